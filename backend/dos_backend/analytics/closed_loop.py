@@ -22,7 +22,7 @@ Key Features:
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import math
 
@@ -88,7 +88,11 @@ class ClosedLoopReport:
         }
 
 
-def run_closed_loop(csv_layer, asof_date: datetime) -> ClosedLoopReport:
+def run_closed_loop(
+    csv_layer,
+    asof_date: datetime,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> ClosedLoopReport:
     """
     Execute closed-loop KPI-driven parameter tuning analysis.
     
@@ -104,6 +108,8 @@ def run_closed_loop(csv_layer, asof_date: datetime) -> ClosedLoopReport:
     Args:
         csv_layer: CSVLayer instance for data access
         asof_date: Date for "as-of" analysis (typically today)
+        progress: Optional ``progress(done, total)`` called before each SKU
+            (may raise to abort the run between SKUs)
     
     Returns:
         ClosedLoopReport with decisions and summary statistics
@@ -158,7 +164,9 @@ def run_closed_loop(csv_layer, asof_date: datetime) -> ClosedLoopReport:
     resolver = TargetServiceLevelResolver(settings)
     
     # Process each SKU
-    for sku_obj in skus:
+    for i, sku_obj in enumerate(skus):
+        if progress is not None:
+            progress(i, len(skus))
         sku_id = sku_obj.sku
         
         # Get current target CSL
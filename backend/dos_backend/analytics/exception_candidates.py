@@ -0,0 +1,222 @@
+"""
+Exception-candidate snapshot for the smart exceptions (triage) view.
+
+Everything the triage filters need that comes from storage — current
+on-hand stock, the latest KPI row and the shelf-life flags per SKU — is
+computed once per data revision.  Threshold and checkbox changes then
+re-filter the in-memory snapshot (``filter_exception_candidates``) without
+touching storage or replaying the ledger again.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from ..domain.ledger import StockCalculator
+from ..domain.models import SKU, Transaction
+
+# Stock above this many times the shelf life (in days) is flagged as a perishability risk
+PERISH_STOCK_FACTOR = 10
+
+
+def _safe_float(value: Any, default: float) -> float:
+    """Parse a KPI CSV value ('' / 'None' / garbage -> default)."""
+    if value is None or value == '' or value == 'None':
+        return default
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+
+@dataclass(frozen=True)
+class ExceptionCandidate:
+    """Per-SKU triage inputs at one data revision."""
+    sku: str
+    description: str
+    shelf_life: int
+    stock: int
+    oos_rate: float
+    otif: float
+    wmape: float
+    perish_risk: bool  # shelf_life > 0, stock > 0 and stock > PERISH_STOCK_FACTOR * shelf_life
+
+
+@dataclass(frozen=True)
+class ExceptionSnapshot:
+    """All exception candidates for one (data revision, as-of date)."""
+    revision: Any
+    asof_date: date
+    candidates: Tuple[ExceptionCandidate, ...]
+
+
+def latest_kpi_by_sku(kpi_rows: Iterable[Mapping[str, Any]]) -> Dict[str, Mapping[str, Any]]:
+    """
+    Latest kpi_daily row per SKU (by ISO date string; the first row wins ties).
+    """
+    kpi_map: Dict[str, Mapping[str, Any]] = {}
+    for kpi in kpi_rows:
+        sku_key = kpi.get("sku", "")
+        kpi_date = kpi.get("date", "")
+        if sku_key and (sku_key not in kpi_map or kpi_date > kpi_map[sku_key].get("date", "")):
+            kpi_map[sku_key] = kpi
+    return kpi_map
+
+
+def build_exception_snapshot(
+    skus: List[SKU],
+    transactions: List[Transaction],
+    kpi_rows: Iterable[Mapping[str, Any]],
+    asof_date: date,
+    revision: Any = None,
+) -> ExceptionSnapshot:
+    """
+    Build exception candidates for all SKUs.
+
+    Args:
+        skus: SKU master data
+        transactions: Full ledger
+        kpi_rows: kpi_daily rows (dicts as returned by read_kpi_daily)
+        asof_date: Stock reference date (events with date < asof_date are applied)
+        revision: Storage revision token recorded on the snapshot
+
+    Returns:
+        ExceptionSnapshot with one candidate per SKU, in SKU master order
+    """
+    stocks = StockCalculator.calculate_all_skus([s.sku for s in skus], asof_date, transactions)
+    kpi_map = latest_kpi_by_sku(kpi_rows)
+
+    candidates = []
+    for sku_obj in skus:
+        sku = sku_obj.sku
+        kpi = kpi_map.get(sku)
+        shelf_life = sku_obj.shelf_life_days if sku_obj.shelf_life_days else 0
+        stock = stocks[sku].on_hand
+        candidates.append(ExceptionCandidate(
+            sku=sku,
+            description=sku_obj.description,
+            shelf_life=shelf_life,
+            stock=stock,
+            oos_rate=_safe_float(kpi.get("oos_rate"), 0.0) if kpi else 0.0,
+            otif=_safe_float(kpi.get("otif_rate"), 100.0) if kpi else 100.0,
+            wmape=_safe_float(kpi.get("wmape"), 0.0) if kpi else 0.0,
+            perish_risk=shelf_life > 0 and stock > 0 and stock > shelf_life * PERISH_STOCK_FACTOR,
+        ))
+    return ExceptionSnapshot(revision=revision, asof_date=asof_date, candidates=tuple(candidates))
+
+
+_SNAPSHOT_CACHE: Dict[str, ExceptionSnapshot] = {}
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+def load_exception_snapshot(storage, asof_date: Optional[date] = None) -> ExceptionSnapshot:
+    """
+    Return the exception snapshot for ``storage``, rebuilt only on data changes.
+
+    Args:
+        storage: CSVLayer / StorageAdapter (``data_revision()`` keys the cache)
+        asof_date: Stock reference date (default: tomorrow, i.e. including today)
+
+    Returns:
+        ExceptionSnapshot shared by every caller within the same revision
+    """
+    if asof_date is None:
+        asof_date = date.today() + timedelta(days=1)
+    try:
+        key = str(Path(storage.data_dir).resolve())
+        revision = storage.data_revision()
+    except (AttributeError, TypeError):
+        # Layers without revision tracking (e.g. test doubles): no caching
+        key, revision = None, None
+
+    if key is not None:
+        with _SNAPSHOT_LOCK:
+            cached = _SNAPSHOT_CACHE.get(key)
+        if cached is not None and cached.revision == revision and cached.asof_date == asof_date:
+            return cached
+
+    snapshot = build_exception_snapshot(
+        storage.read_skus(),
+        storage.read_transactions(),
+        storage.read_kpi_daily(),
+        asof_date,
+        revision=revision,
+    )
+    if key is not None:
+        with _SNAPSHOT_LOCK:
+            _SNAPSHOT_CACHE[key] = snapshot
+    return snapshot
+
+
+def filter_exception_candidates(
+    snapshot: ExceptionSnapshot,
+    oos_threshold: float,
+    otif_threshold: float,
+    wmape_threshold: float,
+    shelf_threshold: int,
+    filter_oos: bool = True,
+    filter_otif: bool = True,
+    filter_wmape: bool = True,
+    filter_perish: bool = True,
+    unfulfilled_map: Optional[Mapping[str, int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Select problematic SKUs from a snapshot (pure, in-memory).
+
+    Args:
+        snapshot: Result of build/load_exception_snapshot
+        oos_threshold: Flag OOS rate above this (%)
+        otif_threshold: Flag OTIF below this (%)
+        wmape_threshold: Flag WMAPE above this (%)
+        shelf_threshold: Perishability check applies to shelf life below this (days)
+        filter_*: Enabled filters
+        unfulfilled_map: SKU -> unfulfilled qty from the current proposals
+
+    Returns:
+        Row dicts (sku, description, oos_rate, otif, unfulfilled, wmape,
+        shelf_life, stock, reason), most severe first
+    """
+    unfulfilled_map = unfulfilled_map or {}
+    problematic_skus = []
+
+    for c in snapshot.candidates:
+        reasons = []
+        unfulfilled = unfulfilled_map.get(c.sku, 0)
+
+        if filter_oos and c.oos_rate > oos_threshold:
+            reasons.append(f"OOS alto ({c.oos_rate:.1f}%)")
+
+        if filter_otif and (c.otif < otif_threshold or unfulfilled > 0):
+            if c.otif < otif_threshold and unfulfilled > 0:
+                reasons.append(f"OTIF basso ({c.otif:.1f}%) + Unfulfilled ({unfulfilled})")
+            elif unfulfilled > 0:
+                reasons.append(f"Unfulfilled ({unfulfilled})")
+            else:
+                reasons.append(f"OTIF basso ({c.otif:.1f}%)")
+
+        if filter_wmape and c.wmape > wmape_threshold:
+            reasons.append(f"WMAPE alto ({c.wmape:.1f}%)")
+
+        # Critical perishability: short shelf life + stock far above what it can sell through
+        if filter_perish and c.perish_risk and c.shelf_life < shelf_threshold:
+            reasons.append(f"Shelf life critica ({c.shelf_life}d, stock={c.stock})")
+
+        if reasons:
+            problematic_skus.append({
+                "sku": c.sku,
+                "description": c.description,
+                "oos_rate": c.oos_rate,
+                "otif": c.otif,
+                "unfulfilled": unfulfilled,
+                "wmape": c.wmape,
+                "shelf_life": c.shelf_life,
+                "stock": c.stock,
+                "reason": "; ".join(reasons),
+            })
+
+    # Sort by severity (number of reasons, then by OOS rate descending)
+    problematic_skus.sort(key=lambda x: (-len(x["reason"].split(";")), -x["oos_rate"]))
+    return problematic_skus
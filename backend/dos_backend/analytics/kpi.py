@@ -17,7 +17,8 @@ from datetime import date as Date, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from collections import defaultdict
 
-from ..domain.ledger import StockCalculator
+from ..domain.ledger import StockTimeline
+from .oos_engine import load_oos_engine
 from ..domain.models import EventType
 from ..persistence.csv_layer import CSVLayer
 from ..forecast import fit_forecast_model, predict_single_day, predict
@@ -76,6 +77,9 @@ def compute_oos_kpi(
     # Load sales records for stock calculation
     sales_records = csv_layer.read_sales()
     
+    # One forward replay of the SKU's events serves every day of the lookback
+    timeline = StockTimeline(sku, sku_transactions, sales_records)
+    
     # Loop over lookback period day by day
     oos_days_list = []
     valid_days_count = 0
@@ -92,7 +96,7 @@ def compute_oos_kpi(
             continue
         
         # Calculate stock as-of this date
-        stock = StockCalculator.calculate_asof(sku, check_date, all_transactions, sales_records)
+        stock = timeline.asof(check_date)
         
         # Check OOS condition based on mode
         is_oos = False
@@ -240,22 +244,21 @@ def estimate_lost_sales(
     if asof_date is None:
         asof_date = Date.today()
     
-    # Load sales and transactions
-    sales_records = csv_layer.read_sales()
-    transactions = csv_layer.read_transactions()
+    # Daily OOS records of the SKU (one ledger replay, shared per data revision)
+    oos_history = load_oos_engine(csv_layer).history(sku)
     
     # Import here to avoid circular dependency
     from ..workflows.order import calculate_daily_sales_average
     
     # Get average sales and OOS details using existing function
     avg_sales, oos_count, oos_days_list, assortment_out_list = calculate_daily_sales_average(
-        sales_records=sales_records,
+        sales_records=None,
         sku=sku,
         days_lookback=lookback_days,
-        transactions=transactions,
         asof_date=asof_date,
         oos_detection_mode=mode,
         return_details=True,
+        oos_history=oos_history,
     )
     
     result = {
@@ -281,16 +284,11 @@ def estimate_lost_sales(
     assortment_out_set = set(assortment_out_list)
     
     history = []
-    for i in range(lookback_days):
-        day = start_date + timedelta(days=i)
-        
+    for rec in oos_history.records(start_date, asof_date, mode):
         # Skip OOS days and assortment-out days for model training
-        if day in oos_days_set or day in assortment_out_set:
+        if rec.day in oos_days_set or rec.day in assortment_out_set:
             continue
-        
-        # Get sales for this day
-        day_sales = sum(s.qty_sold for s in sales_records if s.sku == sku and s.date == day)
-        history.append({"date": day, "qty_sold": day_sales})
+        history.append({"date": rec.day, "qty_sold": rec.sold})
     
     # Check if we have enough history for forecast model
     if len(history) < 7:
@@ -360,31 +358,27 @@ def compute_forecast_accuracy(
     if asof_date is None:
         asof_date = Date.today()
     
-    # Load sales and transactions
-    sales_records = csv_layer.read_sales()
-    transactions = csv_layer.read_transactions()
+    # Daily OOS records of the SKU (one ledger replay, shared per data revision)
+    oos_history = load_oos_engine(csv_layer).history(sku)
     
     # Build sales history
-    start_date = asof_date - timedelta(days=lookback_days - 1)
-    history = []
-    
-    for i in range(lookback_days):
-        day = start_date + timedelta(days=i)
-        day_sales = sum(s.qty_sold for s in sales_records if s.sku == sku and s.date == day)
-        history.append({"date": day, "qty_sold": day_sales})
+    history = [
+        {"date": rec.day, "qty_sold": rec.sold}
+        for rec in oos_history.window(asof_date, lookback_days, mode)
+    ]
     
     # Build censored flags using OOS detection
     # Import here to avoid circular dependency
     from ..workflows.order import calculate_daily_sales_average
     
     _, _, oos_days_list, assortment_out_list = calculate_daily_sales_average(
-        sales_records=sales_records,
+        sales_records=None,
         sku=sku,
         days_lookback=lookback_days,
-        transactions=transactions,
         asof_date=asof_date,
         oos_detection_mode=mode,
         return_details=True,
+        oos_history=oos_history,
     )
     
     oos_days_set = set(oos_days_list)
@@ -744,30 +738,21 @@ def compute_pi80_coverage_kpi(
         "sufficient_data": False,
     }
 
-    sales_records = csv_layer.read_sales()
-    transactions  = csv_layer.read_transactions()
-    start_date    = asof_date - timedelta(days=lookback_days - 1)
-
+    oos_history = load_oos_engine(csv_layer).history(sku)
     history: List[Dict] = [
-        {
-            "date": start_date + timedelta(days=i),
-            "qty_sold": sum(
-                s.qty_sold for s in sales_records
-                if s.sku == sku and s.date == start_date + timedelta(days=i)
-            ),
-        }
-        for i in range(lookback_days)
+        {"date": rec.day, "qty_sold": rec.sold}
+        for rec in oos_history.window(asof_date, lookback_days, mode)
     ]
 
     from ..workflows.order import calculate_daily_sales_average
     _, _, oos_days_list, assortment_out_list = calculate_daily_sales_average(
-        sales_records=sales_records,
+        sales_records=None,
         sku=sku,
         days_lookback=lookback_days,
-        transactions=transactions,
         asof_date=asof_date,
         oos_detection_mode=mode,
         return_details=True,
+        oos_history=oos_history,
     )
     censored_set = set(oos_days_list) | set(assortment_out_list)
 
@@ -848,30 +833,21 @@ def compute_promo_event_forecast_kpi(
         "wmape_event":   None, "bias_event":  None, "n_event_points": 0,
     }
 
-    sales_records = csv_layer.read_sales()
-    transactions  = csv_layer.read_transactions()
-    start_date    = asof_date - timedelta(days=lookback_days - 1)
-
+    oos_history = load_oos_engine(csv_layer).history(sku)
     history: List[Dict] = [
-        {
-            "date": start_date + timedelta(days=i),
-            "qty_sold": sum(
-                s.qty_sold for s in sales_records
-                if s.sku == sku and s.date == start_date + timedelta(days=i)
-            ),
-        }
-        for i in range(lookback_days)
+        {"date": rec.day, "qty_sold": rec.sold}
+        for rec in oos_history.window(asof_date, lookback_days, mode)
     ]
 
     from ..workflows.order import calculate_daily_sales_average
     _, _, oos_days_list, assortment_out_list = calculate_daily_sales_average(
-        sales_records=sales_records,
+        sales_records=None,
         sku=sku,
         days_lookback=lookback_days,
-        transactions=transactions,
         asof_date=asof_date,
         oos_detection_mode=mode,
         return_details=True,
+        oos_history=oos_history,
     )
     censored_set = set(oos_days_list) | set(assortment_out_list)
 
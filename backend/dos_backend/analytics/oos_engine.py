@@ -0,0 +1,248 @@
+"""
+OOS / censoring engine: per-SKU daily records from a single ledger replay.
+
+For every calendar day a :class:`DayRecord` tells the start-of-day stock,
+the units sold, and whether the day is OOS, out of assortment or covered
+by an OOS estimate override.  ``calculate_daily_sales_average``, the KPI
+functions (lost sales, forecast accuracy, PI80 coverage, promo/event
+accuracy) and proposal PASS A all derive their censored days from these
+records, so a SKU's ledger is replayed once instead of once per caller.
+
+Rules (unchanged from the former per-call implementation):
+  - OOS is checked at the START of the day (state of
+    ``StockCalculator.calculate_asof(day)``): "strict" = on_hand == 0,
+    "relaxed" = on_hand + on_order == 0.  SKUs without ledger events have
+    no OOS days.  Override days (OOS_OVERRIDE event or legacy
+    "OOS_ESTIMATE_OVERRIDE:" note) are never OOS.
+  - Out of assortment: days before the SKU's first activity, days inside
+    ASSORTMENT_OUT -> ASSORTMENT_IN periods (an initial ASSORTMENT_IN on a
+    SKU with no earlier activity means "out since the beginning"), and
+    days after a trailing ASSORTMENT_OUT.  A day with a sales record is
+    never out of assortment.
+"""
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..domain.ledger import StockTimeline
+from ..domain.models import EventType, SalesRecord, Transaction
+
+
+@dataclass(frozen=True)
+class DayRecord:
+    """One calendar day of a SKU."""
+    day: date
+    on_hand: int  # start of day (events of the day not applied)
+    on_order: int
+    sold: int  # units in sales records for the day
+    oos: bool
+    out_of_assortment: bool
+    override: bool
+
+    @property
+    def censored(self) -> bool:
+        """Excluded from demand averages (OOS or out of assortment)."""
+        return self.oos or self.out_of_assortment
+
+
+@dataclass(frozen=True)
+class CensoringSummary:
+    """Lookback-window summary (the ``calculate_daily_sales_average`` details)."""
+    avg_daily_sales: float
+    oos_days: List[date]
+    out_of_assortment_days: List[date]
+
+    @property
+    def oos_days_count(self) -> int:
+        return len(self.oos_days)
+
+
+class SkuOosHistory:
+    """Daily OOS / assortment records of one SKU (one replay, any date range)."""
+
+    def __init__(self, sku: str, transactions: Sequence[Transaction], sales_records: Sequence[SalesRecord]):
+        """
+        Args:
+            sku: SKU identifier
+            transactions: Ledger events of this SKU
+            sales_records: Sales records of this SKU
+        """
+        self.sku = sku
+        txns = list(transactions)
+        sales = list(sales_records)
+        self._has_ledger = bool(txns)
+        self._timeline = StockTimeline(sku, txns, sales)
+
+        self._sold: Dict[date, int] = {}
+        for s in sales:
+            self._sold[s.date] = self._sold.get(s.date, 0) + s.qty_sold
+
+        self._overrides = {
+            t.date for t in txns
+            if t.event == EventType.OOS_OVERRIDE or (t.note and "OOS_ESTIMATE_OVERRIDE:" in t.note)
+        }
+
+        dates = [t.date for t in txns] + list(self._sold)
+        self._first_activity: Optional[date] = min(dates) if dates else None
+        self._out_periods = self._assortment_out_periods(txns)
+        self._lock = threading.Lock()
+        self._summaries: Dict[Tuple[date, int, str], CensoringSummary] = {}
+
+    def _assortment_out_periods(self, txns: List[Transaction]) -> List[Tuple[Optional[date], Optional[date]]]:
+        """Half-open [out, in) periods; None = unbounded (since the beginning / still out)."""
+        events = sorted(
+            (t for t in txns if t.event in (EventType.ASSORTMENT_OUT, EventType.ASSORTMENT_IN)),
+            key=lambda t: t.date,
+        )
+        periods: List[Tuple[Optional[date], Optional[date]]] = []
+        currently_out, out_start = False, None
+        # Orphan ASSORTMENT_IN on a SKU that was already trading is spurious (SKU_EDIT toggle)
+        if (events and events[0].event == EventType.ASSORTMENT_IN
+                and (self._first_activity is None or self._first_activity >= events[0].date)):
+            currently_out = True
+        for event in events:
+            if event.event == EventType.ASSORTMENT_OUT:
+                currently_out, out_start = True, event.date
+            elif event.event == EventType.ASSORTMENT_IN:
+                if currently_out:
+                    periods.append((out_start, event.date))
+                currently_out, out_start = False, None
+        if currently_out:
+            periods.append((out_start, None))
+        return periods
+
+    def _out_of_assortment(self, day: date) -> bool:
+        if day in self._sold:
+            return False  # sales immunity
+        if self._first_activity is not None and day < self._first_activity:
+            return True  # pre-existence
+        for start, end in self._out_periods:
+            if (start is None or day >= start) and (end is None or day < end):
+                return True
+        return False
+
+    def records(self, start: date, end: date, mode: str = "strict") -> List[DayRecord]:
+        """DayRecords for ``start``..``end`` (inclusive), OOS evaluated with ``mode`` (else "relaxed")."""
+        result: List[DayRecord] = []
+        day = start
+        while day <= end:
+            stock = self._timeline.asof(day)  # start of day
+            on_hand, on_order = stock.on_hand, stock.on_order
+            override = day in self._overrides
+            if not self._has_ledger or override:
+                oos = False
+            elif mode == "strict":
+                oos = on_hand == 0
+            else:
+                oos = on_hand + on_order == 0
+            result.append(DayRecord(
+                day=day,
+                on_hand=on_hand,
+                on_order=on_order,
+                sold=self._sold.get(day, 0),
+                oos=oos,
+                out_of_assortment=self._out_of_assortment(day),
+                override=override,
+            ))
+            day += timedelta(days=1)
+        return result
+
+    def window(self, asof_date: date, days_lookback: int, mode: str = "strict") -> List[DayRecord]:
+        """The ``days_lookback`` days ending at ``asof_date`` (inclusive)."""
+        return self.records(asof_date - timedelta(days=days_lookback - 1), asof_date, mode)
+
+    def summary(self, asof_date: date, days_lookback: int, mode: str = "strict") -> CensoringSummary:
+        """Censored average daily sales over the lookback window (memoized)."""
+        key = (asof_date, days_lookback, mode)
+        with self._lock:
+            cached = self._summaries.get(key)
+        if cached is not None:
+            return cached
+        total_sales = valid_days = 0
+        oos_days: List[date] = []
+        out_days: List[date] = []
+        for rec in self.window(asof_date, days_lookback, mode):
+            if rec.oos:
+                oos_days.append(rec.day)
+            if rec.out_of_assortment:
+                out_days.append(rec.day)
+            if not rec.censored:
+                total_sales += rec.sold
+                valid_days += 1
+        summary = CensoringSummary(
+            avg_daily_sales=total_sales / valid_days if valid_days > 0 else 0.0,
+            oos_days=oos_days,
+            out_of_assortment_days=out_days,
+        )
+        with self._lock:
+            self._summaries[key] = summary
+        return summary
+
+
+class OosEngine:
+    """Per-SKU OOS histories over one (transactions, sales) dataset."""
+
+    def __init__(
+        self,
+        transactions: Sequence[Transaction],
+        sales_records: Sequence[SalesRecord],
+        revision: Any = None,
+    ):
+        self.revision = revision
+        self._txns: Dict[str, List[Transaction]] = defaultdict(list)
+        for t in transactions:
+            self._txns[t.sku].append(t)
+        self._sales: Dict[str, List[SalesRecord]] = defaultdict(list)
+        for s in sales_records:
+            self._sales[s.sku].append(s)
+        self._lock = threading.Lock()
+        self._histories: Dict[str, SkuOosHistory] = {}
+
+    def history(self, sku: str) -> SkuOosHistory:
+        """OOS history of ``sku`` (built on first use)."""
+        with self._lock:
+            history = self._histories.get(sku)
+        if history is None:
+            history = SkuOosHistory(sku, self._txns.get(sku, []), self._sales.get(sku, []))
+            with self._lock:
+                history = self._histories.setdefault(sku, history)
+        return history
+
+
+_ENGINE_CACHE: Dict[str, OosEngine] = {}
+_ENGINE_LOCK = threading.Lock()
+
+
+def load_oos_engine(storage) -> OosEngine:
+    """
+    Return the OOS engine for ``storage``, rebuilt only on data changes.
+
+    Args:
+        storage: CSVLayer / StorageAdapter (``data_revision()`` keys the cache)
+
+    Returns:
+        OosEngine shared by every caller within the same revision
+    """
+    try:
+        key = str(Path(storage.data_dir).resolve())
+        revision = storage.data_revision()
+    except (AttributeError, TypeError):
+        # Layers without revision tracking (e.g. test doubles): no caching
+        key, revision = None, None
+
+    if key is not None:
+        with _ENGINE_LOCK:
+            cached = _ENGINE_CACHE.get(key)
+        if cached is not None and cached.revision == revision:
+            return cached
+
+    engine = OosEngine(storage.read_transactions(), storage.read_sales(), revision=revision)
+    if key is not None:
+        with _ENGINE_LOCK:
+            _ENGINE_CACHE[key] = engine
+    return engine
@@ -318,6 +318,20 @@ def build_feature_row(
     return row
 
 
+def index_sales_by_sku(sales_records: List[Any]) -> Dict[str, List[Any]]:
+    """
+    Group sales records by SKU (input order preserved within each SKU).
+
+    Passing ``index[sku]`` as ``sales_records`` to :func:`build_feature_row`
+    gives the same FeatureRow as passing the full list, without rescanning
+    every SKU's history for each SKU.
+    """
+    by_sku: Dict[str, List[Any]] = {}
+    for s in sales_records:
+        by_sku.setdefault(s.sku, []).append(s)
+    return by_sku
+
+
 # ---------------------------------------------------------------------------
 # Normalisation utilities (pure, stateless per-function)
 # ---------------------------------------------------------------------------
@@ -340,17 +354,37 @@ def _percentile_rank(value: float, population: Sequence[float]) -> float:
     return (below + 0.5 * equal) / n
 
 
+def _percentile_ranks(values: Sequence[float]) -> List[float]:
+    """
+    Percentile rank of every element of `values` within `values` itself.
+
+    Same result as ``[_percentile_rank(v, values) for v in values]`` but with a
+    single sort: each run of equal values shares (below + 0.5·equal) / n.
+    """
+    n = len(values)
+    if n == 0:
+        return []
+    order = sorted(range(n), key=values.__getitem__)
+    ranks = [0.0] * n
+    start = 0
+    while start < n:
+        value = values[order[start]]
+        end = start + 1
+        while end < n and values[order[end]] == value:
+            end += 1
+        rank = (start + 0.5 * (end - start)) / n
+        for i in range(start, end):
+            ranks[order[i]] = rank
+        start = end
+    return ranks
+
+
 def _robust_scale_list(values: List[float]) -> List[float]:
     """
     Scale a list to [0, 100] using percentile rank (robust, no outlier distortion).
     Zero-variance input → all 50.0.
     """
-    if not values:
-        return []
-    ranks = []
-    for v in values:
-        ranks.append(_percentile_rank(v, values) * 100.0)
-    return ranks
+    return [r * 100.0 for r in _percentile_ranks(values)]
 
 
 # ---------------------------------------------------------------------------
@@ -661,6 +695,180 @@ def compute_health_score(
     return _clamp(health, 0.0, 100.0), detail
 
 
+def _active_weights(
+    weights: Optional[Dict[str, float]],
+    waste_applicable: bool,
+) -> Optional[Dict[str, float]]:
+    """Renormalised weights exactly as compute_health_score derives them; None if degenerate."""
+    w = dict(DEFAULT_WEIGHTS) if weights is None else dict(weights)
+    if not waste_applicable:
+        w["waste"] = 0.0
+    total_w = sum(w.values())
+    if total_w <= 0:
+        return None
+    return {k: v / total_w for k, v in w.items()}
+
+
+def compute_health_scores(
+    feature_rows: List[FeatureRow],
+    weights: Optional[Dict[str, float]] = None,
+) -> List[Tuple[float, Dict[str, Any]]]:
+    """
+    Columnar equivalent of ``[compute_health_score(r, weights) for r in rows]``.
+
+    Feature fields are laid out as float64 columns (None → NaN plus an
+    observed mask) and each sub-score is evaluated for the whole population
+    with the same operation order as the scalar helpers, so results are
+    bit-identical.  Only two weight sets exist (perishable / not), so the
+    renormalisation is resolved once per set rather than once per SKU.
+
+    Args:
+        feature_rows: FeatureRows to score.
+        weights:      Custom weight dict (see compute_health_score).
+
+    Returns:
+        One (health_score, detail_dict) per row, same order.
+    """
+    if not feature_rows:
+        return []
+
+    import numpy as np
+
+    nan = float("nan")
+
+    def col(attr: str) -> "np.ndarray":
+        values = [getattr(r, attr) for r in feature_rows]
+        return np.array([nan if v is None else v for v in values], dtype=float)
+
+    def clamp(a, lo: float, hi: float):
+        return np.minimum(np.maximum(a, lo), hi)
+
+    perishable = np.array(
+        [r.shelf_life_days is not None and r.shelf_life_days > 0 for r in feature_rows],
+        dtype=bool,
+    )
+    w_perish = _active_weights(weights, True)
+    w_plain = _active_weights(weights, False)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Availability
+        oos = col("oos_rate")
+        avail = np.where(np.isnan(oos), 50.0, clamp((1.0 - oos) * 100.0, 0.0, 100.0))
+
+        # Waste / freshness (perishables only)
+        waste_rate = col("waste_rate")
+        waste = np.where(
+            perishable,
+            np.where(np.isnan(waste_rate), 50.0, clamp((1.0 - waste_rate) * 100.0, 0.0, 100.0)),
+            0.0,
+        )
+
+        # Inventory efficiency (bell curve on days-of-supply)
+        dos = col("days_of_supply")
+        dos_c = np.where(dos < 0, 0.0, dos)
+        below = clamp(dos_c / DOS_TARGET_LOW * 100.0, 0.0, 100.0) if DOS_TARGET_LOW > 0 else np.zeros_like(dos_c)
+        over_frac = 1.0 - ((dos_c - DOS_TARGET_HIGH) / DOS_TARGET_HIGH if DOS_TARGET_HIGH > 0 else 1.0)
+        above = clamp(over_frac * 100.0, 0.0, 100.0)
+        inv = np.where(
+            np.isnan(dos),
+            50.0,
+            np.where(
+                (dos_c >= DOS_TARGET_LOW) & (dos_c <= DOS_TARGET_HIGH),
+                100.0,
+                np.where(dos_c < DOS_TARGET_LOW, below, above),
+            ),
+        )
+
+        # Supplier (fill 40 %, OTIF 40 %, delay 20 %)
+        fill = col("fill_rate")
+        otif = col("otif_rate")
+        delay = col("avg_delay_days")
+        fill_s = np.where(np.isnan(fill), 50.0, clamp(fill, 0.0, 1.0) * 100.0)
+        otif_s = np.where(np.isnan(otif), 50.0, clamp(otif, 0.0, 1.0) * 100.0)
+        delay_s = np.where(
+            np.isnan(delay), 50.0, clamp((1.0 - delay / MAX_DELAY_DAYS) * 100.0, 0.0, 100.0)
+        )
+        supp = clamp(fill_s * 0.40 + otif_s * 0.40 + delay_s * 0.20, 0.0, 100.0)
+
+        # Forecast quality: legacy (WMAPE + bias) blended with v4 metrics
+        wmape = col("wmape")
+        bias = col("bias")
+        ads = col("avg_daily_sales_for_bias")
+        wmape_s = np.where(
+            np.isnan(wmape), 50.0, clamp((1.0 - wmape / WMAPE_CAP_PCT) * 100.0, 0.0, 100.0)
+        )
+        bias_ok = ~np.isnan(bias) & (ads > 0)
+        nbias = np.minimum(np.abs(bias) / ads, BIAS_WINSOR)
+        bias_s = np.where(bias_ok, clamp((1.0 - nbias / BIAS_WINSOR) * 100.0, 0.0, 100.0), 50.0)
+        legacy = 0.70 * wmape_s + 0.30 * bias_s
+
+        pi80_err = col("pi80_coverage_error")
+        wmape_promo = col("wmape_promo")
+        wmape_event = col("wmape_event")
+        n_promo = np.array([r.n_promo_points for r in feature_rows], dtype=float)
+        n_event = np.array([r.n_event_points for r in feature_rows], dtype=float)
+        has_pi80 = ~np.isnan(pi80_err)
+        has_promo = ~np.isnan(wmape_promo) & (n_promo >= MIN_PROMO_POINTS)
+        has_event = ~np.isnan(wmape_event) & (n_event >= MIN_EVENT_POINTS)
+        # Accumulate in the scalar helper's append order (pi80, promo, event)
+        new_sum = np.where(has_pi80, clamp(100.0 - np.abs(pi80_err) * 200.0, 0.0, 100.0), 0.0)
+        new_sum = new_sum + np.where(
+            has_promo, clamp((1.0 - wmape_promo / WMAPE_CAP_PCT) * 100.0, 0.0, 100.0), 0.0
+        )
+        new_sum = new_sum + np.where(
+            has_event, clamp((1.0 - wmape_event / WMAPE_CAP_PCT) * 100.0, 0.0, 100.0), 0.0
+        )
+        n_new = has_pi80.astype(int) + has_promo.astype(int) + has_event.astype(int)
+        blended = _FORECAST_LEGACY_WEIGHT * legacy + _FORECAST_NEW_WEIGHT * (new_sum / n_new)
+        fc = clamp(np.where(n_new > 0, blended, legacy), 0.0, 100.0)
+
+        # Weighted health, one weight set per perishability class
+        def weighted(w: Optional[Dict[str, float]]):
+            if w is None:
+                return np.full(len(feature_rows), nan)
+            return (
+                w["availability"]  * avail +
+                w["waste"]         * waste +
+                w["inventory_eff"] * inv   +
+                w["supplier"]      * supp  +
+                w["forecast"]      * fc
+            )
+
+        health = clamp(np.where(perishable, weighted(w_perish), weighted(w_plain)), 0.0, 100.0)
+
+    rounded = {
+        flag: None if w is None else {k: round(w[k], 4) for k in (
+            "availability", "waste", "inventory_eff", "supplier", "forecast")}
+        for flag, w in ((True, w_perish), (False, w_plain))
+    }
+
+    out: List[Tuple[float, Dict[str, Any]]] = []
+    columns = zip(
+        perishable.tolist(), health.tolist(), avail.tolist(), waste.tolist(),
+        inv.tolist(), supp.tolist(), fc.tolist(),
+    )
+    for row, (is_p, h, a, ws, i, sp, f) in zip(feature_rows, columns):
+        rw = rounded[is_p]
+        if rw is None:
+            # Degenerate weights: defer to the scalar path for its neutral output
+            out.append(compute_health_score(row, weights))
+            continue
+        out.append((h, {
+            "health_availability_score":   a,
+            "health_waste_score":          ws,
+            "health_inventory_eff_score":  i,
+            "health_supplier_score":       sp,
+            "health_forecast_score":       f,
+            "weight_availability":         rw["availability"],
+            "weight_waste":                rw["waste"],
+            "weight_inventory_eff":        rw["inventory_eff"],
+            "weight_supplier":             rw["supplier"],
+            "weight_forecast":             rw["forecast"],
+            "is_perishable":               is_p,
+        }))
+    return out
+
+
 # ---------------------------------------------------------------------------
 # Priority scoring (cross-SKU for robust rescaling)
 # ---------------------------------------------------------------------------
@@ -736,7 +944,7 @@ def score_all_skus(
 
     Steps:
       1. Compute Importance (cross-SKU, robust scaling)
-      2. Compute Health (per-SKU, renormalised weights)
+      2. Compute Health (columnar, renormalised weights)
       3. Compute Priority (cross-SKU, robust scaling of raw product)
       4. Set confidence / data-quality
 
@@ -753,11 +961,12 @@ def score_all_skus(
     # --- Step 1: Importance ---
     importance_map = compute_importance_scores(feature_rows)
 
-    # --- Step 2: Health (per-SKU) ---
+    # --- Step 2: Health (columnar over the population) ---
+    health_rows = compute_health_scores(feature_rows, weights)
+
     results: List[SKUScoringResult] = []
-    for row in feature_rows:
+    for row, (health, detail) in zip(feature_rows, health_rows):
         imp, u_comp, f_comp = importance_map.get(row.sku, (50.0, 50.0, 50.0))
-        health, detail = compute_health_score(row, weights)
 
         confidence, flag, n_missing = _compute_confidence(row, imp)
 
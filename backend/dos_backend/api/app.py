@@ -104,13 +104,35 @@ def _run_sqlite_startup() -> None:
 
 @asynccontextmanager
 async def _lifespan(app: FastAPI) -> AsyncGenerator[None, None]:  # noqa: ARG001
-    """Run heavy startup work before accepting requests, clean up on shutdown."""
+    """Run heavy startup work before accepting requests, clean up on shutdown.
+
+    Also starts the idempotency-key TTL compaction (daemon thread, first pass
+    right away, then every 6 h) and the storage executor (single writer
+    thread + ``DOS_STORAGE_READERS`` reader threads, see ``api.executor``);
+    both are stopped on shutdown.
+    """
+    from ..config import get_idempotency_ttl_days, get_storage_queue_limit, get_storage_readers
+    from .deps import db_path
+    from .executor import StorageExecutor, set_executor
+    from .idempotency import IdempotencyCompactor
+
     loop = asyncio.get_running_loop()
     with concurrent.futures.ThreadPoolExecutor(
         max_workers=1, thread_name_prefix="dos-startup"
     ) as pool:
         await loop.run_in_executor(pool, _run_sqlite_startup)
-    yield  # server is live here
+    compactor = IdempotencyCompactor(db_path(), ttl_days=get_idempotency_ttl_days())
+    compactor.start()
+    readers = get_storage_readers()
+    executor = StorageExecutor(readers, get_storage_queue_limit()) if readers > 0 else None
+    set_executor(executor)
+    try:
+        yield  # server is live here
+    finally:
+        set_executor(None)
+        if executor is not None:
+            executor.shutdown()
+        compactor.stop()
 
 
 # ---------------------------------------------------------------------------
@@ -208,8 +230,9 @@ def create_app() -> FastAPI:
     Steps performed:
     1. Configure stdlib logging for the ``dos_backend`` namespace
     2. Create FastAPI instance with title, version, and /api/docs active
-    3. Register exception handlers (ErrorEnvelope wrapping)
-    4. Include all routers under /api/v1 (except /health which is at root)
+    3. Add ``Connection: close`` middleware only if ``DOS_KEEP_ALIVE`` is off
+    4. Register exception handlers (ErrorEnvelope wrapping)
+    5. Include all routers under /api/v1 (except /health which is at root)
 
     Call once at module level for production, or per-test for isolation.
     """
@@ -230,11 +253,20 @@ def create_app() -> FastAPI:
     )
 
     # ------------------------------------------------------------------
-    # Middleware — Connection: close rimosso; il keep-alive è gestito
-    # tramite timeout_keep_alive=5 (uvicorn) + ConnectionPool idle=3 s
-    # (OkHttp).  Il pool OkHttp scade a 3 s, prima che uvicorn chiuda
-    # la connessione a 5 s → zero connessioni stale, zero middleware.
+    # Middleware — keep-alive attivo di default, gestito tramite
+    # timeout_keep_alive (DOS_KEEP_ALIVE_TIMEOUT, default 5 s, uvicorn)
+    # + ConnectionPool idle=3 s (OkHttp).  Il pool OkHttp scade a 3 s,
+    # prima che uvicorn chiuda la connessione → zero connessioni stale.
+    # DOS_KEEP_ALIVE=0 ripristina Connection: close (client/proxy legacy).
     # ------------------------------------------------------------------
+    from ..config import get_keep_alive
+    if not get_keep_alive():
+        app.add_middleware(_ConnectionCloseMiddleware)
+
+    # Revision-keyed cache of the read endpoints (see api.response_cache)
+    from ..config import get_response_cache_size
+    from .response_cache import ResponseCache
+    app.state.response_cache = ResponseCache(get_response_cache_size())
 
     # ------------------------------------------------------------------
     # Exception handlers — wrap everything in ErrorEnvelope
@@ -8,6 +8,8 @@ Exported
 get_db          Yields a raw ``sqlite3.Connection`` (row_factory=sqlite3.Row).
                 Resolves path from DOS_DB_PATH env → dos_backend.config.DATABASE_PATH.
 
+db_path         The database file ``get_db`` connects to (same resolution).
+
 get_storage     Yields a ``StorageAdapter`` (csv or sqlite per dos_backend.config).
                 Backend selection follows: DOS_STORAGE_BACKEND → settings.json → default.
 
@@ -23,13 +25,18 @@ from typing import Generator
 from .auth import optional_token, verify_token  # re-export for convenience
 from ..config import DATABASE_PATH
 
-__all__ = ["get_db", "get_storage", "verify_token", "optional_token"]
+__all__ = ["get_db", "db_path", "get_storage", "verify_token", "optional_token"]
 
 
 # ---------------------------------------------------------------------------
 # SQLite connection
 # ---------------------------------------------------------------------------
 
+def db_path() -> str:
+    """Return the SQLite file used by ``get_db`` (``DOS_DB_PATH`` → ``DATABASE_PATH``)."""
+    return os.environ.get("DOS_DB_PATH", "").strip() or str(DATABASE_PATH)
+
+
 def get_db() -> Generator[sqlite3.Connection, None, None]:
     """
     Yield a ``sqlite3.Connection`` scoped to the current HTTP request.
@@ -41,8 +48,7 @@ def get_db() -> Generator[sqlite3.Connection, None, None]:
     The connection is always closed in the ``finally`` block regardless of errors.
     ``row_factory`` is set to ``sqlite3.Row`` for dict-like column access.
     """
-    db_path = os.environ.get("DOS_DB_PATH", "").strip() or str(DATABASE_PATH)
-    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn = sqlite3.connect(db_path(), check_same_thread=False)
     conn.row_factory = sqlite3.Row
     try:
         yield conn
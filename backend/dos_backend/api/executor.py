@@ -0,0 +1,259 @@
+"""
+dos_backend/api/executor.py — Storage executor for the API routes.
+
+Routers are plain ``def`` functions doing blocking SQLite/CSV I/O and
+CPU-bound ledger replay.  Declaring a router with ``route_class=StorageRoute``
+turns each endpoint into an ``async`` wrapper that runs the original function
+on the process-wide ``StorageExecutor``:
+
+  reads   GET / HEAD endpoints → reader pool (``DOS_STORAGE_READERS`` threads)
+  writes  any other method     → one dedicated writer thread (FIFO queue)
+
+Writes are therefore serialized by the queue instead of contending for
+SQLite / CSV locks, and a slow read (e.g. a full ``/stock``) only occupies
+one reader thread: scanner lookups from other handhelds keep being served
+by the rest of the pool.  Each lane admits at most ``queue_limit`` requests
+(queued + running); beyond that the request fails fast with 503 instead of
+piling up behind a stalled lane.
+
+Request-scoped storage dependencies (``Depends(get_storage)`` /
+``Depends(get_db)``: StorageAdapter construction, journal recovery, SQLite
+open) are resolved on the same lane as the endpoint rather than by FastAPI on
+Starlette's threadpool; ``app.dependency_overrides`` are honoured.  They are
+torn down on the lane when the endpoint returns or, for a
+``StreamingResponse``, when its body is exhausted.  Streamed bodies
+(``api.streaming``) produce every chunk on the reader lane via
+``iterate_on_lane``.
+
+The executor is installed by the app lifespan (``set_executor``).  Without
+one (executor disabled, or a TestClient used without lifespan) the wrappers
+fall back to Starlette's threadpool, i.e. the former behaviour.
+
+Every finished write-lane request (committed or failed) bumps
+``write_generation()``, the in-process part of the revision the response
+cache and the read ETags are keyed on (see ``api.response_cache``).
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import inspect
+import logging
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+from fastapi import Request, params
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+from .deps import get_db, get_storage
+from .errors import ServiceUnavailableError
+
+logger = logging.getLogger("dos_backend.api.executor")
+
+_READ_METHODS = frozenset({"GET", "HEAD"})
+
+# Dependencies resolved on the endpoint's lane instead of by FastAPI
+_LANE_DEPENDENCIES = (get_storage, get_db)
+
+# Extra parameter the wrappers receive the Request through
+_REQUEST_PARAM = "_storage_route_request"
+
+_END = object()
+
+
+class StorageExecutor:
+    """Bounded single-writer / multi-reader thread executor."""
+
+    def __init__(self, readers: int = 4, queue_limit: int = 64) -> None:
+        """
+        Args:
+            readers: Reader threads (>= 1)
+            queue_limit: Max requests queued or running per lane
+        """
+        self.queue_limit = queue_limit
+        self._readers = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, readers), thread_name_prefix="dos-read"
+        )
+        self._writer = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="dos-write"
+        )
+        # Touched only from the event loop thread: no lock needed
+        self._pending = {"read": 0, "write": 0}
+
+    def pending(self, lane: str) -> int:
+        """Requests currently queued or running on ``lane`` ("read" / "write")."""
+        return self._pending[lane]
+
+    async def run(self, lane: str, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn`` on ``lane`` and await its result (context variables preserved)."""
+        if self._pending[lane] >= self.queue_limit:
+            logger.warning("Storage executor %s lane full (%d pending)", lane, self._pending[lane])
+            raise ServiceUnavailableError("Server occupato, riprovare tra poco.")
+        self._pending[lane] += 1
+        try:
+            return await self.run_admitted(lane, fn, *args, **kwargs)
+        finally:
+            self._pending[lane] -= 1
+
+    async def run_admitted(self, lane: str, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+        """Like ``run`` without the queue-limit check (continuation of an admitted request)."""
+        pool = self._writer if lane == "write" else self._readers
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, fn, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(pool, call)
+
+    def shutdown(self) -> None:
+        """Finish queued work and stop the threads."""
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+
+
+_executor: Optional[StorageExecutor] = None
+
+# Write-lane requests finished by this process (bumped on the event loop)
+_write_generation = 0
+
+
+def set_executor(executor: Optional[StorageExecutor]) -> None:
+    """Install (or with None remove) the process-wide executor used by StorageRoute."""
+    global _executor
+    _executor = executor
+
+
+def get_executor() -> Optional[StorageExecutor]:
+    """The installed executor, or None (routes use Starlette's threadpool)."""
+    return _executor
+
+
+def write_generation() -> int:
+    """Number of write-lane requests finished so far (changes after every API write)."""
+    return _write_generation
+
+
+async def _run_admitted(lane: str, fn: Callable[..., Any], *args: Any) -> Any:
+    executor = _executor
+    if executor is None:
+        return await run_in_threadpool(fn, *args)
+    return await executor.run_admitted(lane, fn, *args)
+
+
+async def iterate_on_lane(chunks: Iterable[Any], lane: str = "read") -> AsyncIterator[Any]:
+    """Async iterator over ``chunks`` producing each item on ``lane``."""
+    iterator = iter(chunks)
+    while True:
+        chunk = await _run_admitted(lane, next, iterator, _END)
+        if chunk is _END:
+            return
+        yield chunk
+
+
+def _lane_dependency_params(endpoint: Callable[..., Any]) -> dict[str, Callable[..., Any]]:
+    """Endpoint parameters declared as ``Depends(<lane dependency>)``."""
+    return {
+        name: param.default.dependency
+        for name, param in inspect.signature(endpoint).parameters.items()
+        if isinstance(param.default, params.Depends)
+        and param.default.dependency in _LANE_DEPENDENCIES
+    }
+
+
+def _enter(dependency: Callable[..., Any], request: Request, cleanups: list) -> Any:
+    """Resolve ``dependency`` (a plain or generator function) like FastAPI would."""
+    provider = request.app.dependency_overrides.get(dependency, dependency)
+    if inspect.isgeneratorfunction(provider):
+        gen = provider()
+        value = next(gen)
+        cleanups.append(gen.close)
+        return value
+    return provider()
+
+
+def _close(cleanups: list) -> None:
+    for cleanup in reversed(cleanups):
+        cleanup()
+
+
+def _call_with_dependencies(
+    endpoint: Callable[..., Any],
+    deps: dict[str, Callable[..., Any]],
+    request: Request,
+    /,
+    *args: Any,
+    **kwargs: Any,
+) -> tuple[Any, list]:
+    """Resolve ``deps``, call ``endpoint``; returns the result and the pending teardown."""
+    cleanups: list = []
+    try:
+        resolved: dict[Callable[..., Any], Any] = {}  # one instance per request, as FastAPI caches
+        for name, dependency in deps.items():
+            if dependency not in resolved:
+                resolved[dependency] = _enter(dependency, request, cleanups)
+            kwargs[name] = resolved[dependency]
+        result = endpoint(*args, **kwargs)
+    except BaseException:
+        _close(cleanups)
+        raise
+    if not isinstance(result, StreamingResponse):
+        _close(cleanups)
+        cleanups = []
+    return result, cleanups
+
+
+async def _closing(body: AsyncIterator[Any], lane: str, cleanups: list) -> AsyncIterator[Any]:
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        await _run_admitted(lane, _close, cleanups)
+
+
+def _offload(endpoint: Callable[..., Any], lane: str) -> Callable[..., Any]:
+    """Async wrapper running the sync ``endpoint`` (and its storage dependencies) on ``lane``."""
+    deps = _lane_dependency_params(endpoint)
+    call = functools.partial(_call_with_dependencies, endpoint, deps)
+
+    # FastAPI resolves params from this signature: lane dependencies are
+    # dropped (resolved by the wrapper) and the Request is added unless the
+    # endpoint already takes it (FastAPI injects a single Request param)
+    try:
+        signature = inspect.signature(endpoint, eval_str=True)
+    except NameError:
+        signature = inspect.signature(endpoint)
+    kept = [p for name, p in signature.parameters.items() if name not in deps]
+    request_name = next((p.name for p in kept if p.annotation is Request), _REQUEST_PARAM)
+    if request_name == _REQUEST_PARAM:
+        kept.append(inspect.Parameter(_REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+
+    @functools.wraps(endpoint)
+    async def _endpoint(*args: Any, **kwargs: Any) -> Any:
+        global _write_generation
+        request = kwargs[request_name] if request_name != _REQUEST_PARAM else kwargs.pop(_REQUEST_PARAM)
+        executor = _executor
+        try:
+            if executor is None:
+                result, cleanups = await run_in_threadpool(call, request, *args, **kwargs)
+            else:
+                result, cleanups = await executor.run(lane, call, request, *args, **kwargs)
+        finally:
+            if lane == "write":
+                _write_generation += 1
+        if cleanups:
+            # Streamed body still reads from the storage: tear down once sent
+            result.body_iterator = _closing(result.body_iterator, lane, cleanups)
+        return result
+
+    _endpoint.__signature__ = signature.replace(parameters=kept)  # type: ignore[attr-defined]
+    return _endpoint
+
+
+class StorageRoute(APIRoute):
+    """APIRoute that runs sync endpoints on the storage executor (reads vs writes by method)."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        if not asyncio.iscoroutinefunction(endpoint):
+            methods = {m.upper() for m in (kwargs.get("methods") or ["GET"])}
+            endpoint = _offload(endpoint, "read" if methods <= _READ_METHODS else "write")
+        super().__init__(path, endpoint, **kwargs)
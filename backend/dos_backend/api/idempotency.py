@@ -36,18 +36,32 @@ ledger write:
    ``finalize(conn, client_event_id, status_code, response_data)`` to update
    the placeholder with the real response.
 
-3. The *loser* calls ``lookup_with_wait()`` which polls until the winner
+3. The *loser* calls ``lookup_with_wait()`` which waits until the winner
    finalises.  It then replays the stored response with
    ``already_recorded=True``.
 
 This guarantees exactly one ledger write per ``client_event_id``, even under
 concurrent load (threads / gunicorn workers sharing the same SQLite file).
 
+In-process fast path
+--------------------
+Finalised responses never change, so ``finalize()`` also keeps them in a
+bounded LRU (``_RECENT_MAX`` entries) keyed on ``(database file,
+client_event_id)``.  ``lookup()``, ``try_claim()`` and ``lookup_with_wait()``
+answer from it without touching SQLite — an Android offline-queue retry of a
+recent event is replayed from memory.  ``finalize()`` notifies a
+``threading.Condition`` so waiters in the same process wake up immediately;
+waiters in other processes fall back to polling the table every *delay*
+seconds.  ``ensure_schema()`` runs its DDL once per database file.
+In-memory databases (no file) bypass the LRU.
+
 Retention / TTL
 ---------------
-No automatic cleanup is implemented.  For a production deployment a nightly job
-should DELETE rows older than, say, 30 days.  The ``created_at`` index in
-migration 005 makes such a query efficient.
+``compact(conn, ttl_days)`` deletes keys older than *ttl_days* (in batches,
+through the ``created_at`` index of migration 005) and evicts them from the
+LRU.  ``IdempotencyCompactor`` runs it on a daemon thread at server start and
+then every ``interval`` seconds; ``api.app`` starts it in the lifespan with
+the retention of ``DOS_IDEMPOTENCY_TTL_DAYS`` (default 30 days).
 """
 from __future__ import annotations
 
@@ -56,6 +70,8 @@ import logging
 import sqlite3
 import threading
 import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -91,16 +107,77 @@ def _get_lock(conn: sqlite3.Connection) -> threading.RLock:
         return _conn_locks[conn_id]
 
 
+# ---------------------------------------------------------------------------
+# In-process LRU of finalised keys + wake-up condition for waiters
+#
+# Entries: (db_file, client_event_id) → (status_code, response_json, finalised_at)
+# The JSON text is stored (not the dict) so every hit returns a fresh dict the
+# router can mutate (``already_recorded``) without touching the cache.
+# ---------------------------------------------------------------------------
+
+_RECENT_MAX: int = 4096
+_recent: "OrderedDict[tuple[str, str], tuple[int, str, float]]" = OrderedDict()
+_finalized = threading.Condition(threading.Lock())
+
+# Database files whose schema has already been ensured by this process.
+_schema_ready: set[str] = set()
+
+
+def _db_file(conn: sqlite3.Connection) -> Optional[str]:
+    """File of the connection's main database, or ``None`` for in-memory DBs."""
+    try:
+        for _, name, path in conn.execute("PRAGMA database_list").fetchall():
+            if name == "main":
+                return path or None
+    except sqlite3.Error:
+        pass
+    return None
+
+
+def _recent_get(db_file: Optional[str], client_event_id: str) -> Optional[tuple[int, dict]]:
+    """LRU hit for *client_event_id* (caller holds ``_finalized``)."""
+    if db_file is None:
+        return None
+    entry = _recent.get((db_file, client_event_id))
+    if entry is None:
+        return None
+    _recent.move_to_end((db_file, client_event_id))
+    return entry[0], json.loads(entry[1])
+
+
+def _recent_put(db_file: Optional[str], client_event_id: str, status_code: int, response_json: str) -> None:
+    """Remember a finalised response and wake up every waiter."""
+    with _finalized:
+        if db_file is not None:
+            _recent[(db_file, client_event_id)] = (status_code, response_json, time.time())
+            _recent.move_to_end((db_file, client_event_id))
+            while len(_recent) > _RECENT_MAX:
+                _recent.popitem(last=False)
+        _finalized.notify_all()
+
+
+def _cached(conn: sqlite3.Connection, client_event_id: str) -> tuple[Optional[str], Optional[tuple[int, dict]]]:
+    """``(db_file, LRU hit or None)`` for *client_event_id* on *conn*."""
+    with _get_lock(conn):
+        db_file = _db_file(conn)
+    with _finalized:
+        return db_file, _recent_get(db_file, client_event_id)
+
+
 def ensure_schema(conn: sqlite3.Connection) -> None:
     """
     Ensure the idempotency table exists.
 
     Safe to call repeatedly (CREATE TABLE IF NOT EXISTS).  Called once per
-    request by the router.  Uses individual ``execute()`` calls (never
+    request by the router; the DDL only runs the first time a database file
+    is seen by this process.  Uses individual ``execute()`` calls (never
     ``executescript()``) so it is safe to call from multiple threads sharing
     the same connection, provided the per-connection RLock is held.
     """
     with _get_lock(conn):
+        db_file = _db_file(conn)
+        if db_file is not None and db_file in _schema_ready:
+            return
         try:
             # WAL mode + busy timeout improve concurrent access on a shared
             # SQLite file (no-ops on :memory: / already-set connections).
@@ -125,6 +202,8 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
                 """
             )
             conn.commit()
+            if db_file is not None:
+                _schema_ready.add(db_file)
         except sqlite3.Error as exc:
             logger.warning("idempotency: ensure_schema failed — %s", exc)
 
@@ -143,6 +222,9 @@ def lookup(
     Returns:
         ``(status_code, response_dict)`` if the key exists, else ``None``.
     """
+    _, hit = _cached(conn, client_event_id)
+    if hit is not None:
+        return hit
     with _get_lock(conn):
         try:
             row = conn.execute(
@@ -179,6 +261,9 @@ def try_claim(
         ``False`` — another caller already claimed (or finalised) this key;
                     the caller should call ``lookup_with_wait()`` and replay.
     """
+    _, hit = _cached(conn, client_event_id)
+    if hit is not None:
+        return False  # finalised recently: no INSERT + commit needed
     try:
         with _get_lock(conn):
             cursor = conn.execute(
@@ -193,6 +278,8 @@ def try_claim(
             return cursor.rowcount == 1
     except sqlite3.Error as exc:
         logger.warning("idempotency: try_claim failed for %r — %s", client_event_id, exc)
+        # The database may have been replaced: re-run the DDL on the next request.
+        _schema_ready.clear()
         # Fail open: treat as owning the slot to avoid silently dropping data.
         return True
 
@@ -208,9 +295,12 @@ def finalize(
 
     Must be called by the winner of ``try_claim()`` after the ledger write
     succeeds.  Converts ``status_code=0`` (pending) to the actual HTTP status
-    and stores the serialised response for future replay.
+    and stores the serialised response for future replay.  Waiters of the
+    same process are woken up and the response enters the in-process LRU.
     """
+    response_json = json.dumps(response_data, default=str)
     with _get_lock(conn):
+        db_file = _db_file(conn)
         try:
             conn.execute(
                 """
@@ -218,11 +308,13 @@ def finalize(
                    SET status_code = ?, response_json = ?
                  WHERE client_event_id = ?
                 """,
-                (status_code, json.dumps(response_data, default=str), client_event_id),
+                (status_code, response_json, client_event_id),
             )
             conn.commit()
         except sqlite3.Error as exc:
             logger.warning("idempotency: finalize failed for %r — %s", client_event_id, exc)
+            db_file = None  # not persisted: do not serve it from memory either
+    _recent_put(db_file, client_event_id, status_code, response_json)
 
 
 def lookup_with_wait(
@@ -232,19 +324,23 @@ def lookup_with_wait(
     delay: float = 0.02,
 ) -> Optional[tuple[int, dict]]:
     """
-    Poll for a finalised idempotency record, retrying if still pending.
+    Wait for a finalised idempotency record, retrying if still pending.
 
     Called by the *loser* of ``try_claim()`` to wait for the winner to call
-    ``finalize()``.  Retries up to *max_retries* times with *delay* seconds
-    between each attempt.
+    ``finalize()``.  Between attempts the caller blocks on the finalisation
+    condition for up to *delay* seconds: a winner in the same process wakes
+    it up at once, a winner in another process is seen by the next poll of
+    the table.  Gives up after *max_retries* attempts.
 
     Returns:
         ``(status_code, response_dict)`` once finalised, or ``None`` on timeout.
     """
     lock = _get_lock(conn)
+    with lock:
+        db_file = _db_file(conn)
     for attempt in range(max_retries):
         # Acquire the lock briefly for each poll so the winner thread can
-        # call finalize() while the loser sleeps between attempts.
+        # call finalize() while the loser waits between attempts.
         with lock:
             try:
                 row = conn.execute(
@@ -262,7 +358,16 @@ def lookup_with_wait(
                     exc,
                 )
         if attempt < max_retries - 1:
-            time.sleep(delay)
+            with _finalized:
+                # Checked under the condition: a finalize() that ran after the
+                # SELECT above is either visible here or notifies our wait().
+                hit = _recent_get(db_file, client_event_id)
+                if hit is not None:
+                    return hit
+                _finalized.wait(delay)
+                hit = _recent_get(db_file, client_event_id)
+                if hit is not None:
+                    return hit
     logger.warning(
         "idempotency: lookup_with_wait timed out after %d retries for %r",
         max_retries,
@@ -293,3 +398,108 @@ def record(
         finalize(conn, client_event_id, status_code, response_data)
         return True
     return False
+
+
+# ---------------------------------------------------------------------------
+# Retention — TTL compaction
+# ---------------------------------------------------------------------------
+
+def compact(
+    conn: sqlite3.Connection,
+    ttl_days: int = 30,
+    batch_size: int = 500,
+) -> int:
+    """
+    Delete idempotency keys older than *ttl_days* (finalised or still pending).
+
+    Rows are deleted in batches of *batch_size* (one short write transaction
+    each, selected through the ``created_at`` index) so concurrent claims are
+    never blocked for long.  Matching LRU entries are evicted as well.
+
+    Returns:
+        Number of rows deleted (0 when the table does not exist).
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=ttl_days)
+    cutoff_text = cutoff.strftime("%Y-%m-%dT%H:%M:%SZ")
+    deleted = 0
+    lock = _get_lock(conn)
+    while True:
+        with lock:
+            try:
+                cursor = conn.execute(
+                    """
+                    DELETE FROM api_idempotency_keys
+                     WHERE rowid IN (
+                        SELECT rowid FROM api_idempotency_keys
+                         WHERE created_at < ?
+                         LIMIT ?
+                     )
+                    """,
+                    (cutoff_text, batch_size),
+                )
+                conn.commit()
+            except sqlite3.Error as exc:
+                logger.warning("idempotency: compact failed — %s", exc)
+                break
+        deleted += cursor.rowcount
+        if cursor.rowcount < batch_size:
+            break
+
+    expired_before = cutoff.timestamp()
+    with _finalized:
+        for key in [k for k, entry in _recent.items() if entry[2] < expired_before]:
+            del _recent[key]
+    if deleted:
+        logger.info("idempotency: compacted %d key(s) older than %d day(s)", deleted, ttl_days)
+    return deleted
+
+
+class IdempotencyCompactor:
+    """
+    Daemon thread that runs ``compact()`` at start and every *interval* seconds.
+
+    Opens its own connection (read-write, never creating the database file)
+    for each pass, so it never shares a connection with request handlers.
+    """
+
+    def __init__(self, db_path: str, ttl_days: int = 30, interval: float = 6 * 3600.0) -> None:
+        self.db_path = db_path
+        self.ttl_days = ttl_days
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="dos-idempotency-compactor", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> int:
+        """One compaction pass; returns the number of deleted keys."""
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=rw", uri=True, timeout=5.0)
+        except sqlite3.Error:
+            return 0  # no database yet: nothing to compact
+        try:
+            has_table = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='api_idempotency_keys'"
+            ).fetchone()
+            return compact(conn, self.ttl_days) if has_table else 0
+        finally:
+            conn.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as exc:  # never let the thread die
+                logger.warning("idempotency: compaction pass failed — %s", exc)
+            self._stop.wait(self.interval)
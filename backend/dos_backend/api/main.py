@@ -32,7 +32,7 @@ app = create_app()
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
     import uvicorn
-    from dos_backend.config import get_api_host, get_api_port
+    from dos_backend.config import get_api_host, get_api_port, get_keep_alive_timeout
 
     host = get_api_host()
     port = get_api_port()
@@ -45,5 +45,5 @@ if __name__ == "__main__":
         port=port,
         log_level=log_level,
         reload=reload,
-        timeout_keep_alive=5,    # OkHttp pool idle=3 s → scade prima; mai connessioni stale
+        timeout_keep_alive=get_keep_alive_timeout(),  # default 5 s > OkHttp pool idle=3 s → mai connessioni stale
     )
@@ -0,0 +1,115 @@
+"""
+dos_backend/api/response_cache.py — Revision-keyed response cache for read endpoints.
+
+Usage (inside a GET route):
+    return cached_response(request, storage, lambda: _build(...))
+
+Revision
+--------
+The data revision is ``(write_generation(), storage.data_revision(), today)``:
+
+  write_generation  bumped by every API write request of this process
+                    (ledger, SKUs, sales, lots — see ``api.executor``)
+  data_revision     stat of the CSV files / SQLite database, so writes made
+                    by the desktop app on the same data are seen as well
+  today             results default to "as of today", so they expire at
+                    midnight even without writes
+
+Its hash is sent as ``ETag``.  A request whose ``If-None-Match`` matches gets
+``304 Not Modified`` without recomputing anything; otherwise the serialized
+body is served from a bounded LRU keyed on (path, query, revision) and only
+computed on a miss.  Repeated scans of the same barcode across handhelds hit
+the cache until the next write.
+
+The cache lives on ``app.state.response_cache`` (one per app instance,
+``DOS_RESPONSE_CACHE_SIZE`` entries; 0 = ETag only, no cache).  Errors raised
+by the route (404 / 400) are never cached.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from .executor import write_generation
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized JSON bodies for one data revision."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._etag: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, etag: str) -> Optional[bytes]:
+        with self._lock:
+            if etag != self._etag:
+                return None
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: tuple, etag: str, body: bytes) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if etag != self._etag:
+                # Entries of any other revision can never be served again
+                self._entries.clear()
+                self._etag = etag
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def revision_etag(storage: Any) -> str:
+    """Strong ETag of the current data revision (see module docstring)."""
+    token = (write_generation(), storage.data_revision(), date.today().isoformat())
+    return '"%s"' % hashlib.blake2b(repr(token).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    for tag in request.headers.get("if-none-match", "").split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def cached_response(request: Request, storage: Any, build: Callable[[], Any]) -> Response:
+    """
+    JSON response for the current request, served from the cache when possible.
+
+    Args:
+        request: Current request (path + query are the cache key)
+        storage: Request storage (``data_revision()`` part of the revision)
+        build: Computes the response model on a miss
+    """
+    etag = revision_etag(storage)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    cache: Optional[ResponseCache] = getattr(request.app.state, "response_cache", None)
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    body = cache.get(key, etag) if cache is not None else None
+    if body is None:
+        body = json.dumps(
+            jsonable_encoder(build()), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        if cache is not None:
+            cache.put(key, etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,167 @@
+"""
+dos_backend/api/streaming.py — Streamed (NDJSON / chunked JSON) list responses.
+
+Usage (inside a route):
+    fmt = stream_format(request, stream)
+    if fmt is not None:
+        return streaming_response(request, _iter_items(...), fmt, total=n)
+
+Formats
+-------
+ndjson  Client sends ``Accept: application/x-ndjson``: one JSON object per
+        line, no envelope (the item count, when known, is sent as
+        ``X-Total-Count``).
+json    Client passes ``?stream=true``: the same JSON document as the
+        buffered response, written row by row (``envelope`` fields first,
+        then the ``items`` array).
+
+Rows are produced by a generator (typically one storage read per SKU), so
+neither the model list nor the serialized body is ever held in memory.  Each
+chunk is produced on the storage executor's reader lane (not on Starlette's
+threadpool), like the route that returned the response.  The first row is
+flushed as soon as it is ready, then every ``chunk_rows`` rows.
+When the client sends ``Accept-Encoding: gzip`` the body is gzip-compressed
+incrementally, with a sync flush per chunk so compressed bytes reach the
+client while the rest is still being computed.
+
+A storage error mid-stream cannot change the (already sent) status code:
+it is logged and the body is cut short, which NDJSON / JSON clients detect
+as a truncated document.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import zlib
+from typing import Any, Iterable, Iterator, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from .executor import iterate_on_lane
+
+logger = logging.getLogger("dos_backend.api.streaming")
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows per flushed chunk (after the first row, which is flushed alone)
+_CHUNK_ROWS = 64
+
+
+def stream_format(request: Request, stream: bool = False) -> Optional[str]:
+    """Negotiated streamed format: ``"ndjson"``, ``"json"`` or None (buffered response)."""
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", "").lower():
+        return "ndjson"
+    return "json" if stream else None
+
+
+def accepts_gzip(request: Request) -> bool:
+    """True if ``Accept-Encoding`` allows gzip (``q=0`` opts out)."""
+    for token in request.headers.get("accept-encoding", "").lower().split(","):
+        coding, _, params = token.strip().partition(";")
+        if coding.strip() not in ("gzip", "*"):
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def _encode(item: Any) -> bytes:
+    if isinstance(item, BaseModel):
+        return item.model_dump_json().encode("utf-8")
+    return json.dumps(item, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _chunks(
+    items: Iterable[Any],
+    fmt: str,
+    envelope: Optional[dict],
+    items_key: str,
+    chunk_rows: int,
+) -> Iterator[bytes]:
+    """Serialized body, one chunk per batch of rows."""
+    if fmt == "ndjson":
+        head, sep, tail = b"", b"\n", b"\n"
+    elif envelope is not None:
+        fields = json.dumps(envelope, separators=(",", ":"), default=str)[:-1]
+        head = (fields + ("," if envelope else "") + json.dumps(items_key) + ":[").encode("utf-8")
+        sep, tail = b",", b"]}"
+    else:
+        head, sep, tail = b"[", b",", b"]"
+
+    buf = [head]
+    first = True
+    rows = 0
+    for item in items:
+        if not first:
+            buf.append(sep)
+        buf.append(_encode(item))
+        rows += 1
+        if first or rows >= chunk_rows:
+            yield b"".join(buf)
+            buf, rows = [], 0
+        first = False
+    if fmt == "ndjson" and first:
+        tail = b""  # empty NDJSON body
+    buf.append(tail)
+    yield b"".join(buf)
+
+
+def _gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Gzip ``chunks`` incrementally (sync flush after each chunk)."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        out = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def _logged(chunks: Iterator[bytes], path: str) -> Iterator[bytes]:
+    try:
+        yield from chunks
+    except Exception:
+        logger.exception("Streamed response for %s aborted", path)
+        raise
+
+
+def streaming_response(
+    request: Request,
+    items: Iterable[Any],
+    fmt: str,
+    *,
+    envelope: Optional[dict] = None,
+    items_key: str = "items",
+    total: Optional[int] = None,
+    chunk_rows: int = _CHUNK_ROWS,
+) -> StreamingResponse:
+    """
+    Stream ``items`` (Pydantic models or JSON-able dicts) in ``fmt``.
+
+    Args:
+        request: Current request (content negotiation)
+        items: Row generator; consumed lazily while the body is sent
+        fmt: ``"ndjson"`` or ``"json"`` (see ``stream_format``)
+        envelope: JSON mode only — fields written before the items array
+            (None = the body is a bare JSON array)
+        items_key: Name of the items array inside ``envelope``
+        total: Item count, sent as ``X-Total-Count`` if known
+        chunk_rows: Rows per flushed chunk
+    """
+    body: Iterator[bytes] = _chunks(items, fmt, envelope, items_key, chunk_rows)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    if accepts_gzip(request):
+        body = _gzipped(body)
+        headers["Content-Encoding"] = "gzip"
+    media_type = NDJSON_MEDIA_TYPE if fmt == "ndjson" else "application/json"
+    return StreamingResponse(
+        iterate_on_lane(_logged(body, request.url.path)), media_type=media_type, headers=headers
+    )
@@ -23,6 +23,25 @@ DOS_API_TOKEN         Static Bearer token for all authenticated endpoints.
 DOS_CORS_ORIGINS      Comma-separated list of allowed CORS origins.
                       Default: empty (CORS middleware not added).
                       Example: http://localhost:3000,https://app.example.com
+DOS_IDEMPOTENCY_TTL_DAYS
+                      Days an idempotency key (client_event_id) is kept before
+                      the background compaction deletes it (default: 30).
+DOS_STORAGE_READERS   Reader threads of the storage executor that runs the
+                      API routes (default: 4).  Writes always run on one
+                      dedicated writer thread.  0 disables the executor
+                      (routes run on Starlette's default threadpool).
+DOS_STORAGE_QUEUE_LIMIT
+                      Max requests queued or running per executor lane
+                      (reads / writes) before new ones get 503 (default: 64).
+DOS_KEEP_ALIVE        '0' / 'false' forces ``Connection: close`` on every
+                      response (legacy clients); default: keep-alive on.
+DOS_KEEP_ALIVE_TIMEOUT
+                      Seconds uvicorn keeps an idle connection open (default: 5).
+DOS_RESPONSE_CACHE_SIZE
+                      Entries of the in-memory response cache of the read
+                      endpoints (stock, EAN lookup, search, scanner preload);
+                      default: 256, 0 disables it.  Entries are keyed on the
+                      data revision, so any write invalidates them.
 
 Backward-compatibility guarantee
 ---------------------------------
@@ -245,6 +264,58 @@ def get_cors_origins() -> list[str]:
     return [origin.strip() for origin in raw.split(",") if origin.strip()]
 
 
+def get_idempotency_ttl_days() -> int:
+    """Return the idempotency-key retention in days (default: ``30``).
+
+    Invalid or non-positive values are silently replaced by the default.
+    """
+    raw = os.environ.get("DOS_IDEMPOTENCY_TTL_DAYS", "").strip()
+    try:
+        days = int(raw)
+        if days > 0:
+            return days
+    except (ValueError, TypeError):
+        pass
+    return 30
+
+
+def _int_env(name: str, default: int, minimum: int) -> int:
+    """Integer env var; missing, invalid or below ``minimum`` → ``default``."""
+    raw = os.environ.get(name, "").strip()
+    try:
+        value = int(raw)
+        if value >= minimum:
+            return value
+    except (ValueError, TypeError):
+        pass
+    return default
+
+
+def get_storage_readers() -> int:
+    """Return the storage executor reader threads (default: ``4``; ``0`` = disabled)."""
+    return _int_env("DOS_STORAGE_READERS", 4, 0)
+
+
+def get_storage_queue_limit() -> int:
+    """Return the max queued + running requests per executor lane (default: ``64``)."""
+    return _int_env("DOS_STORAGE_QUEUE_LIMIT", 64, 1)
+
+
+def get_keep_alive() -> bool:
+    """Return ``False`` when ``DOS_KEEP_ALIVE`` disables HTTP keep-alive."""
+    return os.environ.get("DOS_KEEP_ALIVE", "").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_keep_alive_timeout() -> int:
+    """Return uvicorn's idle keep-alive timeout in seconds (default: ``5``)."""
+    return _int_env("DOS_KEEP_ALIVE_TIMEOUT", 5, 1)
+
+
+def get_response_cache_size() -> int:
+    """Return the response cache capacity in entries (default: ``256``; ``0`` = disabled)."""
+    return _int_env("DOS_RESPONSE_CACHE_SIZE", 256, 0)
+
+
 # Convenience module-level snapshots (resolved at import time).
 # Use the getter functions above when you need env-var changes to take effect
 # without reloading the module (e.g. inside tests).
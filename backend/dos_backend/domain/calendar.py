@@ -29,9 +29,10 @@ Usage Examples:
 """
 from datetime import date as Date, timedelta
 import json
+import threading
 from enum import Enum
-from typing import Tuple, Optional, TYPE_CHECKING
-from dataclasses import dataclass
+from typing import Any, Callable, Dict, Tuple, Optional, TYPE_CHECKING
+from dataclasses import dataclass, field
 
 if TYPE_CHECKING:
     from .holidays import HolidayCalendar
@@ -56,6 +57,10 @@ class CalendarConfig:
         saturday_lane_lead_time: Lead time for Friday->Saturday lane
         holidays: Set of dates (DEPRECATED: use holiday_calendar instead)
         holiday_calendar: HolidayCalendar instance for effect-aware holiday management
+
+    Each instance also carries a private memo of resolved receipt dates and
+    protection windows (see ``clear_resolution_cache``).  It is not part of
+    equality/repr and is reset automatically when the holiday set changes.
     """
     order_days: set = None          # Default: {0,1,2,3,4} = Mon-Fri
     delivery_days: set = None       # Default: {0,1,2,3,4,5} = Mon-Sat
@@ -63,6 +68,9 @@ class CalendarConfig:
     saturday_lane_lead_time: int = 1  # Friday->Saturday lead time
     holidays: set = None            # DEPRECATED: use holiday_calendar
     holiday_calendar: Optional['HolidayCalendar'] = None  # Effect-aware holiday management
+    _resolution_cache: Dict[str, Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
     
     def __post_init__(self):
         # Set defaults using object.__setattr__ (frozen dataclass)
@@ -78,6 +86,88 @@ class CalendarConfig:
 DEFAULT_CONFIG = CalendarConfig()
 
 
+# ============ Resolution Cache ============
+#
+# Receipt dates and protection windows only depend on (order_date, lane) and
+# the calendar configuration, yet a proposal run evaluates them with identical
+# arguments for every SKU (and again per lane candidate in lane deduction).
+# Results are memoized on the CalendarConfig instance itself, so the cache is
+# shared by every caller holding the same config and dies with it.
+
+_RESOLUTION_CACHE_MAX_ENTRIES = 4096
+_RESOLUTION_LOCK = threading.Lock()
+
+
+def _holiday_fingerprint(config: CalendarConfig) -> tuple:
+    """
+    Hashable token of everything that can change a calendar walk.
+
+    CalendarConfig is frozen, but its sets and the attached HolidayCalendar
+    are mutable; comparing this token on every lookup guarantees that a
+    cached result is never served after the holiday configuration changed.
+    The HolidayCalendar contributes its ``version`` stamp (renewed on every
+    rule change), so a lookup never re-reads the rules.
+    """
+    holiday_cal = config.holiday_calendar
+    return (
+        frozenset(config.order_days),
+        frozenset(config.delivery_days),
+        frozenset(config.holidays),
+        holiday_cal.version if holiday_cal is not None else None,
+    )
+
+
+def _memoized(config: CalendarConfig, key: tuple, compute: Callable[[], Any]) -> Any:
+    """
+    Return compute() memoized on config under key.
+
+    ValueErrors (e.g. SATURDAY lane requested on a Thursday) are memoized too
+    and re-raised on every hit, since lane deduction probes invalid lanes for
+    each SKU.  Thread-safe: the GUI worker pools share DEFAULT_CONFIG.
+    """
+    with _RESOLUTION_LOCK:
+        cache = config._resolution_cache
+        fingerprint = _holiday_fingerprint(config)
+        if cache.get("fingerprint") != fingerprint:
+            cache.clear()
+            cache["fingerprint"] = fingerprint
+            cache["entries"] = {}
+        entries = cache["entries"]
+
+        if key in entries:
+            is_error, value = entries[key]
+            if is_error:
+                raise ValueError(value)
+            return value
+
+    try:
+        value = compute()
+    except ValueError as e:
+        result = (True, str(e))
+    else:
+        result = (False, value)
+    with _RESOLUTION_LOCK:
+        # Store only if the configuration did not change while computing
+        if cache.get("fingerprint") == fingerprint:
+            if len(entries) >= _RESOLUTION_CACHE_MAX_ENTRIES:
+                entries.clear()
+            entries[key] = result
+    if result[0]:
+        raise ValueError(result[1])
+    return value
+
+
+def clear_resolution_cache(config: CalendarConfig = DEFAULT_CONFIG) -> None:
+    """
+    Drop all memoized receipt dates / protection windows for a configuration.
+
+    Not needed after editing holidays (the fingerprint check handles that);
+    useful in tests and after bulk reloads to release memory.
+    """
+    with _RESOLUTION_LOCK:
+        config._resolution_cache.clear()
+
+
 def is_order_day(date: Date, config: CalendarConfig = DEFAULT_CONFIG) -> bool:
     """
     Check if a date is a valid order day.
@@ -184,6 +274,15 @@ def next_receipt_date(
     Raises:
         ValueError: If order_date is not a valid order day
     """
+    return _memoized(
+        config,
+        ("receipt", order_date, lane, config.lead_time_days, config.saturday_lane_lead_time),
+        lambda: _compute_next_receipt_date(order_date, lane, config),
+    )
+
+
+def _compute_next_receipt_date(order_date: Date, lane: Lane, config: CalendarConfig) -> Date:
+    """Uncached body of next_receipt_date (walks the calendar day by day)."""
     if not is_order_day(order_date, config):
         raise ValueError(f"{order_date} is not a valid order day (weekday={order_date.weekday()})")
     
@@ -225,6 +324,15 @@ def next_order_opportunity(
     Returns:
         Next valid order date
     """
+    return _memoized(
+        config,
+        ("next_order", after_date),
+        lambda: _compute_next_order_opportunity(after_date, config),
+    )
+
+
+def _compute_next_order_opportunity(after_date: Date, config: CalendarConfig) -> Date:
+    """Uncached body of next_order_opportunity."""
     current = after_date + timedelta(days=1)
     max_iterations = 14  # Safety limit
     
@@ -282,6 +390,17 @@ def protection_window(
         # Next order = Monday, r2 = Tuesday
         # P = 1 day (Mon -> Tue)
     """
+    return _memoized(
+        config,
+        ("window", order_date, lane, config.lead_time_days, config.saturday_lane_lead_time),
+        lambda: _compute_protection_window(order_date, lane, config),
+    )
+
+
+def _compute_protection_window(
+    order_date: Date, lane: Lane, config: CalendarConfig
+) -> Tuple[Date, Date, int]:
+    """Uncached body of protection_window."""
     # Calculate first receipt date from this order
     r1 = next_receipt_date(order_date, lane, config)
     
@@ -462,7 +581,15 @@ def resolve_receipt_and_protection(
         r1, _r2, P = protection_window(order_date, lane, config)
         return r1, P
 
-    # Override path: r1 is fixed by the caller
+    return _memoized(
+        config,
+        ("override", receipt_override),
+        lambda: _resolve_override_protection(receipt_override, config),
+    )
+
+
+def _resolve_override_protection(receipt_override: Date, config: CalendarConfig) -> Tuple[Date, int]:
+    """(r1, P) for a user-forced receipt date; r2 follows the STANDARD rhythm."""
     r1 = receipt_override
 
     # Derive r2 via STANDARD rhythm: first order opportunity strictly after r1,
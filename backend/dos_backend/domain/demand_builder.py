@@ -393,6 +393,7 @@ def _build_intermittent(
         fit_sba,
         fit_tsb,
         predict_P_days,
+        one_step_forecasts,
         select_best_method,
         estimate_sigma_P_rolling,
         detect_obsolescence,
@@ -474,6 +475,8 @@ def _build_intermittent(
     final_method = method
     backtest_wmape = 0.0
     backtest_bias = 0.0
+    # One forward pass of one-step forecasts, shared by backtest and sigma_P
+    shared_forecasts = None
 
     if method == "intermittent_auto":
         # Automatic selection via classification + backtest
@@ -511,13 +514,15 @@ def _build_intermittent(
                     # Standard intermittent: test SBA and TSB
                     candidates = ["sba", "tsb"]
 
+                shared_forecasts = one_step_forecasts(series, alpha_default, exclude_indices)
                 best_method, results = select_best_method(
                     series=series,
                     candidate_methods=candidates,
                     test_periods=backtest_periods,
                     alpha=alpha_default,
                     exclude_indices=exclude_indices,
-                    metric=backtest_metric
+                    metric=backtest_metric,
+                    forecasts=shared_forecasts,
                 )
                 final_method = best_method
                 backtest_wmape = results[best_method].wmape
@@ -589,7 +594,8 @@ def _build_intermittent(
             series=series,
             model=model,
             P=protection_period_days,
-            exclude_indices=exclude_indices
+            exclude_indices=exclude_indices,
+            forecasts=shared_forecasts if model.alpha == alpha_default else None,
         )
     except Exception as exc:
         logger.warning("sigma_P estimation failed: %s; using fallback", exc)
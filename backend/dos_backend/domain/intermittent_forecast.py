@@ -428,72 +428,124 @@ def classify_intermittent(
 # Backtest (rolling origin)
 # ---------------------------------------------------------------------------
 
-def backtest_method(
+INTERMITTENT_METHODS: Tuple[str, ...] = ("croston", "sba", "tsb")
+
+
+def one_step_forecasts(
     series: List[float],
-    method: str,
-    test_periods: int = 4,
     alpha: float = 0.1,
     exclude_indices: Optional[List[int]] = None
-) -> BacktestResult:
+) -> Dict[str, List[Optional[float]]]:
     """
-    Backtest intermittent method using rolling origin.
-    
-    Strategy:
-    - Split series into train + test windows (rolling forward)
-    - Fit on train, predict 1-step ahead, compare to test
-    - Compute WMAPE and bias
-    
+    One-step-ahead forecasts of Croston, SBA and TSB for every origin.
+
+    Element ``t`` of each list equals ``predict_daily(fit_<method>(series[:t],
+    alpha, [i for i in exclude_indices if i < t]))`` (TSB uses alpha for
+    both demand and probability), or None where that fit would raise
+    (no uncensored observation before t).
+
+    Because all three smoothers are recursive, a single forward pass over
+    the series yields every origin at once: O(n) instead of the O(n²) of
+    refitting from index 0 per test point.  Updates follow the exact
+    operation order of the fit_* functions, so values are bit-identical.
+
     Args:
-        series: full demand series
-        method: 'croston', 'sba', or 'tsb'
-        test_periods: number of test periods to evaluate
-        alpha: smoothing parameter
-        exclude_indices: OOS censored indices
-    
+        series: demand observations
+        alpha: smoothing parameter (0 < alpha <= 1)
+        exclude_indices: OOS censored indices (skipped, as in fit_*)
+
     Returns:
-        BacktestResult with performance metrics
+        {"croston": [...], "sba": [...], "tsb": [...]}, each of len(series) + 1
+        (the last element is the forecast for the day after the series).
     """
-    if len(series) < test_periods + 7:  # need min train data
-        raise ValueError(f"Series too short for backtest: {len(series)} < {test_periods + 7}")
-    
+    if not 0 < alpha <= 1:
+        raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+
     exclude_set = set(exclude_indices or [])
-    
+    sba_correction = 1.0 - alpha / 2.0
+
+    croston: List[Optional[float]] = []
+    sba: List[Optional[float]] = []
+    tsb: List[Optional[float]] = []
+
+    n_clean = 0            # uncensored observations seen so far
+    last_nonzero = -1      # clean index of last non-zero demand (-1 = none yet)
+    p_t = 0.0              # Croston/SBA smoothed interval
+    z_t = 0.0              # Croston/SBA smoothed size
+    tsb_z = 0.0            # TSB smoothed size
+    tsb_b = 0.0            # TSB smoothed probability
+
+    for t in range(len(series) + 1):
+        # --- Forecast for origin t from the state of series[:t] ---
+        if n_clean == 0:
+            croston.append(None)
+            sba.append(None)
+            tsb.append(None)
+        else:
+            if last_nonzero < 0:
+                # All zeros: p_t = n_clean, z_t = 0 in fit_croston
+                croston.append(0.0 / n_clean)
+                sba.append(sba_correction * 0.0 / n_clean)
+                tsb.append(0.0 * 0.0)
+            else:
+                p_eff = max(p_t, 0.1)
+                croston.append(z_t / p_eff)
+                sba.append(sba_correction * z_t / p_eff)
+                tsb.append(max(tsb_b, 0.0001) * tsb_z)
+
+        if t == len(series) or t in exclude_set:
+            continue
+
+        # --- Absorb observation t into the state ---
+        demand = series[t]
+        clean_idx = n_clean
+        n_clean += 1
+
+        # TSB probability (first clean observation initialises b_t)
+        occurrence = 1.0 if demand > 0 else 0.0
+        if clean_idx == 0:
+            tsb_b = occurrence
+        else:
+            tsb_b = alpha * occurrence + (1 - alpha) * tsb_b
+
+        if demand > 0:
+            if last_nonzero < 0:
+                p_t = clean_idx + 1
+                z_t = demand
+                tsb_z = demand
+                if clean_idx >= 1:
+                    tsb_z = alpha * demand + (1 - alpha) * tsb_z
+            else:
+                p_t = alpha * (clean_idx - last_nonzero) + (1 - alpha) * p_t
+                z_t = alpha * demand + (1 - alpha) * z_t
+                tsb_z = alpha * demand + (1 - alpha) * tsb_z
+            last_nonzero = clean_idx
+
+    return {"croston": croston, "sba": sba, "tsb": tsb}
+
+
+def _backtest_from_forecasts(
+    series: List[float],
+    method: str,
+    forecasts: List[Optional[float]],
+    test_periods: int,
+    exclude_set: set
+) -> BacktestResult:
+    """WMAPE/bias over the last test_periods origins of precomputed forecasts."""
     errors = []
     actuals = []
-    forecasts = []
-    
-    # Rolling origin: fit on [0:t], predict t+1
+
     for test_idx in range(len(series) - test_periods, len(series)):
         if test_idx in exclude_set:
             continue
-        
-        # Train on all data before test point
-        train_series = series[:test_idx]
-        train_exclude = [i for i in exclude_set if i < test_idx]
-        
-        # Fit model
-        try:
-            if method == "croston":
-                model = fit_croston(train_series, alpha, train_exclude)
-            elif method == "sba":
-                model = fit_sba(train_series, alpha, train_exclude)
-            elif method == "tsb":
-                model = fit_tsb(train_series, alpha, alpha, train_exclude)
-            else:
-                raise ValueError(f"Unknown method: {method}")
-            
-            # Predict 1-step ahead
-            forecast = predict_daily(model)
-            actual = series[test_idx]
-            
-            forecasts.append(forecast)
-            actuals.append(actual)
-            errors.append(forecast - actual)
-        
-        except (ValueError, ZeroDivisionError):
+        forecast = forecasts[test_idx]
+        if forecast is None:
             # Insufficient data or degenerate case
             continue
-    
+        actual = series[test_idx]
+        actuals.append(actual)
+        errors.append(forecast - actual)
+
     if len(actuals) == 0:
         return BacktestResult(
             method=method,
@@ -502,36 +554,130 @@ def backtest_method(
             n_forecasts=0,
             n_observations=0
         )
-    
+
     # Compute metrics
     total_actual = sum(actuals)
     if total_actual == 0:
         wmape = 999.0
     else:
         wmape = sum(abs(e) for e in errors) / total_actual
-    
+
     bias = float(np.mean(errors))
-    
+
     return BacktestResult(
         method=method,
         wmape=float(wmape),
         bias=bias,
-        n_forecasts=len(forecasts),
+        n_forecasts=len(actuals),
         n_observations=len(actuals)
     )
 
 
+def backtest_all_methods(
+    series: List[float],
+    test_periods: int = 4,
+    alpha: float = 0.1,
+    exclude_indices: Optional[List[int]] = None,
+    forecasts: Optional[Dict[str, List[Optional[float]]]] = None
+) -> Dict[str, BacktestResult]:
+    """
+    Rolling-origin backtest of Croston, SBA and TSB in a single pass.
+
+    Equivalent to calling ``backtest_method`` once per method, but the
+    one-step-ahead forecasts are produced by one forward pass
+    (``one_step_forecasts``) shared by all methods.
+
+    Args:
+        series: full demand series
+        test_periods: number of test periods to evaluate
+        alpha: smoothing parameter
+        exclude_indices: OOS censored indices
+        forecasts: optional output of ``one_step_forecasts`` for the same
+            series/alpha/exclude_indices, to share it with sigma estimation
+
+    Returns:
+        {method: BacktestResult} for every method in INTERMITTENT_METHODS
+
+    Raises:
+        ValueError: if the series is too short for the backtest
+    """
+    if len(series) < test_periods + 7:  # need min train data
+        raise ValueError(f"Series too short for backtest: {len(series)} < {test_periods + 7}")
+
+    if forecasts is None:
+        forecasts = one_step_forecasts(series, alpha, exclude_indices)
+    exclude_set = set(exclude_indices or [])
+
+    return {
+        method: _backtest_from_forecasts(
+            series, method, forecasts[method], test_periods, exclude_set
+        )
+        for method in INTERMITTENT_METHODS
+    }
+
+
+def backtest_method(
+    series: List[float],
+    method: str,
+    test_periods: int = 4,
+    alpha: float = 0.1,
+    exclude_indices: Optional[List[int]] = None
+) -> BacktestResult:
+    """
+    Backtest intermittent method using rolling origin.
+    
+    Strategy:
+    - Split series into train + test windows (rolling forward)
+    - Fit on train, predict 1-step ahead, compare to test
+    - Compute WMAPE and bias
+
+    Forecasts come from ``one_step_forecasts`` (single forward pass); use
+    ``backtest_all_methods`` to score several methods on the same series.
+    
+    Args:
+        series: full demand series
+        method: 'croston', 'sba', or 'tsb'
+        test_periods: number of test periods to evaluate
+        alpha: smoothing parameter
+        exclude_indices: OOS censored indices
+    
+    Returns:
+        BacktestResult with performance metrics
+    """
+    if len(series) < test_periods + 7:  # need min train data
+        raise ValueError(f"Series too short for backtest: {len(series)} < {test_periods + 7}")
+
+    if method not in INTERMITTENT_METHODS or not 0 < alpha <= 1:
+        # Every fit would fail: no forecast evaluated
+        return BacktestResult(
+            method=method,
+            wmape=999.0,
+            bias=0.0,
+            n_forecasts=0,
+            n_observations=0
+        )
+
+    forecasts = one_step_forecasts(series, alpha, exclude_indices)
+    return _backtest_from_forecasts(
+        series, method, forecasts[method], test_periods, set(exclude_indices or [])
+    )
+
+
 def select_best_method(
     series: List[float],
     candidate_methods: Optional[List[str]] = None,
     test_periods: int = 4,
     alpha: float = 0.1,
     exclude_indices: Optional[List[int]] = None,
-    metric: str = "wmape"
+    metric: str = "wmape",
+    forecasts: Optional[Dict[str, List[Optional[float]]]] = None
 ) -> Tuple[str, Dict[str, BacktestResult]]:
     """
     Select best intermittent method via backtest comparison.
     
+    All candidates are scored from one shared forward pass
+    (``backtest_all_methods``) instead of one rolling refit per method.
+    
     Args:
         series: demand observations
         candidate_methods: list of methods to test (default: ['sba', 'tsb'])
@@ -539,6 +685,7 @@ def select_best_method(
         alpha: smoothing parameter
         exclude_indices: OOS censored indices
         metric: 'wmape' or 'bias' to optimize
+        forecasts: optional precomputed ``one_step_forecasts`` output
     
     Returns:
         Tuple of (best_method_name, dict_of_all_results)
@@ -546,12 +693,20 @@ def select_best_method(
     if candidate_methods is None:
         candidate_methods = ["sba", "tsb"]
     
+    try:
+        shared = backtest_all_methods(series, test_periods, alpha, exclude_indices, forecasts)
+    except Exception:
+        shared = {}
+    
     results = {}
     for method in candidate_methods:
         try:
-            results[method] = backtest_method(
-                series, method, test_periods, alpha, exclude_indices
-            )
+            if method in shared:
+                results[method] = shared[method]
+            else:
+                results[method] = backtest_method(
+                    series, method, test_periods, alpha, exclude_indices
+                )
         except (ValueError, Exception) as e:
             # Method failed, assign worst score
             results[method] = BacktestResult(
@@ -581,7 +736,8 @@ def estimate_sigma_P_rolling(
     series: List[float],
     model: IntermittentModel,
     P: int,
-    exclude_indices: Optional[List[int]] = None
+    exclude_indices: Optional[List[int]] = None,
+    forecasts: Optional[Dict[str, List[Optional[float]]]] = None
 ) -> float:
     """
     Estimate sigma_P (forecast error std) via rolling residuals.
@@ -596,6 +752,8 @@ def estimate_sigma_P_rolling(
         model: fitted intermittent model
         P: protection period
         exclude_indices: OOS censored indices
+        forecasts: optional ``one_step_forecasts`` output computed with
+            model.alpha (e.g. shared with the backtest)
     
     Returns:
         sigma_P: estimated forecast error std over P days
@@ -606,31 +764,16 @@ def estimate_sigma_P_rolling(
     
     exclude_set = set(exclude_indices or [])
     
-    # Compute 1-step forecast errors
+    # Compute 1-step forecast errors (single forward pass)
     errors = []
-    for t in range(7, len(series)):
-        if t in exclude_set:
-            continue
-        
-        train_series = series[:t]
-        train_exclude = [i for i in exclude_set if i < t]
-        
-        try:
-            if model.method == "croston":
-                m = fit_croston(train_series, model.alpha, train_exclude)
-            elif model.method == "sba":
-                m = fit_sba(train_series, model.alpha, train_exclude)
-            elif model.method == "tsb":
-                m = fit_tsb(train_series, model.alpha, model.alpha, train_exclude)
-            else:
+    if model.method in INTERMITTENT_METHODS and 0 < model.alpha <= 1:
+        if forecasts is None:
+            forecasts = one_step_forecasts(series, model.alpha, exclude_indices)
+        method_forecasts = forecasts[model.method]
+        for t in range(7, len(series)):
+            if t in exclude_set or method_forecasts[t] is None:
                 continue
-            
-            forecast = predict_daily(m)
-            actual = series[t]
-            errors.append(forecast - actual)
-        
-        except (ValueError, ZeroDivisionError):
-            continue
+            errors.append(method_forecasts[t] - series[t])
     
     if len(errors) < P:
         # Fallback
@@ -25,16 +25,25 @@ try:
     from ..forecast import baseline_forecast
     from .ledger import is_day_censored
     from .models import SKU, SalesRecord, PromoWindow, Transaction
+    from ..promo_calendar import PromoIndex
     # promo_windows_for_sku not used directly (filtering done in extract_promo_events)
 except ImportError:
     from forecast import baseline_forecast
     from domain.ledger import is_day_censored
     from domain.models import SKU, SalesRecord, PromoWindow, Transaction
+    from promo_calendar import PromoIndex
 
 
 logger = logging.getLogger(__name__)
 
 
+def _sku_windows(promo_windows: List[PromoWindow], sku: str) -> List[PromoWindow]:
+    """Windows of one SKU in input order (O(1) bucket lookup on a PromoIndex)."""
+    if isinstance(promo_windows, PromoIndex):
+        return promo_windows.for_sku(sku)
+    return [w for w in promo_windows if w.sku == sku]
+
+
 @dataclass
 class UpliftEvent:
     """Single promo event uplift calculation."""
@@ -88,7 +97,7 @@ def extract_promo_events(
         asof_date = date.today()
     
     # Filter windows for this SKU
-    sku_windows = [w for w in promo_windows if w.sku == sku_id]
+    sku_windows = _sku_windows(promo_windows, sku_id)
     
     # Filter out future events
     past_windows = [w for w in sku_windows if w.end_date < asof_date]
@@ -550,7 +559,7 @@ def is_in_post_promo_window(
         return None
     
     # Filter windows for this SKU
-    sku_windows = [w for w in promo_windows if w.sku == sku]
+    sku_windows = _sku_windows(promo_windows, sku)
     
     for window in sku_windows:
         post_promo_start = window.end_date + timedelta(days=1)  # Giorno dopo end_date
@@ -830,8 +839,8 @@ def estimate_cannibalization_downlift(
         for driver_start, driver_end in driver_promo_events:
             # Verifica se target è in promo nello stesso periodo (se sì, skip)
             target_in_promo = False
-            for pw in promo_windows:
-                if pw.sku == target_sku and pw.start_date <= driver_end and pw.end_date >= driver_start:
+            for pw in _sku_windows(promo_windows, target_sku):
+                if pw.start_date <= driver_end and pw.end_date >= driver_start:
                     target_in_promo = True
                     break
             
@@ -24,7 +24,7 @@ import statistics
 from .domain.ledger import is_day_censored
 
 # Import promo calendar for promo-adjusted forecast
-from .promo_calendar import is_promo, promo_windows_for_sku
+from .promo_calendar import is_promo, promo_windows_for_sku, PromoIndex
 
 
 def fit_forecast_model(
@@ -1151,7 +1151,10 @@ def promo_adjusted_forecast(
     filtered_promo_windows = promo_windows
     if store_id is None:
         # Global-only mode: exclude store-specific promo windows
-        filtered_promo_windows = [w for w in promo_windows if w.store_id is None]
+        if isinstance(promo_windows, PromoIndex):
+            filtered_promo_windows = promo_windows.global_only()
+        else:
+            filtered_promo_windows = [w for w in promo_windows if w.store_id is None]
     
     any_promo_active = False
     for forecast_date in horizon_dates:
@@ -1349,6 +1352,9 @@ def _find_promo_window_for_date(
     Returns:
         PromoWindow object if found, else None
     """
+    if isinstance(promo_windows, PromoIndex):
+        return promo_windows.find_window(check_date, sku_id, store_id)
+
     for window in promo_windows:
         # SKU filter
         if window.sku != sku_id:
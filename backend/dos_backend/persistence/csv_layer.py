@@ -5,16 +5,312 @@ Handles all file I/O for transactions, SKUs, sales, etc.
 Auto-creates files with correct headers on first run.
 """
 import csv
+import io
 import os
 import json
+import threading
+from contextlib import contextmanager
 from datetime import date
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import Callable, List, Dict, Optional, Any, Sequence, Tuple
 
 from ..domain.models import Transaction, EventType, SKU, SalesRecord, AuditLog, DemandVariability, Lot, PromoWindow, EventUpliftRule
 from ..utils.sku_validation import validate_sku_canonical, SkuFormatError  # noqa: F401
 
 
+# In-process write generation per CSV path.  Bumped by every CSVLayer write
+# helper so that two writes landing in the same filesystem timestamp tick
+# with identical file size still yield distinct revisions.
+_WRITE_GENERATIONS: Dict[str, int] = {}
+
+# In-process rewrite generation per CSV path: bumped by every write except
+# plain appends (see CSVLayer.rewrite_epoch).  _PROCESS_EPOCH makes tokens of
+# an earlier process never match.
+_REWRITE_GENERATIONS: Dict[str, int] = {}
+_PROCESS_EPOCH = f"{os.getpid()}-{os.urandom(4).hex()}"
+
+# Per-SKU row indexes (see _SkuRowIndex), keyed by CSV path and shared by all
+# CSVLayer instances of the process.  Value: file -> column the timeline is
+# ordered by (newest first).
+_SKU_INDEXED_FILES: Dict[str, str] = {
+    "transactions.csv": "date",
+    "sales.csv": "date",
+    "audit_log.csv": "timestamp",
+}
+_SKU_ROW_INDEXES: Dict[str, "_SkuRowIndex"] = {}
+_SKU_ROW_INDEX_LOCK = threading.Lock()
+
+# Serializes durable batch appends (see CSVLayer._append_csv_batch) in-process;
+# _data_dir_lock adds the cross-process lock file on top of it
+_APPEND_LOCK = threading.Lock()
+_APPEND_LOCK_FILE = ".append.lock"
+
+# SKU id sets for CSVLayer.sku_exists, keyed by skus.csv path: (file_revision, ids)
+_SKU_ID_CACHE: Dict[str, Tuple[Tuple[int, int, int], frozenset]] = {}
+_SKU_ID_CACHE_LOCK = threading.Lock()
+
+# Processed document ids for CSVLayer.receiving_document_ids, keyed by
+# receiving_logs.csv path: (file_revision, ids)
+_RECEIVING_DOC_CACHE: Dict[str, Tuple[Tuple[int, int, int], frozenset]] = {}
+_RECEIVING_DOC_CACHE_LOCK = threading.Lock()
+
+# Keyset cursor of a per-SKU page: (order value, row sequence) of the last row returned
+PageCursor = Tuple[str, int]
+
+
+def _ledger_filter(
+    date_from: Optional[date],
+    date_to: Optional[date],
+    events: Optional[Sequence[EventType]],
+    note_contains: Optional[str],
+) -> Callable[[Transaction], bool]:
+    """Predicate of CSVLayer.delete_transactions (all given filters must match)."""
+    event_set = set(events) if events is not None else None
+    
+    def _match(txn: Transaction) -> bool:
+        if date_from is not None and txn.date < date_from:
+            return False
+        if date_to is not None and txn.date > date_to:
+            return False
+        if event_set is not None and txn.event not in event_set:
+            return False
+        if note_contains is not None and not (txn.note and note_contains in txn.note):
+            return False
+        return True
+    
+    return _match
+
+
+class _SkuRowIndex:
+    """
+    Byte offsets of the rows of one CSV file, grouped by SKU.
+
+    Built with a single scan of the file and valid for one ``file_revision``.
+    Rows appended through ``CSVLayer._append_csv`` are added incrementally;
+    any other change to the file is detected by the revision check and the
+    index is rebuilt on next use.
+
+    Per SKU, rows are kept as ``(order_value, seq, offset, length)`` where
+    ``seq`` is the row position in the file.  Pages are served newest first:
+    order value descending, file order among equal values.
+    """
+
+    def __init__(self, order_column: str, strip_sku: bool):
+        self.order_column = order_column
+        self.strip_sku = strip_sku
+        self.header: List[str] = []
+        self.revision: Optional[Tuple[int, int, int]] = None
+        self.end = 0
+        self.clean_tail = True
+        self.count = 0
+        self.rows: Dict[str, List[Tuple[str, int, int, int]]] = {}
+        self._ordered: Dict[str, List[Tuple[str, int, int, int]]] = {}
+
+    def build(self, filepath: Path, revision: Tuple[int, int, int]):
+        """(Re)index the whole file."""
+        self.header, self.rows, self._ordered = [], {}, {}
+        self.count, self.end, self.clean_tail = 0, 0, True
+        self.revision = revision
+        if not filepath.exists():
+            return
+
+        line_starts: List[int] = []
+        pos = [0]
+
+        def lines(f):
+            for raw in f:
+                line_starts.append(pos[0])
+                pos[0] += len(raw)
+                yield raw.decode("utf-8")
+
+        with open(filepath, "rb") as f:
+            reader = csv.reader(lines(f))
+            self.header = next(reader, [])
+            sku_idx = self.header.index("sku") if "sku" in self.header else None
+            order_idx = self.header.index(self.order_column) if self.order_column in self.header else None
+            consumed = reader.line_num
+            for values in reader:
+                offset = line_starts[consumed]
+                consumed = reader.line_num
+                if not values:
+                    continue
+                self._add(values, sku_idx, order_idx, offset, pos[0] - offset)
+            if line_starts:
+                f.seek(line_starts[-1])
+                self.clean_tail = f.read().endswith(b"\n")
+        self.end = pos[0]
+
+    def _add(self, values, sku_idx, order_idx, offset: int, length: int):
+        sku = values[sku_idx] if sku_idx is not None and sku_idx < len(values) else ""
+        if self.strip_sku:
+            sku = sku.strip()
+        order_value = values[order_idx] if order_idx is not None and order_idx < len(values) else ""
+        self.rows.setdefault(sku, []).append((order_value, self.count, offset, length))
+        self._ordered.pop(sku, None)
+        self.count += 1
+
+    def append(self, row: Dict[str, str], offset: int, length: int, revision: Tuple[int, int, int]):
+        """Record a row just appended at ``offset`` (file now at ``revision``)."""
+        values = [str(row.get(col, "")) for col in self.header]
+        self._add(values, self.header.index("sku") if "sku" in self.header else None,
+                  self.header.index(self.order_column) if self.order_column in self.header else None,
+                  offset, length)
+        self.end = offset + length
+        self.revision = revision
+
+    def ordered(self, sku: str) -> List[Tuple[str, int, int, int]]:
+        """Rows of ``sku``, newest first (order value desc, file order on ties)."""
+        ordered = self._ordered.get(sku)
+        if ordered is None:
+            # Stable sort on file order: ties keep their file order
+            ordered = sorted(self.rows.get(sku, ()), key=lambda r: r[0], reverse=True)
+            self._ordered[sku] = ordered
+        return ordered
+
+    def page(
+        self, sku: str, limit: Optional[int], before: Optional[PageCursor]
+    ) -> Tuple[List[Tuple[str, int, int, int]], Optional[PageCursor]]:
+        """Index entries of the page after ``before`` plus the cursor of the next page."""
+        ordered = self.ordered(sku)
+        start = 0
+        if before is not None:
+            # First entry strictly after the cursor in (value desc, seq asc) order
+            value, seq = before
+            lo, hi = 0, len(ordered)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                v, s = ordered[mid][0], ordered[mid][1]
+                if v > value or (v == value and s <= seq):
+                    lo = mid + 1
+                else:
+                    hi = mid
+            start = lo
+        stop = len(ordered) if not limit else min(len(ordered), start + limit)
+        entries = ordered[start:stop]
+        next_cursor = (entries[-1][0], entries[-1][1]) if entries and stop < len(ordered) else None
+        return entries, next_cursor
+
+    def matching(self, sku: str, value: str) -> List[Tuple[str, int, int, int]]:
+        """Entries of ``sku`` whose order value equals ``value`` (e.g. one day), in file order."""
+        ordered = self.ordered(sku)
+        # First entry with order value <= value (ordered is value-descending)
+        lo, hi = 0, len(ordered)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ordered[mid][0] > value:
+                lo = mid + 1
+            else:
+                hi = mid
+        entries = []
+        for entry in ordered[lo:]:
+            if entry[0] != value:
+                break
+            entries.append(entry)
+        return entries
+
+
+@contextmanager
+def _data_dir_lock(data_dir: Path):
+    """
+    Exclusive lock on ``data_dir`` for journaled appends and their recovery.
+    
+    Taken in-process through ``_APPEND_LOCK`` and across processes (desktop
+    app and backend subprocess share the data directory) through an OS lock
+    on ``<data_dir>/.append.lock``.  The OS releases it when its owner dies,
+    so an append journal seen while holding the lock belongs to a crashed
+    writer, never to an append still in flight.
+    """
+    with _APPEND_LOCK:
+        fd = os.open(str(data_dir / _APPEND_LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.name == "nt":
+                import msvcrt
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)  # gives up after ~10 s: retry
+                        break
+                    except OSError:
+                        continue
+            else:
+                import fcntl
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if os.name == "nt":
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+                else:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+def _fsync_dir(path: Path):
+    """Make file creations / deletions in ``path`` durable (no-op on Windows)."""
+    if os.name == "nt":
+        return
+    fd = os.open(str(path), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class _LotBatch:
+    """
+    In-memory view of lots.csv for the FEFO consumptions of one batch write.
+    
+    Duck-types the ``get_lots_by_sku`` / ``update_lot_quantity`` pair used by
+    ``LotConsumptionManager.consume_from_lots``: lots.csv is read once when
+    the batch starts and rewritten once by ``flush``.
+    """
+
+    def __init__(self, csv_layer: "CSVLayer"):
+        self._csv_layer = csv_layer
+        self._lots: List[Lot] = csv_layer.read_lots()
+        self.dirty = False
+
+    def get_lots_by_sku(self, sku: str, sort_by_expiry: bool = True) -> List[Lot]:
+        """Same contract as ``CSVLayer.get_lots_by_sku``."""
+        sku_normalized = str(sku).strip()
+        sku_lots = [lot for lot in self._lots if str(lot.sku).strip() == sku_normalized]
+        if sort_by_expiry:
+            sku_lots.sort(key=lambda lot: (lot.expiry_date is None, lot.expiry_date or date.max))
+        return sku_lots
+
+    def update_lot_quantity(self, lot_id: str, new_qty: int):
+        """Same contract as ``CSVLayer.update_lot_quantity``, applied in memory."""
+        for i, lot in enumerate(self._lots):
+            if lot.lot_id == lot_id:
+                self._lots[i] = Lot(
+                    lot_id=lot.lot_id,
+                    sku=lot.sku,
+                    expiry_date=lot.expiry_date,
+                    qty_on_hand=new_qty,
+                    receipt_id=lot.receipt_id,
+                    receipt_date=lot.receipt_date,
+                )
+                # Depleted lots disappear as soon as lots.csv would be rewritten
+                self._lots = [lot for lot in self._lots if lot.qty_on_hand > 0]
+                self.dirty = True
+                return
+        raise ValueError(f"Lot not found: {lot_id}")
+
+    @property
+    def lots(self) -> List[Lot]:
+        """Current lots (consumptions applied)."""
+        return list(self._lots)
+
+    def flush(self):
+        """Write lots.csv once if any lot changed."""
+        if self.dirty:
+            self._csv_layer._write_lots(self._lots)
+            self.dirty = False
+
+
 class CSVLayer:
     """Manages all CSV file operations with auto-create."""
 
@@ -96,6 +392,7 @@ class CSVLayer:
         CSVLayer.DEFAULT_DATA_DIR = self.data_dir
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self._ensure_all_files_exist()
+        self._recover_append_journals()
     
     def _ensure_all_files_exist(self):
         """Create all CSV files with headers if they don't exist."""
@@ -152,6 +449,64 @@ class CSVLayer:
                 logger = logging.getLogger(__name__)
                 logger.warning(f"Schema check/migration failed for {filename}: {e}. File may have issues.")
     
+    def file_revision(self, filename: str) -> Tuple[int, int, int]:
+        """
+        Cheap change token for a data file (no read, one ``stat``).
+
+        Two calls return the same tuple only if the file was not rewritten or
+        appended in between, so callers can key derived caches on it.
+
+        Args:
+            filename: File name inside ``data_dir`` (e.g. "promo_calendar.csv")
+
+        Returns:
+            (mtime_ns, size, in-process write generation); (0, 0, gen) if missing
+        """
+        filepath = self.data_dir / filename
+        generation = _WRITE_GENERATIONS.get(str(filepath), 0)
+        try:
+            st = filepath.stat()
+        except OSError:
+            return (0, 0, generation)
+        return (st.st_mtime_ns, st.st_size, generation)
+
+    def data_revision(self) -> Tuple[Tuple[int, int, int], ...]:
+        """
+        Change token for the whole data directory.
+
+        Combines ``file_revision`` of every CSV in SCHEMAS plus the JSON
+        settings/holidays files; equal tokens mean no tracked file changed.
+        """
+        names = list(self.SCHEMAS) + ["settings.json", "holidays.json"]
+        return tuple(self.file_revision(name) for name in names)
+
+    def rewrite_epoch(self, filename: str) -> Tuple[str, int, int]:
+        """
+        Token that changes whenever ``filename`` is rewritten, but not on appends.
+
+        Two equal tokens mean rows were only appended in between, so derived
+        data over a prefix of the rows (e.g. dashboard aggregates) can be
+        extended with the new tail instead of re-validated.  Rewrites made by
+        this process bump the in-process generation; atomic rewrites by other
+        processes change the inode; a new process never matches older tokens.
+
+        Returns:
+            (process epoch, inode, in-process rewrite generation)
+        """
+        filepath = self.data_dir / filename
+        try:
+            inode = filepath.stat().st_ino
+        except OSError:
+            inode = 0
+        return (_PROCESS_EPOCH, inode, _REWRITE_GENERATIONS.get(str(filepath), 0))
+
+    def _bump_revision(self, filename: str, rewrite: bool = True):
+        """Record an in-process write to ``filename`` (see ``file_revision``; appends pass rewrite=False)."""
+        key = str(self.data_dir / filename)
+        _WRITE_GENERATIONS[key] = _WRITE_GENERATIONS.get(key, 0) + 1
+        if rewrite:
+            _REWRITE_GENERATIONS[key] = _REWRITE_GENERATIONS.get(key, 0) + 1
+
     def _read_csv(self, filename: str) -> List[Dict[str, str]]:
         """Read CSV file and return list of dicts."""
         filepath = self.data_dir / filename
@@ -170,18 +525,346 @@ class CSVLayer:
         columns = self.SCHEMAS[filename]
         filepath = self.data_dir / filename
         
-        with open(filepath, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
-            writer.writeheader()
-            writer.writerows(rows)
+        # Pending journals are resolved first: their sizes refer to the old file
+        with _data_dir_lock(self.data_dir):
+            self._recover_append_journals_locked()
+            with open(filepath, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(rows)
+            self._bump_revision(filename)
     
     def _append_csv(self, filename: str, row: Dict[str, str]):
-        """Append a single row to CSV file."""
+        """Append a single row to CSV file (under ``_data_dir_lock``, after journal recovery)."""
         filepath = self.data_dir / filename
+        indexed = filename in _SKU_INDEXED_FILES
         
-        with open(filepath, "a", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=self.SCHEMAS[filename])
-            writer.writerow(row)
+        # A row appended while a batch journal is pending would be cut off
+        # if that batch is rolled back: resolve journals first, then append
+        with _data_dir_lock(self.data_dir):
+            self._recover_append_journals_locked()
+            if indexed:
+                before = self.file_revision(filename)
+            with open(filepath, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=self.SCHEMAS[filename])
+                writer.writerow(row)
+            self._bump_revision(filename, rewrite=False)
+            if indexed:
+                self._extend_sku_index(filename, [row], before)
+    
+    def _append_csv_batch(self, filename: str, rows: List[Dict[str, str]]):
+        """
+        Durably append rows to a CSV file, all or nothing (no rewrite, no backup).
+        
+        Args:
+            filename: CSV filename
+            rows: List of dicts to append
+        """
+        self._append_csv_batches({filename: rows})
+    
+    def _append_csv_batches(
+        self,
+        batches: Dict[str, List[Dict[str, str]]],
+        replacements: Optional[Dict[str, List[Dict[str, str]]]] = None,
+    ):
+        """
+        Durably append rows to one or more CSV files as a single commit.
+        
+        Steps:
+        1. Write one journal ``<file>.journal`` per file (size before the
+           append, length and SHA-256 of the new bytes, batch id and number
+           of files in the batch), fsync them and the directory; a replaced
+           file gets a ``replace`` journal and its full new content in
+           ``<file>.replace`` (fsynced)
+        2. Append each file's rows with one write and fsync it
+        3. Multi-file batches: write the batch commit marker
+           ``append-<batch>.commit`` (fsynced, with the directory), then
+           rename every ``<file>.replace`` over its file
+        4. Delete the journals, then the marker, fsyncing the directory
+        
+        Everything runs under ``_data_dir_lock``, so journals left behind by
+        a crash are resolved (``_recover_append_journals``) before the next
+        append touches the same files: the batch is kept if its commit
+        marker exists, or if every journal of the batch is present and the
+        bytes of every file are on disk; otherwise every file is truncated
+        back to its previous size.  The marker outlives the journals, so a
+        crash while they are being deleted never rolls back only part of a
+        committed batch.
+        
+        Args:
+            batches: {filename: rows to append}; empty row lists are ignored
+            replacements: {filename: rows} of files rewritten (header + rows)
+                in the same commit, e.g. lots.csv after FEFO
+        """
+        import hashlib
+        import uuid
+        
+        batches = {filename: rows for filename, rows in batches.items() if rows}
+        replacements = replacements or {}
+        if set(batches) & set(replacements):
+            raise ValueError("A file cannot be appended and replaced in the same batch")
+        if not batches and not replacements:
+            return
+        payloads = {}
+        for filename, rows in batches.items():
+            buf = io.StringIO()
+            csv.DictWriter(buf, fieldnames=self.SCHEMAS[filename], extrasaction='ignore').writerows(rows)
+            payloads[filename] = buf.getvalue().encode("utf-8")
+        batch_id = uuid.uuid4().hex
+        n_files = len(batches) + len(replacements)
+        
+        with _data_dir_lock(self.data_dir):
+            self._recover_append_journals_locked()
+            befores = {filename: self.file_revision(filename) for filename in batches}
+            files, sizes, journals, staged = {}, {}, [], []
+            try:
+                for filename, rows in replacements.items():
+                    self._backup_file(filename)
+                    journal_path = self.data_dir / f"{filename}.journal"
+                    self._write_journal(journal_path, {"replace": True, "batch": batch_id, "files": n_files})
+                    journals.append(journal_path)
+                    staged_path = self.data_dir / f"{filename}.replace"
+                    staged.append(staged_path)
+                    with open(staged_path, "w", newline="", encoding="utf-8") as f:
+                        writer = csv.DictWriter(f, fieldnames=self.SCHEMAS[filename], extrasaction='ignore')
+                        writer.writeheader()
+                        writer.writerows(rows)
+                        f.flush()
+                        os.fsync(f.fileno())
+                for filename in batches:
+                    f = files[filename] = open(self.data_dir / filename, "a+b")
+                    size = sizes[filename] = f.seek(0, os.SEEK_END)
+                    if size:
+                        f.seek(size - 1)
+                        if f.read(1) != b"\n":
+                            # Unterminated last line (hand edit): start the batch on a new row
+                            payloads[filename] = b"\r\n" + payloads[filename]
+                    journal_path = self.data_dir / f"{filename}.journal"
+                    self._write_journal(journal_path, {
+                        "size": size,
+                        "length": len(payloads[filename]),
+                        "sha256": hashlib.sha256(payloads[filename]).hexdigest(),
+                        "batch": batch_id,
+                        "files": n_files,
+                    })
+                    journals.append(journal_path)
+                _fsync_dir(self.data_dir)
+                try:
+                    for filename, f in files.items():
+                        f.write(payloads[filename])
+                        f.flush()
+                        os.fsync(f.fileno())
+                except BaseException:
+                    # Roll back partial appends right away
+                    for filename, f in files.items():
+                        f.truncate(sizes[filename])
+                        f.flush()
+                        os.fsync(f.fileno())
+                    raise
+                marker = None
+                if n_files > 1:
+                    marker = self.data_dir / f"append-{batch_id}.commit"
+                    self._write_journal(marker, {"batch": batch_id, "files": sorted([*batches, *replacements])})
+                    _fsync_dir(self.data_dir)
+            except BaseException:
+                for path in [*staged, *journals]:
+                    path.unlink(missing_ok=True)
+                _fsync_dir(self.data_dir)
+                raise
+            finally:
+                for f in files.values():
+                    f.close()
+            # Committed: replacements roll forward from here, even after a crash
+            for filename in replacements:
+                os.replace(self.data_dir / f"{filename}.replace", self.data_dir / filename)
+            if replacements:
+                _fsync_dir(self.data_dir)
+            for journal_path in journals:
+                journal_path.unlink(missing_ok=True)
+            _fsync_dir(self.data_dir)
+            if marker is not None:
+                marker.unlink(missing_ok=True)
+                _fsync_dir(self.data_dir)
+            for filename in replacements:
+                self._bump_revision(filename)
+            for filename, rows in batches.items():
+                self._bump_revision(filename, rewrite=False)
+                if filename in _SKU_INDEXED_FILES:
+                    self._extend_sku_index(filename, rows, befores[filename])
+    
+    @staticmethod
+    def _write_journal(journal_path: Path, entry: Dict[str, Any]):
+        """Write and fsync an append journal entry."""
+        with open(journal_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _recover_append_journals(self):
+        """Complete or roll back batch appends interrupted by a crash (see _append_csv_batches)."""
+        if not any(self.data_dir.glob("*.csv.journal")) and not any(self.data_dir.glob("append-*.commit")):
+            return
+        with _data_dir_lock(self.data_dir):
+            self._recover_append_journals_locked()
+    
+    def _recover_append_journals_locked(self):
+        """``_recover_append_journals`` body (caller holds ``_data_dir_lock``)."""
+        import hashlib
+        import logging
+        logger = logging.getLogger(__name__)
+        
+        markers = {path.name[len("append-"): -len(".commit")]: path for path in self.data_dir.glob("append-*.commit")}
+        groups: Dict[str, List[Tuple[Path, Path, Dict[str, Any]]]] = {}
+        for journal_path in self.data_dir.glob("*.csv.journal"):
+            filepath = self.data_dir / journal_path.name[: -len(".journal")]
+            try:
+                with open(journal_path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                if not entry.get("replace"):
+                    int(entry["size"]), int(entry["length"])
+            except (OSError, ValueError, KeyError, TypeError):
+                # Journal itself incomplete: the append never started
+                journal_path.unlink(missing_ok=True)
+                continue
+            if not filepath.exists():
+                journal_path.unlink(missing_ok=True)
+                continue
+            groups.setdefault(entry.get("batch") or str(journal_path), []).append((journal_path, filepath, entry))
+        
+        for batch_id, members in groups.items():
+            # Marker present: the batch committed, journals were being deleted
+            if batch_id in markers:
+                for journal_path, filepath, entry in members:
+                    staged_path = filepath.with_name(f"{filepath.name}.replace")
+                    if entry.get("replace") and staged_path.exists():
+                        os.replace(staged_path, filepath)
+                    logger.info(f"Recovered committed batch append on {filepath.name}")
+                    journal_path.unlink(missing_ok=True)
+                    self._bump_revision(filepath.name)
+                continue
+            # All journals of a batch are written before its first append:
+            # a missing one means nothing was appended yet (rolled back below).
+            # Replacements are only renamed after the marker: without it, roll back
+            committed = len(members) == int(members[0][2].get("files", 1))
+            for _, filepath, entry in members:
+                if entry.get("replace"):
+                    committed = False
+                    continue
+                with open(filepath, "rb") as f:
+                    f.seek(int(entry["size"]))
+                    appended = f.read(int(entry["length"]))
+                committed = committed and (
+                    len(appended) == int(entry["length"])
+                    and hashlib.sha256(appended).hexdigest() == entry.get("sha256")
+                )
+            for journal_path, filepath, entry in members:
+                if entry.get("replace"):
+                    filepath.with_name(f"{filepath.name}.replace").unlink(missing_ok=True)
+                    logger.warning(f"Rolled back incomplete batch rewrite of {filepath.name}")
+                elif committed:
+                    logger.info(f"Recovered committed batch append on {filepath.name}")
+                else:
+                    with open(filepath, "r+b") as f:
+                        f.truncate(int(entry["size"]))
+                        f.flush()
+                        os.fsync(f.fileno())
+                    logger.warning(f"Rolled back incomplete batch append on {filepath.name}")
+                journal_path.unlink(missing_ok=True)
+                self._bump_revision(filepath.name)
+        if groups:
+            _fsync_dir(self.data_dir)
+        for marker in markers.values():
+            marker.unlink(missing_ok=True)
+        if markers:
+            _fsync_dir(self.data_dir)
+    
+    # ============ Per-SKU Row Index ============
+    
+    def _sku_row_index(self, filename: str) -> _SkuRowIndex:
+        """Up-to-date per-SKU row index of ``filename`` (caller holds _SKU_ROW_INDEX_LOCK)."""
+        key = str(self.data_dir / filename)
+        revision = self.file_revision(filename)
+        index = _SKU_ROW_INDEXES.get(key)
+        if index is None or index.revision != revision:
+            index = _SkuRowIndex(_SKU_INDEXED_FILES[filename], strip_sku=filename in ("transactions.csv", "sales.csv"))
+            index.build(self.data_dir / filename, revision)
+            _SKU_ROW_INDEXES[key] = index
+        return index
+    
+    def _extend_sku_index(self, filename: str, rows: List[Dict[str, str]], before: Tuple[int, int, int]):
+        """Fold rows just appended into a current index (else leave it to rebuild)."""
+        key = str(self.data_dir / filename)
+        with _SKU_ROW_INDEX_LOCK:
+            index = _SKU_ROW_INDEXES.get(key)
+            if index is None or index.revision != before or not index.header:
+                return
+            if not index.clean_tail or index.end != before[1]:
+                return
+            lengths = []
+            for row in rows:
+                buf = io.StringIO()
+                csv.DictWriter(buf, fieldnames=self.SCHEMAS[filename], extrasaction='ignore').writerow(row)
+                lengths.append(len(buf.getvalue().encode("utf-8")))
+            after = self.file_revision(filename)
+            # Anything else appended meanwhile (another process): rebuild on next read
+            if after[1] != before[1] + sum(lengths):
+                return
+            offset = before[1]
+            for row, length in zip(rows, lengths):
+                index.append(row, offset, length, after)
+                offset += length
+    
+    def _read_sku_rows(
+        self,
+        filename: str,
+        sku: str,
+        limit: Optional[int] = None,
+        before: Optional[PageCursor] = None,
+        equal_to: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, str]], Optional[PageCursor]]:
+        """
+        Read one SKU's rows, newest first, seeking only to the rows of the page.
+        
+        Args:
+            filename: An indexed CSV (see _SKU_INDEXED_FILES)
+            sku: SKU to read
+            limit: Page size (None/0 = all remaining rows)
+            before: Cursor returned with the previous page (None = first page)
+            equal_to: Only the rows whose order column equals this value
+                (e.g. one day of transactions.csv); no paging
+        
+        Returns:
+            (row dicts, cursor for the next page or None if this was the last)
+        """
+        filepath = self.data_dir / filename
+        for attempt in range(2):
+            with _SKU_ROW_INDEX_LOCK:
+                if attempt:
+                    _SKU_ROW_INDEXES.pop(str(filepath), None)
+                index = self._sku_row_index(filename)
+                if equal_to is not None:
+                    entries, next_cursor = index.matching(sku, equal_to), None
+                else:
+                    entries, next_cursor = index.page(sku, limit, before)
+                header = index.header
+            if not entries:
+                return [], next_cursor
+            
+            rows = []
+            with open(filepath, "rb") as f:
+                for _, _, offset, length in entries:
+                    f.seek(offset)
+                    chunk = f.read(length).decode("utf-8", errors="replace")
+                    values = next(csv.reader(io.StringIO(chunk, newline="")), [])
+                    row = dict(zip(header, values))
+                    for col in header[len(values):]:
+                        row[col] = None
+                    rows.append(row)
+            # Offsets are stale if the file changed under the same revision: rebuild once
+            row_skus = {(r.get("sku") or "").strip() if index.strip_sku else r.get("sku") for r in rows}
+            if row_skus == {sku}:
+                break
+        return rows, next_cursor
     
     # ============ SKU Operations ============
     
@@ -403,8 +1086,24 @@ class CSVLayer:
         return [s.sku for s in skus]
     
     def sku_exists(self, sku_id: str) -> bool:
-        """Check if SKU exists in skus.csv."""
-        return sku_id in self.get_all_sku_ids()
+        """
+        Check if SKU exists in skus.csv.
+        
+        The SKU id set is cached per ``file_revision("skus.csv")``: repeated
+        checks (API validations) cost one ``stat`` while the catalog is
+        unchanged.
+        """
+        key = str(self.data_dir / "skus.csv")
+        revision = self.file_revision("skus.csv")
+        with _SKU_ID_CACHE_LOCK:
+            cached = _SKU_ID_CACHE.get(key)
+        if cached is None or cached[0] != revision:
+            ids = frozenset(self.get_all_sku_ids())
+            # read_skus may persist sanitized values: key on the revision after the read
+            cached = (self.file_revision("skus.csv"), ids)
+            with _SKU_ID_CACHE_LOCK:
+                _SKU_ID_CACHE[key] = cached
+        return sku_id in cached[1]
     
     def search_skus(self, query: str) -> List[SKU]:
         """
@@ -859,20 +1558,71 @@ class CSVLayer:
         rows = self._read_csv("transactions.csv")
         transactions = []
         for row in rows:
-            try:
-                txn = Transaction(
-                    date=date.fromisoformat(row.get("date", "")),
-                    sku=row.get("sku", "").strip(),
-                    event=EventType(row.get("event", "").strip()),
-                    qty=int(row.get("qty", 0)),
-                    receipt_date=date.fromisoformat(row.get("receipt_date", "")) if row.get("receipt_date") else None,
-                    note=row.get("note", "").strip() or None,
-                )
+            txn = self._row_to_transaction(row)
+            if txn is not None:
                 transactions.append(txn)
-            except (ValueError, KeyError) as e:
-                print(f"Warning: Invalid transaction in transactions.csv: {e}")
         return transactions
     
+    @staticmethod
+    def _row_to_transaction(row: Dict[str, str]) -> Optional[Transaction]:
+        """Parse a transactions.csv row (None, with a warning, if invalid)."""
+        try:
+            return Transaction(
+                date=date.fromisoformat(row.get("date", "")),
+                sku=row.get("sku", "").strip(),
+                event=EventType(row.get("event", "").strip()),
+                qty=int(row.get("qty", 0)),
+                receipt_date=date.fromisoformat(row.get("receipt_date", "")) if row.get("receipt_date") else None,
+                note=row.get("note", "").strip() or None,
+            )
+        except (ValueError, KeyError) as e:
+            print(f"Warning: Invalid transaction in transactions.csv: {e}")
+            return None
+    
+    def read_sku_transactions_page(
+        self,
+        sku: str,
+        limit: Optional[int] = 50,
+        before: Optional[PageCursor] = None,
+    ) -> Tuple[List[Transaction], Optional[PageCursor]]:
+        """
+        Latest ledger events of one SKU, newest first, in keyset pages.
+        
+        Served from the per-SKU row index: only the rows of the page are read
+        from disk.  Order matches sorting ``read_transactions()`` for the SKU
+        by date descending (file order among same-date events).
+        
+        Args:
+            sku: SKU identifier
+            limit: Page size (None/0 = all remaining events)
+            before: Cursor returned with the previous page (None = latest events)
+        
+        Returns:
+            (transactions, cursor for the next page or None if no more events)
+        """
+        rows, next_cursor = self._read_sku_rows("transactions.csv", sku, limit, before)
+        transactions = []
+        for row in rows:
+            txn = self._row_to_transaction(row)
+            if txn is not None:
+                transactions.append(txn)
+        return transactions, next_cursor
+    
+    def sum_qty(self, sku: str, day: date, event: EventType) -> int:
+        """
+        Total qty of one SKU's ``event`` transactions on ``day``.
+        
+        Reads only that day's rows through the per-SKU row index (ordered by
+        date), so the cost does not depend on ledger size.
+        """
+        rows, _ = self._read_sku_rows("transactions.csv", sku, equal_to=day.isoformat())
+        total = 0
+        for row in rows:
+            txn = self._row_to_transaction(row)
+            if txn is not None and txn.event == event:
+                total += txn.qty
+        return total
+    
     def write_transaction(self, txn: Transaction):
         """Add a new transaction to transactions.csv."""
         # Auto-apply FEFO for SALE/WASTE events
@@ -890,37 +1640,207 @@ class CSVLayer:
         })
     
     def write_transactions_batch(self, txns: List[Transaction]):
-        """Add multiple transactions at once (append mode)."""
+        """
+        Add multiple transactions at once (durable append, all or nothing).
+        
+        Only the new rows are written (see ``_append_csv_batch``); the
+        ledger is never re-read or rewritten here (only ``overwrite_transactions``
+        and the targeted ``delete_transactions`` / ``replace_transactions_day``
+        rewrite transactions.csv).
+        """
+        self._append_csv_batch("transactions.csv", self._ledger_rows(txns))
+    
+    def _ledger_rows(self, txns: List[Transaction]) -> List[Dict[str, str]]:
+        """transactions.csv rows of ``txns``, applying FEFO to SALE/WASTE events."""
+        txns, lot_batch = self._fefo_transactions(txns)
+        if lot_batch is not None:
+            lot_batch.flush()
+        return [self._transaction_row(txn) for txn in txns]
+    
+    def _fefo_transactions(self, txns: List[Transaction]) -> Tuple[List[Transaction], Optional[_LotBatch]]:
+        """
+        Apply FEFO to the SALE/WASTE events of ``txns`` on an in-memory lot view.
+        
+        Returns the events (FEFO details in their notes) and the ``_LotBatch``
+        holding the consumed lots (None if no event consumes lots); lots.csv
+        is read once and not written: the caller commits the lot batch.
+        """
         from ..domain.models import EventType
-        rows = self._read_csv("transactions.csv")
+        result = []
+        lot_batch: Optional[_LotBatch] = None
         for txn in txns:
-            # Auto-apply FEFO for SALE/WASTE events
             if txn.event in [EventType.SALE, EventType.WASTE] and txn.qty > 0:
-                txn = self._apply_fefo_to_transaction(txn)
-            
-            rows.append({
-                "date": txn.date.isoformat(),
-                "sku": txn.sku,
-                "event": txn.event.value,
-                "qty": str(txn.qty),
-                "receipt_date": txn.receipt_date.isoformat() if txn.receipt_date else "",
-                "note": txn.note or "",
-            })
-        self._write_csv_atomic("transactions.csv", rows)
+                if lot_batch is None:
+                    lot_batch = _LotBatch(self)
+                txn = self._apply_fefo_to_transaction(txn, lot_batch)
+            result.append(txn)
+        return result, lot_batch
+    
+    def write_eod_batch(
+        self,
+        txns: List[Transaction],
+        new_sales: List[SalesRecord],
+        all_sales: Optional[List[SalesRecord]] = None,
+    ):
+        """
+        Commit a daily close: sales, ledger events and their FEFO lot updates together.
+        
+        FEFO is applied once to the SALE/WASTE events; sales.csv, the ledger
+        rows and lots.csv are then written with one journaled commit (see
+        ``_append_csv_batches``), so a crash never leaves a close half-written.
+        
+        Args:
+            txns: Ledger events of the close (SALE / ADJUST)
+            new_sales: Sales records appended to sales.csv
+            all_sales: Full sales list replacing sales.csv instead (re-run of
+                a day whose sales are replaced); ``new_sales`` is then ignored
+        """
+        txns, lot_batch = self._fefo_transactions(txns)
+        self._write_eod_files(txns, new_sales, all_sales, lot_batch)
+    
+    def _write_eod_files(
+        self,
+        txns: List[Transaction],
+        new_sales: List[SalesRecord],
+        all_sales: Optional[List[SalesRecord]],
+        lot_batch: Optional[_LotBatch],
+    ):
+        """``write_eod_batch`` commit of events FEFO was already applied to."""
+        batches = {"transactions.csv": [self._transaction_row(txn) for txn in txns]}
+        replacements = {}
+        if all_sales is not None:
+            replacements["sales.csv"] = [self._sales_row(sale) for sale in all_sales]
+        else:
+            batches["sales.csv"] = [self._sales_row(sale) for sale in new_sales]
+        if lot_batch is not None and lot_batch.dirty:
+            replacements["lots.csv"] = [self._lot_row(lot) for lot in lot_batch.lots if lot.qty_on_hand > 0]
+        self._append_csv_batches(batches, replacements)
+        if lot_batch is not None:
+            lot_batch.dirty = False
     
     def overwrite_transactions(self, txns: List[Transaction]):
         """Overwrite entire transactions.csv with given list (atomic write with backup)."""
-        rows = []
-        for txn in txns:
-            rows.append({
-                "date": txn.date.isoformat(),
-                "sku": txn.sku,
-                "event": txn.event.value,
-                "qty": str(txn.qty),
-                "receipt_date": txn.receipt_date.isoformat() if txn.receipt_date else "",
-                "note": txn.note or "",
-            })
-        self._write_csv_atomic("transactions.csv", rows)
+        self._write_csv_atomic("transactions.csv", [self._transaction_row(txn) for txn in txns])
+    
+    @staticmethod
+    def _transaction_row(txn: Transaction) -> Dict[str, str]:
+        """transactions.csv row of ``txn`` (written as is, no FEFO)."""
+        return {
+            "date": txn.date.isoformat(),
+            "sku": txn.sku,
+            "event": txn.event.value,
+            "qty": str(txn.qty),
+            "receipt_date": txn.receipt_date.isoformat() if txn.receipt_date else "",
+            "note": txn.note or "",
+        }
+    
+    def delete_transactions(
+        self,
+        sku: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        events: Optional[Sequence[EventType]] = None,
+        note_contains: Optional[str] = None,
+    ) -> int:
+        """
+        Delete one SKU's ledger events matching all the given filters.
+        
+        Args:
+            sku: SKU identifier
+            date_from: Only events on/after this date
+            date_to: Only events on/before this date
+            events: Only these event types
+            note_contains: Only events whose note contains this tag
+        
+        Returns:
+            Number of deleted events
+        """
+        drop = _ledger_filter(date_from, date_to, events, note_contains)
+        day = date_from if date_from is not None and date_from == date_to else None
+        return self._filter_sku_transactions(sku, drop, day)
+    
+    def replace_transactions_day(
+        self,
+        sku: str,
+        day: date,
+        txns: List[Transaction],
+        events: Optional[Sequence[EventType]] = None,
+    ) -> int:
+        """
+        Replace one SKU's ledger events of one day (optionally only ``events``) with ``txns``.
+        
+        The new events are written as is (no FEFO) after the kept rows, in a
+        single atomic write.
+        
+        Returns:
+            Number of replaced (deleted) events
+        """
+        drop = _ledger_filter(day, day, events, None)
+        return self._filter_sku_transactions(sku, drop, day, [self._transaction_row(t) for t in txns])
+    
+    def _filter_sku_transactions(
+        self,
+        sku: str,
+        drop: Callable[[Transaction], bool],
+        day: Optional[date] = None,
+        extra_rows: Sequence[Dict[str, str]] = (),
+    ) -> int:
+        """
+        Remove ``sku``'s events for which ``drop`` is true, then add ``extra_rows``.
+        
+        The per-SKU row index tells first whether anything matches (reading
+        only the SKU's rows, or only ``day``'s rows if the filter is limited
+        to one day); if nothing does, the extra rows are appended durably and
+        the ledger is not rewritten.  Otherwise a single streaming pass copies
+        the kept rows to a temporary file (rows of other SKUs are not parsed),
+        writes the extra rows and atomically replaces transactions.csv (with
+        backup).  Unparseable rows are kept.
+        
+        Returns:
+            Number of removed events
+        """
+        import tempfile
+        
+        def _dropped(row: Dict[str, str]) -> bool:
+            if (row.get("sku") or "").strip() != sku:
+                return False
+            txn = self._row_to_transaction(row)
+            return txn is not None and drop(txn)
+        
+        rows, _ = self._read_sku_rows("transactions.csv", sku, equal_to=day.isoformat() if day else None)
+        if not any(_dropped(row) for row in rows):
+            self._append_csv_batch("transactions.csv", list(extra_rows))
+            return 0
+        
+        columns = self.SCHEMAS["transactions.csv"]
+        filepath = self.data_dir / "transactions.csv"
+        removed = 0
+        with _data_dir_lock(self.data_dir):
+            self._recover_append_journals_locked()
+            self._backup_file("transactions.csv")
+            temp_fd, temp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp", text=True)
+            try:
+                with os.fdopen(temp_fd, "w", newline="", encoding="utf-8") as out, \
+                        open(filepath, "r", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(out, fieldnames=columns, extrasaction='ignore')
+                    writer.writeheader()
+                    for row in csv.DictReader(f):
+                        if _dropped(row):
+                            removed += 1
+                        else:
+                            writer.writerow(row)
+                    writer.writerows(extra_rows)
+                    out.flush()
+                    os.fsync(out.fileno())
+                os.replace(temp_path, filepath)
+            except BaseException:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+            self._bump_revision("transactions.csv")
+        return removed
     
     # ============ Event Uplift Rules Operations ============
     
@@ -1033,22 +1953,43 @@ class CSVLayer:
         rows = self._read_csv("sales.csv")
         sales = []
         for row in rows:
-            try:
-                # Backward compatibility: promo_flag defaults to 0 if not present
-                promo_flag_str = row.get("promo_flag", "0").strip()
-                promo_flag = int(promo_flag_str) if promo_flag_str else 0
-                
-                s = SalesRecord(
-                    date=date.fromisoformat(row.get("date", "")),
-                    sku=row.get("sku", "").strip(),
-                    qty_sold=int(row.get("qty_sold", 0)),
-                    promo_flag=promo_flag,
-                )
-                sales.append(s)
-            except (ValueError, KeyError) as e:
-                print(f"Warning: Invalid sales record in sales.csv: {e}")
+            sale = self._row_to_sale(row)
+            if sale is not None:
+                sales.append(sale)
+        return sales
+    
+    def read_sku_sales(self, sku: str) -> List[SalesRecord]:
+        """
+        Sales records of one SKU, newest first.
+        
+        Served from the per-SKU row index: only the SKU's rows are read.
+        """
+        rows, _ = self._read_sku_rows("sales.csv", sku)
+        sales = []
+        for row in rows:
+            sale = self._row_to_sale(row)
+            if sale is not None:
+                sales.append(sale)
         return sales
     
+    @staticmethod
+    def _row_to_sale(row: Dict[str, str]) -> Optional[SalesRecord]:
+        """Parse a sales.csv row (None, with a warning, if invalid)."""
+        try:
+            # Backward compatibility: promo_flag defaults to 0 if not present
+            promo_flag_str = (row.get("promo_flag") or "0").strip()
+            promo_flag = int(promo_flag_str) if promo_flag_str else 0
+            
+            return SalesRecord(
+                date=date.fromisoformat(row.get("date", "")),
+                sku=row.get("sku", "").strip(),
+                qty_sold=int(row.get("qty_sold", 0)),
+                promo_flag=promo_flag,
+            )
+        except (ValueError, KeyError) as e:
+            print(f"Warning: Invalid sales record in sales.csv: {e}")
+            return None
+    
     def write_sales_record(self, sale: SalesRecord):
         """Add a sales record to sales.csv."""
         self._append_csv("sales.csv", {
@@ -1062,6 +2003,20 @@ class CSVLayer:
         """Append a sales record to sales.csv (alias for write_sales_record)."""
         self.write_sales_record(sale)
     
+    def append_sales_batch(self, sales: List[SalesRecord]):
+        """Append several sales records with one durable write (see _append_csv_batch)."""
+        self._append_csv_batch("sales.csv", [self._sales_row(sale) for sale in sales])
+    
+    @staticmethod
+    def _sales_row(sale: SalesRecord) -> Dict[str, str]:
+        """sales.csv row of ``sale``."""
+        return {
+            "date": sale.date.isoformat(),
+            "sku": sale.sku,
+            "qty_sold": str(sale.qty_sold),
+            "promo_flag": str(sale.promo_flag),
+        }
+    
     def write_sales(self, sales: List[SalesRecord]):
         """Overwrite entire sales.csv with given list (for bulk updates)."""
         file_path = self.data_dir / "sales.csv"
@@ -1070,6 +2025,7 @@ class CSVLayer:
             writer.writerow(["date", "sku", "qty_sold", "promo_flag"])
             for sale in sales:
                 writer.writerow([sale.date.isoformat(), sale.sku, str(sale.qty_sold), str(sale.promo_flag)])
+        self._bump_revision("sales.csv")
 
     def upsert_oos_estimate_sale(self, sku: str, estimate_date: date, qty_pz: int) -> SalesRecord:
         """
@@ -1117,25 +2073,18 @@ class CSVLayer:
             qty=0,
             note=note,
         )
-        all_txns = self.read_transactions()
-        filtered = []
-        for t in all_txns:
-            # Remove exact-type duplicate
-            if t.sku == sku and t.date == estimate_date and t.event == EventType.OOS_OVERRIDE:
-                continue
-            # Remove legacy WASTE qty=0 marker for same day
-            if (
-                t.sku == sku
-                and t.date == estimate_date
-                and t.event == EventType.WASTE
+        def _is_marker(t: Transaction) -> bool:
+            if t.date != estimate_date:
+                return False
+            # Exact-type duplicate or legacy WASTE qty=0 marker for same day
+            return t.event == EventType.OOS_OVERRIDE or (
+                t.event == EventType.WASTE
                 and t.qty == 0
-                and t.note
+                and bool(t.note)
                 and "OOS_ESTIMATE_OVERRIDE:" in t.note
-            ):
-                continue
-            filtered.append(t)
-        filtered.append(new_txn)
-        self.overwrite_transactions(filtered)
+            )
+        
+        self._filter_sku_transactions(sku, _is_marker, estimate_date, [self._transaction_row(new_txn)])
         return new_txn
 
     # ============ Promo Calendar Operations ============
@@ -1201,6 +2150,7 @@ class CSVLayer:
                     window.store_id or "",
                     str(window.promo_flag),
                 ])
+        self._bump_revision("promo_calendar.csv")
     
     # ============ KPI Daily Operations ============
     
@@ -1502,21 +2452,36 @@ class CSVLayer:
             qty_received: New total quantity received
             status: New status (PENDING, PARTIAL, RECEIVED)
         """
+        self.update_orders_received_qty({order_id: (qty_received, status)})
+    
+    def update_orders_received_qty(self, updates: Dict[str, Tuple[int, str]]):
+        """
+        Update qty_received and status of several orders with one atomic rewrite.
+        
+        Args:
+            updates: {order_id: (new total qty_received, new status)}
+        
+        Raises:
+            ValueError: If an order_id is not in order_logs.csv (nothing is written)
+        """
         import logging
         logger = logging.getLogger(__name__)
         
+        if not updates:
+            return
         orders = self.read_order_logs()
-        updated = False
+        pending = dict(updates)
 
         for order in orders:
-            if order.get("order_id") == order_id:
+            order_id = order.get("order_id")
+            if order_id in pending:
+                qty_received, status = pending.pop(order_id)
                 order["qty_received"] = str(qty_received)
                 order["status"] = status
-                updated = True
                 logger.info(f"Updated order {order_id}: qty_received={qty_received}, status={status}")
-                break
 
-        if not updated:
+        if pending:
+            order_id, (qty_received, status) = next(iter(pending.items()))
             raise ValueError(
                 f"Order {order_id} not found in order_logs.csv "
                 f"— cannot update qty_received={qty_received}, status={status}"
@@ -1567,6 +2532,28 @@ class CSVLayer:
         """Read receiving logs."""
         return self._read_csv("receiving_logs.csv")
     
+    def receiving_document_ids(self) -> frozenset:
+        """
+        Ids of every processed document (``document_id`` and legacy ``receipt_id``).
+        
+        Cached per ``file_revision("receiving_logs.csv")``: duplicate checks of
+        a receipt cost one ``stat`` while no receipt has been closed.
+        """
+        key = str(self.data_dir / "receiving_logs.csv")
+        revision = self.file_revision("receiving_logs.csv")
+        with _RECEIVING_DOC_CACHE_LOCK:
+            cached = _RECEIVING_DOC_CACHE.get(key)
+        if cached is None or cached[0] != revision:
+            ids = set()
+            for log in self.read_receiving_logs():
+                ids.add(log.get("document_id", ""))
+                ids.add(log.get("receipt_id", ""))
+            ids.discard("")
+            cached = (revision, frozenset(ids))
+            with _RECEIVING_DOC_CACHE_LOCK:
+                _RECEIVING_DOC_CACHE[key] = cached
+        return cached[1]
+    
     def write_receiving_log(self, document_id: str, date_str: str, sku: str, qty: int, receipt_date: str, order_ids: str = "", receipt_id: Optional[str] = None):
         """
         Write receiving log entry with document and order traceability.
@@ -1580,8 +2567,15 @@ class CSVLayer:
             order_ids: Comma-separated list of order_ids fulfilled by this receipt
             receipt_id: Legacy receipt_id (for backward compatibility)
         """
+        self._append_csv("receiving_logs.csv", self._receiving_log_row(
+            document_id, date_str, sku, qty, receipt_date, order_ids, receipt_id,
+        ))
+    
+    @staticmethod
+    def _receiving_log_row(document_id: str, date_str: str, sku: str, qty: int, receipt_date: str, order_ids: str = "", receipt_id: Optional[str] = None) -> Dict[str, str]:
+        """receiving_logs.csv row (arguments as in ``write_receiving_log``)."""
         validate_sku_canonical(sku, context="write_receiving_log")
-        self._append_csv("receiving_logs.csv", {
+        return {
             "document_id": document_id,
             "receipt_id": receipt_id or document_id,  # Backward compat
             "date": date_str,
@@ -1589,7 +2583,44 @@ class CSVLayer:
             "qty_received": str(qty),
             "receipt_date": receipt_date,
             "order_ids": order_ids,
+        }
+    
+    def write_receipt_batch(
+        self,
+        txns: List[Transaction],
+        receiving_logs: List[Dict[str, Any]],
+        lots: Optional[List[Lot]] = None,
+    ):
+        """
+        Commit closed receipts: ledger events, receiving logs and new lots together.
+        
+        The three files are appended with one journaled commit (see
+        ``_append_csv_batches``): after a crash either every row of the batch
+        is on disk or none is.  Lots sharing a lot_id keep the last one; a
+        lot whose id is already in lots.csv (legacy re-receipt) is upserted
+        with ``write_lot`` after the commit.
+        
+        Args:
+            txns: Ledger events (RECEIPT / UNFULFILLED)
+            receiving_logs: ``write_receiving_log`` keyword arguments, one dict per row
+            lots: Lots created by the receipts
+        """
+        ledger_rows = self._ledger_rows(txns)
+        log_rows = [self._receiving_log_row(**log) for log in receiving_logs]
+        
+        new_lots: Dict[str, Lot] = {}
+        for lot in lots or []:
+            new_lots[lot.lot_id] = lot
+        existing_ids = {lot.lot_id for lot in self.read_lots()} if new_lots else set()
+        replaced = [lot for lot_id, lot in new_lots.items() if lot_id in existing_ids]
+        
+        self._append_csv_batches({
+            "transactions.csv": ledger_rows,
+            "receiving_logs.csv": log_rows,
+            "lots.csv": [self._lot_row(lot) for lot_id, lot in new_lots.items() if lot_id not in existing_ids],
         })
+        for lot in replaced:
+            self.write_lot(lot)
     
     # ============ Audit Log Operations ============
     
@@ -1676,11 +2707,11 @@ class CSVLayer:
         Returns:
             List of AuditLog objects (sorted by timestamp desc)
         """
-        rows = self._read_csv("audit_log.csv")
-        
-        # Filter by SKU if provided
         if sku:
-            rows = [r for r in rows if r.get("sku") == sku]
+            # Indexed path: only this SKU's rows are read
+            return self.read_sku_audit_page(sku, limit=limit)[0]
+        
+        rows = self._read_csv("audit_log.csv")
         
         # Sort by timestamp descending (most recent first)
         rows = sorted(rows, key=lambda r: r.get("timestamp", ""), reverse=True)
@@ -1689,18 +2720,37 @@ class CSVLayer:
         if limit:
             rows = rows[:limit]
         
-        # Convert to AuditLog objects
-        audit_logs = []
-        for row in rows:
-            audit_logs.append(AuditLog(
-                timestamp=row.get("timestamp", ""),
-                operation=row.get("operation", ""),
-                sku=row.get("sku") if row.get("sku") else None,
-                details=row.get("details", ""),
-                user=row.get("user", "system"),
-            ))
+        return [self._row_to_audit_log(row) for row in rows]
+    
+    def read_sku_audit_page(
+        self,
+        sku: str,
+        limit: Optional[int] = 50,
+        before: Optional[PageCursor] = None,
+    ) -> Tuple[List[AuditLog], Optional[PageCursor]]:
+        """
+        Latest audit log entries of one SKU, newest first, in keyset pages.
+        
+        Args:
+            sku: SKU identifier
+            limit: Page size (None/0 = all remaining entries)
+            before: Cursor returned with the previous page (None = latest entries)
         
-        return audit_logs
+        Returns:
+            (audit entries, cursor for the next page or None if no more entries)
+        """
+        rows, next_cursor = self._read_sku_rows("audit_log.csv", sku, limit, before)
+        return [self._row_to_audit_log(row) for row in rows], next_cursor
+    
+    @staticmethod
+    def _row_to_audit_log(row: Dict[str, str]) -> AuditLog:
+        return AuditLog(
+            timestamp=row.get("timestamp", ""),
+            operation=row.get("operation", ""),
+            sku=row.get("sku") if row.get("sku") else None,
+            details=row.get("details", ""),
+            user=row.get("user", "system"),
+        )
     
     # ============ Settings Operations ============
     
@@ -2386,6 +3436,7 @@ class CSVLayer:
         Write CSV file atomically with auto-backup.
         
         Steps:
+        0. Take ``_data_dir_lock`` and resolve pending append journals
         1. Backup existing file
         2. Write to temporary file
         3. Atomic rename (replaces original)
@@ -2401,32 +3452,37 @@ class CSVLayer:
         if not self.SCHEMAS.get(filename):
             raise ValueError(f"Unknown CSV file: {filename}")
         
-        # 1. Backup existing
-        self._backup_file(filename)
-        
-        columns = self.SCHEMAS[filename]
-        filepath = self.data_dir / filename
-        
-        # 2. Write to temporary file
-        temp_fd, temp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp", text=True)
-        
-        try:
-            with os.fdopen(temp_fd, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=columns)
-                writer.writeheader()
-                writer.writerows(rows)
+        # Pending journals are resolved first: their sizes refer to the old file
+        with _data_dir_lock(self.data_dir):
+            self._recover_append_journals_locked()
+            
+            # 1. Backup existing
+            self._backup_file(filename)
+            
+            columns = self.SCHEMAS[filename]
+            filepath = self.data_dir / filename
+            
+            # 2. Write to temporary file
+            temp_fd, temp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp", text=True)
             
-            # 3. Atomic rename (replaces original)
-            os.replace(temp_path, filepath)
-            logger.debug(f"Atomic write completed for {filename}")
-        except Exception as e:
-            # Cleanup temp file on error
             try:
-                os.remove(temp_path)
-            except OSError:
-                pass
-            logger.error(f"Atomic write failed for {filename}: {e}")
-            raise
+                with os.fdopen(temp_fd, "w", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=columns)
+                    writer.writeheader()
+                    writer.writerows(rows)
+            
+                # 3. Atomic rename (replaces original)
+                os.replace(temp_path, filepath)
+                self._bump_revision(filename)
+                logger.debug(f"Atomic write completed for {filename}")
+            except Exception as e:
+                # Cleanup temp file on error
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                logger.error(f"Atomic write failed for {filename}: {e}")
+                raise
     
     # ==================== LOT MANAGEMENT ====================
     
@@ -2494,18 +3550,7 @@ class CSVLayer:
             lots.append(lot)
         
         # Write all lots
-        rows = []
-        for lot_obj in lots:
-            rows.append({
-                "lot_id": lot_obj.lot_id,
-                "sku": lot_obj.sku,
-                "expiry_date": lot_obj.expiry_date.isoformat() if lot_obj.expiry_date else "",
-                "qty_on_hand": str(lot_obj.qty_on_hand),
-                "receipt_id": lot_obj.receipt_id,
-                "receipt_date": lot_obj.receipt_date.isoformat(),
-            })
-        
-        self._write_csv_atomic("lots.csv", rows)
+        self._write_csv_atomic("lots.csv", [self._lot_row(lot_obj) for lot_obj in lots])
     
     def update_lot_quantity(self, lot_id: str, new_qty: int):
         """
@@ -2536,23 +3581,25 @@ class CSVLayer:
         if not updated:
             raise ValueError(f"Lot not found: {lot_id}")
         
-        # Remove lots with qty = 0
-        lots = [lot for lot in lots if lot.qty_on_hand > 0]
-        
-        # Write back
-        rows = []
-        for lot_obj in lots:
-            rows.append({
-                "lot_id": lot_obj.lot_id,
-                "sku": lot_obj.sku,
-                "expiry_date": lot_obj.expiry_date.isoformat() if lot_obj.expiry_date else "",
-                "qty_on_hand": str(lot_obj.qty_on_hand),
-                "receipt_id": lot_obj.receipt_id,
-                "receipt_date": lot_obj.receipt_date.isoformat(),
-            })
-        
+        self._write_lots(lots)
+    
+    def _write_lots(self, lots: List[Lot]):
+        """Rewrite lots.csv with ``lots``, dropping depleted lots (qty = 0)."""
+        rows = [self._lot_row(lot_obj) for lot_obj in lots if lot_obj.qty_on_hand > 0]
         self._write_csv_atomic("lots.csv", rows)
     
+    @staticmethod
+    def _lot_row(lot_obj: Lot) -> Dict[str, str]:
+        """lots.csv row of ``lot_obj``."""
+        return {
+            "lot_id": lot_obj.lot_id,
+            "sku": lot_obj.sku,
+            "expiry_date": lot_obj.expiry_date.isoformat() if lot_obj.expiry_date else "",
+            "qty_on_hand": str(lot_obj.qty_on_hand),
+            "receipt_id": lot_obj.receipt_id,
+            "receipt_date": lot_obj.receipt_date.isoformat(),
+        }
+    
     def get_lots_by_sku(self, sku: str, sort_by_expiry: bool = True) -> List[Lot]:
         """
         Get all lots for a specific SKU.
@@ -2635,7 +3682,7 @@ class CSVLayer:
     
     # ============ FEFO Auto-Trigger ============
     
-    def _apply_fefo_to_transaction(self, txn: Transaction) -> Transaction:
+    def _apply_fefo_to_transaction(self, txn: Transaction, lots: Optional["_LotBatch"] = None) -> Transaction:
         """
         Apply FEFO consumption to SALE/WASTE transaction.
         
@@ -2644,6 +3691,7 @@ class CSVLayer:
         
         Args:
             txn: Transaction to process
+            lots: In-memory lot view of a batch write (None = read/write lots.csv directly)
         
         Returns:
             Transaction with updated note containing FEFO details
@@ -2657,10 +3705,11 @@ class CSVLayer:
         
         logger = logging.getLogger(__name__)
         
+        lot_source = lots if lots is not None else self
         try:
             # Get lots for this SKU
-            lots = self.get_lots_by_sku(txn.sku, sort_by_expiry=True)
-            if not lots:
+            sku_lots = lot_source.get_lots_by_sku(txn.sku, sort_by_expiry=True)
+            if not sku_lots:
                 # No lot tracking for this SKU, skip FEFO
                 return txn
             
@@ -2668,8 +3717,8 @@ class CSVLayer:
             consumption_records = LotConsumptionManager.consume_from_lots(
                 sku=txn.sku,
                 qty_to_consume=txn.qty,
-                lots=lots,
-                csv_layer=self,
+                lots=sku_lots,
+                csv_layer=lot_source,
             )
             
             if consumption_records:
@@ -15,7 +15,7 @@ Design:
 """
 
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import Callable, List, Dict, Optional, Any, Sequence, Tuple
 from datetime import date
 import sqlite3
 
@@ -24,6 +24,7 @@ from ..domain.models import (
     DemandVariability, Lot, PromoWindow, EventUpliftRule
 )
 from .csv_layer import CSVLayer
+from ..utils.sku_validation import validate_sku_canonical, is_sku_canonical
 
 # Import config from dos_backend package (env-var-aware, no sys.path hack needed).
 # Falls back to the same defaults as the project-root config.py when no env vars are set.
@@ -166,6 +167,37 @@ class StorageAdapter(CSVLayer):
     def is_sqlite_mode(self) -> bool:
         """Check if currently using SQLite backend"""
         return self.backend == 'sqlite' and self.conn is not None
+
+    def data_revision(self) -> tuple:
+        """
+        Change token for the active storage (see CSVLayer.data_revision).
+
+        In SQLite mode the database and WAL files are stat-ed as well, since
+        repository writes do not touch the CSV files.
+        """
+        revision = super().data_revision()
+        if not self.is_sqlite_mode():
+            return revision
+        db_path = Path(DATABASE_PATH)
+        db_tokens = []
+        for path in (db_path, db_path.with_name(db_path.name + "-wal")):
+            try:
+                st = path.stat()
+                db_tokens.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                db_tokens.append((0, 0))
+        return revision + tuple(db_tokens)
+    
+    def rewrite_epoch(self, filename: str):
+        """
+        CSV rewrite token (see CSVLayer.rewrite_epoch).
+
+        None for the ledger in SQLite mode (no append-only token there):
+        callers then re-validate the whole prefix.
+        """
+        if self.is_sqlite_mode() and filename == "transactions.csv":
+            return None
+        return self.csv_layer.rewrite_epoch(filename)
     
     def close(self):
         """Close database connection (if open)"""
@@ -555,6 +587,40 @@ class StorageAdapter(CSVLayer):
         else:
             return self.csv_layer.read_transactions()
     
+    def read_sku_transactions(self, sku: str, asof: Optional[date] = None) -> List[Transaction]:
+        """Ledger events of one SKU (only ``date < asof`` if given).
+
+        SQLite mode runs one query over idx_transactions_sku_date; CSV mode
+        reads only the SKU's rows through CSVLayer's per-SKU index.  Used by
+        the streamed list endpoints, which compute stock one SKU at a time.
+        """
+        if self.is_sqlite_mode():
+            assert self.repos is not None
+            try:
+                rows = self.repos.ledger().list_transactions_for_sku_asof(sku, asof or date.max)
+                return [self._dict_to_transaction(t) for t in rows]
+            except Exception as e:
+                self._sqlite_degrade(e)
+                print(f"⚠ SQLite read_sku_transactions failed, falling back to CSV: {e}")
+        txns, _ = self.csv_layer.read_sku_transactions_page(sku, limit=None)
+        return [t for t in txns if asof is None or t.date < asof]
+
+    def sum_qty(self, sku: str, day: date, event: EventType) -> int:
+        """Total qty of *sku*'s *event* transactions on *day*.
+
+        SQLite mode runs one aggregate over idx_transactions_sku_date; CSV
+        mode reads only that day's rows through CSVLayer's per-SKU index.
+        """
+        if self.is_sqlite_mode():
+            assert self.repos is not None
+            try:
+                return self.repos.ledger().sum_qty(sku, day.isoformat(), event.value)
+            except Exception as e:
+                self._sqlite_degrade(e)
+                print(f"⚠ SQLite sum_qty failed, falling back to CSV: {e}")
+                return self.csv_layer.sum_qty(sku, day, event)
+        return self.csv_layer.sum_qty(sku, day, event)
+
     def write_transaction(self, txn: Transaction):
         """Write single transaction"""
         if self.is_sqlite_mode():
@@ -575,6 +641,33 @@ class StorageAdapter(CSVLayer):
         else:
             self.csv_layer.write_transaction(txn)
     
+    def _sync_skus_to_sqlite(self, sku_ids: List[str]) -> None:
+        """Upsert SKUs that exist in CSV but are missing from SQLite.
+
+        Called automatically when a batch transaction write fails with a
+        foreign-key error so that the missing SKUs are inserted and the
+        caller can retry without a full CSV fallback.
+        """
+        assert self.repos is not None
+        # Normalize keys so int SKU codes or SKUs with spaces still resolve.
+        csv_skus = {str(s.sku).strip(): s for s in self.csv_layer.read_skus()}
+        for sku_id in sku_ids:
+            sku_id_normalized = str(sku_id).strip()
+            # Warn early if the SKU itself is not canonical (7-digit zero-padded).
+            # A non-canonical SKU at this point indicates data entered without
+            # validation upstream and should be investigated rather than silently synced.
+            if not is_sku_canonical(sku_id_normalized):
+                print(f"⚠ SKU non canonico durante sync SQLite (atteso 7 cifre): '{sku_id_normalized}'")
+            sku_obj = csv_skus.get(sku_id_normalized)
+            if sku_obj is not None:
+                try:
+                    self.repos.skus().upsert(self._sku_to_dict(sku_obj))
+                    print(f"ℹ Auto-synced missing SKU to SQLite: {sku_id}")
+                except Exception as sync_err:
+                    print(f"⚠ Could not sync SKU {sku_id} to SQLite: {sync_err}")
+            else:
+                print(f"⚠ SKU {sku_id} not found in CSV catalog — cannot auto-sync")
+
     def write_transactions_batch(self, txns: List[Transaction]):
         """Write multiple transactions (batch mode)"""
         if self.is_sqlite_mode():
@@ -598,6 +691,117 @@ class StorageAdapter(CSVLayer):
         else:
             self.csv_layer.write_transactions_batch(txns)
 
+    def _ledger_batch_with_csv(self, txns: List[Transaction], write_csv: Callable[[], None], context: str) -> Tuple[bool, bool]:
+        """
+        Append ``txns`` to the SQLite ledger with companion CSV rows in the same commit.
+
+        ``write_csv`` runs inside the ledger transaction (``append_batch(before_commit=…)``),
+        so a failed CSV write rolls the ledger rows back; it runs at most once,
+        also across the FK retry.  Missing SKUs are synced from CSV and the
+        batch retried once; any other failure degrades to CSV.
+
+        Returns:
+            (committed, csv_written): committed is False after a degrade to
+            CSV; the caller then writes the ledger rows, plus the CSV rows
+            unless csv_written (the SQLite COMMIT failed after they landed)
+        """
+        assert self.repos is not None
+        batch = [{
+            'date': txn.date.isoformat(),
+            'sku': txn.sku,
+            'event': txn.event.value,
+            'qty': txn.qty,
+            'receipt_date': txn.receipt_date.isoformat() if txn.receipt_date else None,
+            'note': txn.note or ''
+        } for txn in txns]
+        csv_failed = False
+        csv_written = False
+
+        def _write_csv_rows():
+            nonlocal csv_failed, csv_written
+            if csv_written:
+                return  # landed in an earlier attempt whose COMMIT failed
+            csv_failed = True
+            write_csv()
+            csv_failed = False
+            csv_written = True
+
+        try:
+            self.repos.ledger().append_batch(batch, before_commit=_write_csv_rows)
+            return True, True
+        except Exception as e:
+            if csv_failed:
+                raise  # ledger rolled back, nothing written
+            from ..repositories import ForeignKeyError as _FKError
+            if isinstance(e, _FKError):
+                # Missing SKUs in SQLite: sync them from CSV and retry once
+                try:
+                    self._sync_skus_to_sqlite(list({txn.sku for txn in txns}))
+                    self.repos.ledger().append_batch(batch, before_commit=_write_csv_rows)
+                    return True, True
+                except Exception as retry_err:
+                    if csv_failed:
+                        raise
+                    print(f"⚠ SQLite {context} retry failed: {retry_err}")
+            self._sqlite_degrade(e)
+            print(f"⚠ SQLite {context} failed, falling back to CSV: {e}")
+        return False, csv_written
+
+    def write_receipt_batch(self, txns: List[Transaction], receiving_logs: List[Dict[str, Any]], lots: Optional[List[Lot]] = None):
+        """
+        Commit closed receipts: ledger events, receiving logs and lots together.
+
+        Receiving logs and lots always live in CSV.  In SQLite mode they are
+        written inside the ledger transaction (see ``_ledger_batch_with_csv``);
+        if the SQLite COMMIT fails after the CSV half landed, the CSV fallback
+        only adds the ledger events (logs and lots are never appended twice).
+        In CSV mode the three files share one journaled append
+        (``CSVLayer.write_receipt_batch``).
+        """
+        for txn in txns:
+            validate_sku_canonical(txn.sku, context="write_receipt_batch")
+
+        if self.is_sqlite_mode():
+            committed, csv_written = self._ledger_batch_with_csv(
+                txns, lambda: self.csv_layer.write_receipt_batch([], receiving_logs, lots), "write_receipt_batch",
+            )
+            if committed:
+                return
+            if csv_written:
+                self.csv_layer.write_transactions_batch(txns)
+                return
+        self.csv_layer.write_receipt_batch(txns, receiving_logs, lots)
+
+    def write_eod_batch(self, txns: List[Transaction], new_sales: List[SalesRecord], all_sales: Optional[List[SalesRecord]] = None):
+        """
+        Commit a daily close: sales, ledger events and their FEFO lot updates together.
+
+        Sales and lots always live in CSV.  FEFO is applied exactly once, on
+        an in-memory lot view, before anything is written.  In SQLite mode the
+        sales and lots commit inside the ledger transaction (see
+        ``_ledger_batch_with_csv``); in CSV mode everything is one journaled
+        commit (``CSVLayer.write_eod_batch``).
+        """
+        for txn in txns:
+            validate_sku_canonical(txn.sku, context="write_eod_batch")
+
+        if self.is_sqlite_mode():
+            txns, lot_batch = self.csv_layer._fefo_transactions(txns)
+            committed, csv_written = self._ledger_batch_with_csv(
+                txns, lambda: self.csv_layer._write_eod_files([], new_sales, all_sales, lot_batch), "write_eod_batch",
+            )
+            if committed:
+                return
+            if csv_written:
+                # FEFO notes already applied: append the rows as they are
+                self.csv_layer._append_csv_batch(
+                    "transactions.csv", [self.csv_layer._transaction_row(txn) for txn in txns],
+                )
+            else:
+                self.csv_layer._write_eod_files(txns, new_sales, all_sales, lot_batch)
+            return
+        self.csv_layer.write_eod_batch(txns, new_sales, all_sales)
+
     def overwrite_transactions(self, txns: List[Transaction]):
         """
         Replace the entire transaction ledger with *txns* (used by revert logic).
@@ -652,6 +856,78 @@ class StorageAdapter(CSVLayer):
         else:
             self.csv_layer.overwrite_transactions(txns)
 
+    def delete_transactions(
+        self,
+        sku: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        events: Optional[Sequence[EventType]] = None,
+        note_contains: Optional[str] = None,
+    ) -> int:
+        """
+        Delete one SKU's ledger events matching all the given filters (revert / purge).
+        
+        SQLite mode runs one indexed DELETE; CSV mode a single streaming
+        filter pass over transactions.csv (skipped if nothing matches).
+        
+        Returns:
+            Number of deleted events
+        """
+        if self.is_sqlite_mode():
+            assert self.repos is not None
+            try:
+                return self.repos.ledger().delete_matching(
+                    sku,
+                    date_from=date_from.isoformat() if date_from else None,
+                    date_to=date_to.isoformat() if date_to else None,
+                    events=[e.value for e in events] if events is not None else None,
+                    note_contains=note_contains,
+                )
+            except Exception as e:
+                self._sqlite_degrade(e)
+                print(f"⚠ SQLite delete_transactions failed, falling back to CSV: {e}")
+        return self.csv_layer.delete_transactions(sku, date_from, date_to, events, note_contains)
+    
+    def replace_transactions_day(
+        self,
+        sku: str,
+        day: date,
+        txns: List[Transaction],
+        events: Optional[Sequence[EventType]] = None,
+    ) -> int:
+        """
+        Replace one SKU's ledger events of one day (optionally only ``events``) with *txns*.
+        
+        SQLite mode deletes and inserts in one transaction; CSV mode uses a
+        single streaming filter pass (plain append if nothing matches).
+        
+        Returns:
+            Number of replaced (deleted) events
+        """
+        if self.is_sqlite_mode():
+            assert self.repos is not None
+            try:
+                return self.repos.ledger().replace_day(
+                    sku,
+                    day.isoformat(),
+                    [
+                        {
+                            'date': t.date.isoformat(),
+                            'sku': t.sku,
+                            'event': t.event.value,
+                            'qty': t.qty,
+                            'receipt_date': t.receipt_date.isoformat() if t.receipt_date else None,
+                            'note': t.note or '',
+                        }
+                        for t in txns
+                    ],
+                    events=[e.value for e in events] if events is not None else None,
+                )
+            except Exception as e:
+                self._sqlite_degrade(e)
+                print(f"⚠ SQLite replace_transactions_day failed, falling back to CSV: {e}")
+        return self.csv_layer.replace_transactions_day(sku, day, txns, events)
+
     # ============================================================
     # Sales Operations
     # ============================================================
@@ -678,6 +954,10 @@ class StorageAdapter(CSVLayer):
         
         return all_sales
     
+    def read_sku_sales(self, sku: str) -> List[SalesRecord]:
+        """Sales records of one SKU (CSV per-SKU index, no full-file read)."""
+        return self.csv_layer.read_sku_sales(sku)
+    
     def write_sales_record(self, sale: SalesRecord):
         """Write single sales record.
         
@@ -690,6 +970,10 @@ class StorageAdapter(CSVLayer):
         """Append sales record (alias for write_sales_record)"""
         self.write_sales_record(sale)
 
+    def append_sales_batch(self, sales: List[SalesRecord]):
+        """Append several sales records in one write (always CSV, like write_sales_record)."""
+        self.csv_layer.append_sales_batch(sales)
+
     def write_sales(self, sales: List[SalesRecord]):
         """Bulk-overwrite all sales records.
         
@@ -745,9 +1029,15 @@ class StorageAdapter(CSVLayer):
     def write_order_log(self, *args, **kwargs):
         self.csv_layer.write_order_log(*args, **kwargs)
     
+    def update_orders_received_qty(self, updates: Dict[str, Tuple[int, str]]):
+        self.csv_layer.update_orders_received_qty(updates)
+    
     def read_receiving_logs(self):
         return self.csv_layer.read_receiving_logs()
     
+    def receiving_document_ids(self) -> frozenset:
+        return self.csv_layer.receiving_document_ids()
+    
     def write_receiving_log(self, *args, **kwargs):
         self.csv_layer.write_receiving_log(*args, **kwargs)
     
@@ -8,8 +8,12 @@ All dates are inclusive (start_date and end_date both included).
 Timezone-naive dates (assumes business timezone consistency).
 """
 import logging
+import threading
+from bisect import bisect_right
+from collections.abc import Sequence
 from datetime import date as Date
-from typing import List, Optional
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from .domain.models import PromoWindow, SalesRecord
 from .persistence.csv_layer import CSVLayer
@@ -18,6 +22,186 @@ from .persistence.csv_layer import CSVLayer
 logger = logging.getLogger(__name__)
 
 
+# ============ Preindexed Lookup ============
+
+class _WindowBucket:
+    """
+    Windows of one SKU (or of the whole calendar) ordered by start_date.
+
+    ``max_end[i]`` is the latest end_date among the first ``i + 1`` windows,
+    so a bisection on ``starts`` plus one comparison tells whether any window
+    can still cover a date, and a backward scan can stop as soon as it
+    cannot.
+    """
+
+    __slots__ = ("windows", "positions", "starts", "max_end")
+
+    def __init__(self, entries: List[Tuple[int, PromoWindow]]):
+        # Stable sort: windows with equal start keep their input order, which
+        # matches ``promo_windows_for_sku``'s ``list.sort`` on start_date.
+        entries = sorted(entries, key=lambda e: e[1].start_date)
+        self.positions = [pos for pos, _ in entries]
+        self.windows = [w for _, w in entries]
+        self.starts = [w.start_date for w in self.windows]
+        self.max_end: List[Date] = []
+        running = None
+        for w in self.windows:
+            if running is None or w.end_date > running:
+                running = w.end_date
+            self.max_end.append(running)
+
+    def covering(self, check_date: Date):
+        """Yield ``(position, window)`` for windows containing check_date (latest start first)."""
+        i = bisect_right(self.starts, check_date) - 1
+        while i >= 0 and self.max_end[i] >= check_date:
+            w = self.windows[i]
+            if w.end_date >= check_date:
+                yield self.positions[i], w
+            i -= 1
+
+
+class PromoIndex(Sequence):
+    """
+    Read-only promo calendar with per-SKU bisection lookups.
+
+    Behaves like the ``List[PromoWindow]`` it was built from (same order,
+    ``len``, iteration, indexing), so it can be passed anywhere a window
+    list is expected.  The query functions of this module
+    (``is_promo``, ``promo_windows_for_sku``, ``get_active_promos``) detect
+    it and answer in O(log n) per SKU instead of scanning the calendar.
+
+    Build it once per calendar revision with :func:`load_promo_index` and
+    share it between forecast, modifier and guardrail code.
+    """
+
+    def __init__(self, windows: Iterable[PromoWindow]):
+        self._windows: List[PromoWindow] = list(windows)
+        per_sku: Dict[str, List[Tuple[int, PromoWindow]]] = {}
+        for pos, w in enumerate(self._windows):
+            per_sku.setdefault(w.sku, []).append((pos, w))
+        self._by_sku: Dict[str, List[PromoWindow]] = {
+            sku: [w for _, w in entries] for sku, entries in per_sku.items()
+        }
+        self._buckets: Dict[str, _WindowBucket] = {
+            sku: _WindowBucket(entries) for sku, entries in per_sku.items()
+        }
+        self._all = _WindowBucket(list(enumerate(self._windows)))
+        self._global_only: Optional["PromoIndex"] = None
+
+    # -- Sequence protocol --
+
+    def __getitem__(self, item):
+        return self._windows[item]
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def __iter__(self):
+        return iter(self._windows)
+
+    def __repr__(self) -> str:
+        return f"PromoIndex({len(self._windows)} windows, {len(self._by_sku)} SKUs)"
+
+    # -- Queries --
+
+    def skus(self) -> List[str]:
+        """SKUs that have at least one window."""
+        return list(self._by_sku)
+
+    def for_sku(self, sku: str) -> List[PromoWindow]:
+        """All windows of a SKU, in calendar order (any store)."""
+        return list(self._by_sku.get(sku, ()))
+
+    def windows_for_sku(self, sku: str, store_id: Optional[str] = None) -> List[PromoWindow]:
+        """Same result as ``promo_windows_for_sku(sku, windows, store_id)``."""
+        bucket = self._buckets.get(sku)
+        if bucket is None:
+            return []
+        if store_id is None:
+            return list(bucket.windows)
+        return [w for w in bucket.windows if w.store_id is None or w.store_id == store_id]
+
+    def is_active(self, sku: str, check_date: Date, store_id: Optional[str] = None) -> bool:
+        """Same result as ``is_promo(check_date, sku, windows, store_id)``."""
+        bucket = self._buckets.get(sku)
+        if bucket is None:
+            return False
+        for _, w in bucket.covering(check_date):
+            if store_id is None or w.store_id is None or w.store_id == store_id:
+                return True
+        return False
+
+    def find_window(self, check_date: Date, sku: str, store_id: Optional[str] = None) -> Optional[PromoWindow]:
+        """
+        First window (in calendar order) of a SKU containing check_date.
+
+        Store matching is strict: ``store_id=None`` considers global windows
+        only, otherwise only windows of exactly that store.
+        """
+        bucket = self._buckets.get(sku)
+        if bucket is None:
+            return None
+        best_pos = -1
+        best = None
+        for pos, w in bucket.covering(check_date):
+            if w.store_id != store_id:
+                continue
+            if best is None or pos < best_pos:
+                best_pos, best = pos, w
+        return best
+
+    def active_on(self, check_date: Date, sku: Optional[str] = None) -> List[PromoWindow]:
+        """Windows containing check_date (optionally for one SKU), in calendar order."""
+        bucket = self._all if sku is None else self._buckets.get(sku)
+        if bucket is None:
+            return []
+        hits = sorted(bucket.covering(check_date), key=lambda e: e[0])
+        return [w for _, w in hits]
+
+    def global_only(self) -> "PromoIndex":
+        """Index restricted to global windows (``store_id is None``); built once."""
+        if self._global_only is None:
+            if all(w.store_id is None for w in self._windows):
+                self._global_only = self
+            else:
+                self._global_only = PromoIndex(w for w in self._windows if w.store_id is None)
+        return self._global_only
+
+
+_PROMO_INDEX_CACHE: Dict[str, Tuple[object, PromoIndex]] = {}
+_PROMO_INDEX_LOCK = threading.Lock()
+
+
+def load_promo_index(csv_layer: CSVLayer) -> PromoIndex:
+    """
+    Return the PromoIndex for ``csv_layer``'s promo calendar.
+
+    The index is rebuilt only when ``promo_calendar.csv`` changes (see
+    ``CSVLayer.file_revision``); otherwise the same instance is returned, so
+    every caller within a revision shares one parse and one set of buckets.
+
+    Args:
+        csv_layer: CSV persistence layer (or StorageAdapter)
+
+    Returns:
+        PromoIndex over ``csv_layer.read_promo_calendar()``
+    """
+    try:
+        key = str(Path(csv_layer.data_dir).resolve())
+        revision = csv_layer.file_revision("promo_calendar.csv")
+    except (AttributeError, TypeError):
+        # Layers without a data directory (e.g. test doubles): no caching
+        return PromoIndex(csv_layer.read_promo_calendar())
+    with _PROMO_INDEX_LOCK:
+        cached = _PROMO_INDEX_CACHE.get(key)
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+    index = PromoIndex(csv_layer.read_promo_calendar())
+    with _PROMO_INDEX_LOCK:
+        _PROMO_INDEX_CACHE[key] = (revision, index)
+    return index
+
+
 # ============ Query Functions ============
 
 def is_promo(check_date: Date, sku: str, promo_windows: List[PromoWindow], store_id: Optional[str] = None) -> bool:
@@ -35,6 +219,9 @@ def is_promo(check_date: Date, sku: str, promo_windows: List[PromoWindow], store
     Returns:
         True if date falls within any promo window for the SKU
     """
+    if isinstance(promo_windows, PromoIndex):
+        return promo_windows.is_active(sku, check_date, store_id)
+
     for window in promo_windows:
         if window.sku != sku:
             continue
@@ -65,6 +252,9 @@ def promo_windows_for_sku(sku: str, promo_windows: List[PromoWindow], store_id:
     Returns:
         Filtered list of PromoWindow objects for the SKU (sorted by start_date)
     """
+    if isinstance(promo_windows, PromoIndex):
+        return promo_windows.windows_for_sku(sku, store_id)
+
     filtered = []
     for w in promo_windows:
         if w.sku != sku:
@@ -269,7 +459,10 @@ def get_promo_stats(promo_windows: List[PromoWindow], sku: Optional[str] = None)
         - sku_count: Number of unique SKUs with promos
     """
     if sku:
-        promo_windows = [w for w in promo_windows if w.sku == sku]
+        if isinstance(promo_windows, PromoIndex):
+            promo_windows = promo_windows.for_sku(sku)
+        else:
+            promo_windows = [w for w in promo_windows if w.sku == sku]
     
     total_windows = len(promo_windows)
     total_promo_days = sum(w.duration_days() for w in promo_windows)
@@ -295,6 +488,9 @@ def get_active_promos(promo_windows: List[PromoWindow], check_date: Date) -> Lis
     Returns:
         List of PromoWindow objects active on check_date
     """
+    if isinstance(promo_windows, PromoIndex):
+        return promo_windows.active_on(check_date)
+
     active = [w for w in promo_windows if w.contains_date(check_date)]
     return active
 
@@ -16,7 +16,7 @@ Design Principles:
 
 import sqlite3
 from datetime import date, datetime
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Callable, Sequence
 from dataclasses import dataclass, asdict
 from contextlib import contextmanager
 
@@ -424,12 +424,19 @@ class LedgerRepository:
                 raise BusinessRuleError(f"Invalid event type or business rule violated: {e}") from e
             raise
     
-    def append_batch(self, transactions: List[Dict[str, Any]]) -> List[int]:
+    def append_batch(
+        self,
+        transactions: List[Dict[str, Any]],
+        before_commit: Optional[Callable[[], None]] = None,
+    ) -> List[int]:
         """
         Append multiple transactions atomically.
         
         Args:
             transactions: List of transaction dicts (date, sku, event, qty, receipt_date, note)
+            before_commit: Called inside the transaction after the inserts
+                (e.g. to write companion CSV rows); if it raises, the batch
+                is rolled back
         
         Returns:
             List of transaction_ids
@@ -454,6 +461,8 @@ class LedgerRepository:
                         txn.get('note', '')
                     ))
                     transaction_ids.append(cur.lastrowid)
+                if before_commit is not None:
+                    before_commit()
             
             return transaction_ids
         
@@ -520,6 +529,40 @@ class LedgerRepository:
         cursor.execute(sql, values)
         return [dict(row) for row in cursor.fetchall()]
     
+    def list_transactions_for_sku_asof(
+        self,
+        sku: str,
+        asof: date,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return all transactions for a single SKU with date strictly before *asof*.
+
+        This is the purpose-built query for stock calculation: it pushes the
+        SKU and date filters into SQL so the DB returns only the rows that matter,
+        avoiding the 10 000-row LIMIT of the generic list_transactions() and avoiding
+        loading rows for other SKUs into Python.
+
+        Args:
+            sku:   SKU identifier (exact match, case-sensitive).
+            asof:  Reference date.  Only transactions with date < asof are returned.
+
+        Returns:
+            List of transaction dicts sorted by (date ASC, transaction_id ASC).
+            Never truncated — all matching rows are returned.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT *
+            FROM   transactions
+            WHERE  sku  = ?
+              AND  date < ?
+            ORDER BY date ASC, transaction_id ASC
+            """,
+            (sku, asof.isoformat()),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+    
     def get_by_id(self, transaction_id: int) -> Optional[Dict[str, Any]]:
         """
         Get transaction by ID.
@@ -554,11 +597,136 @@ class LedgerRepository:
             cur.execute("DELETE FROM transactions WHERE transaction_id = ?", (transaction_id,))
             return cur.rowcount > 0
     
+    @staticmethod
+    def _match_clause(
+        sku: str,
+        date_from: Optional[str],
+        date_to: Optional[str],
+        events: Optional[Sequence[str]],
+        note_contains: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        """WHERE clause (and values) selecting one SKU's rows by the given filters."""
+        clauses = ["sku = ?"]
+        values: List[Any] = [sku]
+        if date_from:
+            clauses.append("date >= ?")
+            values.append(date_from)
+        if date_to:
+            clauses.append("date <= ?")
+            values.append(date_to)
+        if events is not None:
+            clauses.append(f"event IN ({', '.join('?' for _ in events) or 'NULL'})")
+            values.extend(events)
+        if note_contains:
+            clauses.append("instr(note, ?) > 0")
+            values.append(note_contains)
+        return " AND ".join(clauses), values
+    
+    def delete_matching(
+        self,
+        sku: str,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        events: Optional[Sequence[str]] = None,
+        note_contains: Optional[str] = None,
+    ) -> int:
+        """
+        Delete one SKU's transactions matching all the given filters.
+        
+        A single DELETE served by idx_transactions_sku_date (SKU equality,
+        date range); the rest of the ledger is never read.
+        
+        Args:
+            sku: SKU code
+            date_from: Only rows with date >= date_from (YYYY-MM-DD)
+            date_to: Only rows with date <= date_to (YYYY-MM-DD)
+            events: Only these event types
+            note_contains: Only rows whose note contains this substring
+        
+        Returns:
+            Number of deleted rows
+        
+        Warning: Breaks ledger immutability. Use only for reverts and purges.
+        """
+        where_sql, values = self._match_clause(sku, date_from, date_to, events, note_contains)
+        with transaction(self.conn) as cur:
+            cur.execute(f"DELETE FROM transactions WHERE {where_sql}", values)
+            return cur.rowcount
+    
+    def replace_day(
+        self,
+        sku: str,
+        day: str,
+        transactions: List[Dict[str, Any]],
+        events: Optional[Sequence[str]] = None,
+    ) -> int:
+        """
+        Replace one SKU's transactions of one day (optionally only ``events``) atomically.
+        
+        Args:
+            sku: SKU code
+            day: Date (YYYY-MM-DD)
+            transactions: New transaction dicts (date, sku, event, qty, receipt_date, note)
+            events: Only rows of these event types are replaced
+        
+        Returns:
+            Number of replaced (deleted) rows
+        
+        Raises:
+            ForeignKeyError, BusinessRuleError: On constraint violation (nothing changed)
+        """
+        where_sql, values = self._match_clause(sku, day, day, events, None)
+        try:
+            with transaction(self.conn, isolation_level="IMMEDIATE") as cur:
+                cur.execute(f"DELETE FROM transactions WHERE {where_sql}", values)
+                deleted = cur.rowcount
+                cur.executemany("""
+                    INSERT INTO transactions (date, sku, event, qty, receipt_date, note)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [
+                    (
+                        txn['date'],
+                        txn['sku'],
+                        txn['event'],
+                        txn['qty'],
+                        txn.get('receipt_date') or '',
+                        txn.get('note') or '',
+                    )
+                    for txn in transactions
+                ])
+            return deleted
+        
+        except (RuntimeError, sqlite3.IntegrityError) as e:
+            error_msg = str(e).lower()
+            if "foreign key" in error_msg:
+                raise ForeignKeyError(f"SKU {sku} does not exist") from e
+            elif "check constraint" in error_msg:
+                raise BusinessRuleError(f"Invalid transaction data: {e}") from e
+            raise
+    
     def count_by_sku(self, sku: str) -> int:
         """Count transactions for a SKU."""
         cursor = self.conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM transactions WHERE sku = ?", (sku,))
         return cursor.fetchone()[0]
+    
+    def sum_qty(self, sku: str, day: str, event: str) -> int:
+        """
+        Total qty of one SKU's events of one type on one day.
+        
+        Served by idx_transactions_sku_date (SKU and date equality seeks), so
+        the cost does not depend on ledger size.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT COALESCE(SUM(qty), 0)
+            FROM   transactions
+            WHERE  sku = ? AND date = ? AND event = ?
+            """,
+            (sku, day, event),
+        )
+        return int(cursor.fetchone()[0])
 
 
 # ============================================================
@@ -17,6 +17,8 @@ Regole
   as-is (validazione semantica a carico del cliente Android).
 - La conferma dell'ordine non viene mai bloccata se il backend è offline
   (il pulsante desktop gestisce l'errore in modo non-fatale).
+- GET /order-dispatches supporta lo streaming (``Accept: application/x-ndjson``
+  o ``?stream=true``, gzip se accettato) come GET /stock.
 """
 from __future__ import annotations
 
@@ -24,11 +26,13 @@ import logging
 from datetime import datetime, timezone
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
 
 from ..api.auth import verify_token
+from ..api.executor import StorageRoute
 from ..api.deps import get_storage
 from ..api.errors import NotFoundError
+from ..api.streaming import stream_format, streaming_response
 from ..schemas import (
     OrderDispatchCreateRequest,
     OrderDispatchDeleteResponse,
@@ -39,7 +43,7 @@ from ..schemas import (
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["dispatches"])
+router = APIRouter(tags=["dispatches"], route_class=StorageRoute)
 
 _MAX_HISTORY = 10
 
@@ -143,9 +147,16 @@ def create_order_dispatch(
     response_model=list[OrderDispatchSummary],
     dependencies=[Depends(verify_token)],
 )
-def list_order_dispatches(storage=Depends(get_storage)):
+def list_order_dispatches(
+    request: Request,
+    stream: bool = Query(default=False, description="true = risposta in streaming"),
+    storage=Depends(get_storage),
+):
     """Return the last _MAX_HISTORY dispatches, newest first."""
     rows = storage.read_order_dispatches()  # already sorted desc by csv_layer
+    fmt = stream_format(request, stream)
+    if fmt is not None:
+        return streaming_response(request, (_build_summary(r) for r in rows[:_MAX_HISTORY]), fmt)
     return [_build_summary(r) for r in rows[:_MAX_HISTORY]]
 
 
@@ -19,6 +19,10 @@ Atomicità
 Tutti gli SKU vengono validati PRIMA di scrivere qualsiasi evento.
 Se uno SKU non è trovato nel catalogo, la risposta è 400 con la lista
 degli errori e il ledger rimane invariato.
+Gli eventi di tutte le voci vengono poi scritti con un'unica
+``write_transactions_batch`` (una sola transazione SQLite; in modalità CSV
+un solo append e un solo aggiornamento FEFO dei lotti): una chiusura non
+può restare scritta a metà.
 
 Idempotenza
 -----------
@@ -35,6 +39,7 @@ from fastapi import APIRouter, Depends, status
 from fastapi.responses import JSONResponse
 
 from ..api.auth import verify_token
+from ..api.executor import StorageRoute
 from ..api.deps import get_db, get_storage
 from ..api.errors import BadRequestError
 from ..api import idempotency
@@ -50,7 +55,7 @@ from ..utils.colli_utils import colli_to_pezzi
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["eod"])
+router = APIRouter(tags=["eod"], route_class=StorageRoute)
 
 _ENDPOINT_LABEL = "POST /eod/close"
 
@@ -135,6 +140,76 @@ def _validate_entries(
     return errors, resolved
 
 
+# ---------------------------------------------------------------------------
+# Event builder
+# ---------------------------------------------------------------------------
+
+def _build_entry_events(
+    eod_date,
+    sku_code: str,
+    entry,
+    pack_size: int,
+) -> list[tuple[Transaction, str]]:
+    """
+    Ledger events of one validated EOD entry, in write order, with their labels.
+
+    Order: WASTE → UNFULFILLED → ADJUST (adjust_qty) → ADJUST (on_hand), so
+    the physical count is always the final state of the day.
+    """
+    note = entry.note.strip()
+    events: list[tuple[Transaction, str]] = []
+
+    # ── WASTE ─────────────────────────────────────────────────────────
+    if entry.waste_qty is not None and entry.waste_qty > 0:
+        events.append((Transaction(
+            date=eod_date,
+            sku=sku_code,
+            event=EventType.WASTE,
+            qty=entry.waste_qty,
+            note=f"[EOD] {note}" if note else "[EOD]",
+        ), "WASTE"))
+
+    # ── UNFULFILLED ───────────────────────────────────────────────────
+    # unfulfilled_qty is in COLLI -> convert to pezzi
+    if entry.unfulfilled_qty is not None and entry.unfulfilled_qty > 0:
+        unfulfilled_pezzi = colli_to_pezzi(entry.unfulfilled_qty, pack_size)
+        if unfulfilled_pezzi > 0:
+            events.append((Transaction(
+                date=eod_date,
+                sku=sku_code,
+                event=EventType.UNFULFILLED,
+                qty=unfulfilled_pezzi,
+                note=f"[EOD] {note}" if note else "[EOD]",
+            ), "UNFULFILLED"))
+
+    # ── ADJUST (manual correction, written before on_hand) ────────────
+    # adjust_qty is in COLLI -> convert to pezzi
+    if entry.adjust_qty is not None and entry.adjust_qty > 0:
+        adjust_pezzi = colli_to_pezzi(entry.adjust_qty, pack_size)
+        if adjust_pezzi > 0:
+            events.append((Transaction(
+                date=eod_date,
+                sku=sku_code,
+                event=EventType.ADJUST,
+                qty=adjust_pezzi,
+                note=f"[EOD-ADJUST] {note}" if note else "[EOD-ADJUST]",
+            ), "ADJUST"))
+
+    # ── on_hand → ADJUST (physical count, always last) ────────────────
+    # on_hand is in COLLI -> convert to pezzi
+    if entry.on_hand is not None:
+        on_hand_pezzi = colli_to_pezzi(entry.on_hand, pack_size)
+        events.append((Transaction(
+            date=eod_date,
+            sku=sku_code,
+            event=EventType.ADJUST,
+            qty=on_hand_pezzi,
+            note=f"[EOD-ON_HAND] {note}" if note else "[EOD-ON_HAND]",
+        ), "ADJUST:ON_HAND"))
+
+    return events
+
+
 # ---------------------------------------------------------------------------
 # Route
 # ---------------------------------------------------------------------------
@@ -241,89 +316,39 @@ def close_eod(
         )
 
     # ------------------------------------------------------------------ #
-    # 5. Write events (all-or-nothing: validated above)                   #
+    # 5. Build every event, then write them in ONE ledger batch           #
+    #    (single storage transaction; one FEFO lot update in CSV mode)    #
     # ------------------------------------------------------------------ #
     results: list[EodEntryResult] = []
+    batch: list[Transaction] = []
 
     for idx, sku_code in resolved:
         entry = body.entries[idx]
-        note = entry.note.strip()
-        events_written: list[str] = []
-
-        # Get pack_size for colli->pezzi conversion (on_hand, adjust_qty, unfulfilled_qty)
         sku_obj = sku_map[sku_code]
-        pack_size: int = getattr(sku_obj, "pack_size", 1) or 1
-
-        # ── WASTE ─────────────────────────────────────────────────────
-        if entry.waste_qty is not None and entry.waste_qty > 0:
-            storage.write_transaction(Transaction(
-                date=body.date,
-                sku=sku_code,
-                event=EventType.WASTE,
-                qty=entry.waste_qty,
-                note=f"[EOD] {note}" if note else "[EOD]",
-            ))
-            events_written.append("WASTE")
-
-        # ── UNFULFILLED ───────────────────────────────────────────────
-        # unfulfilled_qty is in COLLI -> convert to pezzi
-        if entry.unfulfilled_qty is not None and entry.unfulfilled_qty > 0:
-            unfulfilled_pezzi = colli_to_pezzi(entry.unfulfilled_qty, pack_size)
-            if unfulfilled_pezzi > 0:
-                storage.write_transaction(Transaction(
-                    date=body.date,
-                    sku=sku_code,
-                    event=EventType.UNFULFILLED,
-                    qty=unfulfilled_pezzi,
-                    note=f"[EOD] {note}" if note else "[EOD]",
-                ))
-                events_written.append("UNFULFILLED")
-
-        # ── ADJUST (manual correction, written before on_hand) ────────
-        # adjust_qty is in COLLI -> convert to pezzi
-        if entry.adjust_qty is not None and entry.adjust_qty > 0:
-            adjust_pezzi = colli_to_pezzi(entry.adjust_qty, pack_size)
-            if adjust_pezzi > 0:
-                storage.write_transaction(Transaction(
-                    date=body.date,
-                    sku=sku_code,
-                    event=EventType.ADJUST,
-                    qty=adjust_pezzi,
-                    note=f"[EOD-ADJUST] {note}" if note else "[EOD-ADJUST]",
-                ))
-                events_written.append("ADJUST")
-
-        # ── on_hand → ADJUST (physical count, always last) ────────────
-        # on_hand is in COLLI -> convert to pezzi
-        if entry.on_hand is not None:
-            on_hand_pezzi = colli_to_pezzi(entry.on_hand, pack_size)
-            storage.write_transaction(Transaction(
-                date=body.date,
-                sku=sku_code,
-                event=EventType.ADJUST,
-                qty=on_hand_pezzi,
-                note=f"[EOD-ON_HAND] {note}" if note else "[EOD-ON_HAND]",
-            ))
-            events_written.append("ADJUST:ON_HAND")
-
-        noop = len(events_written) == 0
+        events = _build_entry_events(body.date, sku_code, entry, getattr(sku_obj, "pack_size", 1) or 1)
+        batch.extend(txn for txn, _ in events)
         results.append(EodEntryResult(
             sku=sku_code,
-            events_written=events_written,
-            noop=noop,
+            events_written=[label for _, label in events],
+            noop=not events,
         ))
-        if events_written:
+
+    if batch:
+        storage.write_transactions_batch(batch)
+
+    for result in results:
+        if result.events_written:
             logger.info(
                 "eod events written: date=%s sku=%s events=%s",
                 body.date,
-                sku_code,
-                events_written,
+                result.sku,
+                result.events_written,
             )
         else:
             logger.debug(
                 "eod noop: date=%s sku=%s (all fields null/zero)",
                 body.date,
-                sku_code,
+                result.sku,
             )
 
     # ------------------------------------------------------------------ #
@@ -31,6 +31,7 @@ from fastapi import APIRouter, Depends, status
 from fastapi.responses import JSONResponse
 
 from ..api.auth import verify_token
+from ..api.executor import StorageRoute
 from ..api.deps import get_db, get_storage
 from ..api.errors import NotFoundError
 from ..api import idempotency
@@ -45,7 +46,7 @@ from ..utils.colli_utils import colli_to_pezzi
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["exceptions"])
+router = APIRouter(tags=["exceptions"], route_class=StorageRoute)
 
 _ENDPOINT_LABEL = "POST /exceptions"
 
@@ -291,22 +292,17 @@ def daily_upsert_exception(
     POS) dove duplicare le righe produrrebbe un doppio conteggio.
     """
     # ------------------------------------------------------------------ #
-    # 1. Validate SKU                                                     #
+    # 1. Validate SKU (indexed lookup, no catalog scan)                   #
     # ------------------------------------------------------------------ #
-    all_skus = storage.read_skus()
-    if not any(s.sku == body.sku for s in all_skus):
+    if not storage.sku_exists(body.sku):
         raise NotFoundError(f"SKU '{body.sku}' non trovato nel database.")
 
     # ------------------------------------------------------------------ #
     # 2. Read current state for this triplet                              #
+    #    (indexed sum: cost independent of ledger size)                   #
     # ------------------------------------------------------------------ #
     event_type: EventType = _EVENT_MAP[body.event]
-    all_txns = storage.read_transactions()
-
-    def _matches(t: Transaction) -> bool:
-        return t.sku == body.sku and t.date == body.date and t.event == event_type
-
-    current_qty: int = sum(t.qty for t in all_txns if _matches(t))
+    current_qty: int = storage.sum_qty(body.sku, body.date, event_type)
 
     # ------------------------------------------------------------------ #
     # 3. Apply mode logic                                                 #
@@ -330,13 +326,12 @@ def daily_upsert_exception(
                 content=resp.model_dump(mode="json"),
             )
 
-        # Build a new ledger list: keep all non-matching rows, add one corrected row.
-        non_matching = [t for t in all_txns if not _matches(t)]
+        # Swap the triplet's rows for one corrected row (targeted, indexed).
         new_txn = Transaction(
             date=body.date, sku=body.sku, event=event_type,
             qty=body.qty, note=note,
         )
-        storage.overwrite_transactions(non_matching + [new_txn])
+        storage.replace_transactions_day(body.sku, body.date, [new_txn], events=[event_type])
         qty_delta = body.qty - current_qty
         qty_total = body.qty
         logger.info(
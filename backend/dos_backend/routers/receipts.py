@@ -1,5 +1,6 @@
 """
 POST /receipts/close — chiude una ricezione merce scrivendo eventi RECEIPT nel ledger.
+POST /receipts/close-batch — chiude N documenti di ricezione in una chiamata.
 
 Atomicità
 ---------
@@ -30,6 +31,16 @@ Per ogni ``lines[i]``:
 - Se lo SKU ha ``has_expiry_label=True``, ``expiry_date`` è obbligatoria.
 
 Tutti gli errori vengono raccolti in un unico 400 prima di scrivere nulla.
+
+Batch (``/receipts/close-batch``)
+---------------------------------
+Le consegne del mattino portano spesso 20+ bolle: il batch le chiude con una
+sola lettura del catalogo SKU e un solo controllo sull'insieme (indicizzato e
+in cache) dei document_id già registrati.  Le righe di tutti i documenti sono
+validate insieme (campi ``receipts[i].lines[j]...``); eventi RECEIPT e righe
+dei receiving_logs di tutti i documenti sono scritti con un unico commit
+(``storage.write_receipt_batch``).  Un documento già registrato, o ripetuto nel
+batch, è restituito con ``already_posted=true`` senza toccare il ledger.
 """
 from __future__ import annotations
 
@@ -40,6 +51,7 @@ from fastapi import APIRouter, Depends, status
 from fastapi.responses import JSONResponse
 
 from ..api.auth import verify_token
+from ..api.executor import StorageRoute
 from ..api.deps import get_db, get_storage
 from ..api.errors import BadRequestError
 from ..api import idempotency
@@ -48,15 +60,18 @@ from ..domain.models import EventType, Transaction
 from ..schemas import (
     ErrorDetail,
     ReceiptLineResult,
+    ReceiptsCloseBatchRequest,
+    ReceiptsCloseBatchResponse,
     ReceiptsCloseRequest,
     ReceiptsCloseResponse,
 )
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["receipts"])
+router = APIRouter(tags=["receipts"], route_class=StorageRoute)
 
 _ENDPOINT_LABEL = "POST /receipts/close"
+_BATCH_ENDPOINT_LABEL = "POST /receipts/close-batch"
 
 
 # ---------------------------------------------------------------------------
@@ -67,10 +82,14 @@ def _validate_lines(
     body: ReceiptsCloseRequest,
     sku_map: dict,        # {sku_code: SKU}
     ean_to_sku: dict,     # {ean: sku_code}
+    field_prefix: str = "",
 ) -> tuple[list[ErrorDetail], list[tuple[int, str, object]]]:
     """
     Validate all receipt lines.
 
+    ``field_prefix`` is prepended to every error field (e.g. ``receipts[2].``
+    in the batch endpoint).
+
     Returns:
         (errors, resolved)
         errors   — list of ErrorDetail (empty if all valid)
@@ -81,7 +100,7 @@ def _validate_lines(
     resolved: list[tuple[int, str, object]] = []
 
     for idx, line in enumerate(body.lines):
-        prefix = f"lines[{idx}]"
+        prefix = f"{field_prefix}lines[{idx}]"
         sku_code: str | None = None
         sku_obj = None
 
@@ -153,6 +172,115 @@ def _validate_lines(
     return errors, resolved
 
 
+def _catalog_indices(storage) -> tuple[dict, dict]:
+    """``(sku_map, ean_to_sku)`` lookup indices over the SKU catalog."""
+    all_skus = storage.read_skus()
+    sku_map: dict = {s.sku: s for s in all_skus}
+    ean_to_sku: dict = {
+        s.ean: s.sku
+        for s in all_skus
+        if s.ean and s.ean.strip()
+    }
+    return sku_map, ean_to_sku
+
+
+def _already_posted_response(
+    body: ReceiptsCloseRequest,
+    client_receipt_id: str | None,
+) -> ReceiptsCloseResponse:
+    """Synthetic response for a receipt_id already in the receiving_logs."""
+    synthetic_lines = [
+        ReceiptLineResult(
+            line_index=i,
+            sku=(line.sku or "").strip() or (line.ean or ""),
+            ean=(line.ean or "").strip() or None,
+            qty_received=line.qty_received,
+            expiry_date=line.expiry_date,
+            status="already_received",
+        )
+        for i, line in enumerate(body.lines)
+    ]
+    return ReceiptsCloseResponse(
+        receipt_id=body.receipt_id,
+        receipt_date=body.receipt_date,
+        already_posted=True,
+        client_receipt_id=client_receipt_id,
+        lines=synthetic_lines,
+    )
+
+
+def _build_receipt(
+    body: ReceiptsCloseRequest,
+    resolved: list[tuple[int, str, object]],
+    today_str: str,
+) -> tuple[list[Transaction], list[dict], list[ReceiptLineResult]]:
+    """
+    RECEIPT events, receiving_log rows and line results of a validated receipt.
+
+    Returns:
+        (transactions, receiving_logs, result_lines) — transactions only for
+        qty_received > 0; one receiving_log row per line (even qty=0) so the
+        receipt_id idempotency check covers the full document next time.
+    """
+    txns: list[Transaction] = []
+    receiving_logs: list[dict] = []
+    result_lines: list[ReceiptLineResult] = []
+
+    for idx, sku_code, sku_obj in resolved:
+        line = body.lines[idx]
+        raw_ean = (line.ean or "").strip() or None
+
+        note_parts = [f"receipt_id={body.receipt_id}"]
+        if line.note:
+            note_parts.append(line.note)
+        if line.expiry_date:
+            note_parts.append(f"expiry={line.expiry_date.isoformat()}")
+        note = "; ".join(note_parts)
+
+        if line.qty_received > 0:
+            txns.append(
+                Transaction(
+                    date=body.receipt_date,
+                    sku=sku_code,
+                    event=EventType.RECEIPT,
+                    qty=line.qty_received,
+                    receipt_date=body.receipt_date,
+                    note=note,
+                )
+            )
+            line_status = "ok"
+        else:
+            # qty_received == 0: acknowledged, no RECEIPT event
+            line_status = "skipped"
+            logger.info(
+                "receipt line skipped (qty=0): receipt_id=%r sku=%s idx=%d",
+                body.receipt_id,
+                sku_code,
+                idx,
+            )
+
+        result_lines.append(
+            ReceiptLineResult(
+                line_index=idx,
+                sku=sku_code,
+                ean=raw_ean,
+                qty_received=line.qty_received,
+                expiry_date=line.expiry_date,
+                status=line_status,
+            )
+        )
+        receiving_logs.append(dict(
+            document_id=body.receipt_id,
+            receipt_id=body.receipt_id,
+            date_str=today_str,
+            sku=sku_code,
+            qty=line.qty_received,
+            receipt_date=body.receipt_date.isoformat(),
+        ))
+
+    return txns, receiving_logs, result_lines
+
+
 # ---------------------------------------------------------------------------
 # Route
 # ---------------------------------------------------------------------------
@@ -243,30 +371,12 @@ def close_receipt(
     # ---------------------------------------------------------------------- #
     # 3. Legacy idempotency: receipt_id already in receiving_logs?           #
     # ---------------------------------------------------------------------- #
-    existing_logs = storage.read_receiving_logs()
-    if any(log.get("receipt_id") == body.receipt_id for log in existing_logs):
+    if body.receipt_id in storage.receiving_document_ids():
         logger.info(
             "receipt already processed (legacy receipt_id=%r)", body.receipt_id
         )
         # Reconstruct a synthetic response from the current request payload.
-        synthetic_lines = [
-            ReceiptLineResult(
-                line_index=i,
-                sku=(line.sku or "").strip() or (line.ean or ""),
-                ean=(line.ean or "").strip() or None,
-                qty_received=line.qty_received,
-                expiry_date=line.expiry_date,
-                status="already_received",
-            )
-            for i, line in enumerate(body.lines)
-        ]
-        resp = ReceiptsCloseResponse(
-            receipt_id=body.receipt_id,
-            receipt_date=body.receipt_date,
-            already_posted=True,
-            client_receipt_id=client_receipt_id,
-            lines=synthetic_lines,
-        )
+        resp = _already_posted_response(body, client_receipt_id)
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content=resp.model_dump(mode="json"),
@@ -275,13 +385,7 @@ def close_receipt(
     # ---------------------------------------------------------------------- #
     # 4. Build lookup indices                                                 #
     # ---------------------------------------------------------------------- #
-    all_skus = storage.read_skus()
-    sku_map: dict = {s.sku: s for s in all_skus}
-    ean_to_sku: dict = {
-        s.ean: s.sku
-        for s in all_skus
-        if s.ean and s.ean.strip()
-    }
+    sku_map, ean_to_sku = _catalog_indices(storage)
 
     # ---------------------------------------------------------------------- #
     # 5. Validate ALL lines (collect errors atomically)                       #
@@ -300,98 +404,199 @@ def close_receipt(
     # ---------------------------------------------------------------------- #
     # 6. Build Transaction objects (only for qty_received > 0)               #
     # ---------------------------------------------------------------------- #
-    txns_to_write: list[Transaction] = []
-    result_lines: list[ReceiptLineResult] = []
+    txns_to_write, receiving_logs, result_lines = _build_receipt(
+        body, resolved, date_type.today().isoformat()
+    )
 
-    for idx, sku_code, sku_obj in resolved:
-        line = body.lines[idx]
-        raw_ean = (line.ean or "").strip() or None
+    # ---------------------------------------------------------------------- #
+    # 7. Write — ledger + receiving_logs in one commit                        #
+    # ---------------------------------------------------------------------- #
+    storage.write_receipt_batch(txns_to_write, receiving_logs)
+    logger.info(
+        "receipt closed: receipt_id=%r lines=%d txns=%d",
+        body.receipt_id,
+        len(body.lines),
+        len(txns_to_write),
+    )
 
-        note_parts = [f"receipt_id={body.receipt_id}"]
-        if line.note:
-            note_parts.append(line.note)
-        if line.expiry_date:
-            note_parts.append(f"expiry={line.expiry_date.isoformat()}")
-        note = "; ".join(note_parts)
+    # ---------------------------------------------------------------------- #
+    # 8. Assemble response and record idempotency                             #
+    # ---------------------------------------------------------------------- #
+    response_obj = ReceiptsCloseResponse(
+        receipt_id=body.receipt_id,
+        receipt_date=body.receipt_date,
+        already_posted=False,
+        client_receipt_id=client_receipt_id,
+        lines=result_lines,
+    )
+    response_dict = response_obj.model_dump(mode="json")
 
-        if line.qty_received > 0:
-            txns_to_write.append(
-                Transaction(
-                    date=body.receipt_date,
-                    sku=sku_code,
-                    event=EventType.RECEIPT,
-                    qty=line.qty_received,
-                    receipt_date=body.receipt_date,
-                    note=note,
+    if _claimed_slot:
+        idempotency.finalize(
+            conn=db,
+            client_event_id=client_receipt_id,  # type: ignore[arg-type]
+            status_code=status.HTTP_201_CREATED,
+            response_data=response_dict,
+        )
+
+    return JSONResponse(status_code=status.HTTP_201_CREATED, content=response_dict)
+
+
+
+@router.post(
+    "/receipts/close-batch",
+    response_model=ReceiptsCloseBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Chiudi più ricezioni merce (batch)",
+    dependencies=[Depends(verify_token)],
+    responses={
+        200: {
+            "description": "Batch già processato (client_batch_id ripetuto).",
+            "model": ReceiptsCloseBatchResponse,
+        },
+        201: {"description": "Batch registrato (i documenti già presenti hanno already_posted=true)."},
+        400: {"description": "Errori di validazione — nessun documento scritto."},
+    },
+)
+def close_receipts_batch(
+    body: ReceiptsCloseBatchRequest,
+    db=Depends(get_db),
+    storage=Depends(get_storage),
+) -> JSONResponse:
+    """
+    Registra gli eventi RECEIPT di N documenti con una sola scrittura.
+
+    **Atomicità**: le righe di tutti i documenti sono validate insieme; un solo
+    errore → 400 con i campi ``receipts[i].lines[j]...`` e nessuna scrittura.
+    Ledger e receiving_logs di tutti i documenti sono scritti in un unico commit.
+
+    **Idempotenza**:
+    - ``client_batch_id`` → replay della risposta dell'intero batch (200).
+    - ``client_receipt_id`` di un documento già registrato → replay del documento.
+    - ``receipt_id`` già nei receiving_logs (o ripetuto nel batch) → documento
+      con ``already_posted=true``, ledger invariato.
+    """
+    idempotency.ensure_schema(db)
+
+    # ---------------------------------------------------------------------- #
+    # 1. client_batch_id dedup (claim-first, as in /receipts/close)           #
+    # ---------------------------------------------------------------------- #
+    client_batch_id: str | None = (body.client_batch_id or "").strip() or None
+    _claimed_slot: bool = False
+
+    if client_batch_id:
+        stored = idempotency.lookup(db, client_batch_id)
+        if stored is None and not idempotency.try_claim(db, client_batch_id, _BATCH_ENDPOINT_LABEL):
+            stored = idempotency.lookup_with_wait(db, client_batch_id)
+            if stored is None:
+                logger.warning(
+                    "idempotency: lookup_with_wait timed out for %r; processing as fresh",
+                    client_batch_id,
                 )
-            )
-            line_status = "ok"
-        else:
-            # qty_received == 0: acknowledged, no RECEIPT event
-            line_status = "skipped"
+        if stored is not None:
+            stored[1]["already_posted"] = True
             logger.info(
-                "receipt line skipped (qty=0): receipt_id=%r sku=%s idx=%d",
-                body.receipt_id,
-                sku_code,
-                idx,
+                "idempotency replay: client_batch_id=%r endpoint=%s",
+                client_batch_id,
+                _BATCH_ENDPOINT_LABEL,
             )
+            return JSONResponse(status_code=status.HTTP_200_OK, content=stored[1])
+        _claimed_slot = True
 
-        result_lines.append(
-            ReceiptLineResult(
-                line_index=idx,
-                sku=sku_code,
-                ean=raw_ean,
-                qty_received=line.qty_received,
-                expiry_date=line.expiry_date,
-                status=line_status,
+    # ---------------------------------------------------------------------- #
+    # 2. Per-document dedup: client_receipt_id, then indexed receipt_id set   #
+    # ---------------------------------------------------------------------- #
+    posted_ids = set(storage.receiving_document_ids())
+    responses: list[dict | None] = []
+    for receipt in body.receipts:
+        client_receipt_id = (receipt.client_receipt_id or "").strip() or None
+        stored = idempotency.lookup(db, client_receipt_id) if client_receipt_id else None
+        if stored is not None:
+            stored[1]["already_posted"] = True
+            responses.append(stored[1])
+        elif receipt.receipt_id in posted_ids:
+            responses.append(
+                _already_posted_response(receipt, client_receipt_id).model_dump(mode="json")
             )
-        )
+        else:
+            responses.append(None)  # to be written
+        posted_ids.add(receipt.receipt_id)
 
     # ---------------------------------------------------------------------- #
-    # 7. Write — single atomic batch                                          #
+    # 3. Validate every line of every new document                            #
     # ---------------------------------------------------------------------- #
-    if txns_to_write:
-        storage.write_transactions_batch(txns_to_write)
-        logger.info(
-            "receipt closed: receipt_id=%r lines=%d txns=%d",
-            body.receipt_id,
-            len(body.lines),
-            len(txns_to_write),
+    sku_map, ean_to_sku = _catalog_indices(storage)
+    errors: list[ErrorDetail] = []
+    resolved_by_doc: dict[int, list[tuple[int, str, object]]] = {}
+    for i, receipt in enumerate(body.receipts):
+        if responses[i] is not None:
+            continue
+        doc_errors, resolved = _validate_lines(
+            receipt, sku_map, ean_to_sku, field_prefix=f"receipts[{i}]."
         )
+        errors.extend(doc_errors)
+        resolved_by_doc[i] = resolved
 
-    # Write receiving_log entries for all lines (even qty=0) so receipt_id
-    # idempotency check covers the full document next time.
+    if errors:
+        raise BadRequestError(
+            message=(
+                f"{len(errors)} errore/i di validazione — "
+                "nessun documento è stato scritto nel ledger."
+            ),
+            details=errors,
+        )
+
+    # ---------------------------------------------------------------------- #
+    # 4. Build and write all documents in one commit                          #
+    # ---------------------------------------------------------------------- #
     today_str = date_type.today().isoformat()
-    for idx, sku_code, _ in resolved:
-        line = body.lines[idx]
-        storage.write_receiving_log(
-            document_id=body.receipt_id,
-            receipt_id=body.receipt_id,
-            date_str=today_str,
-            sku=sku_code,
-            qty=line.qty_received,
-            receipt_date=body.receipt_date.isoformat(),
+    all_txns: list[Transaction] = []
+    all_logs: list[dict] = []
+    for i, resolved in resolved_by_doc.items():
+        receipt = body.receipts[i]
+        txns, receiving_logs, result_lines = _build_receipt(receipt, resolved, today_str)
+        all_txns.extend(txns)
+        all_logs.extend(receiving_logs)
+        responses[i] = ReceiptsCloseResponse(
+            receipt_id=receipt.receipt_id,
+            receipt_date=receipt.receipt_date,
+            already_posted=False,
+            client_receipt_id=(receipt.client_receipt_id or "").strip() or None,
+            lines=result_lines,
+        ).model_dump(mode="json")
+
+    if resolved_by_doc:
+        storage.write_receipt_batch(all_txns, all_logs)
+        logger.info(
+            "receipt batch closed: documents=%d new=%d txns=%d",
+            len(body.receipts),
+            len(resolved_by_doc),
+            len(all_txns),
         )
 
+    # Per-document keys: a later single /receipts/close retry replays its document
+    for i in resolved_by_doc:
+        client_receipt_id = responses[i]["client_receipt_id"]
+        if client_receipt_id:
+            idempotency.record(
+                db, client_receipt_id, _ENDPOINT_LABEL, status.HTTP_201_CREATED, responses[i]
+            )
+
     # ---------------------------------------------------------------------- #
-    # 8. Assemble response and record idempotency                             #
+    # 5. Assemble response and record idempotency                             #
     # ---------------------------------------------------------------------- #
-    response_obj = ReceiptsCloseResponse(
-        receipt_id=body.receipt_id,
-        receipt_date=body.receipt_date,
+    response_dict = ReceiptsCloseBatchResponse(
         already_posted=False,
-        client_receipt_id=client_receipt_id,
-        lines=result_lines,
-    )
-    response_dict = response_obj.model_dump(mode="json")
+        client_batch_id=client_batch_id,
+        receipts=[ReceiptsCloseResponse(**r) for r in responses],
+    ).model_dump(mode="json")
 
     if _claimed_slot:
         idempotency.finalize(
             conn=db,
-            client_event_id=client_receipt_id,  # type: ignore[arg-type]
+            client_event_id=client_batch_id,  # type: ignore[arg-type]
             status_code=status.HTTP_201_CREATED,
             response_data=response_dict,
         )
 
     return JSONResponse(status_code=status.HTTP_201_CREATED, content=response_dict)
-
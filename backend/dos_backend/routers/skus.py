@@ -5,17 +5,28 @@ Errors
 ------
 400 BAD_REQUEST   EAN contains non-digit characters or has invalid length.
 404 NOT_FOUND     EAN format is valid but no SKU with that code exists.
+
+Cache
+-----
+The read endpoints (by-ean, search, buffered scanner preload) are served
+from the revision-keyed response cache with an ``ETag``: repeated scans of
+the same barcode skip storage until the next write (see
+``api.response_cache``).
 """
 import logging
 from datetime import date, timedelta
+from typing import Iterator
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from fastapi.responses import JSONResponse
 
 from ..api.auth import verify_token
+from ..api.executor import StorageRoute
 from ..api import idempotency
 from ..api.deps import get_db, get_storage
 from ..api.errors import BadRequestError, ConflictError, NotFoundError
+from ..api.response_cache import cached_response
+from ..api.streaming import stream_format, streaming_response
 from ..domain.ledger import StockCalculator, normalize_ean_13, validate_ean
 from ..domain.models import SKU
 from ..schemas import (
@@ -28,10 +39,11 @@ from ..schemas import (
     SkuSearchResponse,
     SkuSearchResult,
 )
+from .stock import iter_stock
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["skus"])
+router = APIRouter(tags=["skus"], route_class=StorageRoute)
 
 _CREATE_ENDPOINT_LABEL = "POST /skus"
 
@@ -40,6 +52,30 @@ _CREATE_ENDPOINT_LABEL = "POST /skus"
 # GET /skus/scanner-preload
 # ---------------------------------------------------------------------------
 
+def _preload_rows(sku_obj: SKU, stock) -> Iterator[ScannerPreloadItem]:
+    """One row per barcode alias of ``sku_obj`` (none if it has no barcode)."""
+    primary = normalize_ean_13((sku_obj.ean or "").strip())
+    secondary = normalize_ean_13((sku_obj.ean_secondary or "").strip())
+
+    on_hand = stock.on_hand if stock else 0
+    on_order = stock.on_order if stock else 0
+    expiry_flag = getattr(sku_obj, "has_expiry_label", False) or False
+
+    eans = [primary] if primary else []
+    if secondary and secondary != primary:
+        eans.append(secondary)
+    for ean in eans:
+        yield ScannerPreloadItem(
+            ean=ean,
+            sku=sku_obj.sku,
+            description=sku_obj.description,
+            pack_size=getattr(sku_obj, "pack_size", 1) or 1,
+            on_hand=on_hand,
+            on_order=on_order,
+            has_expiry_label=expiry_flag,
+        )
+
+
 @router.get(
     "/skus/scanner-preload",
     response_model=list[ScannerPreloadItem],
@@ -47,6 +83,11 @@ _CREATE_ENDPOINT_LABEL = "POST /skus"
     dependencies=[Depends(verify_token)],
 )
 def get_scanner_preload(
+    request: Request,
+    stream: bool = Query(
+        default=False,
+        description="true = risposta in streaming (anche con Accept: application/x-ndjson).",
+    ),
     storage=Depends(get_storage),
 ) -> list[ScannerPreloadItem]:
     """
@@ -59,13 +100,41 @@ def get_scanner_preload(
 
     Usato dall'app Android per pre-popolare la cache offline prima della prima
     scansione, senza richiedere connessione al momento della scansione.
+
+    In streaming (``Accept: application/x-ndjson`` o ``?stream=true``) le righe
+    vengono inviate man mano che lo stock di ciascuno SKU è calcolato (letture
+    per SKU, memoria costante, gzip se accettato): su Wi-Fi di negozio lento
+    i primi byte arrivano subito invece che a catalogo completo.
     """
     today = date.today()
     # END_OF_DAY: include events of today → effective = today + 1
     effective = today + timedelta(days=1)
 
-    all_skus = [s for s in storage.read_skus() if s.in_assortment]
+    fmt = stream_format(request, stream)
+    if fmt is None:
+        return cached_response(request, storage, lambda: _preload(storage, effective))
+
+    by_id = {s.sku: s for s in _preload_skus(storage)}
+
+    def _items() -> Iterator[ScannerPreloadItem]:
+        for sku_id, stock, _ in iter_stock(storage, by_id, effective):
+            yield from _preload_rows(by_id[sku_id], stock)
+
+    return streaming_response(request, _items(), fmt)
+
 
+def _preload_skus(storage) -> list[SKU]:
+    """In-assortment SKUs with at least one barcode."""
+    # SKU senza nessun barcode — saltati (nessuna lettura del ledger)
+    return [
+        s for s in storage.read_skus()
+        if s.in_assortment and ((s.ean or "").strip() or (s.ean_secondary or "").strip())
+    ]
+
+
+def _preload(storage, effective: date) -> list[ScannerPreloadItem]:
+    """Buffered body of ``GET /skus/scanner-preload``, computed on a cache miss."""
+    all_skus = _preload_skus(storage)
     transactions = storage.read_transactions()
     sales_records = storage.read_sales() if hasattr(storage, "read_sales") else []
 
@@ -76,40 +145,7 @@ def get_scanner_preload(
 
     result: list[ScannerPreloadItem] = []
     for sku_obj in all_skus:
-        primary = normalize_ean_13((sku_obj.ean or "").strip())
-        secondary = normalize_ean_13((sku_obj.ean_secondary or "").strip())
-
-        if not primary and not secondary:
-            continue  # SKU senza nessun barcode — salta
-
-        stock = stock_map.get(sku_obj.sku)
-        on_hand = stock.on_hand if stock else 0
-        on_order = stock.on_order if stock else 0
-
-        expiry_flag = getattr(sku_obj, "has_expiry_label", False) or False
-
-        if primary:
-            result.append(ScannerPreloadItem(
-                ean=primary,
-                sku=sku_obj.sku,
-                description=sku_obj.description,
-                pack_size=getattr(sku_obj, "pack_size", 1) or 1,
-                on_hand=on_hand,
-                on_order=on_order,
-                has_expiry_label=expiry_flag,
-            ))
-
-        if secondary and secondary != primary:
-            result.append(ScannerPreloadItem(
-                ean=secondary,
-                sku=sku_obj.sku,
-                description=sku_obj.description,
-                pack_size=getattr(sku_obj, "pack_size", 1) or 1,
-                on_hand=on_hand,
-                on_order=on_order,
-                has_expiry_label=expiry_flag,
-            ))
-
+        result.extend(_preload_rows(sku_obj, stock_map.get(sku_obj.sku)))
     return result
 
 
@@ -120,6 +156,7 @@ def get_scanner_preload(
     dependencies=[Depends(verify_token)],
 )
 def get_sku_by_ean(
+    request: Request,
     ean: str,
     storage=Depends(get_storage),
 ) -> SKUResponse:
@@ -131,6 +168,11 @@ def get_sku_by_ean(
     - EAN valido e trovato, ma il valore nel DB ha formato irregolare → **200**
       con `ean_valid: false` (dato legacy accettato senza crash)
     """
+    return cached_response(request, storage, lambda: _lookup_ean(storage, ean))
+
+
+def _lookup_ean(storage, ean: str) -> SKUResponse:
+    """Body of ``GET /skus/by-ean/{ean}``, computed on a cache miss."""
     ean = ean.strip()
 
     # --- 1. Validate EAN format (digits only, length 8/12/13) ---
@@ -191,6 +233,7 @@ def get_sku_by_ean(
     dependencies=[Depends(verify_token)],
 )
 def search_skus(
+    request: Request,
     q: str = Query(default="", description="Stringa di ricerca (SKU code o descrizione)"),
     limit: int = Query(default=20, ge=1, le=200, description="Numero massimo risultati"),
     storage=Depends(get_storage),
@@ -202,6 +245,11 @@ def search_skus(
     - La ricerca è case-insensitive e cerca per sottostringa.
     - Usato dall'app Android per l'autocomplete nella tab Abbinamento EAN.
     """
+    return cached_response(request, storage, lambda: _search(storage, q, limit))
+
+
+def _search(storage, q: str, limit: int) -> SkuSearchResponse:
+    """Body of ``GET /skus/search``, computed on a cache miss."""
     all_skus = storage.search_skus(q.strip()) if q.strip() else storage.read_skus()
     # Sort: perfect-prefix match first, then alphabetical
     q_lower = q.strip().lower()
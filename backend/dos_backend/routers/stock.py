@@ -18,16 +18,35 @@ END_OF_DAY:
 La trasformazione avviene *qui*, nel router, non nel dominio.  Il dominio
 rimane puro: StockCalculator.calculate_asof(sku, effective_asof, ...) con
 semantica sempre date < effective_asof.
+
+Streaming
+---------
+``GET /stock`` con ``Accept: application/x-ndjson`` (una riga JSON per SKU)
+oppure ``?stream=true`` (stesso documento JSON, scritto riga per riga)
+restituisce *tutti* gli SKU filtrati in un'unica pagina: lo stock viene
+calcolato uno SKU alla volta con letture indicizzate per SKU (vedi
+``iter_stock``), a memoria costante.  Gzip se il client lo accetta.
+
+Cache
+-----
+Le risposte bufferizzate di ``GET /stock`` e ``GET /stock/{sku}`` sono
+memorizzate per (path, query, revisione dei dati) e servite dalla memoria
+fino alla prossima scrittura; la revisione è esposta come ``ETag``
+(``If-None-Match`` → 304).  Vedi ``api.response_cache``.
 """
 from datetime import date, timedelta
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 
 from ..api.auth import verify_token
+from ..api.executor import StorageRoute
 from ..api.deps import get_storage
 from ..api.errors import NotFoundError
+from ..api.response_cache import cached_response
+from ..api.streaming import stream_format, streaming_response
 from ..domain.ledger import StockCalculator
+from ..domain.models import Stock
 from ..schemas import (
     StockDetailResponse,
     StockItem,
@@ -36,7 +55,7 @@ from ..schemas import (
     TransactionSummary,
 )
 
-router = APIRouter(tags=["stock"])
+router = APIRouter(tags=["stock"], route_class=StorageRoute)
 
 # How many recent transactions to include in the detail response by default.
 _DEFAULT_RECENT_N = 20
@@ -66,6 +85,23 @@ def _effective_asof(asof_date: date, mode: StockMode) -> date:
     return asof_date
 
 
+def iter_stock(
+    storage, sku_ids: Iterable[str], effective: date
+) -> Iterator[tuple[str, Stock, Optional[date]]]:
+    """
+    Yield ``(sku, stock, last_event_date)`` one SKU at a time.
+
+    Each SKU reads only its own ledger events and sales through the storage
+    per-SKU cursors, so memory does not grow with catalogue or ledger size.
+    """
+    for sku_id in sku_ids:
+        txns = storage.read_sku_transactions(sku_id, effective)
+        sales = storage.read_sku_sales(sku_id)
+        stock = StockCalculator.calculate_asof(sku_id, effective, txns, sales or None)
+        last_event = max((t.date for t in txns), default=None)
+        yield sku_id, stock, last_event
+
+
 # ---------------------------------------------------------------------------
 # GET /stock  (list, paginated)
 # ---------------------------------------------------------------------------
@@ -77,6 +113,7 @@ def _effective_asof(asof_date: date, mode: StockMode) -> date:
     dependencies=[Depends(verify_token)],
 )
 def list_stock(
+    request: Request,
     asof_date: Optional[date] = Query(
         default=None,
         alias="asof_date",
@@ -93,6 +130,13 @@ def list_stock(
     in_assortment: bool = Query(default=True),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=200),
+    stream: bool = Query(
+        default=False,
+        description=(
+            "true = risposta in streaming (tutti gli SKU in un'unica pagina; "
+            "page/page_size ignorati). Anche con Accept: application/x-ndjson."
+        ),
+    ),
     storage=Depends(get_storage),
 ) -> StockListResponse:
     """
@@ -101,13 +145,60 @@ def list_stock(
     resolved = _resolve_asof(asof_date)
     effective = _effective_asof(resolved, mode)
 
+    fmt = stream_format(request, stream)
+    if fmt is None:
+        return cached_response(
+            request,
+            storage,
+            lambda: _stock_page(storage, resolved, effective, sku, in_assortment, page, page_size),
+        )
+
+    by_id = {s.sku: s for s in _filter_skus(storage, sku, in_assortment)}
+
+    def _items() -> Iterator[StockItem]:
+        for sku_id, stock, last_event in iter_stock(storage, by_id, effective):
+            sku_obj = by_id[sku_id]
+            yield StockItem(
+                sku=sku_id,
+                description=sku_obj.description,
+                on_hand=stock.on_hand,
+                on_order=stock.on_order,
+                pack_size=getattr(sku_obj, "pack_size", 1) or 1,
+                last_event_date=last_event,
+            )
+
+    total = len(by_id)
+    return streaming_response(
+        request,
+        _items(),
+        fmt,
+        envelope={"asof": resolved.isoformat(), "page": 1, "page_size": total, "total": total},
+        total=total,
+    )
+
+
+def _filter_skus(storage, sku: list[str], in_assortment: bool) -> list:
+    """SKUs listed by ``GET /stock`` (assortment and ``sku`` filters applied)."""
     all_skus = storage.read_skus()
     if in_assortment:
         all_skus = [s for s in all_skus if s.in_assortment]
     if sku:
         sku_set = {s.upper() for s in sku}
         all_skus = [s for s in all_skus if s.sku.upper() in sku_set]
+    return all_skus
 
+
+def _stock_page(
+    storage,
+    resolved: date,
+    effective: date,
+    sku: list[str],
+    in_assortment: bool,
+    page: int,
+    page_size: int,
+) -> StockListResponse:
+    """Buffered (paginated) body of ``GET /stock``, computed on a cache miss."""
+    all_skus = _filter_skus(storage, sku, in_assortment)
     transactions = storage.read_transactions()
     sales_records = storage.read_sales() if hasattr(storage, "read_sales") else []
 
@@ -165,6 +256,7 @@ def list_stock(
     dependencies=[Depends(verify_token)],
 )
 def get_stock(
+    request: Request,
     sku: str,
     asof_date: Optional[date] = Query(
         default=None,
@@ -206,7 +298,19 @@ def get_stock(
     **Errori**
 
     - 404 se lo SKU non esiste nel database.
+
+    Risposta servita dalla cache finché i dati non cambiano (``ETag`` =
+    revisione dei dati; ``If-None-Match`` → 304).
     """
+    return cached_response(
+        request, storage, lambda: _stock_detail(storage, sku, asof_date, mode, recent_n)
+    )
+
+
+def _stock_detail(
+    storage, sku: str, asof_date: Optional[date], mode: StockMode, recent_n: int
+) -> StockDetailResponse:
+    """Body of ``GET /stock/{sku}``, computed on a cache miss."""
     # 1. Resolve date
     resolved = _resolve_asof(asof_date)
 
@@ -434,6 +434,31 @@ class ReceiptsCloseResponse(BaseModel):
     lines: list[ReceiptLineResult]
 
 
+class ReceiptsCloseBatchRequest(BaseModel):
+    """
+    Più documenti di ricezione (es. le bolle di una consegna mattutina) in una chiamata.
+
+    Ogni documento segue le regole di ``/receipts/close``; la validazione è
+    complessiva (un errore in un documento → 400, nessun documento scritto).
+    """
+    receipts: list[ReceiptsCloseRequest] = Field(..., min_length=1, max_length=200)
+    client_batch_id: Optional[str] = Field(
+        default=None,
+        min_length=1,
+        max_length=128,
+        description=(
+            "UUID opzionale del client per l'intero batch. "
+            "Se ripetuto → 200 con la risposta del primo tentativo."
+        ),
+    )
+
+
+class ReceiptsCloseBatchResponse(BaseModel):
+    already_posted: bool = False
+    client_batch_id: Optional[str] = None
+    receipts: list[ReceiptsCloseResponse]
+
+
 # ---------------------------------------------------------------------------
 # EOD (End-of-Day) batch close
 # ---------------------------------------------------------------------------
@@ -12,9 +12,11 @@ from ..domain.models import Stock, OrderProposal, OrderConfirmation, Transaction
 from ..persistence.csv_layer import CSVLayer
 from ..domain.ledger import StockCalculator, ShelfLifeCalculator
 from ..domain.promo_uplift import is_in_post_promo_window, estimate_post_promo_dip
+from ..promo_calendar import load_promo_index
 from ..analytics.target_resolver import TargetServiceLevelResolver
 from ..domain.calendar import Lane, next_receipt_date, calculate_protection_period_days
 from ..analytics.pipeline import build_open_pipeline
+from ..analytics.oos_engine import SkuOosHistory
 from ..replenishment_policy import compute_order, OrderConstraints
 
 
@@ -717,7 +719,7 @@ class OrderWorkflow:
                 _sales_for_mods = self.csv_layer.read_sales() if sales_records is None else sales_records
                 _trans_for_mods = self.csv_layer.read_transactions() if transactions is None else transactions
                 _all_skus_mods = self.csv_layer.read_skus()
-                _promo_wins = self.csv_layer.read_promo_calendar() if promo_adjustment_enabled else []
+                _promo_wins = load_promo_index(self.csv_layer) if promo_adjustment_enabled else []
                 _evt_rules = self.csv_layer.read_event_uplift_rules() if event_uplift_enabled else []
                 _holidays_mods: list = []
                 if _holiday_mod_enabled:
@@ -1100,14 +1102,14 @@ class OrderWorkflow:
             
             # Find upcoming promo for this SKU
             # Load promo calendar
-            all_promo_windows = self.csv_layer.read_promo_calendar()
+            all_promo_windows = load_promo_index(self.csv_layer)
             all_skus_list = self.csv_layer.read_skus()
             all_sales_records = sales_records if sales_records else self.csv_layer.read_sales()
             
             # Filter promos for this SKU that start AFTER target_receipt_date (order arrives before promo)
             upcoming_promos = [
-                pw for pw in all_promo_windows
-                if pw.sku == sku and pw.start_date > target_receipt_date
+                pw for pw in all_promo_windows.for_sku(sku)
+                if pw.start_date > target_receipt_date
             ]
             
             # Sort by start_date (earliest first)
@@ -1194,7 +1196,7 @@ class OrderWorkflow:
         
         if post_promo_enabled and target_receipt_date and transactions is not None:
             # Load all promo calendar for post-promo detection
-            all_promo_windows = self.csv_layer.read_promo_calendar()
+            all_promo_windows = load_promo_index(self.csv_layer)
             all_skus_list = self.csv_layer.read_skus()
             all_sales_records = sales_records if sales_records else self.csv_layer.read_sales()
             
@@ -1609,7 +1611,7 @@ class OrderWorkflow:
             pipeline.sort(key=lambda x: x["receipt_date"])
 
         # ── 3. Modifiers data (lazy load) ───────────────────────────────────
-        promo_calendar_data = self.csv_layer.read_promo_calendar()
+        promo_calendar_data = load_promo_index(self.csv_layer)
         event_uplift_rules = self.csv_layer.read_event_uplift_rules()
         all_skus = self.csv_layer.read_skus()
         if transactions is None:
@@ -2138,6 +2140,7 @@ def calculate_daily_sales_average(
     return_details: bool = False,
     sku_txns: list | None = None,
     sku_sales: list | None = None,
+    oos_history: Optional["SkuOosHistory"] = None,
 ) -> tuple:
     """
     Calculate average daily sales for a SKU using calendar-based approach.
@@ -2168,6 +2171,9 @@ def calculate_daily_sales_average(
         asof_date: As-of date for calculation (defaults to today)
         oos_detection_mode: "strict" (on_hand==0) or "relaxed" (on_hand+on_order==0)
         return_details: If True, return detailed breakdown (default: False for backward compatibility)
+        sku_txns / sku_sales: Pre-filtered per-SKU lists (skip the global scans)
+        oos_history: Prebuilt SkuOosHistory of the SKU (e.g. from a cached
+            OosEngine); the list arguments are then ignored
     
     Returns:
         If return_details=False (default):
@@ -2188,213 +2194,32 @@ def calculate_daily_sales_average(
         # avg = sum(sales_10_days) / 27  (excludes 2 real OOS days, 3 overrides excluded)
         # oos_count = 2  (only non-override OOS days)
     """
-    from ..domain.ledger import StockCalculator
-    from ..domain.models import EventType
-    
     if asof_date is None:
         asof_date = date.today()
 
-    # Resolve per-SKU lists: use pre-filtered lists when provided by caller
-    # (avoids O(T_global) scans when called N_sku times from a bulk worker).
-    _txns: list = sku_txns if sku_txns is not None else [t for t in (transactions or []) if t.sku == sku]
-    _srs: list  = sku_sales if sku_sales is not None else [s for s in (sales_records or []) if s.sku == sku]
-
-    # Build sales map: {date: qty_sold}
-    sku_sales_map = {}
-    for s in _srs:
-        sku_sales_map[s.date] = sku_sales_map.get(s.date, 0) + s.qty_sold
-    
-    # Generate calendar days range
-    start_date = asof_date - timedelta(days=days_lookback - 1)
-    calendar_days = [start_date + timedelta(days=i) for i in range(days_lookback)]
-
-    # Find first date with any ledger/sales activity for this SKU.
-    # Days before this anchor are "pre-existence" and should be excluded from
-    # both the OOS count and the valid-day denominator (treated like
-    # out-of-assortment so they don't inflate oos_days_count or deflate avg).
-    _first_activity = None
-    for _d in sku_sales_map:
-        if _first_activity is None or _d < _first_activity:
-            _first_activity = _d
-    for _t in _txns:
-        if _first_activity is None or _t.date < _first_activity:
-            _first_activity = _t.date
-
-    # Build map of out-of-assortment periods from ledger
-    out_of_assortment_days = set()
-
-    # Pre-existence: mark days before the SKU's first known activity as excluded.
-    # This prevents "no data before SKU was created" from being counted as OOS.
-    if _first_activity and _first_activity > start_date:
-        for _d in calendar_days:
-            if _d < _first_activity:
-                out_of_assortment_days.add(_d)
-
-    if _txns:
-        # Find all assortment transitions for this SKU
-        assortment_events = [
-            txn for txn in _txns
-            if txn.event in (EventType.ASSORTMENT_OUT, EventType.ASSORTMENT_IN)
-        ]
-        
-        # Sort by date
-        assortment_events.sort(key=lambda t: t.date)
-        
-        # Build periods: assume SKU starts IN assortment unless first event is ASSORTMENT_IN
-        currently_out = False
-        out_start = None
-        
-        # If first event in history is ASSORTMENT_IN, SKU was initially OUT —
-        # BUT ONLY if the SKU had no prior activity before that event.
-        # An orphan ASSORTMENT_IN on a SKU that was already trading (visible
-        # sales or transactions BEFORE the ASSORTMENT_IN date) is spurious
-        # (e.g. written by SKU_EDIT when toggling in_assortment=True on an
-        # already-active SKU). In that case, do NOT assume was-out-from-start.
-        if (assortment_events
-                and assortment_events[0].event == EventType.ASSORTMENT_IN
-                and (_first_activity is None or _first_activity >= assortment_events[0].date)):
-            currently_out = True
-            out_start = start_date  # Entire lookback period starts as OUT
-        
-        for event in assortment_events:
-            if event.event == EventType.ASSORTMENT_OUT:
-                currently_out = True
-                out_start = event.date
-            elif event.event == EventType.ASSORTMENT_IN:
-                if currently_out and out_start:
-                    # Mark all days from out_start to event.date-1 as out of assortment
-                    current = out_start
-                    while current < event.date:
-                        if current in calendar_days:
-                            out_of_assortment_days.add(current)
-                        current += timedelta(days=1)
-                currently_out = False
-                out_start = None
-        
-        # If still out at end of period
-        if currently_out and out_start:
-            current = out_start
-            while current <= asof_date:
-                if current in calendar_days:
-                    out_of_assortment_days.add(current)
-                current += timedelta(days=1)
-
-    # Sales-immunity: a day with recorded sales cannot be out-of-assortment.
-    # Guards against spurious ASSORTMENT_IN events (e.g. written by a SKU_EDIT
-    # that toggles in_assortment) incorrectly marking active trading days as
-    # excluded and collapsing history_valid_days to 0.
-    if sku_sales_map:
-        out_of_assortment_days -= set(sku_sales_map.keys())
-
-    # Detect OOS days (if transactions provided)
-    oos_days = set()
-    oos_override_days = set()  # Days with OOS_ESTIMATE_OVERRIDE marker
-
-    if _txns:
-        # First, identify days with override markers (dual detection: new OOS_OVERRIDE
-        # event type + legacy WASTE-with-note for backward compatibility)
-        for txn in _txns:
-            if txn.event == EventType.OOS_OVERRIDE:                    # new clean marker
-                oos_override_days.add(txn.date)
-            elif txn.note and "OOS_ESTIMATE_OVERRIDE:" in txn.note:    # legacy backward compat
-                oos_override_days.add(txn.date)
-
-        # ── FAST PATH: single forward pass instead of 30 × calculate_asof ──
-        # One call to get base state at start of lookback window, then replay
-        # only events that fall within [start_date, asof_date].  This reduces
-        # complexity from O(days × T_all) to O(T_sku_total + days).
-        # Boundary is inclusive (<=) so estimates written for today are visible.
-        # Pass per-SKU lists to calculate_asof so it doesn't re-scan global lists.
-        base_stock = StockCalculator.calculate_asof(
-            sku, start_date, _txns, _srs
-        )
-        oh = base_stock.on_hand
-        oo = base_stock.on_order
-
-        # Collect and sort SKU-filtered events in the lookback window
-        _priority = StockCalculator.EVENT_PRIORITY
-        _window_txns: list = [
-            t for t in _txns
-            if start_date <= t.date <= asof_date
-        ]
-        if _srs:
-            # Deduplicate: skip sales_records dates that already have an explicit
-            # SALE transaction in the ledger (same dedup as StockCalculator.calculate_asof).
-            # Without this, EOD-generated records (which write BOTH a SALE transaction AND
-            # a sales.csv entry for the same day) would double-deplete the running stock.
-            _window_dates_with_ledger_sale = {
-                t.date for t in _window_txns if t.event == EventType.SALE
-            }
-            _window_txns.extend(
-                Transaction(date=s.date, sku=s.sku, event=EventType.SALE, qty=s.qty_sold)
-                for s in _srs
-                if start_date <= s.date <= asof_date
-                and s.date not in _window_dates_with_ledger_sale
-            )
-        _window_txns.sort(key=lambda t: (t.date, _priority.get(t.event, 99)))
-
-        # Group by date for efficient day-by-day replay
-        from itertools import groupby
-        _by_day: dict = {
-            day: list(grp)
-            for day, grp in groupby(_window_txns, key=lambda t: t.date)
-        }
-
-        for day in calendar_days:
-            # Check OOS at the START of the day (before applying that day's events)
-            if day not in oos_override_days:
-                if oos_detection_mode == "strict":
-                    if oh == 0:
-                        oos_days.add(day)
-                else:  # "relaxed"
-                    if oh + oo == 0:
-                        oos_days.add(day)
-
-            # Apply events of this day to advance the running state
-            for txn in _by_day.get(day, []):
-                ev = txn.event
-                if ev == EventType.SNAPSHOT:
-                    oh = txn.qty
-                    oo = 0
-                elif ev == EventType.ORDER:
-                    oo += txn.qty
-                elif ev == EventType.RECEIPT:
-                    oo = max(0, oo - txn.qty)
-                    oh += txn.qty
-                elif ev == EventType.SALE:
-                    oh = max(0, oh - txn.qty)
-                elif ev == EventType.WASTE:
-                    oh = max(0, oh - txn.qty)
-                elif ev == EventType.ADJUST:
-                    oh = max(0, txn.qty)
-            oh = max(0, oh)
-            oo = max(0, oo)
-    
-    # Calculate average excluding OOS days AND out-of-assortment days
-    total_sales = 0
-    valid_days = 0
-    
-    for day in calendar_days:
-        if day in oos_days:
-            continue  # Skip OOS days
-        if day in out_of_assortment_days:
-            continue  # Skip out-of-assortment days
-        
-        # Include day with sales qty (or zero if no sales)
-        total_sales += sku_sales_map.get(day, 0)
-        valid_days += 1
-    
-    avg_sales = total_sales / valid_days if valid_days > 0 else 0.0
-    oos_days_count = len(oos_days)
+    if oos_history is None:
+        # Resolve per-SKU lists: use pre-filtered lists when provided by caller
+        # (avoids O(T_global) scans when called N_sku times from a bulk worker).
+        _txns: list = sku_txns if sku_txns is not None else [t for t in (transactions or []) if t.sku == sku]
+        _srs: list  = sku_sales if sku_sales is not None else [s for s in (sales_records or []) if s.sku == sku]
+        oos_history = SkuOosHistory(sku, _txns, _srs)
+
+    # One replay of the SKU's ledger: OOS days (checked at the start of each
+    # day, override markers excluded) and out-of-assortment days (incl.
+    # pre-existence and sales immunity) -- see analytics.oos_engine.
+    summary = oos_history.summary(asof_date, days_lookback, oos_detection_mode)
     
     if return_details:
         # Return detailed breakdown for KPI analysis
-        oos_days_list = sorted(list(oos_days))
-        out_of_assortment_days_list = sorted(list(out_of_assortment_days))
-        return (avg_sales, oos_days_count, oos_days_list, out_of_assortment_days_list)
+        return (
+            summary.avg_daily_sales,
+            summary.oos_days_count,
+            list(summary.oos_days),
+            list(summary.out_of_assortment_days),
+        )
     else:
         # Backward compatible return for existing callers
-        return (avg_sales, oos_days_count)
+        return (summary.avg_daily_sales, summary.oos_days_count)
 
 
 def propose_order_for_sku(
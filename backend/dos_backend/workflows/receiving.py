@@ -241,7 +241,8 @@ class ExceptionWorkflow:
         """
         Revert all exceptions of a type for a SKU on a specific date.
         
-        Implementation: re-write transactions.csv excluding matching entries.
+        Implementation: targeted ledger delete (indexed DELETE in SQLite,
+        single filter pass over transactions.csv in CSV mode).
         
         Args:
             event_date: Date to target
@@ -251,17 +252,8 @@ class ExceptionWorkflow:
         Returns:
             Number of reverted entries
         """
-        existing_txns = self.csv_layer.read_transactions()
-        
-        # Filter: keep all except matching exceptions
-        filtered_txns = [
-            t for t in existing_txns
-            if not (t.date == event_date and t.sku == sku and t.event == event_type)
-        ]
-        
-        reverted_count = len(existing_txns) - len(filtered_txns)
-        
-        if reverted_count > 0:
-            self.csv_layer.overwrite_transactions(filtered_txns)
+        reverted_count = self.csv_layer.delete_transactions(
+            sku, date_from=event_date, date_to=event_date, events=[event_type],
+        )
         
         return reverted_count
@@ -7,12 +7,12 @@ Key improvements:
 - Accurate unfulfilled tracking per order
 - Atomic writes with auto-backup
 """
-from datetime import date
+from datetime import date, timedelta
 from typing import List, Dict, Tuple, Optional, Any
 import hashlib
 import logging
 
-from ..domain.models import Transaction, EventType
+from ..domain.models import Transaction, EventType, Lot
 from ..persistence.csv_layer import CSVLayer
 
 logger = logging.getLogger(__name__)
@@ -91,23 +91,65 @@ class ReceivingWorkflow:
                 "DDT-2026-012", date(2026, 2, 10), items
             )
         """
-        # 1. Check idempotency: document already processed?
-        existing_logs = self.csv_layer.read_receiving_logs()
-        document_exists = any(
-            log.get("document_id") == document_id or log.get("receipt_id") == document_id
-            for log in existing_logs
-        )
+        [(transactions, already_processed, order_updates)] = self.close_receipts_batch([{
+            "document_id": document_id,
+            "receipt_date": receipt_date,
+            "items": items,
+            "notes": notes,
+        }])
+        return transactions, already_processed, order_updates
+    
+    def close_receipts_batch(
+        self,
+        documents: List[Dict[str, Any]],  # [{document_id, receipt_date, items, notes}]
+    ) -> List[Tuple[List[Transaction], bool, Dict[str, Dict]]]:
+        """
+        Close several receipt documents (e.g. a morning's delivery notes) at once.
         
-        if document_exists:
-            logger.info(f"Document {document_id} already processed (idempotent skip)")
-            return [], True, {}
+        Same rules as ``close_receipt_by_document`` per document, with shared I/O:
+        - The processed-document id set, order logs and SKU catalog are read
+          once for the whole batch
+        - Ledger events, receiving logs and lots of all documents are committed
+          together (``write_receipt_batch``), then order_logs is rewritten once
+        
+        A document already processed, or repeated within the batch, is skipped
+        (``already_processed=True``).  Items of later documents see the order
+        allocations of earlier ones.
+        
+        Args:
+            documents: Documents to close, each with ``document_id``,
+                ``receipt_date``, ``items`` (as in ``close_receipt_by_document``)
+                and optional ``notes``
         
-        # 2. Read current order state
+        Returns:
+            One ``(transactions, already_processed, order_updates)`` per document,
+            in input order
+        """
+        # 1. Check idempotency against the indexed set of processed documents
+        processed_ids = set(self.csv_layer.receiving_document_ids())
+        new_documents = []
+        for doc in documents:
+            if doc["document_id"] in processed_ids:
+                logger.info(f"Document {doc['document_id']} already processed (idempotent skip)")
+                new_documents.append(None)
+                continue
+            processed_ids.add(doc["document_id"])
+            new_documents.append(doc)
+        
+        if not any(new_documents):
+            return [([], True, {}) for _ in documents]
+        
+        # 2. Read current order state once and build a mutable in-memory dict.
+        #
+        # Why in-memory state?  When the same document contains multiple items for
+        # the same SKU (one per pending treeview row), the allocation loop must see
+        # the quantities already consumed by earlier items.  Reading order_logs as a
+        # static snapshot causes the second item to re-allocate to an already-served
+        # order, overwriting order_updates with stale data and leaving the pending
+        # list unchanged after confirmation.
         order_logs = self.csv_layer.read_order_logs()
 
-        # Build mutable in-memory state keyed by order_id.
-        # This ensures multiple items for the same SKU in one document
-        # each see the correct residual (prevents stale-snapshot overwrite).
+        # Keyed by order_id for O(1) lookup; values are mutable dicts.
         order_state: dict = {}
         for _log in order_logs:
             _oid = _log.get("order_id", "")
@@ -119,230 +161,243 @@ class ReceivingWorkflow:
                     "qty_received": int(_log.get("qty_received", 0)),
                     "date": _log.get("date", ""),
                 }
-
-        transactions = []
-        order_updates = {}  # {order_id: {qty_received_total, new_status, sku}}
-        
-        # 3. Process each item
-        for item in items:
-            sku = item["sku"]
-            qty_received = item["qty_received"]
-            specified_order_ids = item.get("order_ids", [])
-
-            # Get PENDING/PARTIAL orders for this SKU from in-memory state
-            # (already reflects allocations made by earlier items in this document).
-            sku_order_ids = sorted(
-                [
-                    oid for oid, st in order_state.items()
-                    if st["sku"] == sku
-                    and st["status"].upper().strip() in ("PENDING", "PARTIAL")
-                    and st["qty_ordered"] - st["qty_received"] > 0
-                ],
-                key=lambda oid: order_state[oid]["date"],
-            )
-
-            # Determine which orders to allocate to
-            if specified_order_ids:
-                target_order_ids = [oid for oid in sku_order_ids if oid in specified_order_ids]
+        sku_map = {s.sku: s for s in self.csv_layer.read_skus()}
+        
+        results: List[Tuple[List[Transaction], bool, Dict[str, Dict]]] = []
+        all_transactions: List[Transaction] = []
+        receiving_logs: List[Dict[str, Any]] = []
+        lots: List[Lot] = []
+        all_order_updates: Dict[str, Tuple[int, str]] = {}
+        
+        for doc in new_documents:
+            if doc is None:
+                results.append(([], True, {}))
+                continue
+            document_id = doc["document_id"]
+            receipt_date = doc["receipt_date"]
+            items = doc["items"]
+            notes = doc.get("notes", "")
+            
+            transactions = []
+            order_updates = {}  # {order_id: {qty_received_total, new_status, sku}}
+            
+            # Process each item of the document
+            for item in items:
+                sku = item["sku"]
+                qty_received = item["qty_received"]
+                specified_order_ids = item.get("order_ids", [])
+            
+                # Get PENDING/PARTIAL orders for this SKU from the in-memory state
+                # (already reflects allocations made by earlier items in this document).
+                # Sorted by order date for FIFO.
+                sku_order_ids = sorted(
+                    [
+                        oid for oid, st in order_state.items()
+                        if st["sku"] == sku
+                        and st["status"].upper().strip() in ("PENDING", "PARTIAL")
+                        and st["qty_ordered"] - st["qty_received"] > 0  # residual exists
+                    ],
+                    key=lambda oid: order_state[oid]["date"],
+                )
+            
+                # Determine which orders to allocate to
+                if specified_order_ids:
+                    target_order_ids = [oid for oid in sku_order_ids if oid in specified_order_ids]
+                    if not target_order_ids:
+                        logger.warning(
+                            f"Document {document_id}: specified order_ids {specified_order_ids} "
+                            f"not found for {sku}; falling back to FIFO"
+                        )
+                        target_order_ids = sku_order_ids
+                else:
+                    # FIFO allocation
+                    target_order_ids = sku_order_ids
+            
                 if not target_order_ids:
-                    logger.warning(
-                        f"Document {document_id}: specified order_ids {specified_order_ids} "
-                        f"not found for {sku}; falling back to FIFO"
+                    logger.warning(f"Document {document_id}: No PENDING/PARTIAL orders found for {sku}, qty_received={qty_received}")
+                    # Still create RECEIPT event (might be manual stock in)
+                    txn_receipt = Transaction(
+                        date=receipt_date,
+                        sku=sku,
+                        event=EventType.RECEIPT,
+                        qty=qty_received,
+                        receipt_date=receipt_date,
+                        note=f"Document {document_id} (no matching orders); {notes}".strip(),
                     )
-                    target_order_ids = sku_order_ids
-            else:
-                # FIFO allocation
-                target_order_ids = sku_order_ids
-
-            if not target_order_ids:
-                logger.warning(f"Document {document_id}: No PENDING/PARTIAL orders found for {sku}, qty_received={qty_received}")
-                # Still create RECEIPT event (might be manual stock in)
+                    transactions.append(txn_receipt)
+                
+                    # Log to receiving_logs without order linkage
+                    receiving_logs.append(dict(
+                        document_id=document_id,
+                        date_str=date.today().isoformat(),
+                        sku=sku,
+                        qty=qty_received,
+                        receipt_date=receipt_date.isoformat(),
+                        order_ids="",
+                    ))
+                    continue
+            
+                # Allocate qty_received to orders (FIFO)
+                qty_remaining = qty_received
+                allocated_order_ids = []
+            
+                for order_id in target_order_ids:
+                    if qty_remaining <= 0:
+                        break
+                
+                    # Use in-memory state: reflects allocations already done by
+                    # earlier items in the same document for the same SKU.
+                    st = order_state[order_id]
+                    qty_ordered = st["qty_ordered"]
+                    qty_already_received = st["qty_received"]
+                    qty_still_needed = qty_ordered - qty_already_received
+                
+                    if qty_still_needed <= 0:
+                        continue  # Order already fully received (via earlier item)
+                
+                    # Allocate up to qty_still_needed
+                    qty_to_allocate = min(qty_remaining, qty_still_needed)
+                    new_qty_received_total = qty_already_received + qty_to_allocate
+                
+                    # Determine new status
+                    if new_qty_received_total >= qty_ordered:
+                        new_status = "RECEIVED"
+                    elif new_qty_received_total > 0:
+                        new_status = "PARTIAL"
+                    else:
+                        new_status = "PENDING"
+                
+                    # Update in-memory state immediately so the next item sees
+                    # the correct residual for this order (prevents stale overwrite).
+                    st["qty_received"] = new_qty_received_total
+                    st["status"] = new_status
+                
+                    # Persist cumulative update for final CSV write
+                    order_updates[order_id] = {
+                        "qty_received_total": new_qty_received_total,
+                        "new_status": new_status,
+                        "sku": sku,
+                        "qty_ordered": qty_ordered,
+                    }
+                
+                    allocated_order_ids.append(order_id)
+                    qty_remaining -= qty_to_allocate
+                
+                    logger.info(
+                        f"Document {document_id}: Allocated {qty_to_allocate} of {sku} to order {order_id} "
+                        f"(total received: {new_qty_received_total}/{qty_ordered}, status: {new_status})"
+                    )
+            
+                # Create RECEIPT transaction
                 txn_receipt = Transaction(
                     date=receipt_date,
                     sku=sku,
                     event=EventType.RECEIPT,
                     qty=qty_received,
                     receipt_date=receipt_date,
-                    note=f"Document {document_id} (no matching orders); {notes}".strip(),
+                    note=f"Document {document_id}, Orders: {','.join(allocated_order_ids)}; {notes}".strip(),
                 )
                 transactions.append(txn_receipt)
-                
-                # Log to receiving_logs without order linkage
-                self.csv_layer.write_receiving_log(
+            
+                # If qty_remaining > 0 after allocation, log warning
+                if qty_remaining > 0:
+                    logger.warning(
+                        f"Document {document_id}: Received {qty_remaining} extra units of {sku} "
+                        f"beyond pending orders (may be overstock or unplanned)"
+                    )
+            
+                # Check for unfulfilled residuals (orders closed without full receipt)
+                for order_id, update in order_updates.items():
+                    if update["new_status"] == "RECEIVED" and update["qty_received_total"] < update["qty_ordered"]:
+                        qty_unfulfilled = update["qty_ordered"] - update["qty_received_total"]
+                    
+                        txn_unfulfilled = Transaction(
+                            date=receipt_date,
+                            sku=sku,
+                            event=EventType.UNFULFILLED,
+                            qty=qty_unfulfilled,
+                            note=f"Auto-generated for order {order_id} closed by document {document_id}; "
+                                 f"ordered={update['qty_ordered']}, received={update['qty_received_total']}",
+                        )
+                        transactions.append(txn_unfulfilled)
+                        logger.warning(
+                            f"Order {order_id}: Closed with unfulfilled qty={qty_unfulfilled} "
+                            f"(ordered={update['qty_ordered']}, received={update['qty_received_total']})"
+                        )
+            
+                # Write to receiving_logs
+                receipt_id = self.generate_receipt_id(receipt_date, document_id, sku)
+                receiving_logs.append(dict(
                     document_id=document_id,
                     date_str=date.today().isoformat(),
                     sku=sku,
                     qty=qty_received,
                     receipt_date=receipt_date.isoformat(),
-                    order_ids="",
-                )
-                continue
+                    order_ids=",".join(allocated_order_ids),
+                ))
             
-            # Allocate qty_received to orders (FIFO)
-            qty_remaining = qty_received
-            allocated_order_ids = []
+                # Create lot based on has_expiry_label flag and shelf_life_days
+                expiry_date_str_item = item.get("expiry_date", "").strip()
             
-            for order_id in target_order_ids:
-                if qty_remaining <= 0:
-                    break
-
-                st = order_state[order_id]
-                qty_ordered = st["qty_ordered"]
-                qty_already_received = st["qty_received"]
-                qty_still_needed = qty_ordered - qty_already_received
-
-                if qty_still_needed <= 0:
-                    continue  # Order already fully received (via earlier item in same document)
-
-                # Allocate up to qty_still_needed
-                qty_to_allocate = min(qty_remaining, qty_still_needed)
-                new_qty_received_total = qty_already_received + qty_to_allocate
-
-                # Determine new status
-                if new_qty_received_total >= qty_ordered:
-                    new_status = "RECEIVED"
-                elif new_qty_received_total > 0:
-                    new_status = "PARTIAL"
-                else:
-                    new_status = "PENDING"
-
-                # Update in-memory state immediately so the next item sees
-                # the correct residual (prevents stale-snapshot overwrite).
-                st["qty_received"] = new_qty_received_total
-                st["status"] = new_status
-
-                # Persist cumulative update for final CSV write
-                order_updates[order_id] = {
-                    "qty_received_total": new_qty_received_total,
-                    "new_status": new_status,
-                    "sku": sku,
-                    "qty_ordered": qty_ordered,
-                }
-
-                allocated_order_ids.append(order_id)
-                qty_remaining -= qty_to_allocate
-                
-                logger.info(
-                    f"Document {document_id}: Allocated {qty_to_allocate} of {sku} to order {order_id} "
-                    f"(total received: {new_qty_received_total}/{qty_ordered}, status: {new_status})"
-                )
-            
-            # Create RECEIPT transaction
-            txn_receipt = Transaction(
-                date=receipt_date,
-                sku=sku,
-                event=EventType.RECEIPT,
-                qty=qty_received,
-                receipt_date=receipt_date,
-                note=f"Document {document_id}, Orders: {','.join(allocated_order_ids)}; {notes}".strip(),
-            )
-            transactions.append(txn_receipt)
-            
-            # If qty_remaining > 0 after allocation, log warning
-            if qty_remaining > 0:
-                logger.warning(
-                    f"Document {document_id}: Received {qty_remaining} extra units of {sku} "
-                    f"beyond pending orders (may be overstock or unplanned)"
-                )
+                # Look up SKU object for has_expiry_label and shelf_life_days
+                sku_obj = sku_map.get(sku)
+                has_expiry_label = sku_obj.has_expiry_label if sku_obj else False
+                shelf_life_days_sku = sku_obj.shelf_life_days if sku_obj else 0
             
-            # Check for unfulfilled residuals (orders closed without full receipt)
-            for order_id, update in order_updates.items():
-                if update["new_status"] == "RECEIVED" and update["qty_received_total"] < update["qty_ordered"]:
-                    qty_unfulfilled = update["qty_ordered"] - update["qty_received_total"]
+                if has_expiry_label:
+                    # Expiry date from label: use user-provided value
+                    if expiry_date_str_item:
+                        expiry_date_obj = None
+                        try:
+                            expiry_date_obj = date.fromisoformat(expiry_date_str_item)
+                        except ValueError:
+                            logger.warning(f"Invalid expiry_date format for {sku}: {expiry_date_str_item}, skipping lot creation")
                     
-                    txn_unfulfilled = Transaction(
-                        date=receipt_date,
+                        if expiry_date_obj is not None:
+                            lot_id = f"{receipt_id}_{sku}"
+                            lot = Lot(
+                                lot_id=lot_id,
+                                sku=sku,
+                                expiry_date=expiry_date_obj,
+                                qty_on_hand=qty_received,
+                                receipt_id=receipt_id,
+                                receipt_date=receipt_date,
+                            )
+                            lots.append(lot)
+                            logger.info(f"Created labelled lot {lot_id} for {sku}, qty={qty_received}, expiry={expiry_date_obj}")
+                    else:
+                        logger.info(f"SKU {sku} has_expiry_label=True but no expiry_date provided — lot not created")
+                elif shelf_life_days_sku > 0:
+                    # Auto shelf-life tracking: calculate expiry from receipt_date + shelf_life_days
+                    auto_expiry = receipt_date + timedelta(days=shelf_life_days_sku)
+                    lot_id = f"{receipt_id}_{sku}"
+                    lot = Lot(
+                        lot_id=lot_id,
                         sku=sku,
-                        event=EventType.UNFULFILLED,
-                        qty=qty_unfulfilled,
-                        note=f"Auto-generated for order {order_id} closed by document {document_id}; "
-                             f"ordered={update['qty_ordered']}, received={update['qty_received_total']}",
+                        expiry_date=auto_expiry,
+                        qty_on_hand=qty_received,
+                        receipt_id=receipt_id,
+                        receipt_date=receipt_date,
                     )
-                    transactions.append(txn_unfulfilled)
-                    logger.warning(
-                        f"Order {order_id}: Closed with unfulfilled qty={qty_unfulfilled} "
-                        f"(ordered={update['qty_ordered']}, received={update['qty_received_total']})"
-                    )
-            
-            # Write to receiving_logs
-            receipt_id = self.generate_receipt_id(receipt_date, document_id, sku)
-            self.csv_layer.write_receiving_log(
-                document_id=document_id,
-                date_str=date.today().isoformat(),
-                sku=sku,
-                qty=qty_received,
-                receipt_date=receipt_date.isoformat(),
-                order_ids=",".join(allocated_order_ids),
-            )
-            
-            # Create lot based on has_expiry_label flag and shelf_life_days
-            from ..domain.models import Lot
-            from datetime import timedelta
-            
-            expiry_date_str_item = item.get("expiry_date", "").strip()
-            
-            # Look up SKU object for has_expiry_label and shelf_life_days
-            sku_objects = self.csv_layer.read_skus()
-            sku_obj = next((s for s in sku_objects if s.sku == sku), None)
-            has_expiry_label = sku_obj.has_expiry_label if sku_obj else False
-            shelf_life_days_sku = sku_obj.shelf_life_days if sku_obj else 0
-            
-            if has_expiry_label:
-                # Expiry date from label: use user-provided value
-                if expiry_date_str_item:
-                    expiry_date_obj = None
-                    try:
-                        expiry_date_obj = date.fromisoformat(expiry_date_str_item)
-                    except ValueError:
-                        logger.warning(f"Invalid expiry_date format for {sku}: {expiry_date_str_item}, skipping lot creation")
-                    
-                    if expiry_date_obj is not None:
-                        lot_id = f"{receipt_id}_{sku}"
-                        lot = Lot(
-                            lot_id=lot_id,
-                            sku=sku,
-                            expiry_date=expiry_date_obj,
-                            qty_on_hand=qty_received,
-                            receipt_id=receipt_id,
-                            receipt_date=receipt_date,
-                        )
-                        self.csv_layer.write_lot(lot)
-                        logger.info(f"Created labelled lot {lot_id} for {sku}, qty={qty_received}, expiry={expiry_date_obj}")
-                else:
-                    logger.info(f"SKU {sku} has_expiry_label=True but no expiry_date provided — lot not created")
-            elif shelf_life_days_sku > 0:
-                # Auto shelf-life tracking: calculate expiry from receipt_date + shelf_life_days
-                auto_expiry = receipt_date + timedelta(days=shelf_life_days_sku)
-                lot_id = f"{receipt_id}_{sku}"
-                lot = Lot(
-                    lot_id=lot_id,
-                    sku=sku,
-                    expiry_date=auto_expiry,
-                    qty_on_hand=qty_received,
-                    receipt_id=receipt_id,
-                    receipt_date=receipt_date,
-                )
-                self.csv_layer.write_lot(lot)
-                logger.info(f"Created auto-shelf-life lot {lot_id} for {sku}, qty={qty_received}, expiry={auto_expiry} (shelf_life={shelf_life_days_sku}d)")
-        
-        # 4. Write transactions to ledger (batch)
-        if transactions:
-            self.csv_layer.write_transactions_batch(transactions)
-        
-        # 5. Update order_logs with new qty_received and status
-        for order_id, update in order_updates.items():
-            self.csv_layer.update_order_received_qty(
-                order_id=order_id,
-                qty_received=update["qty_received_total"],
-                status=update["new_status"],
+                    lots.append(lot)
+                    logger.info(f"Created auto-shelf-life lot {lot_id} for {sku}, qty={qty_received}, expiry={auto_expiry} (shelf_life={shelf_life_days_sku}d)")
+        
+            all_transactions.extend(transactions)
+            for order_id, update in order_updates.items():
+                all_order_updates[order_id] = (update["qty_received_total"], update["new_status"])
+            results.append((transactions, False, order_updates))
+            logger.info(
+                f"Document {document_id} processed: {len(transactions)} transactions, "
+                f"{len(order_updates)} orders updated"
             )
         
-        logger.info(
-            f"Document {document_id} processed: {len(transactions)} transactions, "
-            f"{len(order_updates)} orders updated"
-        )
+        # 3. Write ledger, receiving logs and lots together
+        self.csv_layer.write_receipt_batch(all_transactions, receiving_logs, lots)
         
-        return transactions, False, order_updates
+        # 4. Update order_logs with new qty_received and status (one rewrite)
+        self.csv_layer.update_orders_received_qty(all_order_updates)
+        
+        return results
     
     def close_receipt(
         self,
@@ -471,7 +526,8 @@ class ExceptionWorkflow:
         """
         Revert all exceptions of a type for a SKU on a specific date.
         
-        Implementation: re-write transactions.csv excluding matching entries.
+        Implementation: targeted ledger delete (indexed DELETE in SQLite,
+        single filter pass over transactions.csv in CSV mode).
         
         Args:
             event_date: Date to target
@@ -481,18 +537,11 @@ class ExceptionWorkflow:
         Returns:
             Number of reverted entries
         """
-        existing_txns = self.csv_layer.read_transactions()
-        
-        # Filter: keep all except matching exceptions
-        filtered_txns = [
-            t for t in existing_txns
-            if not (t.date == event_date and t.sku == sku and t.event == event_type)
-        ]
-        
-        reverted_count = len(existing_txns) - len(filtered_txns)
+        reverted_count = self.csv_layer.delete_transactions(
+            sku, date_from=event_date, date_to=event_date, events=[event_type],
+        )
         
         if reverted_count > 0:
-            self.csv_layer.overwrite_transactions(filtered_txns)
             logger.info(
                 f"Reverted {reverted_count} {event_type.value} exception(s) for {sku} on {event_date}"
             )
@@ -14,7 +14,7 @@ import csv
 import logging
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Set, Any, Sequence
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 from datetime import datetime
 
 from ..domain.models import SKU, DemandVariability
@@ -457,7 +457,8 @@ class SKUImporter:
         self,
         preview: ImportPreview,
         mode: str = "UPSERT",
-        require_confirmation_on_discards: bool = True
+        require_confirmation_on_discards: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
     ) -> Dict[str, Any]:
         """
         Execute the import based on preview results.
@@ -467,6 +468,7 @@ class SKUImporter:
             mode: "UPSERT" (update existing + add new) or "REPLACE" (overwrite all)
             require_confirmation_on_discards: If True and mode is REPLACE with discards,
                                               returns {"confirmation_required": True} instead of executing
+            progress: Optional ``progress(done, total)`` reporting callback (UPSERT: per SKU)
             
         Returns:
             Dict with import results:
@@ -507,7 +509,9 @@ class SKUImporter:
                 # UPSERT: update existing + add new
                 existing_skus = {sku.sku: sku for sku in self.csv_layer.read_skus()}
                 
-                for sku_obj in valid_skus:
+                for i, sku_obj in enumerate(valid_skus):
+                    if progress is not None:
+                        progress(i, len(valid_skus))
                     if sku_obj.sku in existing_skus:
                         self.csv_layer.update_sku_object(sku_obj.sku, sku_obj)
                         result["updated"] += 1
@@ -35,14 +35,23 @@ class _MemStorage:
     Pure-Python stand-in for StorageAdapter.
 
     Implements only the methods called by the four tested endpoints:
+      data_revision (response cache / ETag)
       read_skus / read_transactions / write_transaction / write_transactions_batch
-      read_receiving_logs / write_receiving_log / close
+      read_sku_transactions / read_sku_sales (streamed list endpoints)
+      read_receiving_logs / write_receiving_log / receiving_document_ids
+      write_receipt_batch / close
     """
 
     def __init__(self, skus: list[SKU]) -> None:
         self._skus: list[SKU] = list(skus)
         self._transactions: list[Transaction] = []
         self._recv_logs: list[dict] = []
+        self.receipt_batch_calls = 0
+
+    # -- Revision -------------------------------------------------------------
+    def data_revision(self) -> tuple:
+        """Change token keyed by the response cache (tests also mutate the lists directly)."""
+        return (tuple(map(id, self._skus)), id(self._transactions), len(self._transactions))
 
     # -- SKU ------------------------------------------------------------------
     def read_skus(self) -> list[SKU]:
@@ -52,6 +61,17 @@ class _MemStorage:
     def read_transactions(self) -> list[Transaction]:
         return list(self._transactions)
 
+    def read_sku_transactions(self, sku: str, asof=None) -> list[Transaction]:
+        """Per-SKU cursor used by the streamed list endpoints."""
+        return [t for t in self._transactions if t.sku == sku and (asof is None or t.date < asof)]
+
+    def read_sku_sales(self, sku: str) -> list:
+        return []
+
+    def sum_qty(self, sku: str, day, event) -> int:
+        """Used by POST /exceptions/daily-upsert."""
+        return sum(t.qty for t in self._transactions if t.sku == sku and t.date == day and t.event == event)
+
     def write_transaction(self, txn: Transaction) -> None:
         """Used by POST /exceptions."""
         self._transactions.append(txn)
@@ -67,9 +87,27 @@ class _MemStorage:
     def write_receiving_log(self, **kwargs) -> None:  # noqa: ANN003
         self._recv_logs.append(dict(kwargs))
 
-    def overwrite_transactions(self, txns: list[Transaction]) -> None:
-        """Replace the entire transaction list (used by daily-upsert replace mode)."""
-        self._transactions = list(txns)
+    def receiving_document_ids(self) -> frozenset:
+        """Used by POST /receipts/close and /receipts/close-batch."""
+        ids = {log.get("document_id") for log in self._recv_logs}
+        ids |= {log.get("receipt_id") for log in self._recv_logs}
+        return frozenset(ids - {None, ""})
+
+    def write_receipt_batch(self, txns: list[Transaction], receiving_logs: list[dict], lots=None) -> None:
+        """Ledger events + receiving logs of closed receipts (one commit)."""
+        self.receipt_batch_calls += 1
+        self._transactions.extend(txns)
+        self._recv_logs.extend(dict(log) for log in receiving_logs)
+
+    def replace_transactions_day(self, sku: str, day, txns: list[Transaction], events=None) -> int:
+        """Replace one SKU's events of one day (used by daily-upsert replace mode)."""
+        kept = [
+            t for t in self._transactions
+            if not (t.sku == sku and t.date == day and (events is None or t.event in events))
+        ]
+        replaced = len(self._transactions) - len(kept)
+        self._transactions = kept + list(txns)
+        return replaced
 
     # -- Order dispatches (send to Android) -----------------------------------
     def __init_dispatch_store(self):
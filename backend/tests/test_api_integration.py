@@ -11,6 +11,7 @@ Tests are grouped by endpoint:
   TestGetStock        — GET /api/v1/stock/{sku}
   TestPostExceptions  — POST /api/v1/exceptions
   TestPostReceiptsClose — POST /api/v1/receipts/close
+  TestPostReceiptsCloseBatch — POST /api/v1/receipts/close-batch
 """
 from __future__ import annotations
 
@@ -457,6 +458,73 @@ class TestPostReceiptsClose:
         assert len(mem_storage._transactions) == 1
 
 
+# ===========================================================================
+# POST /api/v1/receipts/close-batch
+# ===========================================================================
+
+
+def _receipt(receipt_id: str, sku: str = "0010001", qty: int = 5, **extra) -> dict:
+    return {
+        "receipt_id": receipt_id,
+        "receipt_date": "2026-02-25",
+        "lines": [{"sku": sku, "qty_received": qty}],
+        **extra,
+    }
+
+
+class TestPostReceiptsCloseBatch:
+    """N documents per call: one commit, shared validation, per-document dedup."""
+
+    def test_201_documents_written_in_one_commit(
+        self, client: TestClient, mem_storage
+    ) -> None:
+        payload = {"receipts": [_receipt(f"DDT-{i}", qty=i + 1) for i in range(20)]}
+        r = client.post(f"{_V1}/receipts/close-batch", json=payload)
+        assert r.status_code == 201
+        body = r.json()
+        assert [d["receipt_id"] for d in body["receipts"]] == [f"DDT-{i}" for i in range(20)]
+        assert not any(d["already_posted"] for d in body["receipts"])
+        assert mem_storage.receipt_batch_calls == 1
+        assert sorted(t.qty for t in mem_storage._transactions) == list(range(1, 21))
+        assert len(mem_storage._recv_logs) == 20
+
+    def test_400_any_invalid_line_writes_nothing(
+        self, client: TestClient, mem_storage
+    ) -> None:
+        payload = {"receipts": [_receipt("DDT-OK"), _receipt("DDT-BAD", sku="9999999")]}
+        r = client.post(f"{_V1}/receipts/close-batch", json=payload)
+        assert r.status_code == 400
+        fields = [d["field"] for d in r.json()["error"]["details"]]
+        assert fields == ["receipts[1].lines[0].sku"]
+        assert mem_storage._transactions == []
+        assert mem_storage._recv_logs == []
+
+    def test_already_posted_and_repeated_documents_skipped(
+        self, client: TestClient, mem_storage
+    ) -> None:
+        client.post(f"{_V1}/receipts/close", json=_receipt("DDT-OLD"))
+        payload = {"receipts": [_receipt("DDT-OLD"), _receipt("DDT-NEW"), _receipt("DDT-NEW")]}
+        r = client.post(f"{_V1}/receipts/close-batch", json=payload)
+        assert r.status_code == 201
+        assert [d["already_posted"] for d in r.json()["receipts"]] == [True, False, True]
+        assert len(mem_storage._transactions) == 2  # DDT-OLD once, DDT-NEW once
+
+    def test_client_ids_replayed(self, client: TestClient, mem_storage) -> None:
+        payload = {
+            "client_batch_id": "uuid-batch-1",
+            "receipts": [_receipt("DDT-A", client_receipt_id="uuid-doc-a")],
+        }
+        r1 = client.post(f"{_V1}/receipts/close-batch", json=payload)
+        r2 = client.post(f"{_V1}/receipts/close-batch", json=payload)
+        assert (r1.status_code, r2.status_code) == (201, 200)
+        assert r2.json()["already_posted"] is True
+        # The document's own key replays a single-document retry
+        r3 = client.post(f"{_V1}/receipts/close", json=_receipt("DDT-A", client_receipt_id="uuid-doc-a"))
+        assert r3.status_code == 200
+        assert r3.json()["lines"][0]["status"] == "ok"
+        assert len(mem_storage._transactions) == 1
+
+
 # ===========================================================================
 # Concurrency — POST /api/v1/exceptions with the same client_event_id
 # ===========================================================================
@@ -708,6 +776,20 @@ class TestPostExceptionsDailyUpsert:
         assert body["noop"] is False
         assert len(mem_storage._transactions) == 1
 
+    def test_200_sum_uses_indexed_lookups_only(
+        self, client: TestClient, mem_storage, monkeypatch
+    ) -> None:
+        """Sum mode validates and totals via sku_exists/sum_qty: no catalog or ledger scan."""
+        client.post(f"{_V1}/exceptions/daily-upsert", json={**_BASE_UPSERT, "mode": "sum", "qty": 4})
+
+        def _no_scan():
+            raise AssertionError("full scan")
+        monkeypatch.setattr(mem_storage, "read_skus", _no_scan)
+        monkeypatch.setattr(mem_storage, "read_transactions", _no_scan)
+        r = client.post(f"{_V1}/exceptions/daily-upsert", json={**_BASE_UPSERT, "mode": "sum", "qty": 2})
+        assert r.status_code == 200
+        assert r.json()["qty_total"] == 6
+
     def test_200_sum_accumulates_across_calls(
         self, client: TestClient, mem_storage
     ) -> None:
@@ -893,6 +975,38 @@ class TestEodClose:
         assert body["total_entries"] == 2
         assert len(body["results"]) == 2
 
+    def test_201_multi_sku_single_ledger_batch(
+        self, client: TestClient, mem_storage, monkeypatch
+    ) -> None:
+        """All events of all entries are written with ONE batch, in spec order."""
+        batches: list = []
+        original = mem_storage.write_transactions_batch
+        monkeypatch.setattr(
+            mem_storage, "write_transactions_batch",
+            lambda txns: batches.append(list(txns)) or original(txns),
+        )
+
+        def _no_single_writes(txn):
+            raise AssertionError("per-event write")
+        monkeypatch.setattr(mem_storage, "write_transaction", _no_single_writes)
+
+        payload = {
+            "date": "2026-03-10",
+            "client_eod_id": "eod-single-batch",
+            "entries": [
+                {"sku": "0010001", "waste_qty": 2, "on_hand": 4},
+                {"sku": "0010002"},
+                {"sku": "0010002", "on_hand": 5},
+            ],
+        }
+        r = client.post(f"{_V1}/eod/close", json=payload)
+        assert r.status_code == 201
+        assert [res["noop"] for res in r.json()["results"]] == [False, True, False]
+        assert len(batches) == 1
+        assert [(t.sku, t.event.value) for t in batches[0]] == [
+            ("0010001", "WASTE"), ("0010001", "ADJUST"), ("0010002", "ADJUST"),
+        ]
+
     # ── Idempotency ───────────────────────────────────────────────────────
 
     def test_200_idempotency_replay(self, client: TestClient) -> None:
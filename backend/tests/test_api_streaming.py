@@ -0,0 +1,132 @@
+"""
+backend/tests/test_api_streaming.py — Streamed (NDJSON / chunked JSON) list endpoints.
+
+Tests cover:
+  TestStreamedEndpoints — /stock, /skus/scanner-preload, /order-dispatches:
+                          streamed rows equal the buffered response
+  TestStreamingHelpers  — lazy chunking and incremental gzip
+  TestSkuSalesCursor    — CSVLayer.read_sku_sales against a full scan
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import zlib
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from dos_backend.api.streaming import _chunks, _gzipped
+from dos_backend.domain.models import EventType, SalesRecord, Transaction
+from dos_backend.persistence.csv_layer import CSVLayer
+
+_V1 = "/api/v1"
+_NDJSON = {"Accept": "application/x-ndjson"}
+
+
+def _ndjson(r) -> list[dict]:
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in r.text.splitlines()]
+
+
+def _seed_ledger(mem_storage) -> None:
+    yesterday = date.today() - timedelta(days=1)
+    mem_storage.write_transactions_batch([
+        Transaction(date=yesterday, sku="0010001", event=EventType.SNAPSHOT, qty=40),
+        Transaction(date=yesterday, sku="0010001", event=EventType.ORDER, qty=12),
+        Transaction(date=yesterday, sku="0010002", event=EventType.SNAPSHOT, qty=7),
+        Transaction(date=date.today(), sku="0010002", event=EventType.WASTE, qty=2),
+    ])
+
+
+class TestStreamedEndpoints:
+
+    def test_stock_ndjson_matches_buffered(self, client: TestClient, mem_storage) -> None:
+        _seed_ledger(mem_storage)
+        for mode in ("POINT_IN_TIME", "END_OF_DAY"):
+            buffered = client.get(f"{_V1}/stock?mode={mode}&page_size=200").json()
+            r = client.get(f"{_V1}/stock?mode={mode}&page_size=1", headers=_NDJSON)
+            assert _ndjson(r) == buffered["items"]  # pagination ignored
+            assert r.headers["x-total-count"] == str(buffered["total"])
+
+    def test_stock_chunked_json_is_a_full_page(self, client: TestClient, mem_storage) -> None:
+        _seed_ledger(mem_storage)
+        buffered = client.get(f"{_V1}/stock?page_size=200").json()
+        body = client.get(f"{_V1}/stock?stream=true").json()
+        assert body["items"] == buffered["items"]
+        assert (body["asof"], body["page"], body["total"]) == (buffered["asof"], 1, buffered["total"])
+        assert body["page_size"] == body["total"]
+
+    def test_scanner_preload_streamed_with_gzip(self, client: TestClient, mem_storage) -> None:
+        _seed_ledger(mem_storage)
+        buffered = client.get(f"{_V1}/skus/scanner-preload").json()
+        r = client.get(
+            f"{_V1}/skus/scanner-preload",
+            headers={**_NDJSON, "Accept-Encoding": "gzip"},
+        )
+        assert r.headers["content-encoding"] == "gzip"
+        assert _ndjson(r) == buffered
+        assert {row["sku"]: row["on_hand"] for row in buffered} == {"0010001": 40, "0010002": 5}
+
+        r = client.get(f"{_V1}/skus/scanner-preload?stream=true", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in r.headers
+        assert r.json() == buffered
+
+    def test_order_dispatches_streamed(self, client: TestClient) -> None:
+        for note in ("a", "b"):
+            client.post(f"{_V1}/order-dispatches", json={"lines": [
+                {"sku": "0010001", "description": "Latte", "qty_ordered": 1, "order_id": "X"},
+            ], "note": note})
+        buffered = client.get(f"{_V1}/order-dispatches").json()
+        assert len(buffered) == 2
+        assert _ndjson(client.get(f"{_V1}/order-dispatches", headers=_NDJSON)) == buffered
+        assert client.get(f"{_V1}/order-dispatches?stream=true").json() == buffered
+
+
+class TestStreamingHelpers:
+
+    def test_first_row_flushed_before_the_rest_is_computed(self) -> None:
+        produced: list[int] = []
+
+        def rows():
+            for i in range(200):
+                produced.append(i)
+                yield {"i": i}
+
+        chunks = _chunks(rows(), "json", {"total": 200}, "items", chunk_rows=64)
+        first = next(chunks)
+        assert produced == [0]
+        assert first == b'{"total":200,"items":[{"i":0}'
+        body = first + b"".join(chunks)
+        assert json.loads(body) == {"total": 200, "items": [{"i": i} for i in range(200)]}
+
+    def test_empty_bodies(self) -> None:
+        assert b"".join(_chunks(iter(()), "ndjson", None, "items", 64)) == b""
+        assert json.loads(b"".join(_chunks(iter(()), "json", None, "items", 64))) == []
+
+    def test_gzip_chunks_decodable_incrementally(self) -> None:
+        chunks = [b"[1", b",2", b",3]"]
+        compressed = list(_gzipped(iter(chunks)))
+        assert gzip.decompress(b"".join(compressed)) == b"[1,2,3]"
+        # Each sync-flushed chunk is decodable on its own as it arrives
+        decoder = zlib.decompressobj(31)
+        assert decoder.decompress(compressed[0]) == b"[1"
+
+
+class TestSkuSalesCursor:
+
+    def test_read_sku_sales_matches_full_scan(self, tmp_path) -> None:
+        layer = CSVLayer(data_dir=tmp_path)
+        base = date(2026, 3, 1)
+        layer.write_sales([
+            SalesRecord(date=base + timedelta(days=i % 9), sku=f"00100{i % 3}", qty_sold=i)
+            for i in range(30)
+        ])
+        layer.read_sku_sales("001000")  # build the index
+        layer.append_sales_batch([SalesRecord(date=base, sku="001001", qty_sold=99, promo_flag=1)])
+        layer.write_sales_record(SalesRecord(date=base, sku="001002", qty_sold=5))
+
+        for sku in ("001000", "001001", "001002", "MISSING"):
+            expected = sorted((s for s in layer.read_sales() if s.sku == sku), key=lambda s: s.date, reverse=True)
+            assert layer.read_sku_sales(sku) == expected
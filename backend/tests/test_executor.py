@@ -0,0 +1,169 @@
+"""
+backend/tests/test_executor.py — Storage executor and keep-alive wiring.
+
+Tests cover:
+  TestStorageExecutor — single writer thread, reads not blocked by a write,
+                        503 when a lane is full
+  TestStorageRoutes   — routers run on the executor lanes by HTTP method;
+                        storage dependency and streamed chunks on the lane
+  TestKeepAlive       — ``Connection: close`` only when DOS_KEEP_ALIVE=0
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from dos_backend.api.app import create_app
+from dos_backend.api.deps import get_storage
+from dos_backend.api.errors import ServiceUnavailableError
+from dos_backend.api.executor import StorageExecutor, get_executor
+
+_V1 = "/api/v1"
+
+
+def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+class TestStorageExecutor:
+
+    def test_writes_serialized_on_one_thread(self) -> None:
+        executor = StorageExecutor(readers=2, queue_limit=8)
+
+        async def _main() -> list[str]:
+            return await asyncio.gather(*(executor.run("write", _thread_name) for _ in range(5)))
+
+        names = asyncio.run(_main())
+        executor.shutdown()
+        assert len(set(names)) == 1
+        assert names[0].startswith("dos-write")
+
+    def test_read_not_blocked_by_running_write(self) -> None:
+        executor = StorageExecutor(readers=2, queue_limit=8)
+        release = threading.Event()
+
+        async def _main() -> str:
+            write = asyncio.ensure_future(executor.run("write", release.wait, 5.0))
+            name = await asyncio.wait_for(executor.run("read", _thread_name), timeout=2.0)
+            assert not write.done()
+            release.set()
+            assert await write is True
+            return name
+
+        assert asyncio.run(_main()).startswith("dos-read")
+        executor.shutdown()
+
+    def test_full_lane_fails_fast(self) -> None:
+        executor = StorageExecutor(readers=1, queue_limit=1)
+        release = threading.Event()
+
+        async def _main() -> None:
+            write = asyncio.ensure_future(executor.run("write", release.wait, 5.0))
+            await asyncio.sleep(0)  # let the first write take the slot
+            assert executor.pending("write") == 1
+            with pytest.raises(ServiceUnavailableError):
+                await executor.run("write", _thread_name)
+            # The read lane has its own budget
+            assert (await executor.run("read", _thread_name)).startswith("dos-read")
+            release.set()
+            await write
+            assert executor.pending("write") == 0
+
+        asyncio.run(_main())
+        executor.shutdown()
+
+
+class TestStorageRoutes:
+
+    def test_routes_run_on_executor_lanes(self, client: TestClient, mem_storage) -> None:
+        assert get_executor() is not None  # installed by the lifespan
+        seen: dict[str, str] = {}
+        read_skus, write_transaction = mem_storage.read_skus, mem_storage.write_transaction
+
+        def _read_skus():
+            seen.setdefault("read", _thread_name())
+            return read_skus()
+
+        def _write_transaction(txn):
+            seen["write"] = _thread_name()
+            return write_transaction(txn)
+
+        mem_storage.read_skus = _read_skus
+        mem_storage.write_transaction = _write_transaction
+
+        assert client.get(f"{_V1}/stock").status_code == 200
+        r = client.post(f"{_V1}/exceptions", json={
+            "date": "2026-02-25", "sku": "0010001", "event": "WASTE", "qty": 3,
+        })
+        assert r.status_code == 201
+        assert seen["read"].startswith("dos-read")
+        assert seen["write"].startswith("dos-write")
+
+    def test_storage_dependency_resolved_on_lane(self, client: TestClient, mem_storage) -> None:
+        seen: list[tuple[str, str]] = []
+
+        def _storage():
+            seen.append(("open", _thread_name()))
+            try:
+                yield mem_storage
+            finally:
+                seen.append(("close", _thread_name()))
+
+        client.app.dependency_overrides[get_storage] = _storage
+        assert client.get(f"{_V1}/stock").status_code == 200
+        r = client.post(f"{_V1}/exceptions", json={
+            "date": "2026-02-25", "sku": "0010001", "event": "WASTE", "qty": 3,
+        })
+        assert r.status_code == 201
+        assert [event for event, _ in seen] == ["open", "close", "open", "close"]
+        assert all(name.startswith("dos-read") for _, name in seen[:2])
+        assert all(name.startswith("dos-write") for _, name in seen[2:])
+
+    def test_streamed_chunks_on_reader_lane(self, client: TestClient, mem_storage) -> None:
+        seen: list[str] = []
+        read_sku_transactions = mem_storage.read_sku_transactions
+
+        def _read_sku_transactions(*args, **kwargs):
+            seen.append(_thread_name())
+            return read_sku_transactions(*args, **kwargs)
+
+        def _storage():
+            try:
+                yield mem_storage
+            finally:
+                seen.append("closed")
+
+        mem_storage.read_sku_transactions = _read_sku_transactions
+        client.app.dependency_overrides[get_storage] = _storage
+        r = client.get(f"{_V1}/stock", headers={"Accept": "application/x-ndjson"})
+        assert r.status_code == 200
+        assert len(r.text.splitlines()) == len(seen) - 1 > 0
+        assert all(name.startswith("dos-read") for name in seen[:-1])
+        assert seen[-1] == "closed"  # torn down only after the body was sent
+
+    def test_executor_removed_on_shutdown(self) -> None:
+        with TestClient(create_app()):
+            assert get_executor() is not None
+        assert get_executor() is None
+
+    def test_disabled_executor_falls_back_to_threadpool(self, monkeypatch) -> None:
+        monkeypatch.setenv("DOS_STORAGE_READERS", "0")
+        with TestClient(create_app()) as tc:
+            assert get_executor() is None
+            assert tc.get("/health").status_code == 200
+
+
+class TestKeepAlive:
+
+    def test_keep_alive_by_default(self, monkeypatch) -> None:
+        monkeypatch.delenv("DOS_KEEP_ALIVE", raising=False)
+        r = TestClient(create_app()).get("/health")
+        assert r.headers.get("connection") != "close"
+
+    def test_connection_close_opt_in(self, monkeypatch) -> None:
+        monkeypatch.setenv("DOS_KEEP_ALIVE", "0")
+        r = TestClient(create_app()).get("/health")
+        assert r.headers["connection"] == "close"
@@ -0,0 +1,154 @@
+"""
+backend/tests/test_idempotency.py — Unit tests for the idempotency key store.
+
+Tests cover:
+  TestFastPath    — finalised keys replayed from the in-process LRU (no SQL)
+  TestWaiters     — same-process wake-up and cross-process polling fallback
+  TestCompaction  — TTL deletion of old keys and the background compactor
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from dos_backend.api import idempotency
+
+
+@pytest.fixture()
+def db_file(tmp_path):
+    return str(tmp_path / "idem.db")
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    idempotency.ensure_schema(conn)
+    return conn
+
+
+class TestFastPath:
+    def test_finalized_key_replayed_without_sql(self, db_file) -> None:
+        conn = _connect(db_file)
+        assert idempotency.try_claim(conn, "evt-1", "POST /x") is True
+        idempotency.finalize(conn, "evt-1", 201, {"ok": True})
+
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+        stored = idempotency.lookup(conn, "evt-1")
+        assert stored == (201, {"ok": True})
+        stored[1]["already_recorded"] = True  # routers mutate the replay
+        assert idempotency.lookup(conn, "evt-1") == (201, {"ok": True})
+        assert idempotency.try_claim(conn, "evt-1", "POST /x") is False
+        idempotency.ensure_schema(conn)
+        assert not [s for s in statements if "api_idempotency_keys" in s]
+        conn.close()
+
+    def test_cache_scoped_to_database_file(self, tmp_path) -> None:
+        first = _connect(str(tmp_path / "a.db"))
+        second = _connect(str(tmp_path / "b.db"))
+        idempotency.try_claim(first, "evt-shared", "POST /x")
+        idempotency.finalize(first, "evt-shared", 201, {"db": "a"})
+
+        assert idempotency.lookup(second, "evt-shared") is None
+        assert idempotency.try_claim(second, "evt-shared", "POST /x") is True
+        first.close()
+        second.close()
+
+
+class TestWaiters:
+    def test_waiter_woken_by_finalize(self, db_file) -> None:
+        winner = _connect(db_file)
+        loser = _connect(db_file)
+        assert idempotency.try_claim(winner, "evt-wait", "POST /x") is True
+        assert idempotency.try_claim(loser, "evt-wait", "POST /x") is False
+
+        result: list = []
+        waiter = threading.Thread(
+            target=lambda: result.append(
+                idempotency.lookup_with_wait(loser, "evt-wait", max_retries=2, delay=10.0)
+            )
+        )
+        started = time.monotonic()
+        waiter.start()
+        time.sleep(0.1)
+        idempotency.finalize(winner, "evt-wait", 201, {"id": 7})
+        waiter.join(timeout=5.0)
+
+        assert result == [(201, {"id": 7})]
+        assert time.monotonic() - started < 5.0  # woken, not timed out
+        winner.close()
+        loser.close()
+
+    def test_other_process_finalize_seen_by_polling(self, db_file) -> None:
+        conn = _connect(db_file)
+        assert idempotency.try_claim(conn, "evt-remote", "POST /x") is True
+
+        def _remote_finalize() -> None:
+            time.sleep(0.05)
+            # Plain SQL: no in-process notification, like another worker.
+            other = sqlite3.connect(db_file)
+            other.execute(
+                "UPDATE api_idempotency_keys SET status_code = 201, response_json = ? "
+                "WHERE client_event_id = ?",
+                ('{"remote": true}', "evt-remote"),
+            )
+            other.commit()
+            other.close()
+
+        thread = threading.Thread(target=_remote_finalize)
+        thread.start()
+        stored = idempotency.lookup_with_wait(conn, "evt-remote", max_retries=50, delay=0.02)
+        thread.join()
+        assert stored == (201, {"remote": True})
+        conn.close()
+
+
+class TestCompaction:
+    def test_compact_deletes_keys_older_than_ttl(self, db_file) -> None:
+        conn = _connect(db_file)
+        conn.executemany(
+            "INSERT INTO api_idempotency_keys "
+            "(client_event_id, endpoint, created_at, status_code, response_json) "
+            "VALUES (?, 'POST /x', ?, ?, '{}')",
+            [
+                ("old-done", "2020-01-01T00:00:00Z", 201),
+                ("old-pending", "2020-01-02T00:00:00Z", 0),
+            ],
+        )
+        conn.commit()
+        idempotency.try_claim(conn, "fresh", "POST /x")
+        idempotency.finalize(conn, "fresh", 201, {})
+
+        assert idempotency.compact(conn, ttl_days=30, batch_size=1) == 2
+        remaining = [r[0] for r in conn.execute("SELECT client_event_id FROM api_idempotency_keys")]
+        assert remaining == ["fresh"]
+        assert idempotency.lookup(conn, "fresh") == (201, {})
+        conn.close()
+
+    def test_compactor_thread_runs_and_stops(self, db_file) -> None:
+        conn = _connect(db_file)
+        conn.execute(
+            "INSERT INTO api_idempotency_keys "
+            "(client_event_id, endpoint, created_at, status_code, response_json) "
+            "VALUES ('ancient', 'POST /x', '2019-05-05T00:00:00Z', 201, '{}')"
+        )
+        conn.commit()
+
+        compactor = idempotency.IdempotencyCompactor(db_file, ttl_days=30, interval=3600)
+        compactor.start()
+        deadline = time.monotonic() + 5.0
+        while time.monotonic() < deadline:
+            if conn.execute("SELECT COUNT(*) FROM api_idempotency_keys").fetchone()[0] == 0:
+                break
+            time.sleep(0.01)
+        compactor.stop()
+
+        assert conn.execute("SELECT COUNT(*) FROM api_idempotency_keys").fetchone()[0] == 0
+        conn.close()
+
+    def test_compactor_never_creates_a_database(self, tmp_path) -> None:
+        missing = tmp_path / "missing.db"
+        assert idempotency.IdempotencyCompactor(str(missing)).run_once() == 0
+        assert not missing.exists()
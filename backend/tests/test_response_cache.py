@@ -0,0 +1,109 @@
+"""
+backend/tests/test_response_cache.py — Revision-keyed response cache of the read endpoints.
+
+Tests cover:
+  TestCachedEndpoints — hits skip storage, ETag / 304, writes invalidate,
+                        errors never cached
+  TestResponseCache   — LRU bound and revision switch
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from dos_backend.api.response_cache import ResponseCache
+from dos_backend.domain.models import EventType, Transaction
+
+from .conftest import SEED_EAN_PLAIN
+
+_V1 = "/api/v1"
+
+
+def _count_sku_reads(mem_storage) -> list[int]:
+    calls = [0]
+    read_skus = mem_storage.read_skus
+
+    def _read_skus():
+        calls[0] += 1
+        return read_skus()
+
+    mem_storage.read_skus = _read_skus
+    return calls
+
+
+class TestCachedEndpoints:
+
+    def test_repeated_scan_served_from_cache(self, client: TestClient, mem_storage) -> None:
+        calls = _count_sku_reads(mem_storage)
+        first = client.get(f"{_V1}/skus/by-ean/{SEED_EAN_PLAIN}")
+        second = client.get(f"{_V1}/skus/by-ean/{SEED_EAN_PLAIN}")
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        assert first.json()["sku"] == "0010001"
+        assert first.headers["etag"] == second.headers["etag"]
+        assert calls[0] == 1
+
+        search = client.get(f"{_V1}/skus/search?limit=2")
+        assert client.get(f"{_V1}/skus/search?limit=2").json() == search.json()
+        assert [r["sku"] for r in search.json()["results"]] == ["0010001", "0010002"]
+        assert calls[0] == 2
+
+    def test_if_none_match_returns_304(self, client: TestClient, mem_storage) -> None:
+        etag = client.get(f"{_V1}/skus/scanner-preload").headers["etag"]
+        calls = _count_sku_reads(mem_storage)
+        r = client.get(f"{_V1}/skus/scanner-preload", headers={"If-None-Match": etag})
+        assert r.status_code == 304
+        assert r.headers["etag"] == etag
+        assert r.content == b""
+        assert calls[0] == 0
+
+    def test_write_invalidates(self, client: TestClient, mem_storage) -> None:
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
+        mem_storage.write_transactions_batch([
+            Transaction(date=date.today() - timedelta(days=2), sku="0010001", event=EventType.SNAPSHOT, qty=10),
+        ])
+        before = client.get(f"{_V1}/stock/0010001")
+        assert before.json()["on_hand"] == 10
+
+        r = client.post(f"{_V1}/exceptions", json={
+            "date": yesterday, "sku": "0010001", "event": "WASTE", "qty": 3,
+        })
+        assert r.status_code == 201
+        after = client.get(f"{_V1}/stock/0010001", headers={"If-None-Match": before.headers["etag"]})
+        assert after.status_code == 200
+        assert after.json()["on_hand"] == 7
+        assert after.headers["etag"] != before.headers["etag"]
+        assert client.get(f"{_V1}/stock").json()["items"][0]["on_hand"] == 7
+
+    def test_errors_not_cached(self, client: TestClient, mem_storage) -> None:
+        calls = _count_sku_reads(mem_storage)
+        assert client.get(f"{_V1}/stock/NOPE").status_code == 404
+        assert client.get(f"{_V1}/stock/NOPE").status_code == 404
+        assert calls[0] == 2
+
+
+class TestResponseCache:
+
+    def test_lru_bound(self) -> None:
+        cache = ResponseCache(maxsize=2)
+        cache.put(("a",), '"r1"', b"1")
+        cache.put(("b",), '"r1"', b"2")
+        assert cache.get(("a",), '"r1"') == b"1"  # a is now most recent
+        cache.put(("c",), '"r1"', b"3")
+        assert len(cache) == 2
+        assert cache.get(("b",), '"r1"') is None
+        assert cache.get(("a",), '"r1"') == b"1"
+
+    def test_new_revision_drops_old_entries(self) -> None:
+        cache = ResponseCache(maxsize=8)
+        cache.put(("a",), '"r1"', b"1")
+        assert cache.get(("a",), '"r2"') is None
+        cache.put(("b",), '"r2"', b"2")
+        assert len(cache) == 1
+        assert cache.get(("a",), '"r1"') is None
+
+    def test_disabled(self) -> None:
+        cache = ResponseCache(maxsize=0)
+        cache.put(("a",), '"r1"', b"1")
+        assert cache.get(("a",), '"r1"') is None
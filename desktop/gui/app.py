@@ -1009,7 +1009,7 @@ class DesktopOrderApp:
         """Compute Importance / Health / Priority scores for all SKUs and write to sku_scores_daily.csv."""
         try:
             from dataclasses import asdict
-            from dos_backend.analytics.scoring import build_feature_row, score_all_skus
+            from dos_backend.analytics.scoring import build_feature_row, index_sales_by_sku, score_all_skus
 
             today = date.today()
             lookback_days = self.kpi_lookback_var.get()
@@ -1043,7 +1043,8 @@ class DesktopOrderApp:
 
             logger.info(f"Building feature rows for {len(sku_ids)} SKUs (lookback={lookback_days}d) ...")
 
-            # --- Build FeatureRows ---
+            # --- Build FeatureRows (sales grouped once, not rescanned per SKU) ---
+            sales_by_sku = index_sales_by_sku(sales_records)
             feature_rows = []
             for sku_id in sku_ids:
                 try:
@@ -1053,7 +1054,7 @@ class DesktopOrderApp:
                         sku=sku_id,
                         ref_date=today,
                         lookback_days=lookback_days,
-                        sales_records=sales_records,
+                        sales_records=sales_by_sku.get(sku_id, []),
                         transactions=transactions,
                         kpi_record=kpi_by_sku.get(sku_id),
                         sku_obj=sku_obj,
@@ -1067,7 +1068,7 @@ class DesktopOrderApp:
                 messagebox.showwarning("Attenzione", "Nessun feature row estratto. Controllare i dati.")
                 return
 
-            # --- Score ---
+            # --- Score (columnar: one sort per ranking, vectorised health) ---
             logger.info(f"Scoring {len(feature_rows)} SKUs ...")
             results = score_all_skus(feature_rows)
 
@@ -0,0 +1,32 @@
+-- Migration 008: Restore indexes lost by the table rebuilds of migration 007
+-- DROP TABLE in 007 also dropped every index of skus, transactions,
+-- order_logs and receiving_logs; the renamed *_new tables had none.
+-- idx_transactions_sku_date in particular backs the per-SKU keyset
+-- pagination of the audit timeline (LedgerRepository.list_transactions_for_sku_page).
+
+CREATE INDEX IF NOT EXISTS idx_skus_in_assortment ON skus(in_assortment) WHERE in_assortment = 1;
+CREATE INDEX IF NOT EXISTS idx_skus_category ON skus(category) WHERE category != '';
+CREATE INDEX IF NOT EXISTS idx_skus_department ON skus(department) WHERE department != '';
+CREATE INDEX IF NOT EXISTS idx_skus_demand_variability ON skus(demand_variability);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_sku_date ON transactions(sku, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_event ON transactions(event);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
+CREATE INDEX IF NOT EXISTS idx_transactions_receipt_date ON transactions(receipt_date) WHERE receipt_date IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_order_logs_sku_status ON order_logs(sku, status);
+CREATE INDEX IF NOT EXISTS idx_order_logs_date ON order_logs(date);
+CREATE INDEX IF NOT EXISTS idx_order_logs_receipt_date ON order_logs(receipt_date) WHERE receipt_date IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_order_logs_status ON order_logs(status);
+
+CREATE INDEX IF NOT EXISTS idx_receiving_logs_sku ON receiving_logs(sku);
+CREATE INDEX IF NOT EXISTS idx_receiving_logs_date ON receiving_logs(date);
+CREATE INDEX IF NOT EXISTS idx_receiving_logs_receipt_date ON receiving_logs(receipt_date);
+
+-- Update schema version
+INSERT INTO schema_version (version, description, checksum)
+VALUES (
+    8,
+    'Restore indexes dropped by the migration 007 table rebuilds',
+    'sha256:008_restore_indexes_after_rebuild'
+);
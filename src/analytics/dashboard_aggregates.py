@@ -0,0 +1,275 @@
+"""
+Dashboard aggregate store: daily sales / waste totals per SKU and overall.
+
+The dashboard charts (daily bars, weekly comparison, per-SKU sales and
+waste) are rendered from these precomputed day buckets instead of scanning
+the full sales list and ledger once per plotted day.
+
+The store is maintained incrementally:
+  - ``sync()`` with an unchanged revision token is a no-op;
+  - rows appended after the previously consumed prefix (EOD closes, new
+    sales, new WASTE events) are folded into the buckets;
+  - when the storage reports an unchanged rewrite epoch (only appends since
+    the last sync, see ``CSVLayer.rewrite_epoch``) just the last consumed
+    row is checked, so a sync costs O(new rows);
+  - otherwise any change (rewrite, in-place upsert, deletion) is detected
+    via a CRC of the consumed prefix and triggers a single-pass rebuild.
+
+The buckets are persisted as JSON next to the data files, so the first
+dashboard refresh after a restart only folds in what changed meanwhile.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import zlib
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..domain.models import EventType, SalesRecord, Transaction
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES_FILENAME = "dashboard_aggregates.json"
+_FORMAT_VERSION = 2
+
+
+def moving_average(values: Sequence[float], period: int) -> List[float]:
+    """
+    Trailing moving average (rolling sum).
+
+    Returns:
+        ``len(values) - period + 1`` averages (empty if fewer values than period)
+    """
+    if period <= 0 or len(values) < period:
+        return []
+    window = sum(values[:period])
+    result = [window / period]
+    for i in range(period, len(values)):
+        window += values[i] - values[i - period]
+        result.append(window / period)
+    return result
+
+
+class _DailyBuckets:
+    """Per-day totals (by SKU and overall) over a consumed prefix of a row list."""
+
+    def __init__(self):
+        self.count = 0
+        self.crc = 0
+        self.last_key = ""
+        self.epoch: Any = None
+        self.by_sku: Dict[str, Dict[int, int]] = {}
+        self.total: Dict[int, int] = {}
+
+    def reset(self):
+        self.__init__()
+
+    def sync(
+        self,
+        rows: Sequence[Any],
+        row_key: Callable[[Any], str],
+        extract: Callable[[Any], Optional[Tuple[str, int, int]]],
+        epoch: Any = None,
+    ) -> bool:
+        """
+        Fold new rows in (or rebuild if the consumed prefix changed). Returns True if modified.
+
+        ``epoch`` equal to the one of the previous sync means the rows were
+        only appended to: the prefix is then validated by its last row alone.
+        """
+        n = len(rows)
+        if self.count:
+            if n < self.count:
+                valid = False
+            elif epoch is not None and epoch == self.epoch:
+                valid = row_key(rows[self.count - 1]) == self.last_key
+            else:
+                valid = zlib.crc32("\n".join(map(row_key, rows[:self.count])).encode()) == self.crc
+            if not valid:
+                self.reset()
+        changed = epoch != self.epoch
+        self.epoch = epoch
+        if n == self.count:
+            return changed
+        tail = rows[self.count:]
+        # Chained CRC: crc(prefix + "\n" + tail) without re-hashing the prefix
+        keys = [row_key(row) for row in tail]
+        self.crc = zlib.crc32((("\n" if self.count else "") + "\n".join(keys)).encode(), self.crc)
+        self.last_key = keys[-1]
+        self.count = n
+        for row in tail:
+            item = extract(row)
+            if item is None:
+                continue
+            sku, day, qty = item
+            per_sku = self.by_sku.setdefault(sku, {})
+            per_sku[day] = per_sku.get(day, 0) + qty
+            self.total[day] = self.total.get(day, 0) + qty
+        return True
+
+    def series(self, end: date, days: int, sku: Optional[str] = None) -> List[int]:
+        buckets = self.total if sku is None else self.by_sku.get(sku, {})
+        last = end.toordinal()
+        return [buckets.get(d, 0) for d in range(last - days + 1, last + 1)]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "crc": self.crc,
+            "last_key": self.last_key,
+            "epoch": self.epoch,
+            "by_sku": {sku: {str(d): q for d, q in days.items()} for sku, days in self.by_sku.items()},
+            "total": {str(d): q for d, q in self.total.items()},
+        }
+
+    @classmethod
+    def from_json(cls, payload: Dict[str, Any]) -> "_DailyBuckets":
+        buckets = cls()
+        buckets.count = int(payload["count"])
+        buckets.crc = int(payload["crc"])
+        buckets.last_key = str(payload["last_key"])
+        buckets.epoch = payload["epoch"]
+        buckets.by_sku = {
+            sku: {int(d): int(q) for d, q in days.items()} for sku, days in payload["by_sku"].items()
+        }
+        buckets.total = {int(d): int(q) for d, q in payload["total"].items()}
+        return buckets
+
+
+def _json_token(value: Any) -> Any:
+    """``value`` as it reads back from the persisted JSON (tuples become lists)."""
+    return json.loads(json.dumps(value)) if value is not None else None
+
+
+def _sales_key(s: SalesRecord) -> str:
+    return f"{s.date.toordinal()}|{s.sku}|{s.qty_sold}"
+
+
+def _sales_item(s: SalesRecord) -> Tuple[str, int, int]:
+    return s.sku, s.date.toordinal(), s.qty_sold
+
+
+def _txn_key(t: Transaction) -> str:
+    return f"{t.date.toordinal()}|{t.sku}|{t.event.value}|{t.qty}"
+
+
+def _waste_item(t: Transaction) -> Optional[Tuple[str, int, int]]:
+    if t.event != EventType.WASTE:
+        return None
+    return t.sku, t.date.toordinal(), t.qty
+
+
+class DashboardAggregates:
+    """
+    Daily/weekly sales and waste series for the dashboard, kept in sync with storage.
+
+    Thread-safe: ``sync`` may run on a GUI worker while the main thread reads series.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: JSON persistence file (None = in-memory only)
+        """
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.Lock()
+        self._revision: Any = None
+        self._sales = _DailyBuckets()
+        self._waste = _DailyBuckets()
+
+    @classmethod
+    def load(cls, data_dir) -> "DashboardAggregates":
+        """Load the persisted store from ``data_dir`` (empty store if missing/corrupt)."""
+        store = cls(Path(data_dir) / AGGREGATES_FILENAME)
+        try:
+            with open(store.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("version") == _FORMAT_VERSION:
+                store._revision = payload.get("revision")
+                store._sales = _DailyBuckets.from_json(payload["sales"])
+                store._waste = _DailyBuckets.from_json(payload["waste"])
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable dashboard aggregates ({store.path}): {e}")
+            store._sales = _DailyBuckets()
+            store._waste = _DailyBuckets()
+        return store
+
+    def sync(
+        self,
+        sales_records: Sequence[SalesRecord],
+        transactions: Sequence[Transaction],
+        revision: Any = None,
+        epochs: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Bring the buckets up to date with the given rows.
+
+        Args:
+            sales_records: All sales (storage order)
+            transactions: All ledger transactions (storage order)
+            revision: Storage revision token; an unchanged token skips all work
+            epochs: Rewrite tokens {"sales": ..., "transactions": ...} taken
+                before the rows were read (see ``CSVLayer.rewrite_epoch``);
+                missing/None tokens fall back to a full prefix check
+
+        Returns:
+            True if the buckets changed
+        """
+        token = _json_token(revision)
+        epochs = epochs or {}
+        with self._lock:
+            if token is not None and token == self._revision:
+                return False
+            changed = self._sales.sync(sales_records, _sales_key, _sales_item, _json_token(epochs.get("sales")))
+            changed = self._waste.sync(
+                transactions, _txn_key, _waste_item, _json_token(epochs.get("transactions"))
+            ) or changed
+            self._revision = token
+            if changed and self.path is not None:
+                self._save_locked()
+            return changed
+
+    def _save_locked(self):
+        payload = {
+            "version": _FORMAT_VERSION,
+            "revision": self._revision,
+            "sales": self._sales.to_json(),
+            "waste": self._waste.to_json(),
+        }
+        tmp = self.path.with_suffix(".json.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist dashboard aggregates: {e}")
+
+    # ------------------------------------------------------------------ #
+    # Series (oldest -> newest)
+    # ------------------------------------------------------------------ #
+
+    def daily_sales(self, end: date, days: int, sku: Optional[str] = None) -> List[int]:
+        """Units sold per day for the ``days`` days ending at ``end`` (all SKUs if sku is None)."""
+        with self._lock:
+            return self._sales.series(end, days, sku)
+
+    def daily_waste(self, end: date, days: int, sku: Optional[str] = None) -> List[int]:
+        """Units wasted (WASTE events) per day for the ``days`` days ending at ``end``."""
+        with self._lock:
+            return self._waste.series(end, days, sku)
+
+    def weekly_sales(self, end: date, weeks: int, sku: Optional[str] = None) -> List[int]:
+        """Units sold per 7-day window, the last window ending at ``end``."""
+        daily = self.daily_sales(end, weeks * 7, sku)
+        return [sum(daily[i:i + 7]) for i in range(0, len(daily), 7)]
+
+    def sku_totals(self) -> Dict[str, int]:
+        """All-time units sold per SKU (in first-sale order)."""
+        with self._lock:
+            return {sku: sum(days.values()) for sku, days in self._sales.by_sku.items()}
@@ -8,6 +8,7 @@ Supports:
 - Rule types: single-date, range, fixed-date (annual recurrence)
 """
 from datetime import date, timedelta
+import itertools
 from dataclasses import dataclass, field
 from typing import Dict, List, Set, Optional, Any
 from enum import Enum
@@ -156,6 +157,50 @@ def italian_public_holidays(year: int) -> Dict[date, str]:
     return holidays
 
 
+# Every change to a calendar's rules / disabled holidays stamps it with a new
+# process-unique version, so resolution caches keyed on it (see
+# domain.calendar) never need to re-read the rules on a lookup.
+_CALENDAR_VERSIONS = itertools.count(1)
+
+_LIST_MUTATORS = (
+    "append", "extend", "insert", "remove", "pop", "clear", "sort", "reverse",
+    "__setitem__", "__delitem__", "__iadd__", "__imul__",
+)
+_SET_MUTATORS = (
+    "add", "discard", "remove", "pop", "clear", "update", "difference_update",
+    "intersection_update", "symmetric_difference_update",
+    "__ior__", "__iand__", "__isub__", "__ixor__",
+)
+
+
+def _change_tracking(base: type, mutators: tuple) -> type:
+    """Subclass of ``base`` calling ``self._on_change()`` after every in-place mutation."""
+    def _wrap(name):
+        original = getattr(base, name)
+
+        def method(self, *args, **kwargs):
+            result = original(self, *args, **kwargs)
+            self._on_change()
+            return result
+        method.__name__ = name
+        return method
+
+    def __init__(self, items=(), on_change=lambda: None):
+        base.__init__(self, items)
+        self._on_change = on_change
+
+    def __reduce__(self):
+        return (base, (base(self),))  # copies / pickles are plain containers
+
+    namespace = {name: _wrap(name) for name in mutators}
+    namespace.update(__init__=__init__, __reduce__=__reduce__)
+    return type(f"_Tracked{base.__name__.capitalize()}", (base,), namespace)
+
+
+_TrackedList = _change_tracking(list, _LIST_MUTATORS)
+_TrackedSet = _change_tracking(set, _SET_MUTATORS)
+
+
 @dataclass
 class HolidayCalendar:
     """
@@ -168,11 +213,32 @@ class HolidayCalendar:
             explicitly disabled (e.g. {"Natale", "Pasqua"}). These are stored in
             holidays.json under the key "disabled_system_holidays" and respected
             by is_holiday(), effects_on(), and list_holidays().
+        version: Process-unique stamp, renewed whenever rules or
+            disabled_system_holidays change (reassigned or edited in place).
+            Rules themselves are treated as values: replace a rule in the
+            list rather than mutating it.
     """
     rules: List[HolidayRule] = field(default_factory=list)
     disabled_system_holidays: Set[str] = field(default_factory=set)
     _cache: Dict[int, Dict[date, Set[HolidayEffect]]] = field(default_factory=dict, repr=False)
     
+    def __post_init__(self):
+        self._touch()
+    
+    def __setattr__(self, name: str, value: Any):
+        # rules / disabled_system_holidays are wrapped so that in-place edits
+        # bump ``version`` as well as reassignments
+        if name == "rules":
+            value = _TrackedList(value, self._touch)
+        elif name == "disabled_system_holidays":
+            value = _TrackedSet(value, self._touch)
+        object.__setattr__(self, name, value)
+        if name in ("rules", "disabled_system_holidays"):
+            self._touch()
+    
+    def _touch(self):
+        object.__setattr__(self, "version", next(_CALENDAR_VERSIONS))
+    
     @classmethod
     def from_config(cls, config_path: Path) -> 'HolidayCalendar':
         """
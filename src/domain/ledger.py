@@ -3,10 +3,12 @@ Stock calculation engine (AsOf logic).
 
 Core ledger processing: deterministic, testable, no I/O.
 """
+import threading
+from bisect import bisect_left
 from datetime import date, timedelta
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 from .models import Transaction, EventType, Stock, SalesRecord
 
@@ -127,11 +129,27 @@ class StockCalculator:
         """
         Calculate stock for all SKUs as-of a date.
         
+        Transactions and sales are bucketed by SKU in one pass, so each SKU
+        replays only its own events (same result as calling calculate_asof
+        per SKU against the full lists).
+        
         Returns:
             Dict {sku: Stock}
         """
+        wanted = set(all_skus)
+        txns_by_sku: Dict[str, List[Transaction]] = defaultdict(list)
+        for t in transactions:
+            if t.sku in wanted:
+                txns_by_sku[t.sku].append(t)
+        sales_by_sku: Dict[str, List[SalesRecord]] = defaultdict(list)
+        for s in sales_records or ():
+            if s.sku in wanted:
+                sales_by_sku[s.sku].append(s)
+        
         return {
-            sku: StockCalculator.calculate_asof(sku, asof_date, transactions, sales_records)
+            sku: StockCalculator.calculate_asof(
+                sku, asof_date, txns_by_sku.get(sku, []), sales_by_sku.get(sku) if sales_records else None
+            )
             for sku in all_skus
         }
     
@@ -333,6 +351,137 @@ class StockCalculator:
         return projected_on_hand + on_order_at_target - current_stock.unfulfilled_qty
 
 
+class StockTimeline:
+    """
+    Day-by-day stock history of one SKU from a single forward replay.
+
+    The SKU's events (plus implicit SALE events from sales records, with the
+    same ledger-SALE dedup) are sorted and applied once; the state at the end
+    of every day that has events is kept.  Any as-of query is then a binary
+    search, with results identical to ``StockCalculator.calculate_asof``.
+    """
+
+    def __init__(
+        self,
+        sku: str,
+        transactions: List[Transaction],
+        sales_records: Optional[List[SalesRecord]] = None,
+    ):
+        """
+        Args:
+            sku: SKU identifier
+            transactions: Ledger transactions (other SKUs are ignored)
+            sales_records: Daily sales records (optional, as in calculate_asof)
+        """
+        self.sku = sku
+        sku_txns = [t for t in transactions if t.sku == sku]
+        if sales_records:
+            dates_with_ledger_sale = {t.date for t in sku_txns if t.event == EventType.SALE}
+            sku_txns.extend(
+                Transaction(date=s.date, sku=s.sku, event=EventType.SALE, qty=s.qty_sold)
+                for s in sales_records
+                if s.sku == sku and s.date not in dates_with_ledger_sale
+            )
+
+        # End-of-day state (on_hand, on_order, unfulfilled) per day with events
+        self._days: List[date] = []
+        self._states: List[Tuple[int, int, int]] = []
+        on_hand = on_order = unfulfilled_qty = 0
+        for txn in StockCalculator._sort_transactions(sku_txns):
+            if self._days and self._days[-1] != txn.date:
+                self._states.append((on_hand, on_order, unfulfilled_qty))
+            if not self._days or self._days[-1] != txn.date:
+                self._days.append(txn.date)
+            if txn.event == EventType.SNAPSHOT:
+                on_hand = txn.qty
+                on_order = 0
+            elif txn.event == EventType.ORDER:
+                on_order += txn.qty
+            elif txn.event == EventType.RECEIPT:
+                on_order = max(0, on_order - txn.qty)
+                on_hand += txn.qty
+            elif txn.event in (EventType.SALE, EventType.WASTE):
+                on_hand = max(0, on_hand - txn.qty)
+            elif txn.event == EventType.ADJUST:
+                on_hand = max(0, txn.qty)
+            elif txn.event == EventType.UNFULFILLED:
+                unfulfilled_qty += txn.qty
+        if self._days:
+            self._states.append((on_hand, on_order, unfulfilled_qty))
+
+    def asof(self, asof_date: date) -> Stock:
+        """Stock with all events dated before ``asof_date`` applied (== calculate_asof)."""
+        i = bisect_left(self._days, asof_date)
+        on_hand, on_order, unfulfilled_qty = self._states[i - 1] if i else (0, 0, 0)
+        return Stock(
+            sku=self.sku,
+            on_hand=max(0, on_hand),
+            on_order=max(0, on_order),
+            unfulfilled_qty=max(0, unfulfilled_qty),
+            asof_date=asof_date,
+        )
+
+    def eod_on_hand(self, start: date, end: date) -> List[int]:
+        """End-of-day on_hand for every day from ``start`` to ``end`` (inclusive)."""
+        result: List[int] = []
+        i = bisect_left(self._days, start + timedelta(days=1))
+        on_hand = max(0, self._states[i - 1][0]) if i else 0
+        day = start
+        while day <= end:
+            # Fold in the events of ``day`` (at most one checkpoint per day)
+            if i < len(self._days) and self._days[i] == day:
+                on_hand = max(0, self._states[i][0])
+                i += 1
+            result.append(on_hand)
+            day += timedelta(days=1)
+        return result
+
+
+_TIMELINE_CACHE: "OrderedDict[tuple, StockTimeline]" = OrderedDict()
+_TIMELINE_CACHE_SIZE = 64
+_TIMELINE_LOCK = threading.Lock()
+
+
+def get_stock_timeline(
+    sku: str,
+    transactions: List[Transaction],
+    sales_records: Optional[List[SalesRecord]] = None,
+    revision=None,
+) -> StockTimeline:
+    """
+    Return the StockTimeline of ``sku``, shared across callers of the same data revision.
+
+    Args:
+        sku: SKU identifier
+        transactions / sales_records: Data the timeline is built from
+        revision: Storage revision token the data corresponds to
+            (``data_revision()``); None = build without caching
+
+    Returns:
+        StockTimeline (small LRU keyed on (sku, revision, with/without sales))
+    """
+    if revision is None:
+        return StockTimeline(sku, transactions, sales_records)
+    try:
+        key = (sku, revision, bool(sales_records))
+        hash(key)
+    except TypeError:
+        return StockTimeline(sku, transactions, sales_records)
+
+    with _TIMELINE_LOCK:
+        timeline = _TIMELINE_CACHE.get(key)
+        if timeline is not None:
+            _TIMELINE_CACHE.move_to_end(key)
+            return timeline
+    timeline = StockTimeline(sku, transactions, sales_records)
+    with _TIMELINE_LOCK:
+        _TIMELINE_CACHE[key] = timeline
+        _TIMELINE_CACHE.move_to_end(key)
+        while len(_TIMELINE_CACHE) > _TIMELINE_CACHE_SIZE:
+            _TIMELINE_CACHE.popitem(last=False)
+    return timeline
+
+
 def calculate_sold_from_eod_stock(
     sku: str,
     eod_date: date,
@@ -28,9 +28,9 @@ except ImportError:
 
 # Import promo calendar for promo-adjusted forecast
 try:
-    from src.promo_calendar import is_promo, promo_windows_for_sku
+    from src.promo_calendar import is_promo, promo_windows_for_sku, PromoIndex
 except ImportError:
-    from promo_calendar import is_promo, promo_windows_for_sku
+    from promo_calendar import is_promo, promo_windows_for_sku, PromoIndex
 
 
 def fit_forecast_model(
@@ -1160,7 +1160,10 @@ def promo_adjusted_forecast(
     filtered_promo_windows = promo_windows
     if store_id is None:
         # Global-only mode: exclude store-specific promo windows
-        filtered_promo_windows = [w for w in promo_windows if w.store_id is None]
+        if isinstance(promo_windows, PromoIndex):
+            filtered_promo_windows = promo_windows.global_only()
+        else:
+            filtered_promo_windows = [w for w in promo_windows if w.store_id is None]
     
     any_promo_active = False
     for forecast_date in horizon_dates:
@@ -1364,6 +1367,9 @@ def _find_promo_window_for_date(
     Returns:
         PromoWindow object if found, else None
     """
+    if isinstance(promo_windows, PromoIndex):
+        return promo_windows.find_window(check_date, sku_id, store_id)
+
     for window in promo_windows:
         # SKU filter
         if window.sku != sku_id:
@@ -11,7 +11,9 @@ from pathlib import Path
 import tempfile
 import os
 import csv
-from collections import defaultdict
+from functools import lru_cache
+from types import SimpleNamespace
+import importlib.util
 import logging
 
 try:
@@ -21,33 +23,56 @@ except ImportError:
     DateEntry = None
     TKCALENDAR_AVAILABLE = False
 
-try:
+def _module_available(name: str) -> bool:
+    """True if *name* can be imported, checked without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# Charting / barcode / QR libraries are only probed here; they are imported on
+# first use (_charting, _barcode_support, _qrcode_support) so that a cold start
+# loads just Tk and the storage layer.
+MATPLOTLIB_AVAILABLE = _module_available("matplotlib") and _module_available("numpy")
+if not MATPLOTLIB_AVAILABLE:
+    print("Warning: matplotlib not installed. Dashboard charts disabled.")
+
+BARCODE_AVAILABLE = _module_available("PIL") and _module_available("barcode")
+if not BARCODE_AVAILABLE:
+    print("Warning: python-barcode or Pillow not installed. Barcode rendering disabled.")
+
+QRCODE_AVAILABLE = _module_available("qrcode") and _module_available("PIL")
+
+
+@lru_cache(maxsize=None)
+def _charting() -> SimpleNamespace:
+    """Import matplotlib (TkAgg backend) and numpy on first chart use."""
     import matplotlib  # type: ignore[import-not-found]
     matplotlib.use('TkAgg')
     from matplotlib.figure import Figure  # type: ignore[import-not-found]
     from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg  # type: ignore[import-not-found]
     import matplotlib.pyplot as plt  # type: ignore[import-not-found]
     import numpy as np
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
-    print("Warning: matplotlib not installed. Dashboard charts disabled.")
+    return SimpleNamespace(Figure=Figure, FigureCanvasTkAgg=FigureCanvasTkAgg, plt=plt, np=np)
 
-try:
+
+@lru_cache(maxsize=None)
+def _barcode_support() -> SimpleNamespace:
+    """Import python-barcode and Pillow on first barcode render."""
     from PIL import Image, ImageTk  # type: ignore[import-untyped]
     import barcode  # type: ignore[import-untyped]
     from barcode.writer import ImageWriter  # type: ignore[import-untyped]
-    BARCODE_AVAILABLE = True
-except ImportError:
-    BARCODE_AVAILABLE = False
-    print("Warning: python-barcode or Pillow not installed. Barcode rendering disabled.")
+    return SimpleNamespace(Image=Image, ImageTk=ImageTk, barcode=barcode, ImageWriter=ImageWriter)
 
-try:
+
+@lru_cache(maxsize=None)
+def _qrcode_support() -> SimpleNamespace:
+    """Import qrcode and Pillow on first QR render."""
     import qrcode  # type: ignore[import-untyped]
-    from PIL import Image as _PilImage  # already imported above if BARCODE_AVAILABLE
-    QRCODE_AVAILABLE = True
-except ImportError:
-    QRCODE_AVAILABLE = False
+    import qrcode.constants  # type: ignore[import-untyped]
+    from PIL import Image, ImageTk  # type: ignore[import-untyped]
+    return SimpleNamespace(qrcode=qrcode, constants=qrcode.constants, Image=Image, ImageTk=ImageTk)
 
 from ..backend_manager import BackendManager, get_lan_ip
 
@@ -58,11 +83,15 @@ from ..domain.validation import colli_to_pezzi, format_pezzi_colli
 from ..domain.promo_uplift import estimate_uplift, UpliftReport
 from ..workflows.order import OrderWorkflow, calculate_daily_sales_average
 from ..workflows.projection import build_projection_series
+from ..workflows.proposal_context import ProposalRunContext
 from ..workflows.receiving import ExceptionWorkflow
 from ..workflows.receiving_v2 import ReceivingWorkflow
 from ..workflows.daily_close import DailyCloseWorkflow
 from .. import promo_calendar
-from .widgets import AutocompleteEntry
+from .widgets import AutocompleteEntry, RowModel, VirtualTreeview
+from .data_service import GuiDataService
+from .job_runner import JOB_RUNNING, JobRunner
+from ..analytics.dashboard_aggregates import DashboardAggregates, moving_average
 from .collapsible_frame import CollapsibleFrame
 from ..utils.logging_config import setup_logging, get_logger
 from ..utils.sku_validation import is_sku_canonical
@@ -103,6 +132,13 @@ class DesktopOrderApp:
             self.exception_workflow = ExceptionWorkflow(self.csv_layer)
             self.daily_close_workflow = DailyCloseWorkflow(self.csv_layer)
             
+            # Background loads/computations for refresh handlers (results via root.after)
+            self.data_service = GuiDataService(self.csv_layer, self.root)
+            # Long analytics operations (KPI, scoring, closed loop, simulation, import)
+            self.job_runner = JobRunner(self.root)
+            # Persisted daily/weekly sales + waste buckets for the dashboard charts
+            self.dashboard_aggregates = DashboardAggregates.load(self.csv_layer.data_dir)
+            
             logger.info("Application initialized successfully")
         except Exception as e:
             logger.critical(f"Failed to initialize application: {str(e)}", exc_info=True)
@@ -117,6 +153,8 @@ class DesktopOrderApp:
         
         # Order proposals storage
         self.current_proposals = []  # List[OrderProposal]
+        # Shared data of the run that produced current_proposals (projection chart)
+        self.proposal_context = None  # Optional[ProposalRunContext]
         
         # EOD stock edits storage (for daily close)
         self.eod_stock_edits = {}  # {sku: eod_stock_on_hand}
@@ -166,6 +204,9 @@ class DesktopOrderApp:
         # Intercept window close to gracefully stop the backend
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
+        # Data revision each tab was last refreshed at (lazy per-tab refresh)
+        self._tab_revisions: dict = {}
+
         # Create GUI
         self._create_widgets()
         self._refresh_all()
@@ -197,9 +238,20 @@ class DesktopOrderApp:
         export_menu.add_command(label="📊 Ordini + KPI + Breakdown", command=self._export_order_kpi_breakdown)
         export_menu.add_command(label="🔍 Order Explain (Audit Trail)", command=self._export_order_explain)
         
+        file_menu.add_separator()
+        file_menu.add_command(label="Attività in background...", command=self._show_job_history)
         file_menu.add_separator()
         file_menu.add_command(label="Esci", command=self._on_close)
         
+        # Job status bar (packed before the notebook so it keeps its row)
+        job_bar = ttk.Frame(self.root)
+        job_bar.pack(side="bottom", fill="x", padx=5)
+        self.job_status_var = tk.StringVar(value="")
+        ttk.Label(job_bar, textvariable=self.job_status_var, foreground="gray").pack(side="left")
+        self.job_cancel_btn = ttk.Button(job_bar, text="Annulla", command=self._cancel_running_jobs)
+        ttk.Button(job_bar, text="Attività", command=self._show_job_history).pack(side="right")
+        self.job_runner.add_listener(self._update_job_status)
+        
         # Tab notebook
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill="both", expand=True, padx=5, pady=5)
@@ -307,20 +359,27 @@ class DesktopOrderApp:
             ttk.Label(date_frame, text="(Installa tkcalendar)").pack(side="left", padx=5)
         ttk.Button(date_frame, text="Aggiorna", command=self._refresh_stock_tab).pack(side="left", padx=5)
         
-        # Stock table
+        # Stock table (virtualized: rows are (StockState, SKU) records keyed by SKU)
         stock_frame = ttk.Frame(left_panel)
         stock_frame.pack(fill="both", expand=True)
         
-        stock_scroll = ttk.Scrollbar(stock_frame)
-        stock_scroll.pack(side="right", fill="y")
-        
-        self.stock_treeview = ttk.Treeview(
+        self.stock_treeview = VirtualTreeview(
             stock_frame,
             columns=("SKU", "Description", "On Hand", "On Order", "Available", "EOD Stock"),
+            formatter=self._format_stock_row,
+            tagger=lambda sku_id, row: ("eod_edited",) if sku_id in self.eod_stock_edits else (),
+            model=RowModel(
+                sort_keys={
+                    "SKU": lambda sku_id, row: sku_id,
+                    "On Hand": lambda sku_id, row: row[0].on_hand,
+                    "On Order": lambda sku_id, row: row[0].on_order,
+                    "Available": lambda sku_id, row: row[0].available(),
+                    "EOD Stock": lambda sku_id, row: self.eod_stock_edits.get(sku_id, -1),
+                },
+                search_text=lambda sku_id, row: f"{sku_id} {row[1].description if row[1] else 'N/A'}",
+            ),
             height=15,
-            yscrollcommand=stock_scroll.set,
         )
-        stock_scroll.config(command=self.stock_treeview.yview)
         
         self.stock_treeview.column("#0", width=0, stretch=tk.NO)
         self.stock_treeview.column("SKU", anchor=tk.W, width=80)
@@ -409,9 +468,11 @@ class DesktopOrderApp:
         self.audit_timeline_treeview.heading("Note", text="Note", anchor=tk.W)
         
         self.audit_timeline_treeview.pack(fill="both", expand=True)
+        self.audit_timeline_treeview.bind("<Double-1>", self._on_audit_timeline_double_click)
         
         # Store selected SKU for audit
         self.selected_sku_for_audit = None
+        self._audit_ledger_cursor = None
     
     def _build_dashboard_tab(self):
         """Build Dashboard tab with KPI analytics and charts."""
@@ -588,31 +649,10 @@ class DesktopOrderApp:
         charts_frame = ttk.LabelFrame(content_frame, text="Grafici & Tendenze", padding=5)
         charts_frame.pack(side="left", fill="both", expand=True, padx=(0, 5))
         
-        if MATPLOTLIB_AVAILABLE:
-            # Create matplotlib figure with 2 subplots
-            self.dashboard_figure = Figure(figsize=(8, 6), dpi=80)
-            
-            # Subplot 1: Daily Sales (Last 30 Days) - top
-            self.daily_sales_ax = self.dashboard_figure.add_subplot(2, 1, 1)
-            self.daily_sales_ax.set_title("Vendite Giornaliere (Ultimi 30 Giorni)")
-            self.daily_sales_ax.set_xlabel("Data")
-            self.daily_sales_ax.set_ylabel("Unità Vendute")
-            self.daily_sales_ax.grid(True, alpha=0.3)
-            
-            # Subplot 2: Weekly Sales Comparison (Last 8 Weeks) - bottom
-            self.weekly_sales_ax = self.dashboard_figure.add_subplot(2, 1, 2)
-            self.weekly_sales_ax.set_title("Confronto Vendite Settimanali (Ultime 8 Settimane)")
-            self.weekly_sales_ax.set_xlabel("Settimana")
-            self.weekly_sales_ax.set_ylabel("Unità Vendute")
-            self.weekly_sales_ax.grid(True, alpha=0.3)
-            
-            self.dashboard_figure.tight_layout()
-            
-            # Embed in Tkinter
-            self.dashboard_canvas = FigureCanvasTkAgg(self.dashboard_figure, master=charts_frame)
-            self.dashboard_canvas.draw()
-            self.dashboard_canvas.get_tk_widget().pack(fill="both", expand=True)
-        else:
+        # Figure is created on first dashboard refresh (see _ensure_dashboard_charts)
+        self.dashboard_charts_frame = charts_frame
+        self.dashboard_figure = None
+        if not MATPLOTLIB_AVAILABLE:
             ttk.Label(charts_frame, text="Grafici disabilitati (matplotlib non installato)", foreground="gray").pack(pady=50)
         
         # Right panel: Top SKUs
@@ -676,93 +716,137 @@ class DesktopOrderApp:
             font=("Helvetica", 9),
             foreground="gray"
         ).pack(fill="x", padx=5, pady=5)
-        
-        # Initial load
-        self._refresh_dashboard()
     
+    def _ensure_dashboard_charts(self) -> bool:
+        """Create the dashboard figure on first use (imports matplotlib lazily)."""
+        if self.dashboard_figure is not None:
+            return True
+        if not MATPLOTLIB_AVAILABLE:
+            return False
+        charting = _charting()
+        # Create matplotlib figure with 2 subplots
+        self.dashboard_figure = charting.Figure(figsize=(8, 6), dpi=80)
+        
+        # Subplot 1: Daily Sales (Last 30 Days) - top
+        self.daily_sales_ax = self.dashboard_figure.add_subplot(2, 1, 1)
+        self.daily_sales_ax.set_title("Vendite Giornaliere (Ultimi 30 Giorni)")
+        self.daily_sales_ax.set_xlabel("Data")
+        self.daily_sales_ax.set_ylabel("Unità Vendute")
+        self.daily_sales_ax.grid(True, alpha=0.3)
+        
+        # Subplot 2: Weekly Sales Comparison (Last 8 Weeks) - bottom
+        self.weekly_sales_ax = self.dashboard_figure.add_subplot(2, 1, 2)
+        self.weekly_sales_ax.set_title("Confronto Vendite Settimanali (Ultime 8 Settimane)")
+        self.weekly_sales_ax.set_xlabel("Settimana")
+        self.weekly_sales_ax.set_ylabel("Unità Vendute")
+        self.weekly_sales_ax.grid(True, alpha=0.3)
+        
+        self.dashboard_figure.tight_layout()
+        
+        # Embed in Tkinter
+        self.dashboard_canvas = charting.FigureCanvasTkAgg(self.dashboard_figure, master=self.dashboard_charts_frame)
+        self.dashboard_canvas.draw()
+        self.dashboard_canvas.get_tk_widget().pack(fill="both", expand=True)
+        return True
+
     def _refresh_dashboard(self):
-        """Refresh all dashboard KPIs and charts."""
+        """Refresh all dashboard KPIs and charts (data computed in background)."""
+        today = date.today()
+        self.data_service.submit(
+            "dashboard",
+            lambda snap, token: self._compute_dashboard_data(snap, today, token),
+            on_result=self._apply_dashboard_data,
+            on_error=self._on_dashboard_error,
+        )
+    
+    def _compute_dashboard_data(self, snap, today: date, token) -> dict | None:
+        """Worker side of the dashboard refresh: stock, cover, top-movement and chart series."""
+        sku_ids = snap.sku_ids
+        transactions = snap.transactions
+        sales_records = snap.sales
+        
+        # Calculate current stock for all SKUs
+        stocks = StockCalculator.calculate_all_skus(
+            sku_ids,
+            today,
+            transactions,
+            sales_records,
+        )
+        
+        # Average days cover + low stock alerts (stock < 10 units or days_cover < 7)
+        total_days_cover = 0
+        skus_with_sales = 0
+        low_stock_count = 0
+        for sku_id in sku_ids:
+            if token.cancelled:
+                return None
+            stock = stocks[sku_id]
+            daily_sales, _ = calculate_daily_sales_average(sales_records, sku_id, days_lookback=30, transactions=transactions, asof_date=today)
+            if daily_sales > 0:
+                days_cover = stock.on_hand / daily_sales
+                total_days_cover += days_cover
+                skus_with_sales += 1
+            else:
+                days_cover = 999
+            if stock.on_hand < 10 or days_cover < 7:
+                low_stock_count += 1
+        
+        avg_days_cover = total_days_cover / skus_with_sales if skus_with_sales > 0 else 0
+        
+        # Fold new sales / WASTE rows into the chart aggregates
+        self.dashboard_aggregates.sync(sales_records, transactions, revision=snap.revision, epochs=snap.epochs)
+        
+        # Top 10 by Movement (Total Sales)
+        sales_by_sku = self.dashboard_aggregates.sku_totals()
+        top_movement = sorted(sales_by_sku.items(), key=lambda x: x[1], reverse=True)[:10]
+        
+        return {
+            "today": today,
+            "sku_ids": sku_ids,
+            "avg_days_cover": avg_days_cover,
+            "low_stock_count": low_stock_count,
+            "top_movement": top_movement,
+        }
+    
+    def _apply_dashboard_data(self, data: dict | None):
+        """Main-thread side of the dashboard refresh: labels, charts and tables."""
+        if data is None:
+            return
         try:
-            # Get data
-            sku_ids = self.csv_layer.get_all_sku_ids()
-            skus_by_id = {sku.sku: sku for sku in self.csv_layer.read_skus()}
-            transactions = self.csv_layer.read_transactions()
-            sales_records = self.csv_layer.read_sales()
-            
-            today = date.today()
-            
-            # Calculate current stock for all SKUs
-            stocks = StockCalculator.calculate_all_skus(
-                sku_ids,
-                today,
-                transactions,
-                sales_records,
-            )
-            
             # === KPI CALCULATIONS ===
-            
-            # 1. Total SKUs
-            total_skus = len(sku_ids)
-            self.kpi_total_skus_label.config(text=f"Totale SKU: {total_skus}")
-            
-            # 3. Average Days Cover
-            total_days_cover = 0
-            skus_with_sales = 0
-            for sku_id in sku_ids:
-                stock = stocks[sku_id]
-                daily_sales, _ = calculate_daily_sales_average(sales_records, sku_id, days_lookback=30, transactions=transactions, asof_date=today)
-                if daily_sales > 0:
-                    days_cover = stock.on_hand / daily_sales
-                    total_days_cover += days_cover
-                    skus_with_sales += 1
-            
-            avg_days_cover = total_days_cover / skus_with_sales if skus_with_sales > 0 else 0
-            self.kpi_days_cover_label.config(text=f"Giorni Copertura Medi: {avg_days_cover:.1f} giorni")
-            
-            # 4. Low Stock Alerts (stock < 10 units or days_cover < 7)
-            low_stock_count = 0
-            for sku_id in sku_ids:
-                stock = stocks[sku_id]
-                daily_sales, _ = calculate_daily_sales_average(sales_records, sku_id, days_lookback=30, transactions=transactions, asof_date=today)
-                days_cover = stock.on_hand / daily_sales if daily_sales > 0 else 999
-                
-                if stock.on_hand < 10 or days_cover < 7:
-                    low_stock_count += 1
-            
-            self.kpi_low_stock_label.config(text=f"⚠️ Avvisi Stock Basso: {low_stock_count}")
+            self.kpi_total_skus_label.config(text=f"Totale SKU: {len(data['sku_ids'])}")
+            self.kpi_days_cover_label.config(text=f"Giorni Copertura Medi: {data['avg_days_cover']:.1f} giorni")
+            self.kpi_low_stock_label.config(text=f"⚠️ Avvisi Stock Basso: {data['low_stock_count']}")
             
             # === CHARTS ===
             
-            if MATPLOTLIB_AVAILABLE:
+            if self._ensure_dashboard_charts():
                 # If SKU selected, show SKU-specific charts; otherwise show general charts
                 if self.selected_dashboard_sku:
                     self._refresh_sku_detail_charts()
                 else:
-                    self._refresh_general_charts(sales_records, today)
+                    self._refresh_general_charts(data["today"])
             
             # === TOP 10 TABLES ===
-            
-            # Top 10 by Movement (Total Sales)
             self.movement_treeview.delete(*self.movement_treeview.get_children())
-            
-            sales_by_sku = defaultdict(int)
-            for sr in sales_records:
-                sales_by_sku[sr.sku] += sr.qty_sold
-            
-            top_movement = sorted(sales_by_sku.items(), key=lambda x: x[1], reverse=True)[:10]
-            
-            for sku, total_sales in top_movement:
+            for sku, total_sales in data["top_movement"]:
                 self.movement_treeview.insert("", "end", values=(sku, total_sales))
             
             # Update dashboard SKU search autocomplete items
-            self.dashboard_sku_items = sku_ids
+            self.dashboard_sku_items = data["sku_ids"]
         
         except Exception as e:
-            logger.error(f"Dashboard refresh failed: {str(e)}", exc_info=True)
-            messagebox.showerror("Errore Dashboard", f"Impossibile aggiornare dashboard: {str(e)}")
+            self._on_dashboard_error(e)
+    
+    def _on_dashboard_error(self, e: BaseException):
+        logger.error(f"Dashboard refresh failed: {str(e)}", exc_info=e)
+        messagebox.showerror("Errore Dashboard", f"Impossibile aggiornare dashboard: {str(e)}")
     
-    def _refresh_general_charts(self, sales_records: list, today: date):
-        """Refresh general dashboard charts (all SKUs)."""
+    def _refresh_general_charts(self, today: date):
+        """Refresh general dashboard charts (all SKUs) from the precomputed aggregates."""
+        np = _charting().np
+        plt = _charting().plt
+
         # Chart 1: Daily Sales (Last 30 Days)
         self.daily_sales_ax.clear()
         self.daily_sales_ax.set_title("Vendite Giornaliere - Tutti gli SKU (Ultimi 30 Giorni)")
@@ -770,15 +854,9 @@ class DesktopOrderApp:
         self.daily_sales_ax.set_ylabel("Unità Vendute")
         self.daily_sales_ax.grid(True, alpha=0.3)
         
-        # Calculate daily sales for last 30 days
-        dates = []
-        daily_totals = []
-        for i in range(29, -1, -1):  # Last 30 days
-            calc_date = today - timedelta(days=i)
-            day_sales = [sr for sr in sales_records if sr.date == calc_date]
-            total_sold = sum(sr.qty_sold for sr in day_sales)
-            dates.append(calc_date.strftime("%d/%m"))
-            daily_totals.append(total_sold)
+        # Daily sales for last 30 days
+        dates = [(today - timedelta(days=i)).strftime("%d/%m") for i in range(29, -1, -1)]
+        daily_totals = self.dashboard_aggregates.daily_sales(today, 30)
         
         # Plot with bar chart
         self.daily_sales_ax.bar(range(len(dates)), daily_totals, color='#2E86AB', alpha=0.7, width=0.8, label='Vendite')
@@ -807,30 +885,10 @@ class DesktopOrderApp:
         self.weekly_sales_ax.set_ylabel("Unità Vendute")
         self.weekly_sales_ax.grid(True, alpha=0.3)
         
-        # Calculate weekly sales for last 8 weeks
-        weekly_labels = []
-        weekly_totals = []
-        
-        for week_offset in range(7, -1, -1):  # Last 8 weeks, oldest to newest
-            # Calculate start and end of week
-            week_end = today - timedelta(days=week_offset * 7)
-            week_start = week_end - timedelta(days=6)
-            
-            # Calculate sales for this week
-            week_sales = [
-                sr for sr in sales_records 
-                if week_start <= sr.date <= week_end
-            ]
-            total_sold = sum(sr.qty_sold for sr in week_sales)
-            
-            # Label: "W-7" (7 weeks ago) to "W-0" (current week)
-            if week_offset == 0:
-                label = "Corrente"
-            else:
-                label = f"-{week_offset}w"
-            
-            weekly_labels.append(label)
-            weekly_totals.append(total_sold)
+        # Weekly sales for last 8 weeks (7-day windows ending today), oldest to newest
+        weekly_totals = self.dashboard_aggregates.weekly_sales(today, 8)
+        # Label: "-7w" (7 weeks ago) to "Corrente" (current week)
+        weekly_labels = [f"-{week_offset}w" if week_offset else "Corrente" for week_offset in range(7, -1, -1)]
         
         # Create bar chart with color gradient
         colors = plt.cm.viridis(np.linspace(0.3, 0.9, len(weekly_totals)))  # type: ignore[attr-defined]
@@ -867,15 +925,7 @@ class DesktopOrderApp:
         Returns:
             List of moving average values (length = len(data) - period + 1)
         """
-        if len(data) < period:
-            return []
-        
-        ma_values = []
-        for i in range(period - 1, len(data)):
-            window = data[i - period + 1:i + 1]
-            ma_values.append(sum(window) / period)
-        
-        return ma_values
+        return moving_average(data, period)
     
     def _filter_dashboard_sku_items(self, typed_text: str) -> list:
         """
@@ -916,9 +966,109 @@ class DesktopOrderApp:
         self.dashboard_sku_var.set("")  # Clear entry field
         self._refresh_dashboard()
     
+    # ------------------------------------------------------------------ #
+    # Background jobs
+    # ------------------------------------------------------------------ #
+
+    def _start_job(self, name: str, label: str, compute, on_done, on_error):
+        """Run ``compute(ctx)`` as job ``name``; a second start while it runs is ignored."""
+        def _cancelled():
+            self.job_status_var.set(f"{label}: annullato")
+
+        record = self.job_runner.start(
+            name, compute,
+            on_done=on_done, on_error=on_error, on_cancelled=_cancelled,
+            label=label,
+        )
+        if record is None:
+            self.job_status_var.set(f"{label}: già in esecuzione")
+
+    def _update_job_status(self):
+        """Job runner listener: show the running job's progress in the status bar."""
+        active = [j for j in self.job_runner.jobs() if j.active]
+        if not active:
+            self.job_status_var.set("")
+            self.job_cancel_btn.pack_forget()
+            return
+        running = next((j for j in active if j.status == JOB_RUNNING), active[0])
+        text = f"⏳ {running.label}"
+        if running.total:
+            text += f": {running.done}/{running.total}"
+        if len(active) > 1:
+            text += f"  (+{len(active) - 1} in coda)"
+        self.job_status_var.set(text)
+        if not self.job_cancel_btn.winfo_ismapped():
+            self.job_cancel_btn.pack(side="left", padx=5)
+
+    def _cancel_running_jobs(self):
+        for job in self.job_runner.jobs():
+            if job.active:
+                self.job_runner.cancel(job.name)
+
+    def _show_job_history(self):
+        """Show running and finished background jobs with their durations."""
+        popup = tk.Toplevel(self.root)
+        popup.title("Attività in background")
+        popup.geometry("720x320")
+        popup.transient(self.root)
+
+        columns = ("job", "status", "progress", "duration", "error")
+        tree = ttk.Treeview(popup, columns=columns, show="headings", height=12)
+        for col, text, width in (
+            ("job", "Attività", 220), ("status", "Stato", 90), ("progress", "Avanzamento", 100),
+            ("duration", "Durata", 80), ("error", "Errore", 220),
+        ):
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor="w" if col in ("job", "error") else "center")
+        tree.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+
+        status_labels = {
+            "queued": "In coda", "running": "In corso", "done": "Completato",
+            "failed": "Fallito", "cancelled": "Annullato",
+        }
+
+        def _fill():
+            if not tree.winfo_exists():
+                self.job_runner.remove_listener(_fill)
+                return
+            tree.delete(*tree.get_children())
+            for job in self.job_runner.jobs():
+                duration = job.duration
+                tree.insert("", "end", iid=str(job.job_id), values=(
+                    job.label,
+                    status_labels.get(job.status, job.status),
+                    f"{job.done}/{job.total}" if job.total else "",
+                    f"{duration:.1f}s" if duration is not None else "",
+                    job.error or "",
+                ))
+
+        def _cancel_selected():
+            selected = {int(iid) for iid in tree.selection()}
+            for job in self.job_runner.jobs():
+                if job.job_id in selected and job.active:
+                    self.job_runner.cancel(job.name)
+
+        def _close():
+            self.job_runner.remove_listener(_fill)
+            popup.destroy()
+
+        buttons = ttk.Frame(popup)
+        buttons.pack(fill="x", padx=10, pady=(0, 10))
+        ttk.Button(buttons, text="Annulla selezionata", command=_cancel_selected).pack(side="left")
+        ttk.Button(buttons, text="Chiudi", command=_close).pack(side="right")
+        popup.protocol("WM_DELETE_WINDOW", _close)
+
+        self.job_runner.add_listener(_fill)
+        _fill()
+
     def _calculate_kpi_all_skus(self):
-        """Calculate reorder KPIs for all SKUs and write to cache."""
-        try:
+        """Calculate reorder KPIs for all SKUs and write to cache (background job)."""
+        # Tk variables are read on the main thread, before the job starts
+        lookback_days = self.kpi_lookback_var.get()
+        mode = self.kpi_mode_var.get()
+        today = date.today()
+
+        def _compute(ctx):
             from ..analytics.kpi import (
                 compute_oos_kpi,
                 estimate_lost_sales,
@@ -929,26 +1079,20 @@ class DesktopOrderApp:
                 compute_promo_event_forecast_kpi,
             )
             
-            # Get parameters
-            lookback_days = self.kpi_lookback_var.get()
-            mode = self.kpi_mode_var.get()
-            today = date.today()
-            
             # Get all SKUs
             sku_ids = self.csv_layer.get_all_sku_ids()
             skus_by_id = {s.sku: s for s in self.csv_layer.read_skus()}
             
             if not sku_ids:
-                messagebox.showinfo("Info", "Nessun SKU disponibile per l'analisi KPI.")
-                return
+                return None
             
-            # Show progress (simplified - could add a progress bar later)
             logger.info(f"Calculating KPIs for {len(sku_ids)} SKUs...")
             
             # Calculate KPIs for each SKU
             kpi_snapshots = []
             
-            for sku in sku_ids:
+            for i, sku in enumerate(sku_ids):
+                ctx.progress(i, len(sku_ids), sku)
                 try:
                     # Compute all KPIs
                     oos_result        = compute_oos_kpi(sku, lookback_days, mode, self.csv_layer, today)
@@ -995,41 +1139,47 @@ class DesktopOrderApp:
                     logger.warning(f"KPI calculation failed for SKU {sku}: {str(e)}")
                     continue
             
-            # Write to cache
+            # Last chance to cancel: nothing has been written yet
+            ctx.progress(len(sku_ids), len(sku_ids))
             self.csv_layer.write_kpi_daily_batch(kpi_snapshots)
             
             logger.info(f"KPI calculation complete. {len(kpi_snapshots)} SKUs processed.")
-            
+            return len(kpi_snapshots)
+
+        def _done(count):
+            if count is None:
+                messagebox.showinfo("Info", "Nessun SKU disponibile per l'analisi KPI.")
+                return
             # Refresh display from cache
             self._refresh_kpi_from_cache()
-            
-            messagebox.showinfo("Success", f"KPI calcolati per {len(kpi_snapshots)} SKU.\nRisultati salvati in kpi_daily.csv")
-        
-        except Exception as e:
-            logger.error(f"KPI calculation failed: {str(e)}", exc_info=True)
+            messagebox.showinfo("Success", f"KPI calcolati per {count} SKU.\nRisultati salvati in kpi_daily.csv")
+
+        def _failed(e):
             messagebox.showerror("Errore", f"Calcolo KPI fallito: {str(e)}")
 
+        self._start_job("kpi", "Calcolo KPI", _compute, _done, _failed)
+
     def _calculate_scoring_all_skus(self):
-        """Compute Importance / Health / Priority scores for all SKUs and write to sku_scores_daily.csv."""
-        try:
-            from dataclasses import asdict
-            from ..analytics.scoring import build_feature_row, score_all_skus
+        """Compute Importance / Health / Priority scores for all SKUs and write to sku_scores_daily.csv (background job)."""
+        today = date.today()
+        lookback_days = self.kpi_lookback_var.get()
 
-            today = date.today()
-            lookback_days = self.kpi_lookback_var.get()
+        def _compute(ctx):
+            from dataclasses import asdict
+            from ..analytics.scoring import build_feature_row, index_sales_by_sku, score_all_skus
 
-            # --- Load data ---
-            sku_ids = self.csv_layer.get_all_sku_ids()
+            # --- Load data (shared snapshot, no extra full-ledger read) ---
+            snap = self.data_service.snapshot()
+            sku_ids = [sku.sku for sku in snap.skus]
             if not sku_ids:
-                messagebox.showinfo("Info", "Nessun SKU disponibile per il calcolo degli score.")
-                return
+                return None
 
-            skus_by_id = {sku.sku: sku for sku in self.csv_layer.read_skus()}
-            transactions = self.csv_layer.read_transactions()
-            sales_records = self.csv_layer.read_sales()
+            skus_by_id = snap.skus_by_id
+            transactions = snap.transactions
+            sales_records = snap.sales
 
             # Latest KPI record per SKU (most recent date wins)
-            all_kpi_rows = self.csv_layer.read_kpi_daily()
+            all_kpi_rows = self.data_service.read(self.csv_layer.read_kpi_daily)
             kpi_by_sku: dict = {}
             for row in all_kpi_rows:
                 s = row.get("sku", "")
@@ -1047,9 +1197,11 @@ class DesktopOrderApp:
 
             logger.info(f"Building feature rows for {len(sku_ids)} SKUs (lookback={lookback_days}d) ...")
 
-            # --- Build FeatureRows ---
+            # --- Build FeatureRows (sales grouped once, not rescanned per SKU) ---
+            sales_by_sku = index_sales_by_sku(sales_records)
             feature_rows = []
-            for sku_id in sku_ids:
+            for i, sku_id in enumerate(sku_ids):
+                ctx.progress(i, len(sku_ids), sku_id)
                 try:
                     sku_obj = skus_by_id.get(sku_id)
                     stock_oh = stocks[sku_id].on_hand if sku_id in stocks else 0.0
@@ -1057,7 +1209,7 @@ class DesktopOrderApp:
                         sku=sku_id,
                         ref_date=today,
                         lookback_days=lookback_days,
-                        sales_records=sales_records,
+                        sales_records=sales_by_sku.get(sku_id, []),
                         transactions=transactions,
                         kpi_record=kpi_by_sku.get(sku_id),
                         sku_obj=sku_obj,
@@ -1068,27 +1220,36 @@ class DesktopOrderApp:
                     logger.warning(f"Feature extraction failed for SKU {sku_id}: {e_row}")
 
             if not feature_rows:
-                messagebox.showwarning("Attenzione", "Nessun feature row estratto. Controllare i dati.")
-                return
+                return []
 
-            # --- Score ---
+            # --- Score (columnar: one sort per ranking, vectorised health) ---
             logger.info(f"Scoring {len(feature_rows)} SKUs ...")
             results = score_all_skus(feature_rows)
 
             # --- Persist ---
+            ctx.progress(len(sku_ids), len(sku_ids))
             result_dicts = [asdict(r) for r in results]
             self.csv_layer.write_sku_scores_daily_batch(result_dicts)
 
             logger.info(f"Scoring complete. {len(results)} SKUs written to sku_scores_daily.csv.")
-            messagebox.showinfo(
-                "Score SKU",
-                f"Score calcolati per {len(results)} SKU.\nRisultati salvati in sku_scores_daily.csv"
-            )
+            return results
 
-        except Exception as e:
-            logger.error(f"Scoring calculation failed: {str(e)}", exc_info=True)
+        def _done(results):
+            if results is None:
+                messagebox.showinfo("Info", "Nessun SKU disponibile per il calcolo degli score.")
+            elif not results:
+                messagebox.showwarning("Attenzione", "Nessun feature row estratto. Controllare i dati.")
+            else:
+                messagebox.showinfo(
+                    "Score SKU",
+                    f"Score calcolati per {len(results)} SKU.\nRisultati salvati in sku_scores_daily.csv"
+                )
+
+        def _failed(e):
             messagebox.showerror("Errore", f"Calcolo Score fallito: {str(e)}")
 
+        self._start_job("scoring", "Calcolo Score SKU", _compute, _done, _failed)
+
     def _refresh_kpi_from_cache(self):
         """Refresh KPI table from cached data."""
         try:
@@ -1225,10 +1386,20 @@ class DesktopOrderApp:
             
             # Run analysis
             asof_date = datetime.now()
+            # In apply mode SKUs are modified one by one: report progress but never stop midway
+            apply_mode = action_mode == "apply" and cl_enabled
             
             logger.info(f"Running closed-loop analysis asof {asof_date.strftime('%Y-%m-%d')}")
-            report = run_closed_loop(self.csv_layer, asof_date)
-            
+        
+        except Exception as e:
+            logger.exception("Error running closed-loop analysis")
+            messagebox.showerror("Errore", f"Errore nell'analisi closed-loop: {str(e)}")
+            return
+
+        def _compute(ctx):
+            return run_closed_loop(self.csv_layer, asof_date, progress=ctx.report if apply_mode else ctx.progress)
+
+        def _done(report):
             # Update treeview with results
             self._refresh_closed_loop_results(report)
             
@@ -1249,10 +1420,11 @@ class DesktopOrderApp:
             messagebox.showinfo("Successo", summary_msg)
             
             logger.info(f"Closed-loop analysis completed: {report.skus_processed} SKUs, {report.skus_with_changes} changes, {report.skus_blocked} blocked")
-        
-        except Exception as e:
-            logger.exception("Error running closed-loop analysis")
+
+        def _failed(e):
             messagebox.showerror("Errore", f"Errore nell'analisi closed-loop: {str(e)}")
+
+        self._start_job("closed_loop", "Analisi Closed-Loop", _compute, _done, _failed)
     
     def _refresh_closed_loop_results(self, report):
         """Refresh closed-loop results treeview with report data."""
@@ -1304,32 +1476,45 @@ class DesktopOrderApp:
         logger.info(f"Closed-loop results refreshed with {len(report.decisions)} decisions")
     
     def _refresh_sku_detail_charts(self):
-        """Refresh SKU-specific detail charts (sales 30d + stock evolution 30d) using main dashboard charts."""
-        if not MATPLOTLIB_AVAILABLE or not self.selected_dashboard_sku:
+        """Refresh SKU-specific detail charts (sales 30d + waste 30d); series computed in background."""
+        if not self.selected_dashboard_sku:
             return
+        sku = self.selected_dashboard_sku
+        today = date.today()
+        self.data_service.submit(
+            "sku_detail",
+            lambda snap, token: self._compute_sku_detail_series(snap, sku, today),
+            on_result=self._apply_sku_detail_charts,
+            on_error=lambda e: messagebox.showerror("Errore Grafici SKU", f"Impossibile aggiornare grafici: {str(e)}"),
+        )
+    
+    def _compute_sku_detail_series(self, snap, sku: str, today: date) -> dict:
+        """Worker side of the SKU detail charts: sync the aggregates, read the 31-day series."""
+        # No-op if the data revision is unchanged, else folds in the new rows only
+        self.dashboard_aggregates.sync(snap.sales, snap.transactions, revision=snap.revision, epochs=snap.epochs)
+        return {
+            "sku": sku,
+            "today": today,
+            "sales": self.dashboard_aggregates.daily_sales(today, 31, sku),
+            "waste": self.dashboard_aggregates.daily_waste(today, 31, sku),
+        }
+    
+    def _apply_sku_detail_charts(self, data: dict):
+        """Main-thread side of the SKU detail charts: draw the precomputed series."""
+        if data["sku"] != self.selected_dashboard_sku or not self._ensure_dashboard_charts():
+            return  # selection changed meanwhile (a newer request is on its way)
         
         try:
-            sku = self.selected_dashboard_sku
-            sales_records = self.csv_layer.read_sales()
-            transactions = self.csv_layer.read_transactions()
-            
-            today = date.today()
+            sku = data["sku"]
+            today = data["today"]
             days_ago_30 = today - timedelta(days=30)
             
             # --- Chart 1: Daily Sales (Last 30 Days) for selected SKU ---
             self.daily_sales_ax.clear()
             
-            # Filter sales for this SKU in last 30 days
-            sku_sales = [sr for sr in sales_records if sr.sku == sku and sr.date >= days_ago_30]
-            
-            # Group by date
-            sales_by_date = defaultdict(int)
-            for sr in sku_sales:
-                sales_by_date[sr.date] += sr.qty_sold
-            
             # Create date range (last 30 days)
             date_range = [days_ago_30 + timedelta(days=i) for i in range(31)]
-            sales_values = [sales_by_date.get(d, 0) for d in date_range]
+            sales_values = data["sales"]
             
             # Plot
             self.daily_sales_ax.bar(
@@ -1368,19 +1553,8 @@ class DesktopOrderApp:
             # --- Chart 2: Waste Events (Last 30 Days) for selected SKU ---
             self.weekly_sales_ax.clear()
             
-            # Filter WASTE transactions for this SKU in last 30 days
-            sku_waste = [
-                txn for txn in transactions 
-                if txn.sku == sku and txn.event == EventType.WASTE and txn.date >= days_ago_30
-            ]
-            
-            # Group by date
-            waste_by_date = defaultdict(int)
-            for txn in sku_waste:
-                waste_by_date[txn.date] += txn.qty
-            
-            # Create values for date range (same as sales chart)
-            waste_values = [waste_by_date.get(d, 0) for d in date_range]
+            # WASTE events for this SKU, same date range as the sales chart
+            waste_values = data["waste"]
             
             # Plot with bar chart
             self.weekly_sales_ax.bar(
@@ -1541,20 +1715,26 @@ class DesktopOrderApp:
         proposal_frame = ttk.LabelFrame(self.order_left_paned, text="Proposte Ordine (Doppio click su Colli Proposti per modificare)", padding=5)
         self.order_left_paned.add(proposal_frame, weight=1)
         
-        # Scrollbars (vertical + horizontal)
-        scrollbar_y = ttk.Scrollbar(proposal_frame, orient="vertical")
-        scrollbar_y.pack(side="right", fill="y")
+        # Horizontal scrollbar (the virtualized table owns its vertical one)
         scrollbar_x = ttk.Scrollbar(proposal_frame, orient="horizontal")
         scrollbar_x.pack(side="bottom", fill="x")
 
-        self.proposal_treeview = ttk.Treeview(
+        # Rows are OrderProposal objects keyed by SKU (never loses leading zeros)
+        self.proposal_treeview = VirtualTreeview(
             proposal_frame,
             columns=("SKU", "Description", "Pack Size", "Usable Stock", "Waste Risk %", "Colli Proposti", "Pezzi Proposti", "Shelf Penalty", "MC Comparison", "Promo Δ", "Event Uplift", "Receipt Date"),
+            formatter=lambda sku, proposal: self._build_proposal_row_values(proposal),
+            # low_history tag if valid days <= 7
+            tagger=lambda sku, proposal: (
+                ("low_history",) if getattr(proposal, "history_valid_days", 99) <= 7 else ()
+            ),
+            model=RowModel(sort_keys={
+                "Colli Proposti": lambda sku, proposal: proposal.proposed_qty,
+                "Pezzi Proposti": lambda sku, proposal: proposal.proposed_qty,
+            }),
             height=10,
-            yscrollcommand=scrollbar_y.set,
             xscrollcommand=scrollbar_x.set,
         )
-        scrollbar_y.config(command=self.proposal_treeview.yview)
         scrollbar_x.config(command=self.proposal_treeview.xview)
         
         self.proposal_treeview.column("#0", width=0, stretch=tk.NO)
@@ -1678,19 +1858,15 @@ class DesktopOrderApp:
         chart_lf = ttk.LabelFrame(details_scroll_frame, text="📈 Stock Projection", padding=5)
         chart_lf.pack(fill="x", padx=5, pady=3)
 
-        if MATPLOTLIB_AVAILABLE:
-            self.detail_fig = Figure(figsize=(3.5, 2.0), dpi=80)
-            self.detail_fig.patch.set_facecolor("#f8fafc")  # type: ignore[union-attr]
-            self.detail_ax = self.detail_fig.add_subplot(111)
-            self.detail_chart_canvas = FigureCanvasTkAgg(self.detail_fig, master=chart_lf)
-            self.detail_chart_canvas.get_tk_widget().pack(fill="x")
-            self._draw_projection_chart(None)
-        else:
-            self.detail_chart_canvas = None
-            self.detail_fig = None
-            self.detail_ax = None
-            ttk.Label(chart_lf, text="(matplotlib non disponibile)",
-                      foreground="gray", font=("Helvetica", 8)).pack(pady=8)
+        # Canvas is created on first draw (see _ensure_detail_chart)
+        self.detail_chart_canvas = None
+        self.detail_fig = None
+        self.detail_ax = None
+        self.detail_chart_host = ttk.Frame(chart_lf)
+        self.detail_chart_host.pack(fill="x")
+        ttk.Label(self.detail_chart_host,
+                  text="Seleziona uno SKU" if MATPLOTLIB_AVAILABLE else "(matplotlib non disponibile)",
+                  foreground="gray", font=("Helvetica", 8)).pack(pady=8)
 
         legend_row = ttk.Frame(chart_lf)
         legend_row.pack(fill="x", pady=(2, 0))
@@ -1781,6 +1957,22 @@ class DesktopOrderApp:
         
     # ── Detail panel helpers ────────────────────────────────────────────────
 
+    def _ensure_detail_chart(self) -> bool:
+        """Create the projection chart canvas on first draw (imports matplotlib lazily)."""
+        if self.detail_chart_canvas is not None:
+            return True
+        if not MATPLOTLIB_AVAILABLE:
+            return False
+        charting = _charting()
+        for child in self.detail_chart_host.winfo_children():
+            child.destroy()
+        self.detail_fig = charting.Figure(figsize=(3.5, 2.0), dpi=80)
+        self.detail_fig.patch.set_facecolor("#f8fafc")  # type: ignore[union-attr]
+        self.detail_ax = self.detail_fig.add_subplot(111)
+        self.detail_chart_canvas = charting.FigureCanvasTkAgg(self.detail_fig, master=self.detail_chart_host)
+        self.detail_chart_canvas.get_tk_widget().pack(fill="x")
+        return True
+
     def _draw_projection_chart(self, proposal):
         """Redraw the stock projection chart in the detail sidebar.
 
@@ -1790,7 +1982,10 @@ class DesktopOrderApp:
         - Future series: policy-aware demand (Monte Carlo when MC is the
           primary forecast method; SMA otherwise).
         """
-        if not MATPLOTLIB_AVAILABLE or self.detail_chart_canvas is None:
+        self.data_service.cancel("projection")  # a pending load would paint a stale SKU
+        if proposal is None and self.detail_chart_canvas is None:
+            return  # Nothing drawn yet: keep the placeholder, skip matplotlib
+        if not self._ensure_detail_chart():
             return
         ax = self.detail_ax
         fig = self.detail_fig
@@ -1812,23 +2007,47 @@ class DesktopOrderApp:
             return
 
         today = date.today()
-        receipt_date = proposal.receipt_date
 
-        # Build series via pure helper (real ledger history + policy-aware demand)
-        try:
-            transactions = self.csv_layer.read_transactions()
-        except Exception:
-            transactions = []
-        try:
-            sales_records = self.csv_layer.read_sales()
-        except Exception:
-            sales_records = None
+        # Build series via pure helper (real ledger history + policy-aware demand).
+        # Reuse the generation run's per-SKU slices while storage is unchanged;
+        # otherwise the data is loaded on the background service.
+        context = self.proposal_context
+        revision = self.csv_layer.data_revision()
+        if context is None or context.revision != revision:
+            self.data_service.submit(
+                "projection",
+                lambda snap, token: self._projection_series(
+                    proposal, today, snap.transactions, snap.sales, snap.revision,
+                ),
+                on_result=lambda series: self._paint_projection_chart(proposal, series),
+            )
+            return
+        series = self._projection_series(
+            proposal, today, context.txns_for(proposal.sku), context.sales_for(proposal.sku), revision,
+        )
+        self._paint_projection_chart(proposal, series)
 
+    @staticmethod
+    def _projection_series(proposal, today: date, transactions, sales_records, revision):
+        """``build_projection_series`` for the detail chart (None if it fails)."""
         try:
-            series = build_projection_series(
-                proposal, today, transactions, sales_records,
+            return build_projection_series(
+                proposal, today, transactions, sales_records, revision=revision,
             )
         except Exception:
+            return None
+
+    def _paint_projection_chart(self, proposal, series):
+        """Draw the projection ``series`` of ``proposal`` (None = error placeholder)."""
+        ax = self.detail_ax
+        fig = self.detail_fig
+        if ax is None or fig is None:
+            return
+        ax.clear()
+        ax.set_facecolor("#f8fafc")
+        receipt_date = proposal.receipt_date
+
+        if series is None:
             # Never crash the chart: show placeholder and return.
             ax.text(0.5, 0.5, "Errore grafico",
                     transform=ax.transAxes, ha="center", va="center",
@@ -2600,33 +2819,20 @@ class DesktopOrderApp:
                 target_receipt_date = planning_date + timedelta(days=max(1, lead_time))
                 protection_period = max(1, (target_receipt_date - planning_date).days)
 
-        
-        # Get all SKUs
-        sku_ids = self.csv_layer.get_all_sku_ids()
-        skus_by_id = {sku.sku: sku for sku in self.csv_layer.read_skus()}
-        
-        # Filter: only SKUs in assortment
-        sku_ids = [sku_id for sku_id in sku_ids if sku_id in skus_by_id and skus_by_id[sku_id].in_assortment]
-        
-        # Read transactions and sales
-        transactions = self.csv_layer.read_transactions()
-        sales_records = self.csv_layer.read_sales()
-        
-        # Calculate stock for each SKU.
+
+        # SKUs, ledger, sales and stocks are loaded by the PASS A worker (below)
+        sku_ids: list = []
+        skus_by_id: dict = {}
+        stocks: dict = {}
         # Use asof_date+1 (same logic as the Stock tab) so that EOD events recorded
         # ON today are always included (calculate_asof rule is date < asof_date,
         # strictly less-than).  If asof_date was already advanced to >today by an
         # EOD close in the current session, keep it as-is to avoid double-advancing.
         proposal_asof = self.asof_date if self.asof_date > date.today() else date.today() + timedelta(days=1)
-        stocks = StockCalculator.calculate_all_skus(
-            sku_ids,
-            proposal_asof,
-            transactions,
-            sales_records,
-        )
 
         # Generate proposals
         self.current_proposals = []
+        self.proposal_context = None
 
         # Read OOS boost default from settings
         oos_boost_default = settings.get("reorder_engine", {}).get("oos_boost_percent", {}).get("value", 20) / 100.0
@@ -2642,7 +2848,7 @@ class DesktopOrderApp:
         import threading as _threading
 
         # Container for results produced by the worker thread
-        _pass_a_result: dict = {"sku_oos_data": {}, "oos_candidates": [], "error": None}
+        _pass_a_result: dict = {"context": None, "oos_candidates": [], "error": None}
 
         # ── Progress dialog ──────────────────────────────────────────────────
         _prog = tk.Toplevel(self.root)
@@ -2661,7 +2867,6 @@ class DesktopOrderApp:
         _prog_lbl.pack(anchor="w", pady=(4, 8))
         _prog_bar = ttk.Progressbar(_prog_frame, mode="determinate", length=340)
         _prog_bar.pack(fill="x")
-        _prog_bar["maximum"] = max(len(sku_ids), 1)
         _prog.update_idletasks()
         # Centre on parent
         _pw, _ph = 380, 120
@@ -2672,21 +2877,39 @@ class DesktopOrderApp:
         )
 
         def _pass_a_worker():
-            """Heavy OOS computation – runs in background thread."""
+            """Data load + heavy OOS computation – runs in background thread."""
+            nonlocal sku_ids, skus_by_id, stocks
             try:
-                sku_oos_data_local: dict = {}
                 oos_candidates_local: list = []
 
-                # Pre-build per-SKU indexes for O(1) lookup inside the loop.
-                # Without this every calculate_daily_sales_average call would
-                # linearly scan the full global lists (O(N_sku × T_all)).
-                from collections import defaultdict as _defaultdict
-                _txn_index = _defaultdict(list)
-                for _t in transactions:
-                    _txn_index[_t.sku].append(_t)
-                _sales_index = _defaultdict(list)
-                for _s in sales_records:
-                    _sales_index[_s.sku].append(_s)
+                # Shared per-revision snapshot of the background data service
+                snap = self.data_service.snapshot()
+                all_skus = snap.skus
+                skus_by_id = snap.skus_by_id
+                # Filter: only SKUs in assortment
+                sku_ids = [sku_id for sku_id in snap.sku_ids if sku_id in skus_by_id and skus_by_id[sku_id].in_assortment]
+                transactions = snap.transactions
+                sales_records = snap.sales
+                stocks = StockCalculator.calculate_all_skus(
+                    sku_ids,
+                    proposal_asof,
+                    transactions,
+                    sales_records,
+                )
+                self.root.after(0, lambda n=max(len(sku_ids), 1): _prog_bar.config(maximum=n))
+
+                # Shared run context: per-SKU ledger/sales slices built once, so
+                # PASS A, PASS B, the MC comparison and the projection chart never
+                # rescan the global lists or re-read storage for this run.
+                context = ProposalRunContext(
+                    settings=settings,
+                    skus=all_skus,
+                    transactions=transactions,
+                    sales_records=sales_records,
+                    stocks=stocks,
+                    asof_date=date.today(),
+                    oos_lookback_days=oos_lookback_days,
+                )
 
                 for i, sku_id in enumerate(sku_ids):
                     sku_obj = skus_by_id.get(sku_id)
@@ -2697,35 +2920,12 @@ class DesktopOrderApp:
                         else oos_detection_mode_global
                     )
 
-                    daily_sales, oos_days_count, oos_days_list, out_of_assortment_days = (
-                        calculate_daily_sales_average(
-                            sales_records, sku_id,
-                            days_lookback=oos_lookback_days,
-                            transactions=transactions,
-                            asof_date=date.today(),
-                            oos_detection_mode=oos_detection_mode,
-                            return_details=True,
-                            sku_txns=_txn_index[sku_id],
-                            sku_sales=_sales_index[sku_id],
-                        )
-                    )
-                    history_valid_days = oos_lookback_days - len(oos_days_list) - len(out_of_assortment_days)
-
-                    sku_oos_data_local[sku_id] = {
-                        "sku_obj": sku_obj,
-                        "description": description,
-                        "daily_sales": daily_sales,
-                        "oos_days_count": oos_days_count,
-                        "oos_days_list": oos_days_list,
-                        "out_of_assortment_days": out_of_assortment_days,
-                        "history_valid_days": history_valid_days,
-                        "oos_detection_mode": oos_detection_mode,
-                        "oos_boost_percent": 0.0,
-                    }
+                    demand = context.compute_demand(sku_id, oos_detection_mode)
+                    oos_days_count = demand.oos_days_count
 
                     if oos_days_count > 0:
                         if sku_obj and sku_obj.oos_popup_preference == "always_yes":
-                            sku_oos_data_local[sku_id]["oos_boost_percent"] = oos_boost_default
+                            demand.oos_boost_percent = oos_boost_default
                         elif sku_obj and sku_obj.oos_popup_preference != "always_no":
                             if sku_id not in self.oos_boost_preferences:
                                 oos_candidates_local.append({
@@ -2745,7 +2945,7 @@ class DesktopOrderApp:
                             (_prog_lbl.config(text=f"SKU {c}/{len(sku_ids)}: {d[:40]}"),
                              _prog_bar.config(value=c)))
 
-                _pass_a_result["sku_oos_data"] = sku_oos_data_local
+                _pass_a_result["context"] = context
                 _pass_a_result["oos_candidates"] = oos_candidates_local
 
             except Exception as e:
@@ -2755,9 +2955,6 @@ class DesktopOrderApp:
 
         def _on_pass_a_done():
             """Called on main thread after PASS A worker finishes."""
-            # Allow estimate block to reassign these shared lists without
-            # causing UnboundLocalError for SKUs that skip the estimate branch.
-            nonlocal transactions, sales_records
             try:
                 _prog.grab_release()
                 _prog.destroy()
@@ -2771,21 +2968,21 @@ class DesktopOrderApp:
                 )
                 return
 
-            sku_oos_data = _pass_a_result["sku_oos_data"]
+            context = _pass_a_result["context"]
             oos_candidates = _pass_a_result["oos_candidates"]
 
             # Apply session preferences for OOS-flagged SKUs
-            for sku_id, data in sku_oos_data.items():
-                if data["oos_days_count"] > 0:
-                    sku_obj = data["sku_obj"]
+            for sku_id, demand in context.demand.items():
+                if demand.oos_days_count > 0:
+                    sku_obj = skus_by_id.get(sku_id)
                     if sku_obj and sku_obj.oos_popup_preference == "always_yes":
-                        data["oos_boost_percent"] = oos_boost_default
+                        demand.oos_boost_percent = oos_boost_default
                         self.oos_boost_preferences[sku_id] = oos_boost_default
                     elif sku_obj and sku_obj.oos_popup_preference == "always_no":
-                        data["oos_boost_percent"] = 0.0
+                        demand.oos_boost_percent = 0.0
                         self.oos_boost_preferences[sku_id] = None
                     elif sku_id in self.oos_boost_preferences:
-                        data["oos_boost_percent"] = self.oos_boost_preferences[sku_id] or 0.0
+                        demand.oos_boost_percent = self.oos_boost_preferences[sku_id] or 0.0
 
             # ── SINGLE BULK POPUP for all undecided SKUs ─────────────────────
             bulk_decisions: dict = {}
@@ -2794,14 +2991,13 @@ class DesktopOrderApp:
 
             # ── PASS B: apply bulk decisions, register estimates, generate proposals ─
             for sku_id in sku_ids:
-                data = sku_oos_data.get(sku_id, {})
-                sku_obj = data.get("sku_obj")
-                description = data.get("description", "N/A")
-                daily_sales = data.get("daily_sales", 0.0)
-                oos_days_count = data.get("oos_days_count", 0)
-                history_valid_days = data.get("history_valid_days", 0)
-                oos_detection_mode = data.get("oos_detection_mode", oos_detection_mode_global)
-                oos_boost_percent = data.get("oos_boost_percent", 0.0)
+                demand = context.demand[sku_id]
+                sku_obj = skus_by_id.get(sku_id)
+                description = sku_obj.description if sku_obj else "N/A"
+                daily_sales = demand.daily_sales
+                oos_days_count = demand.oos_days_count
+                history_valid_days = demand.history_valid_days
+                oos_boost_percent = demand.oos_boost_percent
 
                 if sku_id in bulk_decisions:
                     dec = bulk_decisions[sku_id]
@@ -2821,28 +3017,13 @@ class DesktopOrderApp:
                             new_marker = self.csv_layer.upsert_oos_override_marker(
                                 sku_id, estimate_date, estimate_colli, estimate_pz
                             )
-                            # Refresh in-memory lists (replace stale entries for same SKU+date)
-                            sales_records = [
-                                s for s in sales_records
-                                if not (s.sku == sku_id and s.date == estimate_date)
-                            ] + [new_sale]
-                            transactions = [
-                                t for t in transactions
-                                if not (
-                                    t.sku == sku_id and t.date == estimate_date
-                                    and t.event == EventType.OOS_OVERRIDE
-                                )
-                            ] + [new_marker]
-
-                            daily_sales, oos_days_count, _oos_days_list, _ooa_days = calculate_daily_sales_average(
-                                sales_records, sku_id,
-                                days_lookback=oos_lookback_days,
-                                transactions=transactions,
-                                asof_date=date.today(),
-                                oos_detection_mode=oos_detection_mode,
-                                return_details=True,
-                            )
-                            history_valid_days = oos_lookback_days - len(_oos_days_list) - len(_ooa_days)
+                            # Refresh the run data (replace stale entries for same SKU+date)
+                            # and recompute only this SKU's censored average
+                            context.replace_day_events(sku_id, estimate_date, sale=new_sale, marker=new_marker)
+                            demand = context.compute_demand(sku_id, demand.oos_detection_mode)
+                            daily_sales = demand.daily_sales
+                            oos_days_count = demand.oos_days_count
+                            history_valid_days = demand.history_valid_days
                             logger.info(
                                 f"OOS estimate registered for {sku_id} on {estimate_date}: "
                                 f"{estimate_colli} colli ({estimate_pz} pz)"
@@ -2887,12 +3068,17 @@ class DesktopOrderApp:
                     oos_boost_percent=oos_boost_percent,
                     target_receipt_date=target_receipt_date,
                     protection_period_days=protection_period,
-                    transactions=transactions,
-                    sales_records=sales_records,
+                    transactions=context.transactions,
+                    sales_records=context.sales_records,
+                    context=context,
                 )
                 proposal.history_valid_days = history_valid_days
                 self.current_proposals.append(proposal)
 
+            # Writes made during the run (estimates, SKU prefs, synthetic lots) are
+            # already mirrored or irrelevant: the context is current as of now.
+            context.revision = self.csv_layer.data_revision()
+            self.proposal_context = context
             self._refresh_proposal_table()
             messagebox.showinfo(
                 "Proposte Generate",
@@ -3515,21 +3701,7 @@ class DesktopOrderApp:
 
     def _refresh_proposal_table(self):
         """Refresh proposals table."""
-        self.proposal_treeview.delete(*self.proposal_treeview.get_children())
-        
-        for proposal in self.current_proposals:
-            # Apply low_history tag if valid days <= 7
-            tags = ()
-            if hasattr(proposal, 'history_valid_days') and proposal.history_valid_days <= 7:
-                tags = ("low_history",)
-            
-            self.proposal_treeview.insert(
-                "",
-                "end",
-                iid=proposal.sku,  # use SKU as row identifier — never loses leading zeros
-                values=self._build_proposal_row_values(proposal),
-                tags=tags
-            )
+        self.proposal_treeview.set_rows((proposal.sku, proposal) for proposal in self.current_proposals)
 
     def _update_order_info(self, *_):
         """Auto-update the read-only planning info section when order inputs change."""
@@ -3608,7 +3780,8 @@ class DesktopOrderApp:
     def _clear_proposals(self):
         """Clear all proposals."""
         self.current_proposals = []
-        self.proposal_treeview.delete(*self.proposal_treeview.get_children())
+        self.proposal_context = None
+        self.proposal_treeview.set_rows([])
     
     def _on_proposal_double_click(self, event):
         """Handle double-click on proposal row to edit proposed qty or receipt date."""
@@ -3663,7 +3836,7 @@ class DesktopOrderApp:
         
         # Create Entry widget over the cell
         entry_var = tk.StringVar(value=str(current_colli))
-        entry = ttk.Entry(self.proposal_treeview, textvariable=entry_var, justify="center")
+        entry = ttk.Entry(self.proposal_treeview.tree, textvariable=entry_var, justify="center")
         entry.place(x=x, y=y, width=width, height=height)
         entry.focus_set()
         entry.select_range(0, tk.END)
@@ -3684,10 +3857,7 @@ class DesktopOrderApp:
                 proposal.proposed_qty = new_pezzi
                 
                 # Update tree item
-                self.proposal_treeview.item(
-                    tree_item_id,
-                    values=self._build_proposal_row_values(proposal),
-                )
+                self.proposal_treeview.refresh_row(tree_item_id)
                 
                 entry.destroy()
             except ValueError:
@@ -3747,10 +3917,7 @@ class DesktopOrderApp:
                 proposal.proposed_qty = new_pezzi
                 
                 # Update tree item
-                self.proposal_treeview.item(
-                    tree_item_id,
-                    values=self._build_proposal_row_values(proposal),
-                )
+                self.proposal_treeview.refresh_row(tree_item_id)
                 
                 popup.destroy()
             except ValueError:
@@ -3795,10 +3962,7 @@ class DesktopOrderApp:
                     messagebox.showerror("Errore di Validazione", "Formato data non valido. Usa YYYY-MM-DD.", parent=popup)
                     return
 
-            self.proposal_treeview.item(
-                tree_item_id,
-                values=self._build_proposal_row_values(proposal),
-            )
+            self.proposal_treeview.refresh_row(tree_item_id)
             popup.destroy()
 
         button_frame = ttk.Frame(form_frame)
@@ -4203,6 +4367,10 @@ class DesktopOrderApp:
             return None
         
         try:
+            support = _barcode_support()
+            barcode, ImageWriter = support.barcode, support.ImageWriter
+            Image, ImageTk = support.Image, support.ImageTk
+
             # Determine barcode type
             if len(ean) == 13:
                 barcode_class = barcode.get_barcode_class('ean13')
@@ -4429,18 +4597,14 @@ class DesktopOrderApp:
         h_tv_frame = ttk.Frame(history_card)
         h_tv_frame.pack(fill="both", expand=True)
 
-        h_scroll = ttk.Scrollbar(h_tv_frame, orient="vertical")
-        h_scroll.pack(side="right", fill="y")
-
         h_cols = ("Document ID", "Receipt ID", "Date", "SKU", "Qty Received", "Receipt Date", "Order IDs")
-        self.receiving_history_treeview = ttk.Treeview(
+        self.receiving_history_treeview = VirtualTreeview(
             h_tv_frame,
             columns=h_cols,
+            formatter=self._format_receiving_log_row,
             show="headings",
             height=7,
-            yscrollcommand=h_scroll.set,
         )
-        h_scroll.config(command=self.receiving_history_treeview.yview)
 
         h_col_cfg = [
             ("Document ID",  "Documento",        tk.W,      110),
@@ -4457,10 +4621,6 @@ class DesktopOrderApp:
             self.receiving_history_treeview.heading(col_id, text=heading, anchor=anchor)
 
         self.receiving_history_treeview.pack(fill="both", expand=True)
-
-        # ── Initial data load ─────────────────────────────────────────────────
-        self._refresh_pending_orders()
-        self._refresh_receiving_history()
     
     def _filter_pending_orders(self):
         """Filtra ordini in sospeso per data prevista e/o SKU/descrizione."""
@@ -4883,29 +5043,29 @@ class DesktopOrderApp:
         if filter_sku:
             logs = [log for log in logs if filter_sku in log.get("sku", "").lower()]
         
-        # Populate table
-        self.receiving_history_treeview.delete(*self.receiving_history_treeview.get_children())
-        
-        for log in logs:
-            document_id = log.get("document_id", "")
-            receipt_id = log.get("receipt_id", "")
-            date_str = log.get("date", "")
-            sku = log.get("sku", "")
-            qty_received = log.get("qty_received", "")
-            receipt_date_str = log.get("receipt_date", "")
-            order_ids_str = log.get("order_ids", "")
-            
-            # Format order_ids for display (limit length)
-            if order_ids_str and len(order_ids_str) > 50:
-                order_ids_display = order_ids_str[:47] + "..."
-            else:
-                order_ids_display = order_ids_str
-            
-            self.receiving_history_treeview.insert(
-                "",
-                "end",
-                values=(document_id, receipt_id, date_str, sku, qty_received, receipt_date_str, order_ids_display),
-            )
+        # Populate table (log rows have no unique id: key by position)
+        self.receiving_history_treeview.set_rows((str(i), log) for i, log in enumerate(logs))
+    
+    @staticmethod
+    def _format_receiving_log_row(key: str, log: dict) -> tuple:
+        """Display values of a receiving history row."""
+        order_ids_str = log.get("order_ids", "")
+        
+        # Format order_ids for display (limit length)
+        if order_ids_str and len(order_ids_str) > 50:
+            order_ids_display = order_ids_str[:47] + "..."
+        else:
+            order_ids_display = order_ids_str
+        
+        return (
+            log.get("document_id", ""),
+            log.get("receipt_id", ""),
+            log.get("date", ""),
+            log.get("sku", ""),
+            log.get("qty_received", ""),
+            log.get("receipt_date", ""),
+            order_ids_display,
+        )
     
     def _clear_history_filter(self):
         """Clear history filter and refresh."""
@@ -5381,31 +5541,37 @@ class DesktopOrderApp:
             self.ex_revert_all_btn.config(state="disabled")
 
     def _update_sku_context_card(self, sku: str):
-        """Populate the context card for the given SKU code."""
+        """Populate the context card for the given SKU code (stock computed in background)."""
         if not hasattr(self, "ex_ctx_sku_lbl"):
             return
-        skus = self.csv_layer.read_skus()
-        sku_obj = next((s for s in skus if s.sku == sku), None)
-        if not sku_obj:
+        asof = date.today() + timedelta(days=1)
+
+        def _compute(snap, token):
+            sku_obj = snap.skus_by_id.get(sku)
+            if sku_obj is None:
+                return None
+            try:
+                stock = StockCalculator.calculate_asof(
+                    sku=sku,
+                    asof_date=asof,
+                    transactions=snap.transactions,
+                    sales_records=None,
+                )
+                return sku_obj, stock.on_hand, stock.on_order
+            except Exception:
+                return sku_obj, "?", "?"
+
+        self.data_service.submit("sku_context", _compute, on_result=self._apply_sku_context_card)
+
+    def _apply_sku_context_card(self, result):
+        """Main-thread side of ``_update_sku_context_card``."""
+        if result is None:
             for lbl in (self.ex_ctx_sku_lbl, self.ex_ctx_desc_lbl,
                         self.ex_ctx_stock_lbl, self.ex_ctx_onorder_lbl, self.ex_ctx_shelf_lbl):
                 lbl.config(text="—")
             self.ex_ctx_alert_lbl.config(text="")
             return
-        # Calculate stock
-        try:
-            from src.domain.ledger import StockCalculator
-            txns = self.csv_layer.read_transactions()
-            stock = StockCalculator.calculate_asof(
-                sku=sku,
-                asof_date=date.today() + timedelta(days=1),
-                transactions=txns,
-                sales_records=None,
-            )
-            on_hand  = stock.on_hand
-            on_order = stock.on_order
-        except Exception:
-            on_hand, on_order = "?", "?"
+        sku_obj, on_hand, on_order = result
         self.ex_ctx_sku_lbl.config(    text=sku_obj.sku)
         self.ex_ctx_desc_lbl.config(   text=(sku_obj.description or "")[:32])
         self.ex_ctx_stock_lbl.config(  text=str(on_hand))
@@ -5723,16 +5889,20 @@ class DesktopOrderApp:
             messagebox.showerror("Errore", "Formato data visualizzazione non valido. Usa YYYY-MM-DD.")
             return
         
+        # Filter the exceptions of view_date off the Tk thread
+        def _compute(snap, token):
+            return [
+                t for t in snap.transactions
+                if t.event in (EventType.WASTE, EventType.ADJUST, EventType.UNFULFILLED)
+                and t.date == view_date
+            ]
+
+        self.data_service.submit("exception_history", _compute, on_result=self._populate_exception_history)
+
+    def _populate_exception_history(self, exception_txns):
+        """Main-thread side of ``_refresh_exception_tab``."""
         self.exception_treeview.delete(*self.exception_treeview.get_children())
-        
-        # Read all transactions and filter for exceptions on view_date
-        all_txns = self.csv_layer.read_transactions()
-        exception_txns = [
-            t for t in all_txns
-            if t.event in [EventType.WASTE, EventType.ADJUST, EventType.UNFULFILLED]
-            and t.date == view_date
-        ]
-        
+
         # Populate table
         for txn in exception_txns:
             # Extract notes (remove exception_key prefix)
@@ -5806,30 +5976,7 @@ class DesktopOrderApp:
             self.smart_exception_treeview.insert("", "end", values=("", "Nessun filtro attivo", "", "", "", "", "", "", "Abilita almeno un filtro sopra"))
             return
         
-        # Load data sources
-        all_skus = self.csv_layer.read_skus()
-        kpi_daily = self.csv_layer.read_kpi_daily()  # Returns list of KPIDaily records
-        current_stock_map = {}  # Map SKU -> on_hand
-        transactions = self.csv_layer.read_transactions()
-        
-        # Calculate current stock for each SKU
-        from src.domain.ledger import StockCalculator
-        for sku_obj in all_skus:
-            stock = StockCalculator.calculate_asof(
-                sku=sku_obj.sku,
-                asof_date=date.today() + timedelta(days=1),  # Include today
-                transactions=transactions,
-                sales_records=None,
-            )
-            current_stock_map[sku_obj.sku] = stock.on_hand
-        
-        # Build KPI map (latest KPI for each SKU)
-        kpi_map = {}  # Map SKU -> latest KPI dict
-        for kpi in kpi_daily:
-            sku_key = kpi.get("sku", "")
-            kpi_date = kpi.get("date", "")
-            if sku_key and (sku_key not in kpi_map or kpi_date > kpi_map[sku_key].get("date", "")):
-                kpi_map[sku_key] = kpi
+        from ..analytics.exception_candidates import filter_exception_candidates, load_exception_snapshot
         
         # Calculate unfulfilled for each SKU from current proposals (if available)
         unfulfilled_map = {}  # Map SKU -> unfulfilled_qty
@@ -5837,77 +5984,30 @@ class DesktopOrderApp:
             for prop in self.current_proposals:
                 unfulfilled_map[prop.sku] = prop.unfulfilled_qty
         
-        # Filter SKUs
-        problematic_skus = []
-        
-        for sku_obj in all_skus:
-            sku = sku_obj.sku
-            reasons = []
-            
-            # Get KPI data for this SKU
-            kpi = kpi_map.get(sku)
-            
-            # Helper to safely convert KPI values to float
-            def safe_float(value, default=0.0):
-                if value is None or value == '' or value == 'None':
-                    return default
-                try:
-                    return float(value)
-                except (ValueError, TypeError):
-                    return default
-            
-            oos_rate = safe_float(kpi.get("oos_rate"), 0.0) if kpi else 0.0
-            otif = safe_float(kpi.get("otif_rate"), 100.0) if kpi else 100.0
-            wmape = safe_float(kpi.get("wmape"), 0.0) if kpi else 0.0
-            
-            unfulfilled = unfulfilled_map.get(sku, 0)
-            shelf_life = sku_obj.shelf_life_days if sku_obj.shelf_life_days else 0
-            stock = current_stock_map.get(sku, 0)
-            
-            # Apply filters
-            passes = False
-            
-            if filter_oos and oos_rate > oos_threshold:
-                reasons.append(f"OOS alto ({oos_rate:.1f}%)")
-                passes = True
-            
-            if filter_otif and (otif < otif_threshold or unfulfilled > 0):
-                if otif < otif_threshold and unfulfilled > 0:
-                    reasons.append(f"OTIF basso ({otif:.1f}%) + Unfulfilled ({unfulfilled})")
-                elif unfulfilled > 0:
-                    reasons.append(f"Unfulfilled ({unfulfilled})")
-                else:
-                    reasons.append(f"OTIF basso ({otif:.1f}%)")
-                passes = True
-            
-            if filter_wmape and wmape > wmape_threshold:
-                reasons.append(f"WMAPE alto ({wmape:.1f}%)")
-                passes = True
-            
-            if filter_perish and shelf_life > 0 and shelf_life < shelf_threshold and stock > 0:
-                # Critical perishability: short shelf life + stock on hand
-                # Approximate coverage from stock / (avg daily sales estimate)
-                # Use simple ratio: if stock > shelf_life/2, flag as critical
-                if stock > shelf_life * 10:  # Heuristic: stock > 10x shelf_life days is risky
-                    reasons.append(f"Shelf life critica ({shelf_life}d, stock={stock})")
-                    passes = True
-            
-            if passes:
-                problematic_skus.append({
-                    "sku": sku,
-                    "description": sku_obj.description,
-                    "oos_rate": oos_rate,
-                    "otif": otif,
-                    "unfulfilled": unfulfilled,
-                    "wmape": wmape,
-                    "shelf_life": shelf_life,
-                    "stock": stock,
-                    "reason": "; ".join(reasons),
-                })
-        
-        # Sort by severity (number of reasons, then by OOS rate descending)
-        problematic_skus.sort(key=lambda x: (-len(x["reason"].split(";")), -x["oos_rate"]))
+        def _compute(snap, token):
+            # Stock / latest KPI / perishability per SKU: rebuilt only when the data revision changes
+            snapshot = self.data_service.read(load_exception_snapshot, self.csv_layer)
+            return filter_exception_candidates(
+                snapshot,
+                oos_threshold=oos_threshold,
+                otif_threshold=otif_threshold,
+                wmape_threshold=wmape_threshold,
+                shelf_threshold=shelf_threshold,
+                filter_oos=filter_oos,
+                filter_otif=filter_otif,
+                filter_wmape=filter_wmape,
+                filter_perish=filter_perish,
+                unfulfilled_map=unfulfilled_map,
+            )
         
+        self.data_service.submit(
+            "smart_exceptions", _compute, on_result=self._populate_smart_exceptions, needs_snapshot=False
+        )
+
+    def _populate_smart_exceptions(self, problematic_skus):
+        """Main-thread side of ``_refresh_smart_exceptions``."""
+        self.smart_exception_treeview.delete(*self.smart_exception_treeview.get_children())
+
         # Populate table
         for item in problematic_skus:
             self.smart_exception_treeview.insert(
@@ -6106,48 +6206,52 @@ class DesktopOrderApp:
             }
             event_type = event_type_map.get(event_type_str)
 
-            # Count matching events before confirming
-            try:
-                all_txns = self.csv_layer.read_transactions()
-                matching = [
-                    t for t in all_txns
-                    if t.sku == sku and t.date == event_date
-                    and t.event == event_type
-                ]
-                count = len(matching)
-            except Exception:
-                count = 0
-
-            # Explicit risk-aware confirm dialog
-            confirm = messagebox.askyesno(
-                "Conferma Annullamento Multiplo",
-                (f"Stai annullando TUTTI gli eventi {event_type_str}\n"
-                 f"per SKU '{sku}' del {date_str}.\n\n"
-                 f"  Numero eventi trovati: {count}\n"
-                 f"  Questa azione NON può essere annullata.\n\n"
-                 "Sei sicuro di voler procedere?"),
-                parent=popup,
-            )
-            if not confirm:
-                return
-            
-            # Revert
-            try:
-                reverted_count = self.exception_workflow.revert_exception_day(
-                    event_date=event_date,
-                    sku=sku,
-                    event_type=event_type,  # type: ignore[arg-type]
+            # Count matching events off the Tk thread, then confirm
+            def _count(snap, token):
+                return sum(
+                    1 for t in snap.transactions
+                    if t.sku == sku and t.date == event_date and t.event == event_type
                 )
-                
-                messagebox.showinfo(
-                    "Successo",
-                    f"Annullate {reverted_count} eccezione/i.",
+
+            def _confirm_and_revert(count):
+                if not popup.winfo_exists():
+                    return
+                # Explicit risk-aware confirm dialog
+                confirm = messagebox.askyesno(
+                    "Conferma Annullamento Multiplo",
+                    (f"Stai annullando TUTTI gli eventi {event_type_str}\n"
+                     f"per SKU '{sku}' del {date_str}.\n\n"
+                     f"  Numero eventi trovati: {count}\n"
+                     f"  Questa azione NON può essere annullata.\n\n"
+                     "Sei sicuro di voler procedere?"),
                     parent=popup,
                 )
-                popup.destroy()
-                self._refresh_exception_tab()
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to revert: {str(e)}", parent=popup)
+                if not confirm:
+                    return
+
+                # Revert
+                try:
+                    reverted_count = self.exception_workflow.revert_exception_day(
+                        event_date=event_date,
+                        sku=sku,
+                        event_type=event_type,  # type: ignore[arg-type]
+                    )
+
+                    messagebox.showinfo(
+                        "Successo",
+                        f"Annullate {reverted_count} eccezione/i.",
+                        parent=popup,
+                    )
+                    popup.destroy()
+                    self._refresh_exception_tab()
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to revert: {str(e)}", parent=popup)
+
+            self.data_service.submit(
+                "bulk_revert_count", _count,
+                on_result=_confirm_and_revert,
+                on_error=lambda exc: _confirm_and_revert(0),
+            )
         
         ttk.Button(button_frame, text="✔ Conferma Annullamento", command=do_bulk_revert).pack(side="right", padx=5)
         ttk.Button(button_frame, text="Annulla", command=popup.destroy).pack(side="right", padx=5)
@@ -6235,16 +6339,17 @@ class DesktopOrderApp:
         ttk.Entry(lot_toolbar, textvariable=self.lot_filter_sku_var, width=15).pack(side="left", padx=5)
         ttk.Button(lot_toolbar, text="Applica", command=self._refresh_all_lots).pack(side="left", padx=5)
         
-        all_lots_scroll = ttk.Scrollbar(all_lots_frame)
-        all_lots_scroll.pack(side="right", fill="y")
-        
-        self.all_lots_treeview = ttk.Treeview(
+        self.all_lots_treeview = VirtualTreeview(
             all_lots_frame,
             columns=("Lot ID", "SKU", "Description", "Expiry Date", "Qty", "Receipt Date"),
+            formatter=self._format_lot_row,
+            model=RowModel(sort_keys={
+                "Expiry Date": lambda lot_id, row: (row[0].expiry_date is None, row[0].expiry_date or date.max),
+                "Qty": lambda lot_id, row: row[0].qty_on_hand,
+                "Receipt Date": lambda lot_id, row: row[0].receipt_date,
+            }),
             height=10,
-            yscrollcommand=all_lots_scroll.set,
         )
-        all_lots_scroll.config(command=self.all_lots_treeview.yview)
         
         self.all_lots_treeview.column("#0", width=0, stretch=tk.NO)
         self.all_lots_treeview.column("Lot ID", anchor=tk.W, width=120)
@@ -6262,10 +6367,6 @@ class DesktopOrderApp:
         self.all_lots_treeview.heading("Receipt Date", text="Data Ricevimento", anchor=tk.CENTER)
         
         self.all_lots_treeview.pack(fill="both", expand=True)
-        
-        # Initial load
-        self._refresh_expiry_alerts()
-        self._refresh_all_lots()
     
     def _refresh_expiry_alerts(self):
         """Refresh expiring lots alert table."""
@@ -6337,31 +6438,27 @@ class DesktopOrderApp:
         if sku_filter:
             lots = [lot for lot in lots if sku_filter in lot.sku.lower()]
         
-        # Clear table
-        self.all_lots_treeview.delete(*self.all_lots_treeview.get_children())
-        
         # Get SKU descriptions
         skus_by_id = {sku.sku: sku for sku in self.csv_layer.read_skus()}
         
         # Sort by expiry date (None last)
         lots.sort(key=lambda lot: (lot.expiry_date is None, lot.expiry_date or date.max))
         
-        for lot in lots:
-            sku_obj = skus_by_id.get(lot.sku)
-            description = sku_obj.description if sku_obj else "N/A"
-            
-            self.all_lots_treeview.insert(
-                "",
-                "end",
-                values=(
-                    lot.lot_id,
-                    lot.sku,
-                    description,
-                    lot.expiry_date.isoformat() if lot.expiry_date else "No expiry",
-                    lot.qty_on_hand,
-                    lot.receipt_date.isoformat(),
-                ),
-            )
+        self.all_lots_treeview.set_rows((lot.lot_id, (lot, skus_by_id.get(lot.sku))) for lot in lots)
+    
+    @staticmethod
+    def _format_lot_row(lot_id: str, row) -> tuple:
+        """Display values of an all-lots table row ((Lot, SKU) record)."""
+        lot, sku_obj = row
+        description = sku_obj.description if sku_obj else "N/A"
+        return (
+            lot.lot_id,
+            lot.sku,
+            description,
+            lot.expiry_date.isoformat() if lot.expiry_date else "No expiry",
+            lot.qty_on_hand,
+            lot.receipt_date.isoformat(),
+        )
     
     # ------------------------------------------------------------------ #
     #  Score SKU tab                                                      #
@@ -7199,51 +7296,55 @@ class DesktopOrderApp:
         )
 
     def _run_simulation(self, sku_code: str, qty_min: int, qty_max: int, n_days: int, random_seed):
-        """Execute the history simulation and show result summary."""
+        """Execute the history simulation (background job) and show result summary."""
         from datetime import date as _date
         from ..workflows.history_simulation import HistorySimulationWorkflow
 
-        try:
+        def _compute(ctx):
             workflow = HistorySimulationWorkflow(self.csv_layer)
-            result = workflow.run_for_sku(
+            return workflow.run_for_sku(
                 sku_code=sku_code,
                 qty_min=qty_min,
                 qty_max=qty_max,
                 n_days=n_days,
                 end_date=_date.today(),
                 random_seed=random_seed,
+                progress=ctx.progress,
             )
-        except Exception as exc:
+
+        def _failed(exc):
             messagebox.showerror(
                 "Errore Simulazione",
                 f"La simulazione è fallita:\n\n{exc}"
             )
-            return
 
-        # Build summary
-        lines = [
-            f"✅ Simulazione completata per SKU {sku_code}",
-            "",
-            f"Giorni generati:     {result.days_generated}",
-            f"Vendite totali (pz): {result.total_sales_qty}",
-            f"Ordini creati:       {result.orders_created}",
-            f"Ricezioni create:    {result.receipts_created}",
-        ]
-        if result.warnings:
-            lines.append("")
-            lines.append(f"⚠️  {len(result.warnings)} avvertimento/i:")
-            for w in result.warnings[:5]:  # show max 5
-                lines.append(f"  • {w}")
-            if len(result.warnings) > 5:
-                lines.append(f"  ... e altri {len(result.warnings) - 5}")
+        def _done(result):
+            # Build summary
+            lines = [
+                f"✅ Simulazione completata per SKU {sku_code}",
+                "",
+                f"Giorni generati:     {result.days_generated}",
+                f"Vendite totali (pz): {result.total_sales_qty}",
+                f"Ordini creati:       {result.orders_created}",
+                f"Ricezioni create:    {result.receipts_created}",
+            ]
+            if result.warnings:
+                lines.append("")
+                lines.append(f"⚠️  {len(result.warnings)} avvertimento/i:")
+                for w in result.warnings[:5]:  # show max 5
+                    lines.append(f"  • {w}")
+                if len(result.warnings) > 5:
+                    lines.append(f"  ... e altri {len(result.warnings) - 5}")
 
-        messagebox.showinfo("Simulazione Completata", "\n".join(lines))
+            messagebox.showinfo("Simulazione Completata", "\n".join(lines))
 
-        # Refresh relevant tabs so new data is visible
-        try:
-            self._refresh_admin_tab()
-        except Exception:
-            pass
+            # Refresh relevant tabs so new data is visible
+            try:
+                self._refresh_admin_tab()
+            except Exception:
+                pass
+
+        self._start_job("history_simulation", f"Simulazione storico {sku_code}", _compute, _done, _failed)
 
     def _show_sku_form(self, mode="new", sku_code=None, batch_sku_codes=None):
         """
@@ -8346,7 +8447,7 @@ class DesktopOrderApp:
         self._refresh_admin_tab()
 
     def _refresh_stock_tab(self):
-        """Refresh stock calculations and update tab."""
+        """Refresh stock calculations and update tab (computed in background)."""
         try:
             asof_str = self.asof_date_var.get()
             self.asof_date = date.fromisoformat(asof_str)
@@ -8354,55 +8455,56 @@ class DesktopOrderApp:
             messagebox.showerror("Error", "Invalid date format. Use YYYY-MM-DD.")
             return
         
-        self.stock_treeview.delete(*self.stock_treeview.get_children())
-        
-        # Get all SKUs
-        sku_ids = self.csv_layer.get_all_sku_ids()
-        skus_by_id = {sku.sku: sku for sku in self.csv_layer.read_skus()}
-        
-        # Read transactions and sales
-        transactions = self.csv_layer.read_transactions()
-        sales_records = self.csv_layer.read_sales()
-        
-        # Calculate stock for each SKU.
         # Pass asof_date + 1 day so that events recorded ON asof_date are included
         # (the rule is date < asof_date, strictly less-than, so +1 makes it inclusive).
-        stocks = StockCalculator.calculate_all_skus(
-            sku_ids,
-            self.asof_date + timedelta(days=1),
-            transactions,
-            sales_records,
-        )
+        calc_date = self.asof_date + timedelta(days=1)
         
-        # Populate table
-        for sku_id in sku_ids:
-            stock = stocks[sku_id]
-            sku_obj = skus_by_id.get(sku_id)
-            description = sku_obj.description if sku_obj else "N/A"
-            pack_size = (sku_obj.pack_size if sku_obj and sku_obj.pack_size else 1)
-            
-            # Get EOD stock value if edited (stored as int pezzi)
-            eod_value = ""
-            if sku_id in self.eod_stock_edits:
-                eod_value = format_pezzi_colli(self.eod_stock_edits[sku_id], pack_size)
-            
-            item_id = self.stock_treeview.insert(
-                "",
-                "end",
-                iid=sku_id,  # use SKU as row identifier so selection[0] always returns the exact string
-                values=(
-                    stock.sku,
-                    description,
-                    format_pezzi_colli(stock.on_hand, pack_size),
-                    format_pezzi_colli(stock.on_order, pack_size),
-                    format_pezzi_colli(stock.available(), pack_size),
-                    eod_value,
-                ),
+        def compute(snap, token):
+            stocks = StockCalculator.calculate_all_skus(
+                snap.sku_ids,
+                calc_date,
+                snap.transactions,
+                snap.sales,
             )
-            
-            # Apply tag if edited
-            if sku_id in self.eod_stock_edits:
-                self.stock_treeview.item(item_id, tags=("eod_edited",))
+            return snap, stocks
+        
+        # A newer as-of date supersedes any refresh still running on the "stock" channel
+        self.data_service.submit(
+            "stock",
+            compute,
+            on_result=self._populate_stock_tab,
+            on_error=lambda e: logger.error(f"Stock refresh failed: {e}", exc_info=e),
+        )
+    
+    def _populate_stock_tab(self, result):
+        """Fill the stock table from a background stock computation."""
+        snap, stocks = result
+        # Rows are keyed by SKU so selection[0] always returns the exact string;
+        # formatting happens only for the rows actually on screen.
+        self.stock_treeview.set_rows(
+            (sku_id, (stocks[sku_id], snap.skus_by_id.get(sku_id)))
+            for sku_id in snap.sku_ids
+        )
+    
+    def _format_stock_row(self, sku_id: str, row) -> tuple:
+        """Display values of a stock table row ((StockState, SKU) record)."""
+        stock, sku_obj = row
+        description = sku_obj.description if sku_obj else "N/A"
+        pack_size = (sku_obj.pack_size if sku_obj and sku_obj.pack_size else 1)
+        
+        # Get EOD stock value if edited (stored as int pezzi)
+        eod_value = ""
+        if sku_id in self.eod_stock_edits:
+            eod_value = format_pezzi_colli(self.eod_stock_edits[sku_id], pack_size)
+        
+        return (
+            stock.sku,
+            description,
+            format_pezzi_colli(stock.on_hand, pack_size),
+            format_pezzi_colli(stock.on_order, pack_size),
+            format_pezzi_colli(stock.available(), pack_size),
+            eod_value,
+        )
     
     def _on_stock_select(self, event):
         """Handle stock treeview selection to show audit timeline."""
@@ -8424,24 +8526,44 @@ class DesktopOrderApp:
         # Refresh timeline
         self._refresh_audit_timeline()
     
+    # Ledger events loaded per audit timeline page ("load more" fetches the next one)
+    _AUDIT_LEDGER_PAGE_SIZE = 200
+    _AUDIT_MORE_IID = "audit_more"
+    
     def _refresh_audit_timeline(self):
         """Refresh audit timeline for selected SKU."""
         self.audit_timeline_treeview.delete(*self.audit_timeline_treeview.get_children())
+        self._audit_ledger_cursor = None
         
         if not self.selected_sku_for_audit:
+            self.data_service.cancel("audit")
             return
         
+        sku = self.selected_sku_for_audit
+        self.data_service.submit(
+            "audit",
+            lambda snap, token: self._load_audit_timeline(sku),
+            on_result=self._populate_audit_timeline,
+            on_error=lambda e: self.audit_timeline_treeview.insert("", "end", values=(f"Error: {str(e)}", "", "", "")),
+            needs_snapshot=False,
+        )
+    
+    def _load_audit_timeline(self, sku: str, before=None):
+        """Worker side of the audit timeline: one page of SKU ledger events (+ audit log on the first page)."""
+        # Latest ledger events for this SKU (most recent first), read through the per-SKU index
+        sku_transactions, next_cursor = self.data_service.read(
+            self.csv_layer.read_sku_transactions_page, sku, limit=self._AUDIT_LEDGER_PAGE_SIZE, before=before,
+        )
+        
+        # Get audit log entries for this SKU
+        audit_logs = [] if before is not None else self.data_service.read(self.csv_layer.read_audit_log, sku=sku, limit=50)
+        return audit_logs, sku_transactions, next_cursor
+    
+    def _populate_audit_timeline(self, result):
+        """Main-thread side of the audit timeline refresh."""
+        audit_logs, sku_transactions, next_cursor = result
+        self.audit_timeline_treeview.delete(*self.audit_timeline_treeview.get_children())
         try:
-            # Get all transactions for this SKU
-            transactions = self.csv_layer.read_transactions()
-            sku_transactions = [t for t in transactions if t.sku == self.selected_sku_for_audit]
-            
-            # Sort by date (most recent first)
-            sku_transactions = sorted(sku_transactions, key=lambda t: t.date, reverse=True)
-            
-            # Get audit log entries for this SKU
-            audit_logs = self.csv_layer.read_audit_log(sku=self.selected_sku_for_audit, limit=50)
-            
             # Combine and display
             # First, show audit logs (SKU edits, etc.)
             if audit_logs:
@@ -8464,33 +8586,7 @@ class DesktopOrderApp:
             if sku_transactions:
                 # Insert separator
                 self.audit_timeline_treeview.insert("", "end", values=("=== LEDGER EVENTS ===", "", "", ""))
-                
-                for txn in sku_transactions:
-                    note = txn.note or ""
-                    if txn.receipt_date:
-                        note = f"Receipt: {txn.receipt_date.isoformat()} | {note}"
-                    
-                    # Display quantity with correct sign:
-                    # - Events that reduce stock/orders: show negative (SALE, WASTE, RECEIPT, UNFULFILLED)
-                    # - Events that increase stock/orders: show positive (ORDER, SNAPSHOT, ADJUST)
-                    display_qty = txn.qty
-                    if txn.event in [EventType.UNFULFILLED, EventType.RECEIPT]:
-                        # These events reduce on_order, show as negative
-                        display_qty = -abs(txn.qty)
-                    elif txn.event in [EventType.SALE, EventType.WASTE]:
-                        # These events reduce on_hand, show as negative
-                        display_qty = -abs(txn.qty)
-                    
-                    self.audit_timeline_treeview.insert(
-                        "",
-                        "end",
-                        values=(
-                            txn.date.isoformat(),
-                            txn.event.value,
-                            f"{display_qty:+d}" if display_qty else "",
-                            note,
-                        ),
-                    )
+                self._append_audit_ledger_rows(sku_transactions, next_cursor)
             
             if not audit_logs and not sku_transactions:
                 self.audit_timeline_treeview.insert("", "end", values=("No history found", "", "", ""))
@@ -8498,6 +8594,63 @@ class DesktopOrderApp:
         except Exception as e:
             self.audit_timeline_treeview.insert("", "end", values=(f"Error: {str(e)}", "", "", ""))
     
+    def _append_audit_ledger_rows(self, sku_transactions, next_cursor):
+        """Append ledger event rows (and the "load more" row if older events remain)."""
+        if self.audit_timeline_treeview.exists(self._AUDIT_MORE_IID):
+            self.audit_timeline_treeview.delete(self._AUDIT_MORE_IID)
+        
+        for txn in sku_transactions:
+            note = txn.note or ""
+            if txn.receipt_date:
+                note = f"Receipt: {txn.receipt_date.isoformat()} | {note}"
+            
+            # Display quantity with correct sign:
+            # - Events that reduce stock/orders: show negative (SALE, WASTE, RECEIPT, UNFULFILLED)
+            # - Events that increase stock/orders: show positive (ORDER, SNAPSHOT, ADJUST)
+            display_qty = txn.qty
+            if txn.event in [EventType.UNFULFILLED, EventType.RECEIPT]:
+                # These events reduce on_order, show as negative
+                display_qty = -abs(txn.qty)
+            elif txn.event in [EventType.SALE, EventType.WASTE]:
+                # These events reduce on_hand, show as negative
+                display_qty = -abs(txn.qty)
+            
+            self.audit_timeline_treeview.insert(
+                "",
+                "end",
+                values=(
+                    txn.date.isoformat(),
+                    txn.event.value,
+                    f"{display_qty:+d}" if display_qty else "",
+                    note,
+                ),
+            )
+        
+        self._audit_ledger_cursor = next_cursor
+        if next_cursor is not None:
+            self.audit_timeline_treeview.insert(
+                "", "end", iid=self._AUDIT_MORE_IID,
+                values=("▼ Carica eventi precedenti…", "", "", "(doppio click)"),
+            )
+    
+    def _on_audit_timeline_double_click(self, event):
+        """Double-click on the "load more" row: fetch the next page of older ledger events."""
+        if self.audit_timeline_treeview.identify_row(event.y) != self._AUDIT_MORE_IID:
+            return
+        cursor = self._audit_ledger_cursor
+        sku = self.selected_sku_for_audit
+        if cursor is None or not sku:
+            return
+        
+        self.audit_timeline_treeview.item(self._AUDIT_MORE_IID, values=("Caricamento…", "", "", ""))
+        self.data_service.submit(
+            "audit",
+            lambda snap, token: self._load_audit_timeline(sku, before=cursor),
+            on_result=lambda result: self._append_audit_ledger_rows(result[1], result[2]),
+            on_error=lambda e: self.audit_timeline_treeview.insert("", "end", values=(f"Error: {str(e)}", "", "", "")),
+            needs_snapshot=False,
+        )
+    
     def _on_stock_eod_double_click(self, event):
         """Handle double-click on EOD Stock column — opens inline cell editor."""
         region = self.stock_treeview.identify_region(event.x, event.y)
@@ -8517,13 +8670,14 @@ class DesktopOrderApp:
 
     def _open_eod_inline_editor(self, item_id, column_id):
         """Place an inline Entry widget directly over the EOD Stock cell."""
-        item = self.stock_treeview.item(item_id)
-        # item_id == iid == original SKU string (never loses leading zeros)
+        # item_id == row key == original SKU string (never loses leading zeros)
         sku = item_id
+        row = self.stock_treeview.model.get(sku)
+        if row is None:
+            return
 
         # Look up pack_size
-        skus_by_id = {str(s.sku).strip(): s for s in self.csv_layer.read_skus()}
-        sku_obj = skus_by_id.get(sku)
+        sku_obj = row[1]
         pack_size = (sku_obj.pack_size if sku_obj and sku_obj.pack_size else 1)
 
         # Current value in colli
@@ -8541,7 +8695,7 @@ class DesktopOrderApp:
 
         # Entry widget placed over the cell
         entry_var = tk.StringVar(value=initial_colli)
-        entry = ttk.Entry(self.stock_treeview, textvariable=entry_var, justify="center")
+        entry = ttk.Entry(self.stock_treeview.tree, textvariable=entry_var, justify="center")
         entry.place(x=x, y=y, width=width, height=height)
         entry.focus_set()
         entry.select_range(0, tk.END)
@@ -8563,18 +8717,8 @@ class DesktopOrderApp:
             new_pezzi = colli_to_pezzi(new_colli, pack_size)
             self.eod_stock_edits[sku] = new_pezzi
 
-            self.stock_treeview.item(
-                item_id,
-                values=(
-                    item_id,            # SKU — iid preserves leading zeros
-                    item["values"][1],  # Description
-                    item["values"][2],  # On Hand
-                    item["values"][3],  # On Order
-                    item["values"][4],  # Available
-                    format_pezzi_colli(new_pezzi, pack_size),  # EOD Stock
-                ),
-                tags=("eod_edited",),
-            )
+            # Row formatter/tagger read eod_stock_edits
+            self.stock_treeview.refresh_row(item_id)
             entry.destroy()
 
             # Tab → move to next row and open its editor
@@ -8586,8 +8730,8 @@ class DesktopOrderApp:
                 except (ValueError, IndexError):
                     next_id = None
                 if next_id:
-                    self.stock_treeview.selection_set(next_id)
                     self.stock_treeview.see(next_id)
+                    self.stock_treeview.selection_set(next_id)
                     self.stock_treeview.after(30, lambda: self._open_eod_inline_editor(next_id, "#6"))
 
         def _cancel(event=None):
@@ -8601,25 +8745,8 @@ class DesktopOrderApp:
     
     def _filter_stock_table(self):
         """Filter stock table based on search input."""
-        search_text = self.stock_search_var.get().lower()
-        
-        # If search empty, refresh full table
-        if not search_text:
-            self._refresh_stock_tab()
-            return
-        
-        # Filter items
-        for item_id in self.stock_treeview.get_children():
-            item = self.stock_treeview.item(item_id)
-            # item_id == iid == original SKU string (preserves leading zeros)
-            sku = item_id.lower()
-            description = str(item["values"][1]).lower()
-            
-            # Show if matches SKU or description
-            if search_text in sku or search_text in description:
-                self.stock_treeview.reattach(item_id, "", "end")
-            else:
-                self.stock_treeview.detach(item_id)
+        # Show rows whose SKU or description match (narrowed incrementally while typing)
+        self.stock_treeview.set_search(self.stock_search_var.get())
     
     def _confirm_eod_close(self):
         """Confirm EOD stock entries and calculate sales."""
@@ -8687,47 +8814,55 @@ class DesktopOrderApp:
             if not file_path:
                 return  # User cancelled
             
-            # Get current stock
-            sku_ids = self.csv_layer.get_all_sku_ids()
-            skus_by_id = {sku.sku: sku for sku in self.csv_layer.read_skus()}
-            transactions = self.csv_layer.read_transactions()
-            sales_records = self.csv_layer.read_sales()
-            
-            stocks = StockCalculator.calculate_all_skus(
-                sku_ids,
-                self.asof_date,
-                transactions,
-                sales_records,
-            )
-            
-            # Write CSV
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(["SKU", "Description", "EAN", "On Hand", "On Order", "Available", "AsOf Date"])
-                
-                for sku_id in sku_ids:
-                    stock = stocks[sku_id]
-                    sku_obj = skus_by_id.get(sku_id)
-                    description = sku_obj.description if sku_obj else "N/A"
-                    ean = sku_obj.ean if sku_obj else ""
-                    
-                    writer.writerow([
-                        sku_id,
-                        description,
-                        ean,
-                        stock.on_hand,
-                        stock.on_order,
-                        stock.on_hand + stock.on_order,
-                        self.asof_date.isoformat(),
-                    ])
-            
-            messagebox.showinfo("Successo", f"Snapshot stock esportato in:\n{file_path}\n\n{len(sku_ids)} SKU esportati.")
-            
-            # Log export operation
-            self.csv_layer.log_audit(
-                operation="EXPORT",
-                details=f"Stock snapshot exported ({len(sku_ids)} SKUs, AsOf {self.asof_date.isoformat()})",
-                sku=None,
+            asof = self.asof_date
+
+            # Stock from the shared snapshot, file written off the Tk thread
+            def _write(snap, token):
+                sku_ids = [sku.sku for sku in snap.skus]
+                skus_by_id = snap.skus_by_id
+                stocks = StockCalculator.calculate_all_skus(
+                    sku_ids,
+                    asof,
+                    snap.transactions,
+                    snap.sales,
+                )
+
+                # Write CSV
+                with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["SKU", "Description", "EAN", "On Hand", "On Order", "Available", "AsOf Date"])
+
+                    for sku_id in sku_ids:
+                        stock = stocks[sku_id]
+                        sku_obj = skus_by_id.get(sku_id)
+                        description = sku_obj.description if sku_obj else "N/A"
+                        ean = sku_obj.ean if sku_obj else ""
+
+                        writer.writerow([
+                            sku_id,
+                            description,
+                            ean,
+                            stock.on_hand,
+                            stock.on_order,
+                            stock.on_hand + stock.on_order,
+                            asof.isoformat(),
+                        ])
+                return len(sku_ids)
+
+            def _done(count):
+                messagebox.showinfo("Successo", f"Snapshot stock esportato in:\n{file_path}\n\n{count} SKU esportati.")
+
+                # Log export operation
+                self.csv_layer.log_audit(
+                    operation="EXPORT",
+                    details=f"Stock snapshot exported ({count} SKUs, AsOf {asof.isoformat()})",
+                    sku=None,
+                )
+
+            self.data_service.submit(
+                "export_stock", _write, on_result=_done,
+                on_error=lambda e: messagebox.showerror(
+                    "Errore Esportazione", f"Impossibile esportare snapshot stock: {str(e)}"),
             )
         
         except Exception as e:
@@ -8746,29 +8881,37 @@ class DesktopOrderApp:
             if not file_path:
                 return
             
-            transactions = self.csv_layer.read_transactions()
-            
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Date", "SKU", "Event", "Quantity", "Receipt Date", "Notes"])
-                
-                for txn in transactions:
-                    writer.writerow([
-                        txn.date.isoformat(),
-                        txn.sku,
-                        txn.event.name,
-                        txn.qty,
-                        txn.receipt_date.isoformat() if txn.receipt_date else "",
-                        txn.note,
-                    ])
-            
-            messagebox.showinfo("Successo", f"Ledger esportato in:\n{file_path}\n\n{len(transactions)} transazioni esportate.")
-            
-            # Log export operation
-            self.csv_layer.log_audit(
-                operation="EXPORT",
-                details=f"Ledger exported ({len(transactions)} transactions)",
-                sku=None,
+            def _write(snap, token):
+                transactions = snap.transactions
+                with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["Date", "SKU", "Event", "Quantity", "Receipt Date", "Notes"])
+
+                    for txn in transactions:
+                        writer.writerow([
+                            txn.date.isoformat(),
+                            txn.sku,
+                            txn.event.name,
+                            txn.qty,
+                            txn.receipt_date.isoformat() if txn.receipt_date else "",
+                            txn.note,
+                        ])
+                return len(transactions)
+
+            def _done(count):
+                messagebox.showinfo("Successo", f"Ledger esportato in:\n{file_path}\n\n{count} transazioni esportate.")
+
+                # Log export operation
+                self.csv_layer.log_audit(
+                    operation="EXPORT",
+                    details=f"Ledger exported ({count} transactions)",
+                    sku=None,
+                )
+
+            self.data_service.submit(
+                "export_ledger", _write, on_result=_done,
+                on_error=lambda e: messagebox.showerror(
+                    "Errore Esportazione", f"Impossibile esportare ledger: {str(e)}"),
             )
         
         except Exception as e:
@@ -8915,246 +9058,258 @@ class DesktopOrderApp:
             if not file_path:
                 return
             
-            # Load data
-            all_skus = self.csv_layer.read_skus()
-            transactions = self.csv_layer.read_transactions()
-            sales_records = self.csv_layer.read_sales()
             settings = self.csv_layer.read_settings()
-            
-            # Build proposals map (use current proposals if available, else generate fresh)
-            proposal_map = {}
-            if hasattr(self, 'current_proposals') and self.current_proposals:
-                for prop in self.current_proposals:
-                    proposal_map[prop.sku] = prop
-            else:
-                # Generate fresh proposals for export (loop over all SKUs)
-                from src.workflows.order import OrderWorkflow
-                from src.domain.ledger import StockCalculator
-                order_workflow = OrderWorkflow(self.csv_layer)
-                for sku_obj in all_skus:
-                    try:
-                        # Calculate current stock
-                        stock = StockCalculator.calculate_asof(
-                            sku=sku_obj.sku,
-                            asof_date=date.today() + timedelta(days=1),
-                            transactions=transactions,
-                            sales_records=None,
-                        )
+            kpi_lookback_days = settings.get("kpi_metrics", {}).get("oos_lookback_days", {}).get("value", 90)
+            current_proposals = list(getattr(self, "current_proposals", None) or [])
+
+            # Proposals, live KPIs and the file are computed off the Tk thread
+            def _write(snap, token):
+                # Load data (shared snapshot)
+                all_skus = snap.skus
+                transactions = snap.transactions
+                sales_records = snap.sales
+            
+                # Build proposals map (use current proposals if available, else generate fresh)
+                proposal_map = {}
+                if current_proposals:
+                    for prop in current_proposals:
+                        proposal_map[prop.sku] = prop
+                else:
+                    # Generate fresh proposals for export (loop over all SKUs)
+                    from src.workflows.order import OrderWorkflow
+                    from src.domain.ledger import StockCalculator
+                    order_workflow = OrderWorkflow(self.csv_layer)
+                    for sku_obj in all_skus:
+                        try:
+                            # Calculate current stock
+                            stock = StockCalculator.calculate_asof(
+                                sku=sku_obj.sku,
+                                asof_date=date.today() + timedelta(days=1),
+                                transactions=transactions,
+                                sales_records=None,
+                            )
                         
-                        # Calculate daily sales avg
-                        sku_sales = [s for s in sales_records if s.sku == sku_obj.sku]
-                        if sku_sales:
-                            total_sales = sum(s.qty_sold for s in sku_sales)
-                            days = len(sku_sales)
-                            daily_sales_avg = total_sales / days if days > 0 else 0.0
-                        else:
-                            daily_sales_avg = 0.0
+                            # Calculate daily sales avg
+                            sku_sales = [s for s in sales_records if s.sku == sku_obj.sku]
+                            if sku_sales:
+                                total_sales = sum(s.qty_sold for s in sku_sales)
+                                days = len(sku_sales)
+                                daily_sales_avg = total_sales / days if days > 0 else 0.0
+                            else:
+                                daily_sales_avg = 0.0
                         
-                        prop = order_workflow.generate_proposal(
-                            sku=sku_obj.sku,
-                            description=sku_obj.description,
-                            current_stock=stock,
-                            daily_sales_avg=daily_sales_avg,
-                            sku_obj=sku_obj,
-                            transactions=transactions,
-                            sales_records=sales_records,
-                        )
-                        if prop:
-                            proposal_map[sku_obj.sku] = prop
-                    except Exception as e:
-                        logging.warning(f"Failed to generate proposal for SKU {sku_obj.sku} during export: {e}")
+                            prop = order_workflow.generate_proposal(
+                                sku=sku_obj.sku,
+                                description=sku_obj.description,
+                                current_stock=stock,
+                                daily_sales_avg=daily_sales_avg,
+                                sku_obj=sku_obj,
+                                transactions=transactions,
+                                sales_records=sales_records,
+                            )
+                            if prop:
+                                proposal_map[sku_obj.sku] = prop
+                        except Exception as e:
+                            logging.warning(f"Failed to generate proposal for SKU {sku_obj.sku} during export: {e}")
             
-            # Live KPI calculation for each SKU
-            from src.analytics.kpi import compute_oos_kpi, compute_forecast_accuracy, compute_supplier_proxy_kpi, compute_waste_rate
+                # Live KPI calculation for each SKU
+                from src.analytics.kpi import compute_oos_kpi, compute_forecast_accuracy, compute_supplier_proxy_kpi, compute_waste_rate
             
-            kpi_lookback_days = settings.get("kpi_metrics", {}).get("oos_lookback_days", {}).get("value", 90)
-            oos_mode = settings.get("kpi_metrics", {}).get("oos_detection_mode", {}).get("value", "strict")
-            kpi_map = {}  # Map SKU -> KPI dict
+                oos_mode = settings.get("kpi_metrics", {}).get("oos_detection_mode", {}).get("value", "strict")
+                kpi_map = {}  # Map SKU -> KPI dict
             
-            for sku_obj in all_skus:
-                sku = sku_obj.sku
+                for sku_obj in all_skus:
+                    sku = sku_obj.sku
                 
-                # OOS KPI
-                oos_kpi = compute_oos_kpi(
-                    sku=sku,
-                    lookback_days=kpi_lookback_days,
-                    mode=oos_mode,
-                    csv_layer=self.csv_layer,
-                    asof_date=date.today(),
-                )
+                    # OOS KPI
+                    oos_kpi = compute_oos_kpi(
+                        sku=sku,
+                        lookback_days=kpi_lookback_days,
+                        mode=oos_mode,
+                        csv_layer=self.csv_layer,
+                        asof_date=date.today(),
+                    )
                 
-                # Forecast accuracy KPI
-                forecast_kpi = compute_forecast_accuracy(
-                    sku=sku,
-                    lookback_days=kpi_lookback_days,
-                    mode="mape",
-                    csv_layer=self.csv_layer,
-                    asof_date=date.today(),
-                )
+                    # Forecast accuracy KPI
+                    forecast_kpi = compute_forecast_accuracy(
+                        sku=sku,
+                        lookback_days=kpi_lookback_days,
+                        mode="mape",
+                        csv_layer=self.csv_layer,
+                        asof_date=date.today(),
+                    )
                 
-                # Supplier/OTIF proxy KPI
-                supplier_kpi = compute_supplier_proxy_kpi(
-                    sku=sku,
-                    lookback_days=kpi_lookback_days,
-                    csv_layer=self.csv_layer,
-                    asof_date=date.today(),
-                )
+                    # Supplier/OTIF proxy KPI
+                    supplier_kpi = compute_supplier_proxy_kpi(
+                        sku=sku,
+                        lookback_days=kpi_lookback_days,
+                        csv_layer=self.csv_layer,
+                        asof_date=date.today(),
+                    )
                 
-                # Waste rate via canonical compute_waste_rate (always float, never None)
-                waste_rate_val, _ = compute_waste_rate(
-                    sku=sku,
-                    lookback_days=kpi_lookback_days,
-                    csv_layer=self.csv_layer,
-                    asof_date=date.today(),
-                )
+                    # Waste rate via canonical compute_waste_rate (always float, never None)
+                    waste_rate_val, _ = compute_waste_rate(
+                        sku=sku,
+                        lookback_days=kpi_lookback_days,
+                        csv_layer=self.csv_layer,
+                        asof_date=date.today(),
+                    )
                 
-                kpi_map[sku] = {
-                    "oos_rate": oos_kpi.get("oos_rate", 0.0),
-                    "oos_days": oos_kpi.get("oos_days", 0),
-                    "wmape": forecast_kpi.get("wmape", 0.0),
-                    "mae": forecast_kpi.get("mae", 0.0),
-                    "otif": supplier_kpi.get("otif", 100.0),
-                    "qty_unfulfilled": supplier_kpi.get("qty_unfulfilled", 0),
-                    "n_unfulfilled_events": supplier_kpi.get("n_unfulfilled_events", 0),
-                    "waste_rate": waste_rate_val,
-                }
+                    kpi_map[sku] = {
+                        "oos_rate": oos_kpi.get("oos_rate", 0.0),
+                        "oos_days": oos_kpi.get("oos_days", 0),
+                        "wmape": forecast_kpi.get("wmape", 0.0),
+                        "mae": forecast_kpi.get("mae", 0.0),
+                        "otif": supplier_kpi.get("otif", 100.0),
+                        "qty_unfulfilled": supplier_kpi.get("qty_unfulfilled", 0),
+                        "n_unfulfilled_events": supplier_kpi.get("n_unfulfilled_events", 0),
+                        "waste_rate": waste_rate_val,
+                    }
             
-            # Write CSV
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
+                # Write CSV
+                with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
                 
-                # Header row
-                writer.writerow([
-                    "SKU",
-                    "Descrizione",
-                    "Qty Proposta",
-                    "Receipt Date",
-                    "Policy Mode",
-                    "Forecast Method",
-                    "Target CSL",
-                    "Sigma Horizon",
-                    "Reorder Point",
-                    "Inventory Position",
-                    "Pack Size",
-                    "MOQ",
-                    "Max Stock",
-                    "Constraint Pack",
-                    "Constraint MOQ",
-                    "Constraint Max",
-                    "Constraint Details",
-                    "OOS Days Count",
-                    "OOS Boost Applied",
-                    "Shelf Life Days",
-                    "Usable Stock",
-                    "Waste Risk %",
-                    "KPI: OOS Rate %",
-                    "KPI: OOS Days",
-                    "KPI: WMAPE %",
-                    "KPI: MAE",
-                    "KPI: OTIF %",
-                    "KPI: Unfulfilled Qty",
-                    "KPI: Unfulfilled Events",
-                    "KPI: Waste Rate %",
-                    "Notes",
-                ])
+                    # Header row
+                    writer.writerow([
+                        "SKU",
+                        "Descrizione",
+                        "Qty Proposta",
+                        "Receipt Date",
+                        "Policy Mode",
+                        "Forecast Method",
+                        "Target CSL",
+                        "Sigma Horizon",
+                        "Reorder Point",
+                        "Inventory Position",
+                        "Pack Size",
+                        "MOQ",
+                        "Max Stock",
+                        "Constraint Pack",
+                        "Constraint MOQ",
+                        "Constraint Max",
+                        "Constraint Details",
+                        "OOS Days Count",
+                        "OOS Boost Applied",
+                        "Shelf Life Days",
+                        "Usable Stock",
+                        "Waste Risk %",
+                        "KPI: OOS Rate %",
+                        "KPI: OOS Days",
+                        "KPI: WMAPE %",
+                        "KPI: MAE",
+                        "KPI: OTIF %",
+                        "KPI: Unfulfilled Qty",
+                        "KPI: Unfulfilled Events",
+                        "KPI: Waste Rate %",
+                        "Notes",
+                    ])
                 
-                # Data rows
-                row_count = 0
-                for sku_obj in all_skus:
-                    sku = sku_obj.sku
-                    prop = proposal_map.get(sku)
-                    kpi = kpi_map.get(sku, {})
+                    # Data rows
+                    row_count = 0
+                    for sku_obj in all_skus:
+                        sku = sku_obj.sku
+                        prop = proposal_map.get(sku)
+                        kpi = kpi_map.get(sku, {})
                     
-                    if prop:
-                        # Full row from proposal + KPI
-                        writer.writerow([
-                            sku,
-                            sku_obj.description,
-                            prop.proposed_qty,
-                            prop.receipt_date.isoformat() if prop.receipt_date else "",
-                            prop.policy_mode,
-                            prop.forecast_method,
-                            f"{prop.target_csl:.3f}" if prop.target_csl > 0 else "",
-                            f"{prop.sigma_horizon:.2f}" if prop.sigma_horizon > 0 else "",
-                            prop.reorder_point,
-                            prop.inventory_position,
-                            prop.pack_size,
-                            prop.moq,
-                            prop.max_stock,
-                            "YES" if prop.constraints_applied_pack else "NO",
-                            "YES" if prop.constraints_applied_moq else "NO",
-                            "YES" if prop.constraints_applied_max else "NO",
-                            prop.constraint_details,
-                            prop.oos_days_count,
-                            "YES" if prop.oos_boost_applied else "NO",
-                            prop.shelf_life_days if prop.shelf_life_days > 0 else "",
-                            prop.usable_stock,
-                            f"{prop.waste_risk_percent:.1f}" if prop.waste_risk_percent > 0 else "",
-                            f"{kpi.get('oos_rate', 0.0):.2f}",
-                            kpi.get('oos_days', 0),
-                            f"{kpi.get('wmape', 0.0):.2f}",
-                            f"{kpi.get('mae', 0.0):.2f}",
-                            f"{kpi.get('otif', 100.0):.2f}",
-                            kpi.get('qty_unfulfilled', 0),
-                            kpi.get('n_unfulfilled_events', 0),
-                            f"{kpi.get('waste_rate', 0.0):.2f}",
-                            prop.notes,
-                        ])
-                        row_count += 1
-                    else:
-                        # SKU without proposal (KPI only)
-                        writer.writerow([
-                            sku,
-                            sku_obj.description,
-                            0,  # No proposal
-                            "",
-                            "",
-                            "",
-                            "",
-                            "",
-                            0,
-                            0,
-                            sku_obj.pack_size,
-                            sku_obj.moq,
-                            sku_obj.max_stock,
-                            "",
-                            "",
-                            "",
-                            "",
-                            0,
-                            "",
-                            sku_obj.shelf_life_days if sku_obj.shelf_life_days else "",
-                            0,
-                            "",
-                            f"{kpi.get('oos_rate', 0.0):.2f}",
-                            kpi.get('oos_days', 0),
-                            f"{kpi.get('wmape', 0.0):.2f}",
-                            f"{kpi.get('mae', 0.0):.2f}",
-                            f"{kpi.get('otif', 100.0):.2f}",
-                            kpi.get('qty_unfulfilled', 0),
-                            kpi.get('n_unfulfilled_events', 0),
-                            f"{kpi.get('waste_rate', 0.0):.2f}",
-                            "No proposal generated",
-                        ])
-                        row_count += 1
-            
-            messagebox.showinfo(
-                "Successo",
-                f"Export completato:\n{file_path}\n\n{row_count} SKU esportati con KPI live e breakdown."
-            )
+                        if prop:
+                            # Full row from proposal + KPI
+                            writer.writerow([
+                                sku,
+                                sku_obj.description,
+                                prop.proposed_qty,
+                                prop.receipt_date.isoformat() if prop.receipt_date else "",
+                                prop.policy_mode,
+                                prop.forecast_method,
+                                f"{prop.target_csl:.3f}" if prop.target_csl > 0 else "",
+                                f"{prop.sigma_horizon:.2f}" if prop.sigma_horizon > 0 else "",
+                                prop.reorder_point,
+                                prop.inventory_position,
+                                prop.pack_size,
+                                prop.moq,
+                                prop.max_stock,
+                                "YES" if prop.constraints_applied_pack else "NO",
+                                "YES" if prop.constraints_applied_moq else "NO",
+                                "YES" if prop.constraints_applied_max else "NO",
+                                prop.constraint_details,
+                                prop.oos_days_count,
+                                "YES" if prop.oos_boost_applied else "NO",
+                                prop.shelf_life_days if prop.shelf_life_days > 0 else "",
+                                prop.usable_stock,
+                                f"{prop.waste_risk_percent:.1f}" if prop.waste_risk_percent > 0 else "",
+                                f"{kpi.get('oos_rate', 0.0):.2f}",
+                                kpi.get('oos_days', 0),
+                                f"{kpi.get('wmape', 0.0):.2f}",
+                                f"{kpi.get('mae', 0.0):.2f}",
+                                f"{kpi.get('otif', 100.0):.2f}",
+                                kpi.get('qty_unfulfilled', 0),
+                                kpi.get('n_unfulfilled_events', 0),
+                                f"{kpi.get('waste_rate', 0.0):.2f}",
+                                prop.notes,
+                            ])
+                            row_count += 1
+                        else:
+                            # SKU without proposal (KPI only)
+                            writer.writerow([
+                                sku,
+                                sku_obj.description,
+                                0,  # No proposal
+                                "",
+                                "",
+                                "",
+                                "",
+                                "",
+                                0,
+                                0,
+                                sku_obj.pack_size,
+                                sku_obj.moq,
+                                sku_obj.max_stock,
+                                "",
+                                "",
+                                "",
+                                "",
+                                0,
+                                "",
+                                sku_obj.shelf_life_days if sku_obj.shelf_life_days else "",
+                                0,
+                                "",
+                                f"{kpi.get('oos_rate', 0.0):.2f}",
+                                kpi.get('oos_days', 0),
+                                f"{kpi.get('wmape', 0.0):.2f}",
+                                f"{kpi.get('mae', 0.0):.2f}",
+                                f"{kpi.get('otif', 100.0):.2f}",
+                                kpi.get('qty_unfulfilled', 0),
+                                kpi.get('n_unfulfilled_events', 0),
+                                f"{kpi.get('waste_rate', 0.0):.2f}",
+                                "No proposal generated",
+                            ])
+                            row_count += 1
+                return row_count
+
+            def _done(row_count):
+                messagebox.showinfo(
+                    "Successo",
+                    f"Export completato:\n{file_path}\n\n{row_count} SKU esportati con KPI live e breakdown."
+                )
             
-            # Log export operation (EXPORT_LOG audit trail)
-            policy_mode = settings.get("reorder_engine", {}).get("policy_mode", {}).get("value", "legacy")
-            kpi_params = {
-                "lookback_days": kpi_lookback_days,
-                "export_timestamp": timestamp,
-                "policy_mode": policy_mode,
-            }
+                # Log export operation (EXPORT_LOG audit trail)
+                policy_mode = settings.get("reorder_engine", {}).get("policy_mode", {}).get("value", "legacy")
+                kpi_params = {
+                    "lookback_days": kpi_lookback_days,
+                    "export_timestamp": timestamp,
+                    "policy_mode": policy_mode,
+                }
             
-            self.csv_layer.log_audit(
-                operation="EXPORT_LOG",
-                details=f"Order+KPI+Breakdown export: {row_count} SKUs, file={Path(file_path).name}, policy={policy_mode}, kpi_lookback={kpi_lookback_days}d",
-                sku=None,
+                self.csv_layer.log_audit(
+                    operation="EXPORT_LOG",
+                    details=f"Order+KPI+Breakdown export: {row_count} SKUs, file={Path(file_path).name}, policy={policy_mode}, kpi_lookback={kpi_lookback_days}d",
+                    sku=None,
+                )
+
+            self.data_service.submit(
+                "export_order_kpi", _write, on_result=_done,
+                on_error=lambda e: messagebox.showerror(
+                    "Errore Esportazione", f"Impossibile esportare Order+KPI+Breakdown:\n{str(e)}"),
             )
         
         except Exception as e:
@@ -9187,79 +9342,89 @@ class DesktopOrderApp:
             if not file_path:
                 return
 
-            all_skus = self.csv_layer.read_skus()
-            transactions = self.csv_layer.read_transactions()
-            sales_records = self.csv_layer.read_sales()
-            settings = self.csv_layer.read_settings()
-            promo_calendar = self.csv_layer.read_promo_calendar()
-            event_rules = self.csv_layer.read_event_uplift_rules()
+            # Explain chain per SKU and the file are computed off the Tk thread
+            def _write(snap, token):
+                all_skus = snap.skus
+                transactions = snap.transactions
+                sales_records = snap.sales
+                settings = self.csv_layer.read_settings()
+                promo_calendar = self.csv_layer.read_promo_calendar()
+                event_rules = self.csv_layer.read_event_uplift_rules()
 
-            from src.workflows.order import explain_order, calculate_daily_sales_average
-            from src.domain.ledger import StockCalculator
-            from src.analytics.pipeline import build_open_pipeline
-            from src.domain.calendar import next_receipt_date, calculate_protection_period_days, Lane
-            from src.domain.contracts import OrderExplain
+                from src.workflows.order import explain_order, calculate_daily_sales_average
+                from src.domain.ledger import StockCalculator
+                from src.analytics.pipeline import build_open_pipeline
+                from src.domain.calendar import next_receipt_date, calculate_protection_period_days, Lane
+                from src.domain.contracts import OrderExplain
 
-            # CSV header from OrderExplain column spec
-            columns = OrderExplain.CSV_COLUMNS + ["error"]
+                # CSV header from OrderExplain column spec
+                columns = OrderExplain.CSV_COLUMNS + ["error"]
 
-            today = date.today()
-            row_count = 0
+                today = date.today()
+                row_count = 0
 
-            with open(file_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
-                writer.writeheader()
+                with open(file_path, "w", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+                    writer.writeheader()
 
-                for sku_obj in all_skus:
-                    row: dict = {"sku": sku_obj.sku, "asof_date": today.isoformat(), "error": ""}
-                    try:
-                        stock = StockCalculator.calculate_asof(
-                            sku=sku_obj.sku,
-                            asof_date=today + timedelta(days=1),
-                            transactions=transactions,
-                            sales_records=None,
-                        )
-                        pipeline = build_open_pipeline(self.csv_layer, sku_obj.sku, today)
-                        history = [
-                            {"date": s.date, "qty_sold": s.qty_sold}
-                            for s in sales_records if s.sku == sku_obj.sku
-                        ]
-
-                        # Use STANDARD lane for export (representative)
-                        receipt_dt = next_receipt_date(today, Lane.STANDARD)
-                        pp_days = calculate_protection_period_days(today, Lane.STANDARD)
-
-                        explain_dict = explain_order(
-                            sku_id=sku_obj.sku,
-                            asof_date=today,
-                            history=history,
-                            stock=stock,
-                            pipeline=pipeline,
-                            target_receipt_date=receipt_dt,
-                            protection_period_days=pp_days,
-                            settings=settings,
-                            sku_obj=sku_obj,
-                            promo_calendar=promo_calendar,
-                            event_uplift_rules=event_rules,
-                            sales_records=sales_records,
-                            transactions=transactions,
-                            all_skus=all_skus,
-                        )
-                        row.update(explain_dict)
-                    except Exception as exc:
-                        row["error"] = str(exc)[:200]
+                    for sku_obj in all_skus:
+                        row: dict = {"sku": sku_obj.sku, "asof_date": today.isoformat(), "error": ""}
+                        try:
+                            stock = StockCalculator.calculate_asof(
+                                sku=sku_obj.sku,
+                                asof_date=today + timedelta(days=1),
+                                transactions=transactions,
+                                sales_records=None,
+                            )
+                            pipeline = build_open_pipeline(self.csv_layer, sku_obj.sku, today)
+                            history = [
+                                {"date": s.date, "qty_sold": s.qty_sold}
+                                for s in sales_records if s.sku == sku_obj.sku
+                            ]
+
+                            # Use STANDARD lane for export (representative)
+                            receipt_dt = next_receipt_date(today, Lane.STANDARD)
+                            pp_days = calculate_protection_period_days(today, Lane.STANDARD)
+
+                            explain_dict = explain_order(
+                                sku_id=sku_obj.sku,
+                                asof_date=today,
+                                history=history,
+                                stock=stock,
+                                pipeline=pipeline,
+                                target_receipt_date=receipt_dt,
+                                protection_period_days=pp_days,
+                                settings=settings,
+                                sku_obj=sku_obj,
+                                promo_calendar=promo_calendar,
+                                event_uplift_rules=event_rules,
+                                sales_records=sales_records,
+                                transactions=transactions,
+                                all_skus=all_skus,
+                            )
+                            row.update(explain_dict)
+                        except Exception as exc:
+                            row["error"] = str(exc)[:200]
 
-                    writer.writerow(row)
-                    row_count += 1
+                        writer.writerow(row)
+                        row_count += 1
+                return row_count
 
-            messagebox.showinfo(
-                "Successo",
-                f"Order Explain export completato:\n{file_path}\n\n{row_count} SKU esportati."
-            )
-            self.csv_layer.log_audit(
-                operation="EXPORT_LOG",
-                details=f"order_explain export: {row_count} SKUs, file={Path(file_path).name}",
-                sku=None,
+            def _done(row_count):
+                messagebox.showinfo(
+                    "Successo",
+                    f"Order Explain export completato:\n{file_path}\n\n{row_count} SKU esportati."
+                )
+                self.csv_layer.log_audit(
+                    operation="EXPORT_LOG",
+                    details=f"order_explain export: {row_count} SKUs, file={Path(file_path).name}",
+                    sku=None,
+                )
+
+            self.data_service.submit(
+                "export_order_explain", _write, on_result=_done,
+                on_error=lambda e: messagebox.showerror(
+                    "Errore Export Explain", f"Impossibile esportare:\n{str(e)}"),
             )
         except Exception as e:
             import traceback
@@ -9510,26 +9675,17 @@ class DesktopOrderApp:
                 if not messagebox.askyesno("Conferma Import", confirm_msg, parent=wizard):
                     return
             
-            # Execute import
-            try:
+            # Execute import (background job; the wizard stays open until it ends)
+            def _compute(ctx):
                 result = importer.execute_import(
                     preview=preview,
                     mode=mode,
-                    require_confirmation_on_discards=(mode == "REPLACE")  # Already confirmed above
+                    require_confirmation_on_discards=(mode == "REPLACE"),  # Already confirmed above
+                    progress=ctx.report,  # SKUs are written one by one: never stop midway
                 )
-                
-                if result.get("confirmation_required"):
-                    # Should not happen since we already confirmed
-                    messagebox.showwarning(
-                        "Conferma Richiesta",
-                        "Conferma aggiuntiva richiesta per REPLACE con scarti.",
-                        parent=wizard
-                    )
-                    return
-                
+                error_detail_file = ""
                 if result["success"]:
                     # Export discard details if any
-                    error_detail_file = ""
                     if preview.discarded_rows > 0:
                         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                         error_detail_file = f"import_sku_errors_{timestamp}.csv"
@@ -9547,7 +9703,22 @@ class DesktopOrderApp:
                         error_detail_file=error_detail_file,
                         user="GUI"
                     )
-                    
+                return result, error_detail_file
+
+            def _done(outcome):
+                result, error_detail_file = outcome
+                parent = wizard if wizard.winfo_exists() else self.root
+                
+                if result.get("confirmation_required"):
+                    # Should not happen since we already confirmed
+                    messagebox.showwarning(
+                        "Conferma Richiesta",
+                        "Conferma aggiuntiva richiesta per REPLACE con scarti.",
+                        parent=parent
+                    )
+                    return
+                
+                if result["success"]:
                     # Success message
                     success_msg = (
                         f"✅ Import completato con successo!\n\n"
@@ -9562,22 +9733,24 @@ class DesktopOrderApp:
                     if error_detail_file:
                         success_msg += f"\nDettagli scarti salvati in: {error_detail_file}"
                     
-                    messagebox.showinfo("Import Completato", success_msg, parent=wizard)
+                    messagebox.showinfo("Import Completato", success_msg, parent=parent)
                     
                     # Refresh GUI
                     self._refresh_all()
-                    wizard.destroy()
+                    if wizard.winfo_exists():
+                        wizard.destroy()
                 else:
                     error_msg = "Errori:\n" + "\n".join(result.get("errors", ["Errore sconosciuto"]))
-                    messagebox.showerror("Import Fallito", error_msg, parent=wizard)
-            
-            except Exception as e:
-                import traceback
+                    messagebox.showerror("Import Fallito", error_msg, parent=parent)
+
+            def _failed(e):
                 messagebox.showerror(
                     "Errore Import",
-                    f"Errore durante esecuzione import:\n{str(e)}\n\n{traceback.format_exc()}",
-                    parent=wizard
+                    f"Errore durante esecuzione import:\n{str(e)}",
+                    parent=wizard if wizard.winfo_exists() else self.root
                 )
+
+            self._start_job("sku_import", f"Import SKU ({source_file.name})", _compute, _done, _failed)
         
         def on_cancel():
             """Close wizard without importing."""
@@ -9729,19 +9902,57 @@ class DesktopOrderApp:
                 "description": param["description"]
             })
     
+    # Refresh handlers per tab id (tabs not listed refresh through their own controls)
+    _TAB_REFRESHERS = {
+        "dashboard": ("_refresh_dashboard",),
+        "stock": ("_refresh_stock_tab",),
+        "order": ("_refresh_pending_orders",),
+        "receiving": ("_refresh_pending_orders", "_refresh_receiving_history"),
+        "admin": ("_refresh_admin_tab",),
+        "exception": ("_refresh_exception_tab", "_refresh_smart_exceptions"),
+        "expiry": ("_refresh_expiry_alerts", "_refresh_all_lots"),
+        "promo": ("_refresh_promo_tab",),
+        "event_uplift": ("_refresh_event_uplift_tab",),
+        "settings": ("_refresh_settings_tab",),
+    }
+
     def _refresh_all(self):
-        """Refresh all tabs."""
-        self._refresh_dashboard()
-        self._refresh_stock_tab()
-        self._refresh_pending_orders()
-        self._refresh_receiving_history()
-        self._refresh_admin_tab()
-        self._refresh_exception_tab()
-        self._refresh_smart_exceptions()  # Populate smart exception filters on startup
-        self._refresh_promo_tab()
-        self._refresh_settings_tab()
+        """Invalidate all tabs and refresh the visible one.
+
+        Hidden tabs are refreshed lazily on activation (see _refresh_visible_tab),
+        so startup and File > Aggiorna only pay for what is on screen.
+        """
+        self._tab_revisions.clear()
+        self._refresh_visible_tab()
         self._check_sqlite_degradation()
 
+    def _current_tab_id(self) -> str | None:
+        """Return the tab id (key of self.tab_frames) of the selected tab."""
+        try:
+            selected = self.notebook.select()
+        except tk.TclError:
+            return None
+        for tab_id, frame in self.tab_frames.items():
+            if str(frame) == selected:
+                return tab_id
+        return None
+
+    def _refresh_visible_tab(self):
+        """Refresh the selected tab if it was never refreshed or the data changed since."""
+        tab_id = self._current_tab_id()
+        handlers = self._TAB_REFRESHERS.get(tab_id or "")
+        if not handlers:
+            return
+        if tab_id == "settings" and self.settings_modified:
+            return  # Never overwrite unsaved settings edits
+        revision = self.csv_layer.data_revision()
+        if self._tab_revisions.get(tab_id) == revision:
+            return
+        # Record the pre-refresh revision: writes racing the refresh mark it stale again
+        self._tab_revisions[tab_id] = revision
+        for name in handlers:
+            getattr(self, name)()
+
     def _check_sqlite_degradation(self):
         """Show a one-time GUI warning if the SQLite backend hard-degraded to CSV.
 
@@ -10201,9 +10412,6 @@ class DesktopOrderApp:
         self.event_uplift_treeview.tag_configure("past", foreground="gray")
         self.event_uplift_treeview.tag_configure("active", background="#d4edda", foreground="green")
         self.event_uplift_treeview.tag_configure("future", foreground="blue")
-        
-        # Load initial data
-        self._refresh_event_uplift_tab()
     
     def _build_settings_tab(self):
         """Build Settings tab for reorder engine configuration."""
@@ -12069,9 +12277,10 @@ class DesktopOrderApp:
         if not QRCODE_AVAILABLE:
             return None
         try:
-            import qrcode.constants as _qrc  # type: ignore[import-untyped]
-            from PIL import Image as PilImage, ImageTk as PilImageTk
-            qr = qrcode.QRCode(
+            support = _qrcode_support()
+            _qrc = support.constants
+            PilImage, PilImageTk = support.Image, support.ImageTk
+            qr = support.qrcode.QRCode(
                 version=None,
                 error_correction=_qrc.ERROR_CORRECT_M,
                 box_size=6,
@@ -12139,6 +12348,8 @@ class DesktopOrderApp:
             self.backend_manager.stop()
         except Exception as exc:
             logger.warning(f"Error stopping backend on close: {exc}")
+        self.data_service.shutdown()
+        self.job_runner.shutdown()
         self.root.destroy()
 
     def _refresh_android_settings(self):
@@ -12536,6 +12747,9 @@ class DesktopOrderApp:
         except Exception:
             return
         
+        # Lazy refresh of the newly shown tab, after any "unsaved settings" redirect below
+        self.root.after_idle(self._refresh_visible_tab)
+        
         # Find settings tab index
         settings_tab_index = None
         for i in range(self.notebook.index("end")):
@@ -13382,29 +13596,28 @@ class DesktopOrderApp:
     
     def _refresh_uplift_report(self):
         """Calculate and display uplift estimation report for all SKUs with promo events."""
-        try:
-            # Clear all items
-            for item in self.uplift_treeview.get_children():
-                self.uplift_treeview.delete(item)
-            
-            # Read data
-            all_skus = self.csv_layer.read_skus()
+        # Get filter text
+        filter_text = self.uplift_filter_var.get().strip().lower()
+
+        def _compute(snap, token):
+            # Read data (ledger / sales / SKUs from the shared snapshot)
+            all_skus = snap.skus
             promo_windows = self.csv_layer.read_promo_calendar()
-            sales_records = self.csv_layer.read_sales()
-            transactions = self.csv_layer.read_transactions()
+            sales_records = snap.sales
+            transactions = snap.transactions
             settings = self.csv_layer.read_settings()
-            
-            # Get filter text
-            filter_text = self.uplift_filter_var.get().strip().lower()
-            
+
             # Calculate uplift for each SKU that has promo windows
             skus_with_promo = set(w.sku for w in promo_windows)
-            
+            rows = []
+
             for sku_id in sorted(skus_with_promo):
+                if token.cancelled:
+                    return None
                 # Apply SKU filter
                 if filter_text and filter_text not in sku_id.lower():
                     continue
-                
+
                 # Estimate uplift
                 try:
                     report = estimate_uplift(
@@ -13415,49 +13628,40 @@ class DesktopOrderApp:
                         transactions=transactions,
                         settings=settings,
                     )
-                    
-                    # Format uplift with 2 decimals
-                    uplift_display = f"{report.uplift_factor:.2f}x"
-                    
-                    # Determine tag for confidence color
-                    tag = f"confidence_{report.confidence}"
-                    
-                    # Insert row
-                    self.uplift_treeview.insert(
-                        "",
-                        "end",
-                        values=(
+                    rows.append((
+                        (
                             report.sku,
                             report.n_events,
-                            uplift_display,
+                            f"{report.uplift_factor:.2f}x",  # 2 decimals
                             report.confidence,
                             report.pooling_source,
                             report.n_valid_days_total
                         ),
-                        tags=(tag,)
-                    )
-                
+                        f"confidence_{report.confidence}",  # confidence color
+                    ))
+
                 except Exception as e:
                     logging.error(f"Uplift estimation failed for {sku_id}: {e}")
                     # Show row with error
-                    self.uplift_treeview.insert(
-                        "",
-                        "end",
-                        values=(
-                            sku_id,
-                            0,
-                            "Error",
-                            "C",
-                            str(e)[:40],
-                            0
-                        ),
-                        tags=("confidence_C",)
-                    )
-            
-            messagebox.showinfo("Report Completato", f"Report uplift calcolato per {len(skus_with_promo)} SKU con eventi promo.")
-        
-        except Exception as e:
-            messagebox.showerror("Errore", f"Impossibile generare report uplift:\n{str(e)}")
+                    rows.append(((sku_id, 0, "Error", "C", str(e)[:40], 0), "confidence_C"))
+
+            return rows, len(skus_with_promo)
+
+        def _apply(result):
+            if result is None:
+                return
+            rows, n_skus = result
+            # Clear all items
+            self.uplift_treeview.delete(*self.uplift_treeview.get_children())
+            for values, tag in rows:
+                self.uplift_treeview.insert("", "end", values=values, tags=(tag,))
+
+            messagebox.showinfo("Report Completato", f"Report uplift calcolato per {n_skus} SKU con eventi promo.")
+
+        self.data_service.submit(
+            "uplift_report", _compute, on_result=_apply,
+            on_error=lambda e: messagebox.showerror("Errore", f"Impossibile generare report uplift:\n{str(e)}"),
+        )
     
     def _filter_uplift_table(self):
         """Filter uplift report table by SKU."""
@@ -13466,15 +13670,6 @@ class DesktopOrderApp:
     def _refresh_cannibalization_report(self):
         """Calculate and display cannibalization (downlift) report for all substitute groups."""
         try:
-            # Clear all items
-            for item in self.cannib_treeview.get_children():
-                self.cannib_treeview.delete(item)
-            
-            # Read data
-            all_skus = self.csv_layer.read_skus()
-            promo_windows = self.csv_layer.read_promo_calendar()
-            sales_records = self.csv_layer.read_sales()
-            transactions = self.csv_layer.read_transactions()
             settings = self.csv_layer.read_settings()
             
             # Check if cannibalization enabled
@@ -13489,24 +13684,37 @@ class DesktopOrderApp:
             if not substitute_groups:
                 messagebox.showinfo("Nessun Gruppo", "Configura gruppi di sostituti nelle Impostazioni per generare il report.")
                 return
-            
-            # Get filter text
-            filter_text = self.cannib_filter_var.get().strip().lower()
-            
-            # Calculate downlift for each target SKU in each group
-            try:
-                from src.domain.promo_uplift import estimate_cannibalization_downlift
-            except ImportError:
-                from domain.promo_uplift import estimate_cannibalization_downlift
-
-            downlift_min = cannib_settings.get("downlift_min", {}).get("value", 0.6)
-            downlift_max = cannib_settings.get("downlift_max", {}).get("value", 1.0)
-            min_events = cannib_settings.get("min_events_target_sku", {}).get("value", 2)
-            min_valid_days = cannib_settings.get("min_valid_days", {}).get("value", 7)
-            epsilon = cannib_settings.get("denominator_epsilon", {}).get("value", 0.1)
+        except Exception as e:
+            messagebox.showerror("Errore", f"Impossibile generare report cannibalizzazione:\n{str(e)}")
+            return
+        
+        # Get filter text
+        filter_text = self.cannib_filter_var.get().strip().lower()
+        
+        # Calculate downlift for each target SKU in each group
+        try:
+            from src.domain.promo_uplift import estimate_cannibalization_downlift
+        except ImportError:
+            from domain.promo_uplift import estimate_cannibalization_downlift
+
+        downlift_min = cannib_settings.get("downlift_min", {}).get("value", 0.6)
+        downlift_max = cannib_settings.get("downlift_max", {}).get("value", 1.0)
+        min_events = cannib_settings.get("min_events_target_sku", {}).get("value", 2)
+        min_valid_days = cannib_settings.get("min_valid_days", {}).get("value", 7)
+        epsilon = cannib_settings.get("denominator_epsilon", {}).get("value", 0.1)
+
+        def _compute(snap, token):
+            # Read data (ledger / sales / SKUs from the shared snapshot)
+            all_skus = snap.skus
+            promo_windows = self.csv_layer.read_promo_calendar()
+            sales_records = snap.sales
+            transactions = snap.transactions
+            rows = []
             
             for group_id, sku_list in substitute_groups.items():
                 for target_sku in sku_list:
+                    if token.cancelled:
+                        return None
                     # Apply SKU filter
                     if filter_text and filter_text not in target_sku.lower():
                         continue
@@ -13536,50 +13744,40 @@ class DesktopOrderApp:
                         if report.downlift_factor >= 1.0:
                             continue
                         
-                        # Format downlift with 2 decimals
-                        downlift_display = f"{report.downlift_factor:.2f}x"
                         reduction_pct = int((1.0 - report.downlift_factor) * 100)
-                        reduction_display = f"-{reduction_pct}%"
-                        
-                        # Determine tag for confidence color
-                        tag = f"confidence_{report.confidence}"
-                        
-                        # Insert row
-                        self.cannib_treeview.insert(
-                            "",
-                            "end",
-                            values=(
+                        rows.append((
+                            (
                                 report.target_sku,
                                 report.driver_sku,
-                                downlift_display,
-                                reduction_display,
+                                f"{report.downlift_factor:.2f}x",  # 2 decimals
+                                f"-{reduction_pct}%",
                                 report.confidence,
                                 report.n_events,
                             ),
-                            tags=(tag,)
-                        )
+                            f"confidence_{report.confidence}",  # confidence color
+                        ))
                     
                     except Exception as e:
                         logging.error(f"Downlift estimation failed for {target_sku}: {e}")
                         # Show row with error
-                        self.cannib_treeview.insert(
-                            "",
-                            "end",
-                            values=(
-                                target_sku,
-                                "Error",
-                                "N/A",
-                                "N/A",
-                                "C",
-                                0,
-                            ),
-                            tags=("confidence_C",)
-                        )
+                        rows.append(((target_sku, "Error", "N/A", "N/A", "C", 0), "confidence_C"))
+            return rows
+
+        def _apply(rows):
+            if rows is None:
+                return
+            # Clear all items
+            self.cannib_treeview.delete(*self.cannib_treeview.get_children())
+            for values, tag in rows:
+                self.cannib_treeview.insert("", "end", values=values, tags=(tag,))
             
             messagebox.showinfo("Report Completato", f"Report cannibalizzazione calcolato per {len(substitute_groups)} gruppi di sostituti.")
-        
-        except Exception as e:
-            messagebox.showerror("Errore", f"Impossibile generare report cannibalizzazione:\n{str(e)}")
+
+        self.data_service.submit(
+            "cannibalization_report", _compute, on_result=_apply,
+            on_error=lambda e: messagebox.showerror(
+                "Errore", f"Impossibile generare report cannibalizzazione:\n{str(e)}"),
+        )
     
     def _filter_cannibalization_table(self):
         """Filter cannibalization report table by SKU."""
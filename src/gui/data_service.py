@@ -0,0 +1,288 @@
+"""
+Background data service for GUI refresh handlers.
+
+Storage reads (SKUs, ledger, sales) and the computations built on them run
+on a small worker pool instead of the Tk main thread.  Results are handed
+back to the main thread through a queue drained by a ``root.after`` poll, so
+no Tk call is ever made from a worker thread.
+
+Features:
+  - One shared :class:`DataSnapshot` per storage revision
+    (``storage.data_revision()``); concurrent requests for the same revision
+    share a single load.
+  - Requests are grouped in *channels* (e.g. "stock", "dashboard"): a new
+    request on a channel cancels the previous one, so quickly changing the
+    as-of date only ever paints the latest result.
+  - Optional ``key`` deduplication of identical in-flight computations.
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from ..domain.models import SKU, SalesRecord, Transaction
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """Typed, read-only view of the core datasets at one storage revision."""
+    revision: Any
+    skus: List[SKU]
+    sku_ids: List[str]
+    transactions: List[Transaction]
+    sales: List[SalesRecord]
+    skus_by_id: Dict[str, SKU] = field(default_factory=dict)
+    # Rewrite tokens ("sales" / "transactions", see CSVLayer.rewrite_epoch) taken
+    # before the reads: unchanged tokens mean the rows were only appended to
+    epochs: Dict[str, Any] = field(default_factory=dict)
+
+
+class CancelToken:
+    """Cooperative cancellation flag passed to every computation."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class GuiDataService:
+    """
+    Worker pool + per-revision snapshot cache for the desktop GUI.
+
+    Usage (main thread)::
+
+        service.submit(
+            "stock",
+            lambda snap, token: compute_rows(snap, asof),
+            on_result=self._populate_stock_rows,
+        )
+
+    ``compute(snapshot, token)`` runs on a worker; ``on_result(result)`` and
+    ``on_error(exc)`` run on the Tk main thread.
+    """
+
+    def __init__(self, storage, root, max_workers: int = 2, poll_ms: int = 30):
+        """
+        Args:
+            storage: CSVLayer / StorageAdapter (must expose data_revision())
+            root: Tk root (or any object with ``after(ms, fn)``)
+            max_workers: Worker threads for loads and computations
+            poll_ms: Main-thread poll interval while work is pending
+        """
+        self.storage = storage
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gui-data")
+        self._results: "queue.Queue[Callable[[], None]]" = queue.Queue()
+        self._lock = threading.Lock()
+        # Storage reads are serialised: the SQLite connection is shared with the main thread
+        self._load_lock = threading.Lock()
+        self._snapshot: Optional[DataSnapshot] = None
+        self._snapshot_loads: Dict[Any, Future] = {}
+        self._channels: Dict[str, CancelToken] = {}
+        self._inflight: Dict[Hashable, Future] = {}
+        self._pending = 0
+        self._polling = False
+        self._closed = False
+
+    # ------------------------------------------------------------------ #
+    # Snapshot (worker-side)
+    # ------------------------------------------------------------------ #
+
+    def snapshot(self) -> DataSnapshot:
+        """
+        Return the snapshot for the current storage revision, loading it once.
+
+        Safe to call from any thread; concurrent callers for the same
+        revision wait on the same load.
+        """
+        revision = self.storage.data_revision()
+        with self._lock:
+            snap = self._snapshot
+            if snap is not None and snap.revision == revision:
+                return snap
+            load = self._snapshot_loads.get(revision)
+            owner = load is None
+            if owner:
+                load = Future()
+                self._snapshot_loads[revision] = load
+        if not owner:
+            return load.result()
+        try:
+            snap = self._load_snapshot(revision)
+        except BaseException as exc:
+            with self._lock:
+                self._snapshot_loads.pop(revision, None)
+            load.set_exception(exc)
+            raise
+        with self._lock:
+            self._snapshot = snap
+            self._snapshot_loads.pop(revision, None)
+        load.set_result(snap)
+        return snap
+
+    def _load_snapshot(self, revision) -> DataSnapshot:
+        with self._load_lock:
+            epochs = {}
+            if hasattr(self.storage, "rewrite_epoch"):
+                epochs = {
+                    "sales": self.storage.rewrite_epoch("sales.csv"),
+                    "transactions": self.storage.rewrite_epoch("transactions.csv"),
+                }
+            skus = self.storage.read_skus()
+            sku_ids = self.storage.get_all_sku_ids()
+            transactions = self.storage.read_transactions()
+            sales = self.storage.read_sales()
+        return DataSnapshot(
+            revision=revision,
+            skus=skus,
+            sku_ids=sku_ids,
+            transactions=transactions,
+            sales=sales,
+            skus_by_id={s.sku: s for s in skus},
+            epochs=epochs,
+        )
+
+    def read(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a storage read outside the snapshot (e.g. audit log) from a worker, serialised with loads."""
+        with self._load_lock:
+            return fn(*args, **kwargs)
+
+    def invalidate(self):
+        """Drop the cached snapshot (next request reloads even if the revision is unchanged)."""
+        with self._lock:
+            self._snapshot = None
+
+    # ------------------------------------------------------------------ #
+    # Requests (main-thread API)
+    # ------------------------------------------------------------------ #
+
+    def submit(
+        self,
+        channel: str,
+        compute: Callable[[DataSnapshot, CancelToken], Any],
+        on_result: Callable[[Any], None],
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        key: Optional[Hashable] = None,
+        needs_snapshot: bool = True,
+    ) -> CancelToken:
+        """
+        Run ``compute`` on a worker and deliver its result on the main thread.
+
+        Args:
+            channel: Request group; a new submit cancels the channel's previous request
+            compute: ``compute(snapshot, token) -> result`` (worker thread)
+            on_result: Called with the result on the main thread (skipped if cancelled)
+            on_error: Called with the exception on the main thread (default: log)
+            key: Optional dedup key; an identical in-flight request is reused
+            needs_snapshot: False for computations doing their own targeted
+                reads (``compute`` then gets ``None`` instead of a snapshot)
+
+        Returns:
+            CancelToken for this request
+        """
+        token = CancelToken()
+        with self._lock:
+            previous = self._channels.get(channel)
+            if previous is not None:
+                previous.cancel()
+            self._channels[channel] = token
+            future = self._inflight.get(key) if key is not None else None
+            started = future is None
+            if started:
+                # A shared (keyed) computation must not be aborted by one requester
+                run_token = token if key is None else CancelToken()
+                future = self._executor.submit(self._run, compute, run_token, needs_snapshot)
+                if key is not None:
+                    self._inflight[key] = future
+            self._pending += 1
+
+        if started and key is not None:
+            future.add_done_callback(lambda f, k=key: self._forget(k, f))
+        future.add_done_callback(
+            lambda f: self._results.put(lambda: self._deliver(channel, token, f, on_result, on_error))
+        )
+        self._ensure_polling()
+        return token
+
+    def cancel(self, channel: str):
+        """Cancel the pending request of ``channel`` (its callbacks will not run)."""
+        with self._lock:
+            token = self._channels.pop(channel, None)
+        if token is not None:
+            token.cancel()
+
+    def shutdown(self):
+        """Cancel everything and stop the workers (call on application close)."""
+        with self._lock:
+            self._closed = True
+            tokens = list(self._channels.values())
+            self._channels.clear()
+        for token in tokens:
+            token.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+
+    def _run(self, compute, token: CancelToken, needs_snapshot: bool = True):
+        if token.cancelled:
+            return None
+        return compute(self.snapshot() if needs_snapshot else None, token)
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _deliver(self, channel, token, future: Future, on_result, on_error):
+        with self._lock:
+            self._pending -= 1
+            current = self._channels.get(channel) is token
+            if current:
+                del self._channels[channel]
+        if token.cancelled or not current or future.cancelled():
+            return
+        exc = future.exception()
+        if exc is not None:
+            if on_error is not None:
+                on_error(exc)
+            else:
+                logger.error(f"Background refresh '{channel}' failed: {exc}", exc_info=exc)
+            return
+        on_result(future.result())
+
+    def _ensure_polling(self):
+        if not self._polling and not self._closed:
+            self._polling = True
+            self.root.after(self.poll_ms, self._drain)
+
+    def _drain(self):
+        """Main thread: run delivered callbacks, keep polling while work is pending."""
+        while True:
+            try:
+                callback = self._results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback()
+            except Exception as exc:
+                logger.error(f"GUI data callback failed: {exc}", exc_info=True)
+        self._polling = False
+        with self._lock:
+            pending = self._pending > 0
+        if pending:
+            self._ensure_polling()
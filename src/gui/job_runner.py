@@ -0,0 +1,319 @@
+"""
+Background job runner for long GUI operations (KPI, scoring, closed loop,
+history simulation, SKU import).
+
+Jobs run on a small bounded worker pool; everything the GUI sees (progress,
+result, error, cancellation) is delivered on the Tk main thread through a
+queue drained by a ``root.after`` poll, as in :mod:`.data_service`.
+
+Features:
+  - Single-flight per job name: starting a job whose name is already queued
+    or running is a no-op (double-clicks never start a second run).
+  - Cooperative cancellation: the job function receives a :class:`JobContext`
+    whose ``progress()`` / ``check()`` raise :class:`JobCancelled` once the
+    job has been cancelled; per-SKU loops call it once per item.
+  - Throttled progress events (at most one per ``progress_interval`` seconds).
+  - Bounded history of finished jobs with status and duration.
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .data_service import CancelToken
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when its cancellation has been requested."""
+
+
+@dataclass
+class JobRecord:
+    """State of one job (a copy is handed to GUI callbacks)."""
+    job_id: int
+    name: str
+    label: str
+    status: str = JOB_QUEUED
+    submitted_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    done: int = 0
+    total: int = 0
+    message: str = ""
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Run time in seconds (so far, while running; None if never started)."""
+        if self.started_at is None:
+            return None
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    @property
+    def active(self) -> bool:
+        return self.status in (JOB_QUEUED, JOB_RUNNING)
+
+
+class JobContext:
+    """Handle passed to a running job: progress reporting and cancellation checks."""
+
+    def __init__(self, runner: "JobRunner", record: JobRecord, token: CancelToken):
+        self._runner = runner
+        self._record = record
+        self.token = token
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def check(self):
+        """Raise JobCancelled if the job has been cancelled."""
+        if self.token.cancelled:
+            raise JobCancelled(self._record.name)
+
+    def report(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        """Publish progress without a cancellation check (for steps that must not stop midway)."""
+        self._runner._report(self._record, done, total, message)
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        """Publish progress, then raise JobCancelled if the job has been cancelled."""
+        self.report(done, total, message)
+        self.check()
+
+
+class JobRunner:
+    """
+    Bounded pool of named, cancellable background jobs for the desktop GUI.
+
+    Usage (main thread)::
+
+        runner.start(
+            "kpi",
+            lambda ctx: compute_kpis(ctx),
+            on_done=self._on_kpi_done,
+            label="Calcolo KPI",
+        )
+
+    ``fn(ctx)`` runs on a worker; ``on_done(result)``, ``on_error(exc)``,
+    ``on_cancelled()`` and ``on_progress(record)`` run on the Tk main thread.
+    """
+
+    def __init__(
+        self,
+        root,
+        max_workers: int = 1,
+        poll_ms: int = 50,
+        history_size: int = 50,
+        progress_interval: float = 0.2,
+    ):
+        """
+        Args:
+            root: Tk root (or any object with ``after(ms, fn)``)
+            max_workers: Jobs running at the same time (others wait queued)
+            poll_ms: Main-thread poll interval while jobs are pending
+            history_size: Finished jobs kept in the history
+            progress_interval: Minimum seconds between two progress events of a job
+        """
+        self.root = root
+        self.poll_ms = poll_ms
+        self.progress_interval = progress_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gui-job")
+        self._events: "queue.Queue[Callable[[], None]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._active: Dict[str, JobRecord] = {}
+        self._tokens: Dict[int, CancelToken] = {}
+        self._last_progress: Dict[int, float] = {}
+        self._progress_callbacks: Dict[int, Callable[[JobRecord], None]] = {}
+        self._history: Deque[JobRecord] = deque(maxlen=history_size)
+        self._listeners: List[Callable[[], None]] = []
+        self._polling = False
+        self._closed = False
+
+    # ------------------------------------------------------------------ #
+    # Main-thread API
+    # ------------------------------------------------------------------ #
+
+    def start(
+        self,
+        name: str,
+        fn: Callable[[JobContext], Any],
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        on_cancelled: Optional[Callable[[], None]] = None,
+        on_progress: Optional[Callable[[JobRecord], None]] = None,
+        label: Optional[str] = None,
+    ) -> Optional[JobRecord]:
+        """
+        Queue ``fn`` as job ``name``.
+
+        Returns:
+            The new job's record, or None if a job with the same name is
+            already queued or running (single-flight) or the runner is closed
+        """
+        with self._lock:
+            if self._closed or name in self._active:
+                return None
+            record = JobRecord(
+                job_id=next(self._ids), name=name, label=label or name, submitted_at=time.monotonic(),
+            )
+            token = CancelToken()
+            self._active[name] = record
+            self._tokens[record.job_id] = token
+            if on_progress is not None:
+                self._progress_callbacks[record.job_id] = on_progress
+
+        self._executor.submit(self._run, record, token, fn, on_done, on_error, on_cancelled)
+        self._notify()
+        self._ensure_polling()
+        return replace(record)
+
+    def cancel(self, name: str) -> bool:
+        """Request cancellation of job ``name``. Returns False if no such job is active."""
+        with self._lock:
+            record = self._active.get(name)
+            token = self._tokens.get(record.job_id) if record is not None else None
+        if token is None:
+            return False
+        token.cancel()
+        return True
+
+    def is_active(self, name: str) -> bool:
+        with self._lock:
+            return name in self._active
+
+    def jobs(self) -> List[JobRecord]:
+        """Active jobs (oldest first) followed by finished ones (newest first), as copies."""
+        with self._lock:
+            active = sorted(self._active.values(), key=lambda r: r.job_id)
+            return [replace(r) for r in active] + [replace(r) for r in reversed(self._history)]
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Call ``callback()`` on the main thread whenever a job starts, progresses or ends."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def shutdown(self):
+        """Cancel every job and stop the workers (call on application close)."""
+        with self._lock:
+            self._closed = True
+            tokens = list(self._tokens.values())
+        for token in tokens:
+            token.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------ #
+    # Worker side
+    # ------------------------------------------------------------------ #
+
+    def _run(self, record: JobRecord, token: CancelToken, fn, on_done, on_error, on_cancelled):
+        with self._lock:
+            record.started_at = time.monotonic()
+            record.status = JOB_RUNNING
+        self._report(record, 0, None, None)
+
+        result, error = None, None
+        try:
+            if token.cancelled:
+                raise JobCancelled(record.name)
+            result = fn(JobContext(self, record, token))
+        except JobCancelled:
+            status = JOB_CANCELLED
+        except BaseException as exc:
+            status, error = JOB_FAILED, exc
+            logger.error(f"Job '{record.name}' failed: {exc}", exc_info=exc)
+        else:
+            # Cancellation requested after the last checkpoint still counts as completed
+            status = JOB_DONE
+
+        if status == JOB_DONE:
+            final = (on_done, (result,))
+        elif status == JOB_FAILED:
+            final = (on_error, (error,))
+        else:
+            final = (on_cancelled, ())
+        with self._lock:
+            record.status = status
+            record.finished_at = time.monotonic()
+            record.error = str(error) if error is not None else None
+            del self._active[record.name]
+            del self._tokens[record.job_id]
+            self._last_progress.pop(record.job_id, None)
+            self._progress_callbacks.pop(record.job_id, None)
+            self._history.append(record)
+            # Queued under the lock: _drain never sees "no active job" before this event
+            self._events.put(lambda: final[0](*final[1]) if final[0] else None)
+        logger.info(f"Job '{record.name}' {status} in {record.duration:.2f}s")
+
+    def _report(self, record: JobRecord, done: int, total: Optional[int], message: Optional[str]):
+        now = time.monotonic()
+        with self._lock:
+            record.done = done
+            if total is not None:
+                record.total = total
+            if message is not None:
+                record.message = message
+            last = self._last_progress.get(record.job_id)
+            final = record.total and done >= record.total
+            if last is not None and now - last < self.progress_interval and not final:
+                return
+            self._last_progress[record.job_id] = now
+            snapshot = replace(record)
+            on_progress = self._progress_callbacks.get(record.job_id)
+        self._events.put(lambda: on_progress(snapshot) if on_progress else None)
+
+    # ------------------------------------------------------------------ #
+    # Main-thread delivery
+    # ------------------------------------------------------------------ #
+
+    def _notify(self):
+        for listener in list(self._listeners):
+            try:
+                listener()
+            except Exception as exc:
+                logger.error(f"Job listener failed: {exc}", exc_info=True)
+
+    def _ensure_polling(self):
+        if not self._polling and not self._closed:
+            self._polling = True
+            self.root.after(self.poll_ms, self._drain)
+
+    def _drain(self):
+        """Main thread: run delivered callbacks, keep polling while jobs are pending."""
+        delivered = False
+        while True:
+            try:
+                callback = self._events.get_nowait()
+            except queue.Empty:
+                break
+            delivered = True
+            try:
+                callback()
+            except Exception as exc:
+                logger.error(f"Job callback failed: {exc}", exc_info=True)
+        if delivered:
+            self._notify()
+        self._polling = False
+        with self._lock:
+            pending = bool(self._active) or not self._events.empty()
+        if pending:
+            self._ensure_polling()
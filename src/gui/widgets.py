@@ -1,11 +1,12 @@
 """
 Custom widgets for desktop-order-system GUI.
 
-Reusable autocomplete and enhanced UI components.
+Reusable autocomplete, virtualized table and enhanced UI components.
 """
 import tkinter as tk
+from bisect import bisect_right
 from tkinter import ttk
-from typing import Callable, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 
 class AutocompleteEntry:
@@ -220,3 +221,484 @@ class AutocompleteEntry:
     def focus_set(self):
         """Set focus to entry."""
         self.entry.focus_set()
+
+
+def _display_sort_value(value: Any) -> Tuple[int, Any]:
+    """Sort key for a displayed cell: numbers numerically, everything else as text."""
+    if isinstance(value, (int, float)):
+        return (0, value)
+    text = str(value)
+    try:
+        return (0, float(text))
+    except ValueError:
+        return (1, text.lower())
+
+
+class RowModel:
+    """
+    Sorted / filtered row store backing :class:`VirtualTreeview`.
+    
+    Rows are ``(key, record)`` pairs; the record is kept as-is (domain object,
+    tuple, dict) and only formatted when a row becomes visible.
+    
+    Features:
+    - Per-column sort orders cached until the rows change; an updated row is
+      moved with a bisect instead of re-sorting the whole column
+    - Search filter refined from the current view when the new text
+      extends the previous one (typing narrows the result incrementally)
+    - O(1) key -> view position lookup
+    """
+    
+    def __init__(
+        self,
+        sort_keys: Optional[Dict[str, Callable[[str, Any], Any]]] = None,
+        search_text: Optional[Callable[[str, Any], str]] = None,
+    ):
+        """
+        Initialize row model.
+        
+        Args:
+            sort_keys: Column -> ``fn(key, record)`` returning the sort value
+            search_text: ``fn(key, record)`` returning the text matched by set_search
+        """
+        self.sort_keys: Dict[str, Callable[[str, Any], Any]] = dict(sort_keys or {})
+        self.search_text = search_text or (lambda key, record: key)
+        self._records: Dict[str, Any] = {}
+        self._order: List[str] = []
+        self._versions: Dict[str, int] = {}
+        self._generation = 0
+        # column -> (keys ascending, sort values ascending)
+        self._sorted: Dict[str, Tuple[List[str], List[Any]]] = {}
+        self._sort_column: Optional[str] = None
+        self._descending = False
+        self._search = ""
+        self._haystack: Dict[str, str] = {}
+        self._predicate: Optional[Callable[[str, Any], bool]] = None
+        self._view: List[str] = []
+        self._positions: Optional[Dict[str, int]] = None
+    
+    # --- Rows ---
+    
+    def set_rows(self, rows: Iterable[Tuple[str, Any]]):
+        """Replace all rows (sort column and filters are kept)."""
+        self._generation += 1
+        self._records = {}
+        self._order = []
+        for key, record in rows:
+            if key not in self._records:
+                self._order.append(key)
+            self._records[key] = record
+        self._versions = dict.fromkeys(self._order, self._generation)
+        self._sorted.clear()
+        self._haystack.clear()
+        self._rebuild_view()
+    
+    def update(self, key: str, record: Any = None):
+        """
+        Mark a row as changed (optionally replacing its record).
+        
+        Pass no record when the record object was mutated in place.
+        """
+        if key not in self._records:
+            return
+        if record is not None:
+            self._records[key] = record
+        self._generation += 1
+        self._versions[key] = self._generation
+        self._haystack.pop(key, None)
+        
+        for column, (keys, values) in self._sorted.items():
+            idx = keys.index(key)
+            new_value = self.sort_keys[column](key, self._records[key]) if column in self.sort_keys else None
+            if values[idx] == new_value:
+                continue
+            del keys[idx]
+            del values[idx]
+            pos = bisect_right(values, new_value)
+            keys.insert(pos, key)
+            values.insert(pos, new_value)
+        self._rebuild_view()
+    
+    def get(self, key: str) -> Any:
+        return self._records.get(key)
+    
+    def version(self, key: str) -> int:
+        """Change stamp of a row (differs after set_rows/update)."""
+        return self._versions.get(key, 0)
+    
+    # --- View ---
+    
+    def __len__(self) -> int:
+        return len(self._view)
+    
+    def __getitem__(self, index: int) -> str:
+        return self._view[index]
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._records
+    
+    def keys(self) -> List[str]:
+        """Keys of the visible rows, in display order."""
+        return list(self._view)
+    
+    def index(self, key: str) -> Optional[int]:
+        """View position of ``key`` (None if filtered out or missing)."""
+        if self._positions is None:
+            self._positions = {k: i for i, k in enumerate(self._view)}
+        return self._positions.get(key)
+    
+    def sort_by(self, column: Optional[str], descending: bool = False):
+        """Sort the view by ``column`` (None restores insertion order)."""
+        self._sort_column = column
+        self._descending = descending
+        self._rebuild_view()
+    
+    @property
+    def sort_state(self) -> Tuple[Optional[str], bool]:
+        return self._sort_column, self._descending
+    
+    def set_search(self, text: str):
+        """Filter rows whose search text contains ``text`` (case-insensitive)."""
+        text = text.strip().lower()
+        previous = self._search
+        self._search = text
+        if previous and text.startswith(previous):
+            # Narrowing: only rows still visible can match
+            self._view = [k for k in self._view if text in self._haystack_for(k)]
+            self._positions = None
+        else:
+            self._rebuild_view()
+    
+    def set_filter(self, predicate: Optional[Callable[[str, Any], bool]]):
+        """Apply an arbitrary ``predicate(key, record)`` filter (None clears it)."""
+        self._predicate = predicate
+        self._rebuild_view()
+    
+    # --- Internals ---
+    
+    def _haystack_for(self, key: str) -> str:
+        text = self._haystack.get(key)
+        if text is None:
+            text = str(self.search_text(key, self._records[key])).lower()
+            self._haystack[key] = text
+        return text
+    
+    def _ordered_keys(self) -> Iterable[str]:
+        column = self._sort_column
+        if column is None:
+            return reversed(self._order) if self._descending else self._order
+        cached = self._sorted.get(column)
+        if cached is None:
+            key_fn = self.sort_keys.get(column)
+            if key_fn is None:
+                pairs = [(k, None) for k in self._order]
+            else:
+                pairs = sorted(((k, key_fn(k, self._records[k])) for k in self._order), key=lambda p: p[1])
+            cached = ([k for k, _ in pairs], [v for _, v in pairs])
+            self._sorted[column] = cached
+        return reversed(cached[0]) if self._descending else cached[0]
+    
+    def _rebuild_view(self):
+        keys = self._ordered_keys()
+        predicate = self._predicate
+        if predicate is not None:
+            records = self._records
+            keys = [k for k in keys if predicate(k, records[k])]
+        if self._search:
+            search = self._search
+            keys = [k for k in keys if search in self._haystack_for(k)]
+        self._view = list(keys)
+        self._positions = None
+
+
+class VirtualTreeview:
+    """
+    Treeview that materializes only the visible rows (plus a buffer).
+    
+    A fixed pool of Tk items is reused while scrolling: each item is
+    re-pointed at a model row and formatted on demand, so refreshing a table
+    with thousands of rows costs the same as refreshing one screenful.
+    
+    Rows are addressed by their model key (e.g. SKU), like the ``iid`` of a
+    plain Treeview: ``selection()``, ``see()``, ``bbox()``, ``identify_row()``
+    and ``get_children()`` all speak in keys. Bind ``<<TreeviewSelect>>``
+    through :meth:`bind` to be notified of user selection changes.
+    """
+    
+    SELECT_EVENT = "<<VirtualTreeviewSelect>>"
+    
+    def __init__(
+        self,
+        parent: tk.Widget,
+        columns: Sequence[str],
+        formatter: Callable[[str, Any], Sequence[Any]],
+        tagger: Optional[Callable[[str, Any], Sequence[str]]] = None,
+        model: Optional[RowModel] = None,
+        height: int = 15,
+        buffer: int = 10,
+        sortable: bool = True,
+        **kwargs
+    ):
+        """
+        Initialize virtual treeview.
+        
+        Args:
+            parent: Parent widget
+            columns: Column identifiers
+            formatter: ``fn(key, record)`` returning the row values
+            tagger: Optional ``fn(key, record)`` returning the row tags
+            model: Row model (a fresh RowModel if omitted)
+            height: Minimum visible rows
+            buffer: Extra rows materialized below the viewport
+            sortable: Sort by clicking column headings
+            **kwargs: Additional ttk.Treeview options
+        """
+        self.columns = tuple(columns)
+        self.formatter = formatter
+        self.tagger = tagger
+        self.model = model or RowModel()
+        self.buffer = buffer
+        
+        self.frame = ttk.Frame(parent)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree = ttk.Treeview(self.frame, columns=self.columns, height=height, **kwargs)
+        self.tree.pack(side="left", fill="both", expand=True)
+        
+        self._page = max(1, height)
+        self._top = 0
+        self._slots: List[str] = []
+        self._slot_index: Dict[str, int] = {}
+        self._slot_stamps: List[Optional[Tuple[str, int]]] = []
+        self._attached = 0
+        self._selected: List[str] = []
+        
+        try:
+            self._row_height = int(ttk.Style(self.tree).lookup("Treeview", "rowheight") or 20)
+        except (tk.TclError, ValueError):
+            self._row_height = 20
+        
+        if sortable:
+            for column in self.columns:
+                self.tree.heading(column, command=lambda c=column: self.toggle_sort(c))
+        
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select, add="+")
+        self.tree.bind("<Configure>", self._on_configure, add="+")
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_units(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_units(3))
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self._page))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self._page))
+        self.tree.bind("<Home>", lambda e: self._move_selection(-len(self.model)))
+        self.tree.bind("<End>", lambda e: self._move_selection(len(self.model)))
+    
+    # --- Data ---
+    
+    def set_rows(self, rows: Iterable[Tuple[str, Any]]):
+        """Replace all rows and redraw (selection of surviving keys is kept)."""
+        self.model.set_rows(rows)
+        self._selected = [k for k in self._selected if k in self.model]
+        self.refresh()
+    
+    def refresh_row(self, key: str, record: Any = None):
+        """Redraw one row after its record changed (see RowModel.update)."""
+        self.model.update(key, record)
+        self.refresh()
+    
+    def set_search(self, text: str):
+        self.model.set_search(text)
+        self._top = 0
+        self.refresh()
+    
+    def set_filter(self, predicate: Optional[Callable[[str, Any], bool]]):
+        self.model.set_filter(predicate)
+        self._top = 0
+        self.refresh()
+    
+    def toggle_sort(self, column: str):
+        """Sort by ``column``; clicking the same column again reverses the order."""
+        current, descending = self.model.sort_state
+        if column not in self.model.sort_keys:
+            index = self.columns.index(column)
+            self.model.sort_keys[column] = lambda key, record: _display_sort_value(self.formatter(key, record)[index])
+        self.model.sort_by(column, descending=not descending if current == column else False)
+        self.refresh()
+    
+    def get_children(self, item: str = "") -> Tuple[str, ...]:
+        """Keys of all rows in the current (sorted, filtered) view."""
+        return tuple(self.model.keys())
+    
+    def item(self, key: str, option: Optional[str] = None):
+        """Values/tags of a row (as computed by formatter/tagger)."""
+        record = self.model.get(key)
+        info = {
+            "values": list(self.formatter(key, record)) if key in self.model else [],
+            "tags": list(self.tagger(key, record)) if self.tagger and key in self.model else [],
+        }
+        return info[option] if option else info
+    
+    # --- Selection / navigation ---
+    
+    def selection(self) -> Tuple[str, ...]:
+        return tuple(self._selected)
+    
+    def selection_set(self, *keys: str):
+        """Select rows by key and notify SELECT_EVENT listeners."""
+        if len(keys) == 1 and isinstance(keys[0], (list, tuple)):
+            keys = tuple(keys[0])
+        self._selected = [k for k in keys if k in self.model]
+        self._sync_selection()
+        self.tree.event_generate(self.SELECT_EVENT)
+    
+    def see(self, key: str):
+        """Scroll so that ``key`` is visible."""
+        index = self.model.index(key)
+        if index is None:
+            return
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + self._page:
+            self._top = index - self._page + 1
+        else:
+            return
+        self.refresh()
+    
+    def identify_row(self, y: int) -> str:
+        return self._slot_key(self.tree.identify_row(y)) or ""
+    
+    def bbox(self, key: str, column: Optional[str] = None):
+        index = self.model.index(key)
+        if index is None or not (self._top <= index < self._top + self._page):
+            return ""
+        return self.tree.bbox(self._slots[index - self._top], column)
+    
+    # --- Geometry / delegation ---
+    
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+    
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+    
+    def bind(self, sequence, func, add=None):
+        """Bind on the inner tree (``<<TreeviewSelect>>`` maps to user selection changes)."""
+        if sequence == "<<TreeviewSelect>>":
+            sequence = self.SELECT_EVENT
+        return self.tree.bind(sequence, func, add)
+    
+    def __getitem__(self, option):
+        return self.tree[option]
+    
+    def __getattr__(self, name):
+        # column(), heading(), tag_configure(), identify_column(), xview(), after(), ...
+        if name == "tree":
+            raise AttributeError(name)
+        return getattr(self.tree, name)
+    
+    # --- Rendering ---
+    
+    def refresh(self):
+        """Re-point the item pool at the rows of the current scroll window."""
+        model = self.model
+        total = len(model)
+        self._top = max(0, min(self._top, total - self._page))
+        count = min(total - self._top, self._page + self.buffer)
+        
+        while len(self._slots) < count:
+            iid = f"vrow{len(self._slots)}"
+            self.tree.insert("", "end", iid=iid)
+            self._slot_index[iid] = len(self._slots)
+            self._slots.append(iid)
+            self._slot_stamps.append(None)
+            self._attached += 1
+        
+        if self._attached > count:
+            self.tree.detach(*self._slots[count:self._attached])
+        else:
+            for iid in self._slots[self._attached:count]:
+                self.tree.move(iid, "", "end")
+        self._attached = count
+        
+        for i in range(count):
+            key = model[self._top + i]
+            stamp = (key, model.version(key))
+            if self._slot_stamps[i] == stamp:
+                continue
+            record = model.get(key)
+            self.tree.item(
+                self._slots[i],
+                values=tuple(self.formatter(key, record)),
+                tags=tuple(self.tagger(key, record)) if self.tagger else (),
+            )
+            self._slot_stamps[i] = stamp
+        
+        self._sync_selection()
+        self.tree.yview_moveto(0)
+        if total:
+            self.scrollbar.set(self._top / total, min(1.0, (self._top + self._page) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def _slot_key(self, iid: str) -> Optional[str]:
+        index = self._slot_index.get(iid)
+        if index is None or index >= self._attached:
+            return None
+        return self.model[self._top + index]
+    
+    def _visible_selected(self) -> List[str]:
+        selected = set(self._selected)
+        return [
+            iid for i, iid in enumerate(self._slots[:self._attached])
+            if self.model[self._top + i] in selected
+        ]
+    
+    def _sync_selection(self):
+        wanted = self._visible_selected()
+        if set(self.tree.selection()) != set(wanted):
+            self.tree.selection_set(wanted)
+    
+    def _on_tree_select(self, event):
+        # Programmatic re-syncs (scrolling) leave the visible selection unchanged
+        visible = {iid for iid in self.tree.selection() if self._slot_key(iid) is not None}
+        if visible == set(self._visible_selected()):
+            return
+        self._selected = [self._slot_key(iid) for iid in self._slots[:self._attached] if iid in visible]
+        self.tree.event_generate(self.SELECT_EVENT)
+    
+    def _on_configure(self, event):
+        page = max(1, (event.height - self._row_height) // self._row_height)
+        if page != self._page:
+            self._page = page
+            self.refresh()
+    
+    def _on_scrollbar(self, action, value, unit=None):
+        total = len(self.model)
+        if action == "moveto":
+            self._top = int(float(value) * total)
+            self.refresh()
+        elif action == "scroll":
+            step = self._page if unit == "pages" else 1
+            self._scroll_units(int(value) * step)
+    
+    def _on_mousewheel(self, event):
+        return self._scroll_units(-3 if event.delta > 0 else 3)
+    
+    def _scroll_units(self, rows: int):
+        self._top += rows
+        self.refresh()
+        return "break"
+    
+    def _move_selection(self, delta: int):
+        total = len(self.model)
+        if not total:
+            return "break"
+        current = self.model.index(self._selected[-1]) if self._selected else None
+        index = 0 if current is None else max(0, min(total - 1, current + delta))
+        key = self.model[index]
+        self.see(key)
+        self.selection_set(key)
+        slot = self.model.index(key) - self._top
+        self.tree.focus(self._slots[slot])
+        return "break"
@@ -15,7 +15,7 @@ Design:
 """
 
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import Callable, List, Dict, Optional, Any, Sequence, Tuple
 from datetime import date
 import sqlite3
 
@@ -130,6 +130,37 @@ class StorageAdapter(CSVLayer):
     def is_sqlite_mode(self) -> bool:
         """Check if currently using SQLite backend"""
         return self.backend == 'sqlite' and self.conn is not None
+
+    def data_revision(self) -> tuple:
+        """
+        Change token for the active storage (see CSVLayer.data_revision).
+
+        In SQLite mode the database and WAL files are stat-ed as well, since
+        repository writes do not touch the CSV files.
+        """
+        revision = super().data_revision()
+        if not self.is_sqlite_mode():
+            return revision
+        db_path = Path(DATABASE_PATH)
+        db_tokens = []
+        for path in (db_path, db_path.with_name(db_path.name + "-wal")):
+            try:
+                st = path.stat()
+                db_tokens.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                db_tokens.append((0, 0))
+        return revision + tuple(db_tokens)
+    
+    def rewrite_epoch(self, filename: str):
+        """
+        CSV rewrite token (see CSVLayer.rewrite_epoch).
+
+        None for the ledger in SQLite mode (no append-only token there):
+        callers then re-validate the whole prefix.
+        """
+        if self.is_sqlite_mode() and filename == "transactions.csv":
+            return None
+        return self.csv_layer.rewrite_epoch(filename)
     
     def close(self):
         """Close database connection (if open)"""
@@ -530,6 +561,51 @@ class StorageAdapter(CSVLayer):
             all_txns = self.csv_layer.read_transactions()
             return [t for t in all_txns if t.sku == sku and t.date < asof]
 
+    def read_sku_transactions_page(
+        self,
+        sku: str,
+        limit: int = 50,
+        before: Optional[Tuple[str, int]] = None,
+    ) -> Tuple[List[Transaction], Optional[Tuple[str, int]]]:
+        """Latest ledger events of *sku*, newest first, in keyset pages.
+
+        SQLite mode pages through idx_transactions_sku_date with a
+        (date, transaction_id) cursor; CSV mode uses the per-SKU row index
+        of CSVLayer.  Cursors are backend-specific: pass back only the one
+        returned by the previous call.
+
+        Returns:
+            (transactions, cursor for the next page or None if no more events)
+        """
+        if self.is_sqlite_mode():
+            assert self.repos is not None
+            try:
+                rows = self.repos.ledger().list_transactions_for_sku_page(sku, limit + 1, before)
+                page = rows[:limit]
+                next_cursor = (page[-1]['date'], page[-1]['transaction_id']) if len(rows) > limit else None
+                return [self._dict_to_transaction(t) for t in page], next_cursor
+            except Exception as e:
+                self._sqlite_degrade(e)
+                print(f"⚠ SQLite read_sku_transactions_page failed, falling back to CSV: {e}")
+                return self.csv_layer.read_sku_transactions_page(sku, limit)
+        return self.csv_layer.read_sku_transactions_page(sku, limit, before)
+
+    def sum_qty(self, sku: str, day: date, event: EventType) -> int:
+        """Total qty of *sku*'s *event* transactions on *day*.
+
+        SQLite mode runs one aggregate over idx_transactions_sku_date; CSV
+        mode reads only that day's rows through CSVLayer's per-SKU index.
+        """
+        if self.is_sqlite_mode():
+            assert self.repos is not None
+            try:
+                return self.repos.ledger().sum_qty(sku, day.isoformat(), event.value)
+            except Exception as e:
+                self._sqlite_degrade(e)
+                print(f"⚠ SQLite sum_qty failed, falling back to CSV: {e}")
+                return self.csv_layer.sum_qty(sku, day, event)
+        return self.csv_layer.sum_qty(sku, day, event)
+
     def write_transaction(self, txn: Transaction):
         """Write single transaction"""
         if self.is_sqlite_mode():
@@ -631,6 +707,117 @@ class StorageAdapter(CSVLayer):
         else:
             self.csv_layer.write_transactions_batch(txns)
 
+    def _ledger_batch_with_csv(self, txns: List[Transaction], write_csv: Callable[[], None], context: str) -> Tuple[bool, bool]:
+        """
+        Append ``txns`` to the SQLite ledger with companion CSV rows in the same commit.
+
+        ``write_csv`` runs inside the ledger transaction (``append_batch(before_commit=…)``),
+        so a failed CSV write rolls the ledger rows back; it runs at most once,
+        also across the FK retry.  Missing SKUs are synced from CSV and the
+        batch retried once; any other failure degrades to CSV.
+
+        Returns:
+            (committed, csv_written): committed is False after a degrade to
+            CSV; the caller then writes the ledger rows, plus the CSV rows
+            unless csv_written (the SQLite COMMIT failed after they landed)
+        """
+        assert self.repos is not None
+        batch = [{
+            'date': txn.date.isoformat(),
+            'sku': txn.sku,
+            'event': txn.event.value,
+            'qty': txn.qty,
+            'receipt_date': txn.receipt_date.isoformat() if txn.receipt_date else None,
+            'note': txn.note or ''
+        } for txn in txns]
+        csv_failed = False
+        csv_written = False
+
+        def _write_csv_rows():
+            nonlocal csv_failed, csv_written
+            if csv_written:
+                return  # landed in an earlier attempt whose COMMIT failed
+            csv_failed = True
+            write_csv()
+            csv_failed = False
+            csv_written = True
+
+        try:
+            self.repos.ledger().append_batch(batch, before_commit=_write_csv_rows)
+            return True, True
+        except Exception as e:
+            if csv_failed:
+                raise  # ledger rolled back, nothing written
+            from ..repositories import ForeignKeyError as _FKError
+            if isinstance(e, _FKError):
+                # Missing SKUs in SQLite: sync them from CSV and retry once
+                try:
+                    self._sync_skus_to_sqlite(list({txn.sku for txn in txns}))
+                    self.repos.ledger().append_batch(batch, before_commit=_write_csv_rows)
+                    return True, True
+                except Exception as retry_err:
+                    if csv_failed:
+                        raise
+                    print(f"⚠ SQLite {context} retry failed: {retry_err}")
+            self._sqlite_degrade(e)
+            print(f"⚠ SQLite {context} failed, falling back to CSV: {e}")
+        return False, csv_written
+
+    def write_receipt_batch(self, txns: List[Transaction], receiving_logs: List[Dict[str, Any]], lots: Optional[List[Lot]] = None):
+        """
+        Commit closed receipts: ledger events, receiving logs and lots together.
+
+        Receiving logs and lots always live in CSV.  In SQLite mode they are
+        written inside the ledger transaction (see ``_ledger_batch_with_csv``);
+        if the SQLite COMMIT fails after the CSV half landed, the CSV fallback
+        only adds the ledger events (logs and lots are never appended twice).
+        In CSV mode the three files share one journaled append
+        (``CSVLayer.write_receipt_batch``).
+        """
+        for txn in txns:
+            validate_sku_canonical(txn.sku, context="write_receipt_batch")
+
+        if self.is_sqlite_mode():
+            committed, csv_written = self._ledger_batch_with_csv(
+                txns, lambda: self.csv_layer.write_receipt_batch([], receiving_logs, lots), "write_receipt_batch",
+            )
+            if committed:
+                return
+            if csv_written:
+                self.csv_layer.write_transactions_batch(txns)
+                return
+        self.csv_layer.write_receipt_batch(txns, receiving_logs, lots)
+
+    def write_eod_batch(self, txns: List[Transaction], new_sales: List[SalesRecord], all_sales: Optional[List[SalesRecord]] = None):
+        """
+        Commit a daily close: sales, ledger events and their FEFO lot updates together.
+
+        Sales and lots always live in CSV.  FEFO is applied exactly once, on
+        an in-memory lot view, before anything is written.  In SQLite mode the
+        sales and lots commit inside the ledger transaction (see
+        ``_ledger_batch_with_csv``); in CSV mode everything is one journaled
+        commit (``CSVLayer.write_eod_batch``).
+        """
+        for txn in txns:
+            validate_sku_canonical(txn.sku, context="write_eod_batch")
+
+        if self.is_sqlite_mode():
+            txns, lot_batch = self.csv_layer._fefo_transactions(txns)
+            committed, csv_written = self._ledger_batch_with_csv(
+                txns, lambda: self.csv_layer._write_eod_files([], new_sales, all_sales, lot_batch), "write_eod_batch",
+            )
+            if committed:
+                return
+            if csv_written:
+                # FEFO notes already applied: append the rows as they are
+                self.csv_layer._append_csv_batch(
+                    "transactions.csv", [self.csv_layer._transaction_row(txn) for txn in txns],
+                )
+            else:
+                self.csv_layer._write_eod_files(txns, new_sales, all_sales, lot_batch)
+            return
+        self.csv_layer.write_eod_batch(txns, new_sales, all_sales)
+
     def overwrite_transactions(self, txns: List[Transaction]):
         """
         Replace the entire transaction ledger with *txns* (used by revert logic).
@@ -685,6 +872,78 @@ class StorageAdapter(CSVLayer):
         else:
             self.csv_layer.overwrite_transactions(txns)
 
+    def delete_transactions(
+        self,
+        sku: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        events: Optional[Sequence[EventType]] = None,
+        note_contains: Optional[str] = None,
+    ) -> int:
+        """
+        Delete one SKU's ledger events matching all the given filters (revert / purge).
+        
+        SQLite mode runs one indexed DELETE; CSV mode a single streaming
+        filter pass over transactions.csv (skipped if nothing matches).
+        
+        Returns:
+            Number of deleted events
+        """
+        if self.is_sqlite_mode():
+            assert self.repos is not None
+            try:
+                return self.repos.ledger().delete_matching(
+                    sku,
+                    date_from=date_from.isoformat() if date_from else None,
+                    date_to=date_to.isoformat() if date_to else None,
+                    events=[e.value for e in events] if events is not None else None,
+                    note_contains=note_contains,
+                )
+            except Exception as e:
+                self._sqlite_degrade(e)
+                print(f"⚠ SQLite delete_transactions failed, falling back to CSV: {e}")
+        return self.csv_layer.delete_transactions(sku, date_from, date_to, events, note_contains)
+    
+    def replace_transactions_day(
+        self,
+        sku: str,
+        day: date,
+        txns: List[Transaction],
+        events: Optional[Sequence[EventType]] = None,
+    ) -> int:
+        """
+        Replace one SKU's ledger events of one day (optionally only ``events``) with *txns*.
+        
+        SQLite mode deletes and inserts in one transaction; CSV mode uses a
+        single streaming filter pass (plain append if nothing matches).
+        
+        Returns:
+            Number of replaced (deleted) events
+        """
+        if self.is_sqlite_mode():
+            assert self.repos is not None
+            try:
+                return self.repos.ledger().replace_day(
+                    sku,
+                    day.isoformat(),
+                    [
+                        {
+                            'date': t.date.isoformat(),
+                            'sku': t.sku,
+                            'event': t.event.value,
+                            'qty': t.qty,
+                            'receipt_date': t.receipt_date.isoformat() if t.receipt_date else None,
+                            'note': t.note or '',
+                        }
+                        for t in txns
+                    ],
+                    events=[e.value for e in events] if events is not None else None,
+                )
+            except Exception as e:
+                self._sqlite_degrade(e)
+                print(f"⚠ SQLite replace_transactions_day failed, falling back to CSV: {e}")
+        return self.csv_layer.replace_transactions_day(sku, day, txns, events)
+
     # ============================================================
     # Sales Operations
     # ============================================================
@@ -723,6 +982,10 @@ class StorageAdapter(CSVLayer):
         """Append sales record (alias for write_sales_record)"""
         self.write_sales_record(sale)
 
+    def append_sales_batch(self, sales: List[SalesRecord]):
+        """Append several sales records in one write (always CSV, like write_sales_record)."""
+        self.csv_layer.append_sales_batch(sales)
+
     def write_sales(self, sales: List[SalesRecord]):
         """Bulk-overwrite all sales records.
         
@@ -786,15 +1049,24 @@ class StorageAdapter(CSVLayer):
     def write_order_log(self, *args, **kwargs):
         self.csv_layer.write_order_log(*args, **kwargs)
     
+    def update_orders_received_qty(self, updates: Dict[str, Tuple[int, str]]):
+        self.csv_layer.update_orders_received_qty(updates)
+    
     def read_receiving_logs(self):
         return self.csv_layer.read_receiving_logs()
     
+    def receiving_document_ids(self) -> frozenset:
+        return self.csv_layer.receiving_document_ids()
+    
     def write_receiving_log(self, *args, **kwargs):
         self.csv_layer.write_receiving_log(*args, **kwargs)
     
     def read_audit_log(self, sku: Optional[str] = None, limit: Optional[int] = None):
         return self.csv_layer.read_audit_log(sku, limit)
     
+    def read_sku_audit_page(self, sku: str, limit: int = 50, before: Optional[Tuple[str, int]] = None):
+        return self.csv_layer.read_sku_audit_page(sku, limit, before)
+    
     def write_audit_log(self, audit_log: AuditLog):
         self.csv_layer.log_audit(
             operation=audit_log.operation,
@@ -22,9 +22,10 @@ Author: Desktop Order System Team
 Date: February 2026
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import date, timedelta
 from dataclasses import dataclass
+from functools import lru_cache
 
 # Import existing modules
 from src.domain.calendar import calculate_protection_period_days, Lane
@@ -49,6 +50,7 @@ class OrderConstraints:
             raise ValueError(f"max_stock must be >= 0 or None, got {self.max_stock}")
 
 
+@lru_cache(maxsize=128)
 def _z_score_for_csl(alpha: float) -> float:
     """
     Get z-score for target Cycle Service Level (CSL).
@@ -208,6 +210,96 @@ def _calculate_inventory_position(
     return on_hand + on_order
 
 
+def _forecast_demand_and_sigma(
+    history: List[Dict[str, Any]],
+    protection_period: int,
+    window_weeks: int = 8,
+    censored_flags: Optional[List[bool]] = None,
+    alpha_boost_for_censored: float = 0.05,
+    forecast_demand_override: Optional[float] = None,
+    sigma_horizon_override: Optional[float] = None,
+):
+    """
+    Forecast μ_P and estimate σ_P for one SKU (steps 2-3 of ``compute_order``).
+    
+    Returns:
+        Tuple (forecast_demand, sigma_daily, sigma_horizon, model, uncertainty_meta)
+    """
+    # Step 2: Fit forecast model and predict demand (with censored filtering)
+    # If forecast_demand_override is provided, use it directly (event/promo-adjusted forecast)
+    if forecast_demand_override is not None:
+        forecast_demand = forecast_demand_override
+        # Run model fitting only for metadata tracking (not used for forecast_demand)
+        model = fit_forecast_model(
+            history,
+            censored_flags=censored_flags,
+            alpha_boost_for_censored=alpha_boost_for_censored
+        )
+    else:
+        # Standard path: fit model and predict
+        model = fit_forecast_model(
+            history,
+            censored_flags=censored_flags,
+            alpha_boost_for_censored=alpha_boost_for_censored
+        )
+        forecast_values = predict(model, horizon=protection_period)
+        forecast_demand = sum(forecast_values)  # μ_P
+    
+    # Step 3: Estimate uncertainty (with censored filtering)
+    # If sigma_horizon_override is provided, use it directly (event/promo-adjusted uncertainty)
+    if sigma_horizon_override is not None:
+        sigma_horizon = sigma_horizon_override
+        sigma_daily = sigma_horizon / (protection_period ** 0.5) if protection_period > 0 else 0.0
+        uncertainty_meta = {
+            "n_residuals": 0,
+            "n_censored_excluded": 0,
+            "method": "override",
+        }
+    else:
+        # Standard path: estimate uncertainty from history
+        from src.uncertainty import estimate_demand_uncertainty
+        
+        def forecast_func(hist, horizon):
+            m = fit_forecast_model(hist, censored_flags=censored_flags, alpha_boost_for_censored=alpha_boost_for_censored)
+            return predict(m, horizon)
+        
+        sigma_daily, uncertainty_meta = estimate_demand_uncertainty(
+            history, forecast_func, window_weeks=window_weeks, method="mad", censored_flags=censored_flags
+        )
+        
+        sigma_horizon = sigma_over_horizon(protection_period, sigma_daily)
+    
+    return forecast_demand, sigma_daily, sigma_horizon, model, uncertainty_meta
+
+
+def _constraint_notes(
+    order_raw: float,
+    order_after_pack: int,
+    order_after_moq: int,
+    order_final: int,
+    inventory_position: float,
+    constraints: OrderConstraints,
+) -> List[str]:
+    """Human-readable notes of the pack / MOQ / cap adjustments of one order."""
+    notes = []
+    if order_after_pack != int(order_raw):
+        notes.append(
+            f"pack_size: {order_raw:.1f} → {order_after_pack} "
+            f"(rounded up to {constraints.pack_size} units/pack)"
+        )
+    if order_after_moq == 0 and order_after_pack > 0:
+        notes.append(
+            f"moq: {order_after_pack} < {constraints.moq} → 0 (below MOQ, don't order)"
+        )
+    if constraints.max_stock is not None and order_final < order_after_moq:
+        cap = max(0, constraints.max_stock - int(inventory_position))
+        notes.append(
+            f"max_stock: {order_after_moq} → {order_final} "
+            f"(capped by max_stock={constraints.max_stock}, available={cap})"
+        )
+    return notes
+
+
 def compute_order(
     sku: str,
     order_date: date,
@@ -332,50 +424,16 @@ def compute_order(
     protection_period = calculate_protection_period_days(order_date, lane)
     receipt_date = next_receipt_date(order_date, lane)
     
-    # Step 2: Fit forecast model and predict demand (with censored filtering)
-    # If forecast_demand_override is provided, use it directly (event/promo-adjusted forecast)
-    if forecast_demand_override is not None:
-        forecast_demand = forecast_demand_override
-        # Run model fitting only for metadata tracking (not used for forecast_demand)
-        model = fit_forecast_model(
-            history,
-            censored_flags=censored_flags,
-            alpha_boost_for_censored=alpha_boost_for_censored
-        )
-        forecast_values = [forecast_demand / protection_period] * protection_period  # Dummy values for compatibility
-    else:
-        # Standard path: fit model and predict
-        model = fit_forecast_model(
-            history,
-            censored_flags=censored_flags,
-            alpha_boost_for_censored=alpha_boost_for_censored
-        )
-        forecast_values = predict(model, horizon=protection_period)
-        forecast_demand = sum(forecast_values)  # μ_P
-    
-    # Step 3: Estimate uncertainty (with censored filtering)
-    # If sigma_horizon_override is provided, use it directly (event/promo-adjusted uncertainty)
-    if sigma_horizon_override is not None:
-        sigma_horizon = sigma_horizon_override
-        sigma_daily = sigma_horizon / (protection_period ** 0.5) if protection_period > 0 else 0.0
-        uncertainty_meta = {
-            "n_residuals": 0,
-            "n_censored_excluded": 0,
-            "method": "override",
-        }
-    else:
-        # Standard path: estimate uncertainty from history
-        from src.uncertainty import estimate_demand_uncertainty
-        
-        def forecast_func(hist, horizon):
-            m = fit_forecast_model(hist, censored_flags=censored_flags, alpha_boost_for_censored=alpha_boost_for_censored)
-            return predict(m, horizon)
-        
-        sigma_daily, uncertainty_meta = estimate_demand_uncertainty(
-            history, forecast_func, window_weeks=window_weeks, method="mad", censored_flags=censored_flags
-        )
-        
-        sigma_horizon = sigma_over_horizon(protection_period, sigma_daily)
+    # Steps 2-3: Forecast μ_P and uncertainty σ_P (with censored filtering)
+    forecast_demand, sigma_daily, sigma_horizon, model, uncertainty_meta = _forecast_demand_and_sigma(
+        history,
+        protection_period,
+        window_weeks=window_weeks,
+        censored_flags=censored_flags,
+        alpha_boost_for_censored=alpha_boost_for_censored,
+        forecast_demand_override=forecast_demand_override,
+        sigma_horizon_override=sigma_horizon_override,
+    )
     
     # Step 4: Get z-score for effective CSL (use alpha_eff)
     z_score = _z_score_for_csl(alpha_eff)
@@ -396,31 +454,12 @@ def compute_order(
     order_raw = max(0.0, reorder_point - inventory_position)
     
     # Step 8: Apply constraints with tracking
-    constraints_applied = []
-    
-    # Pack size rounding
-    order_after_pack = _apply_pack_size(order_raw, constraints.pack_size)
-    if order_after_pack != int(order_raw):
-        constraints_applied.append(
-            f"pack_size: {order_raw:.1f} → {order_after_pack} "
-            f"(rounded up to {constraints.pack_size} units/pack)"
-        )
-    
-    # MOQ constraint
-    order_after_moq = _apply_moq(order_after_pack, constraints.moq)
-    if order_after_moq == 0 and order_after_pack > 0:
-        constraints_applied.append(
-            f"moq: {order_after_pack} < {constraints.moq} → 0 (below MOQ, don't order)"
-        )
-    
-    # Cap constraint
-    order_final = _apply_cap(order_after_moq, inventory_position, constraints.max_stock)
-    if constraints.max_stock is not None and order_final < order_after_moq:
-        cap = max(0, constraints.max_stock - int(inventory_position))
-        constraints_applied.append(
-            f"max_stock: {order_after_moq} → {order_final} "
-            f"(capped by max_stock={constraints.max_stock}, available={cap})"
-        )
+    order_after_pack = _apply_pack_size(order_raw, constraints.pack_size)  # Pack size rounding
+    order_after_moq = _apply_moq(order_after_pack, constraints.moq)  # MOQ constraint
+    order_final = _apply_cap(order_after_moq, inventory_position, constraints.max_stock)  # Cap constraint
+    constraints_applied = _constraint_notes(
+        order_raw, order_after_pack, order_after_moq, order_final, inventory_position, constraints
+    )
     
     # Build comprehensive breakdown with censored metadata
     return {
@@ -641,11 +680,19 @@ def compute_order_batch(
     inventory_data: Dict[str, Dict[str, Any]],
     constraints_map: Dict[str, OrderConstraints],
     history_map: Dict[str, List[Dict[str, Any]]],
-    window_weeks: int = 8
+    window_weeks: int = 8,
+    demand_overrides: Optional[Dict[str, Tuple[float, float]]] = None,
 ) -> Dict[str, Dict[str, Any]]:
     """
     Compute orders for multiple SKUs in batch.
     
+    Same result per SKU as ``compute_order()``, but everything that does not
+    depend on the SKU (protection period, receipt date, IP cut-off date,
+    z(α)) is resolved once, and the reorder point, raw quantity and the
+    pack / MOQ / cap chain are evaluated as numpy array operations.  Only
+    the forecast (μ_P, σ_P) is computed per SKU, and SKUs found in
+    ``demand_overrides`` skip the rolling sigma refit.
+    
     Args:
         skus: List of SKU identifiers
         order_date: Order placement date
@@ -655,6 +702,9 @@ def compute_order_batch(
         constraints_map: Map {sku: OrderConstraints}
         history_map: Map {sku: sales history}
         window_weeks: Rolling window size
+        demand_overrides: Optional map {sku: (μ_P, σ_P)} from the shared
+            demand engine, as ``forecast_demand_override`` /
+            ``sigma_horizon_override`` of ``compute_order()``
     
     Returns:
         Dict mapping sku → compute_order result
@@ -679,29 +729,100 @@ def compute_order_batch(
         ...     }
         ... )
     """
-    results = {}
+    import numpy as np
+    from src.domain.calendar import next_receipt_date
+    
+    if not 0 < alpha < 1:
+        raise ValueError(f"alpha must be in (0, 1), got {alpha}")
     
+    # Skip SKUs with missing data
+    skus = [sku for sku in skus if sku in inventory_data and sku in history_map]
+    if not skus:
+        return {}
     for sku in skus:
-        if sku not in inventory_data or sku not in history_map:
-            # Skip SKUs with missing data
-            continue
-        
-        inv_data = inventory_data[sku]
-        constraints = constraints_map.get(sku, OrderConstraints())
-        history = history_map[sku]
-        
-        result = compute_order(
-            sku=sku,
-            order_date=order_date,
-            lane=lane,
-            alpha=alpha,
-            on_hand=inv_data["on_hand"],
-            pipeline=inv_data.get("pipeline", []),
-            constraints=constraints,
-            history=history,
-            window_weeks=window_weeks
-        )
-        
-        results[sku] = result
+        if inventory_data[sku]["on_hand"] < 0:
+            raise ValueError(f"on_hand must be >= 0, got {inventory_data[sku]['on_hand']}")
+    demand_overrides = demand_overrides or {}
+    
+    # --- Shared, SKU-independent values (no censored flags: no alpha boost)
+    alpha_eff = min(0.99, alpha)
+    z_score = _z_score_for_csl(alpha_eff)
+    protection_period = calculate_protection_period_days(order_date, lane)
+    receipt_date = next_receipt_date(order_date, lane)
+    forecast_end_date = order_date + timedelta(days=protection_period)
+    
+    # --- Per SKU: forecast and inventory position
+    forecasts = []
+    on_hand_list: List[float] = []
+    ip_list: List[float] = []
+    for sku in skus:
+        mu_override, sigma_override = demand_overrides.get(sku, (None, None))
+        forecasts.append(_forecast_demand_and_sigma(
+            history_map[sku],
+            protection_period,
+            window_weeks=window_weeks,
+            forecast_demand_override=mu_override,
+            sigma_horizon_override=sigma_override,
+        ))
+        on_hand = inventory_data[sku]["on_hand"]
+        on_hand_list.append(on_hand)
+        ip_list.append(_calculate_inventory_position(
+            on_hand, inventory_data[sku].get("pipeline", []), forecast_end_date
+        ))
+    constraints_list = [constraints_map.get(sku, OrderConstraints()) for sku in skus]
+    
+    # --- Vectorized: reorder point, raw order, pack / MOQ / cap
+    mu = np.array([f[0] for f in forecasts], dtype=float)
+    sigma_h = np.array([f[2] for f in forecasts], dtype=float)
+    ip = np.array(ip_list, dtype=float)
+    pack = np.array([c.pack_size for c in constraints_list], dtype=float)
+    moq = np.array([c.moq for c in constraints_list], dtype=float)
+    has_cap = np.array([c.max_stock is not None for c in constraints_list])
+    max_stock = np.array([c.max_stock if c.max_stock is not None else 0 for c in constraints_list], dtype=float)
+    
+    reorder_point = mu + z_score * sigma_h
+    order_raw = np.maximum(0.0, reorder_point - ip)
+    after_pack = np.where(order_raw > 0, np.ceil(order_raw / pack) * pack, 0.0)
+    after_moq = np.where(after_pack < moq, 0.0, after_pack)
+    available = np.maximum(0.0, max_stock - np.trunc(ip))
+    final = np.where(has_cap, np.minimum(after_moq, available), after_moq)
+    
+    results = {}
+    for i, sku in enumerate(skus):
+        forecast_demand, sigma_daily, sigma_horizon, model, uncertainty_meta = forecasts[i]
+        order_after_pack, order_after_moq, order_final = int(after_pack[i]), int(after_moq[i]), int(final[i])
+        results[sku] = {
+            "sku": sku,
+            "order_date": order_date,
+            "receipt_date": receipt_date,
+            "lane": lane.name,
+            "alpha": alpha,
+            "alpha_eff": alpha_eff,
+            "n_censored": 0,
+            "censored_reasons": [],
+            "n_censored_excluded_from_sigma": uncertainty_meta["n_censored_excluded"],
+            "protection_period": protection_period,
+            "forecast_demand": forecast_demand,
+            "forecast_n_samples": model["n_samples"],
+            "forecast_n_censored": model["n_censored"],
+            "forecast_alpha_eff": model["alpha_eff"],
+            "sigma_daily": sigma_daily,
+            "sigma_horizon": sigma_horizon,
+            "sigma_n_residuals": uncertainty_meta["n_residuals"],
+            "z_score": z_score,
+            "reorder_point": float(reorder_point[i]),
+            "on_hand": on_hand_list[i],
+            "on_order": ip_list[i] - on_hand_list[i],
+            "inventory_position": ip_list[i],
+            "order_raw": float(order_raw[i]),
+            "order_after_pack": order_after_pack,
+            "order_after_moq": order_after_moq,
+            "order_final": order_final,
+            "constraints_applied": _constraint_notes(
+                float(order_raw[i]), order_after_pack, order_after_moq, order_final,
+                ip_list[i], constraints_list[i],
+            ),
+            "service_level_target": alpha,
+        }
     
     return results
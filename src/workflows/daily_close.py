@@ -1,12 +1,14 @@
 """
 Daily closing workflow: EOD stock entry and automatic sales calculation with FEFO.
 """
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import date
-from typing import Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import logging
 
 from ..domain.models import Transaction, EventType, SalesRecord
-from ..domain.ledger import calculate_sold_from_eod_stock, LotConsumptionManager
+from ..domain.ledger import calculate_sold_from_eod_stock
 from ..persistence.csv_layer import CSVLayer
 
 logger = logging.getLogger(__name__)
@@ -60,7 +62,72 @@ class DailyCloseWorkflow:
         transactions = self.csv_layer.read_transactions()
         sales_records = self.csv_layer.read_sales()
         
-        # Calculate sold qty and adjustment
+        plan = self._plan_eod_stock(sku, eod_date, eod_stock_on_hand, transactions, sales_records)
+        self._commit_eod_plans([plan], eod_date, sales_records)
+        return plan.sales_record, plan.adjust_txn, plan.status
+    
+    def process_bulk_eod_stock(
+        self,
+        eod_entries: dict,
+        eod_date: date,
+    ) -> list:
+        """
+        Process multiple EOD stock entries at once.
+        
+        Skus, transactions and sales are loaded once and indexed by SKU;
+        every entry is computed from its own SKU's slice, so the close
+        scales linearly with the number of counted SKUs.  The resulting
+        sales, ledger events and FEFO lot updates are then persisted with
+        one ``write_eod_batch`` commit, so a close is never left half-written.
+        
+        Args:
+            eod_entries: Dict {sku: eod_stock_on_hand}
+            eod_date: End-of-day date
+        
+        Returns:
+            List of status messages for each SKU
+        
+        Note: An invalid entry (unknown SKU, negative stock) is reported and
+        skipped; the other entries are still processed.
+        """
+        skus = {s.sku for s in self.csv_layer.read_skus()}
+        sales_records = self.csv_layer.read_sales()
+        txns_by_sku = _group_by_sku(self.csv_layer.read_transactions())
+        sales_by_sku = _group_by_sku(sales_records)
+        
+        results = []
+        plans = []
+        for sku, eod_stock in eod_entries.items():
+            try:
+                if eod_stock < 0:
+                    raise ValueError(f"Stock EOD cannot be negative: {eod_stock}")
+                if sku not in skus:
+                    raise ValueError(f"SKU {sku} does not exist")
+                plan = self._plan_eod_stock(
+                    sku, eod_date, eod_stock, txns_by_sku.get(sku, []), sales_by_sku.get(sku, []),
+                )
+                plans.append(plan)
+                results.append(f"✓ {plan.status}")
+            except Exception as e:
+                results.append(f"✗ {sku} | Errore: {str(e)}")
+        
+        self._commit_eod_plans(plans, eod_date, sales_records)
+        return results
+    
+    def _plan_eod_stock(
+        self,
+        sku: str,
+        eod_date: date,
+        eod_stock_on_hand: int,
+        transactions: List[Transaction],
+        sales_records: List[SalesRecord],
+    ) -> "_EodPlan":
+        """
+        Compute the sale and ADJUST of one EOD entry (nothing is written).
+        
+        ``transactions`` / ``sales_records`` may be the full lists or just
+        this SKU's slice: other SKUs' records never affect the result.
+        """
         qty_sold, adjustment = calculate_sold_from_eod_stock(
             sku=sku,
             eod_date=eod_date,
@@ -70,28 +137,11 @@ class DailyCloseWorkflow:
         )
         
         sales_record = None
+        sale_txn = None
         adjust_txn = None
-        
-        # Write sales if qty_sold > 0
         if qty_sold > 0:
-            # Check if sale already recorded for this date/SKU (idempotency)
-            existing_sale = next(
-                (s for s in sales_records if s.date == eod_date and s.sku == sku),
-                None
-            )
-            
-            if existing_sale:
-                # Update existing sale (overwrite)
-                sales_records = [s for s in sales_records if not (s.date == eod_date and s.sku == sku)]
-                sales_records.append(SalesRecord(date=eod_date, sku=sku, qty_sold=qty_sold))
-                self.csv_layer.write_sales(sales_records)
-                sales_record = SalesRecord(date=eod_date, sku=sku, qty_sold=qty_sold)
-            else:
-                # Append new sale
-                sales_record = SalesRecord(date=eod_date, sku=sku, qty_sold=qty_sold)
-                self.csv_layer.append_sales(sales_record)
-            
-            # Write SALE transaction to the ledger for audit trail and stock calculation.
+            sales_record = SalesRecord(date=eod_date, sku=sku, qty_sold=qty_sold)
+            # SALE transaction for audit trail and stock calculation.
             # qty is positive (architecture convention: SALE on_hand -= qty).
             # calculate_asof deduplicates: if a ledger SALE exists for a date, the
             # corresponding sales.csv entry is skipped to avoid double-counting.
@@ -102,32 +152,9 @@ class DailyCloseWorkflow:
                 qty=qty_sold,
                 note="EOD chiusura giornaliera",
             )
-            self.csv_layer.write_transaction(sale_txn)
-
-            # Apply FEFO consumption to lots (real-time sync).
-            # FEFO is triggered here because auto-FEFO in write_transaction only
-            # applies inside write_transaction for SALE/WASTE; we call it manually
-            # to keep lot quantities in sync.
-            try:
-                lots = self.csv_layer.get_lots_by_sku(sku, sort_by_expiry=True)
-                if lots:
-                    consumption_records = LotConsumptionManager.consume_from_lots(
-                        sku=sku,
-                        qty_to_consume=qty_sold,
-                        lots=lots,
-                        csv_layer=self.csv_layer,
-                    )
-                    
-                    if consumption_records:
-                        logger.info(f"FEFO consumption for {sku} EOD sales: {consumption_records}")
-            except Exception as e:
-                logger.warning(f"FEFO consumption failed for {sku}: {e}, continuing without lot update")
-
-
         
-        # Write ADJUST if adjustment != 0 (stock discrepancy after accounting for sales)
+        # ADJUST if adjustment != 0 (stock discrepancy after accounting for sales)
         if adjustment != 0:
-            # Create ADJUST transaction to align stock
             adjust_txn = Transaction(
                 date=eod_date,
                 sku=sku,
@@ -135,45 +162,62 @@ class DailyCloseWorkflow:
                 qty=eod_stock_on_hand,  # ADJUST sets stock to this value
                 note=f"EOD adjustment (discrepancy: {adjustment:+d})",
             )
-            self.csv_layer.write_transaction(adjust_txn)
-        
-        # Build status message
-        msg_parts = []
-        if qty_sold > 0:
-            msg_parts.append(f"Venduto: {qty_sold}")
-        if adjustment != 0:
-            msg_parts.append(f"Rettifica: {adjustment:+d}")
-        if not msg_parts:
-            msg_parts.append("Nessun cambiamento (stock teorico = EOD)")
-        
-        status = f"{sku} | {' | '.join(msg_parts)}"
         
-        return sales_record, adjust_txn, status
+        return _EodPlan(sku, qty_sold, adjustment, sales_record, sale_txn, adjust_txn)
     
-    def process_bulk_eod_stock(
-        self,
-        eod_entries: dict,
-        eod_date: date,
-    ) -> list:
+    def _commit_eod_plans(self, plans: List["_EodPlan"], eod_date: date, sales_records: List[SalesRecord]):
         """
-        Process multiple EOD stock entries at once.
-        
-        Args:
-            eod_entries: Dict {sku: eod_stock_on_hand}
-            eod_date: End-of-day date
+        Persist planned EOD entries: sales, ledger events and lots in one commit.
         
-        Returns:
-            List of status messages for each SKU
-        
-        Note: Continues processing even if one SKU fails (logs error).
+        ``write_eod_batch`` applies FEFO to the SALE events exactly once
+        (one lots.csv update for the whole close, in CSV and SQLite mode) and
+        writes sales with the ledger batch, so a close is never half-written.
         """
-        results = []
-        
-        for sku, eod_stock in eod_entries.items():
-            try:
-                _, _, status = self.process_eod_stock(sku, eod_date, eod_stock)
-                results.append(f"✓ {status}")
-            except Exception as e:
-                results.append(f"✗ {sku} | Errore: {str(e)}")
-        
-        return results
+        new_sales = [p.sales_record for p in plans if p.sales_record is not None]
+        all_sales = None
+        if new_sales:
+            # Re-runs for the same date/SKU replace the earlier sale (idempotency)
+            replaced = {s.sku for s in new_sales}
+            if any(s.date == eod_date and s.sku in replaced for s in sales_records):
+                kept = [s for s in sales_records if not (s.date == eod_date and s.sku in replaced)]
+                all_sales = kept + new_sales
+        
+        events: List[Transaction] = []
+        for plan in plans:
+            events.extend(t for t in (plan.sale_txn, plan.adjust_txn) if t is not None)
+        if events or new_sales:
+            self.csv_layer.write_eod_batch(events, new_sales, all_sales)
+        
+        for plan in plans:
+            if plan.sale_txn is not None or plan.adjust_txn is not None:
+                logger.info(f"EOD {eod_date.isoformat()} {plan.status}")
+
+
+def _group_by_sku(records) -> Dict[str, list]:
+    """Bucket transactions / sales records by SKU, keeping file order."""
+    by_sku: Dict[str, list] = defaultdict(list)
+    for record in records:
+        by_sku[record.sku].append(record)
+    return by_sku
+
+
+@dataclass
+class _EodPlan:
+    """Events computed for one EOD entry, before they are written."""
+    sku: str
+    qty_sold: int
+    adjustment: int
+    sales_record: Optional[SalesRecord]
+    sale_txn: Optional[Transaction]
+    adjust_txn: Optional[Transaction]
+    
+    @property
+    def status(self) -> str:
+        msg_parts = []
+        if self.qty_sold > 0:
+            msg_parts.append(f"Venduto: {self.qty_sold}")
+        if self.adjustment != 0:
+            msg_parts.append(f"Rettifica: {self.adjustment:+d}")
+        if not msg_parts:
+            msg_parts.append("Nessun cambiamento (stock teorico = EOD)")
+        return f"{self.sku} | {' | '.join(msg_parts)}"
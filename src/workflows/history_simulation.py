@@ -11,13 +11,13 @@ Design rules:
 - Stock starts at 0 on the first day of the period; the engine creates orders
   automatically from that day forward.
 - Random qty per day is sampled from a uniform integer range [qty_min, qty_max].
-- Rerun is idempotent: before generating, all previous SIM_HIST events for the
+- Rerun is idempotent: before writing, all previous SIM_HIST events for the
   SKU in the same period are removed; sales.csv rows for the SKU+period are
   replaced wholesale.
 - No datetime.now() or date.today() in core logic; dates are passed as params.
 """
 from datetime import date, timedelta
-from typing import List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional
 import random
 import logging
 
@@ -88,6 +88,7 @@ class HistorySimulationWorkflow:
         n_days: int,
         end_date: date,
         random_seed: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
     ) -> HistorySimulationResult:
         """
         Generate n_days of synthetic history ending on end_date (inclusive).
@@ -99,6 +100,8 @@ class HistorySimulationWorkflow:
             n_days: Number of calendar days to simulate.
             end_date: Last day of the simulated period (normally today).
             random_seed: Optional seed for reproducibility (deterministic when set).
+            progress: Optional ``progress(done, total)`` called once per simulated
+                day (may raise to abort the run before anything is written).
 
         Returns:
             HistorySimulationResult summary.
@@ -139,10 +142,7 @@ class HistorySimulationWorkflow:
             sku=sku_code,
         )
 
-        # --- Step 1: Purge previous simulation data for this SKU+period ---
-        self._purge_previous_simulation(sku_code, start_date, end_date)
-
-        # --- Step 2: Run chronological simulation ---
+        # --- Step 1: Run chronological simulation (in memory only) ---
         rng = random.Random(random_seed)
         lead_time = sku_obj.lead_time_days if sku_obj.lead_time_days > 0 else 7
         reorder_point = sku_obj.reorder_point if sku_obj.reorder_point >= 0 else 10
@@ -160,6 +160,8 @@ class HistorySimulationWorkflow:
         on_order = 0
 
         for day_offset in range(n_days):
+            if progress is not None:
+                progress(day_offset, n_days)
             current_day = start_date + timedelta(days=day_offset)
 
             # Receive any orders due today
@@ -269,6 +271,10 @@ class HistorySimulationWorkflow:
             )
         pending_orders.clear()
 
+        # --- Step 2: Purge previous simulation data for this SKU+period ---
+        # Done only now, so a run aborted during the simulation leaves storage untouched.
+        self._purge_previous_simulation(sku_code, start_date, end_date)
+
         # --- Step 3: Write order_logs for traceability ---
         # We write minimal order log entries so order pipeline and receiving_logs stay consistent.
         self._write_sim_order_logs(sku_code, sim_transactions, start_date, end_date)
@@ -311,18 +317,10 @@ class HistorySimulationWorkflow:
         Also removes associated order_log and receiving_log entries (by SIM prefix).
         """
         # --- Transactions ---
-        all_txns = self.csv_layer.read_transactions()
-        kept_txns = []
-        purged = 0
-        for txn in all_txns:
-            is_sim = txn.note and SIM_TAG in txn.note
-            in_period = start_date <= txn.date <= end_date
-            if txn.sku == sku_code and is_sim and in_period:
-                purged += 1
-            else:
-                kept_txns.append(txn)
+        purged = self.csv_layer.delete_transactions(
+            sku_code, date_from=start_date, date_to=end_date, note_contains=SIM_TAG,
+        )
         if purged:
-            self.csv_layer.overwrite_transactions(kept_txns)
             logger.info(f"[SIM_HIST] Purged {purged} previous simulation transactions for {sku_code}")
 
         # --- Order logs ---
@@ -7,14 +7,17 @@ import logging
 
 if TYPE_CHECKING:
     from ..domain.contracts import OrderExplain
+    from .proposal_context import ProposalRunContext
 
 from ..domain.models import Stock, OrderProposal, OrderConfirmation, Transaction, EventType, SKU, SalesRecord
 from ..persistence.csv_layer import CSVLayer
 from ..domain.ledger import StockCalculator, ShelfLifeCalculator
 from ..domain.promo_uplift import is_in_post_promo_window, estimate_post_promo_dip
+from ..promo_calendar import load_promo_index
 from ..analytics.target_resolver import TargetServiceLevelResolver
 from ..domain.calendar import Lane, next_receipt_date, calculate_protection_period_days
 from ..analytics.pipeline import build_open_pipeline
+from ..analytics.oos_engine import SkuOosHistory
 from ..replenishment_policy import compute_order, OrderConstraints
 
 
@@ -231,6 +234,7 @@ class OrderWorkflow:
         transactions: Optional[List[Transaction]] = None,
         sales_records: Optional[List[SalesRecord]] = None,
         pipeline_extra: Optional[List[dict]] = None,
+        context: Optional["ProposalRunContext"] = None,
     ) -> OrderProposal:
         """
         Generate order proposal based on stock and sales history.
@@ -261,6 +265,8 @@ class OrderWorkflow:
             transactions: All transactions (required for inventory_position calculation if target_receipt_date provided)
             sales_records: All sales records (required for inventory_position calculation if target_receipt_date provided)
             pipeline_extra: Extra pipeline items for CSL mode (Friday dual-lane support). List of dicts with keys: receipt_date (date), qty (int). Appended to unfulfilled orders from order_logs.csv.
+            context: Shared run data of a bulk generation (settings, SKU master, per-SKU
+                ledger/sales slices); when given, nothing it holds is re-read from storage
         
         Returns:
             OrderProposal with suggested quantity (adjusted for pack_size, MOQ, and max_stock cap)
@@ -318,7 +324,7 @@ class OrderWorkflow:
         
         # === FORECAST METHOD SELECTION (SIMPLE vs MONTE CARLO) ===
         # Read global settings
-        settings = self.csv_layer.read_settings()
+        settings = context.settings if context is not None else self.csv_layer.read_settings()
         global_forecast_method = settings.get("reorder_engine", {}).get("forecast_method", {}).get("value", "simple")
         mc_show_comparison = settings.get("monte_carlo", {}).get("show_comparison", {}).get("value", False)
         
@@ -555,16 +561,19 @@ class OrderWorkflow:
             mc_horizon_days_used = horizon_days
             
             # Fetch historical sales data for SKU (with lookback window to avoid stale outliers)
-            sales_records = self.csv_layer.read_sales()
             mc_history_lookback = int(
                 settings.get("monte_carlo", {}).get("history_days", {}).get("value", 90)
                 if settings else 90
             )
             mc_cutoff = date.today() - timedelta(days=mc_history_lookback)
-            sku_sales_history = [
-                {"date": rec.date, "qty_sold": rec.qty_sold}
-                for rec in sales_records if rec.sku == sku and rec.date >= mc_cutoff
-            ]
+            if context is not None:
+                sku_sales_history = context.sales_history(sku, mc_cutoff)
+            else:
+                sales_records = self.csv_layer.read_sales()
+                sku_sales_history = [
+                    {"date": rec.date, "qty_sold": rec.qty_sold}
+                    for rec in sales_records if rec.sku == sku and rec.date >= mc_cutoff
+                ]
 
             # Run Monte Carlo forecast (with sparse-history guard)
             # When fewer than 5 records exist in the window, the MC empirical bootstrap
@@ -716,8 +725,8 @@ class OrderWorkflow:
                 # Load inputs (lazy; each branch only if the flag is enabled)
                 _sales_for_mods = self.csv_layer.read_sales() if sales_records is None else sales_records
                 _trans_for_mods = self.csv_layer.read_transactions() if transactions is None else transactions
-                _all_skus_mods = self.csv_layer.read_skus()
-                _promo_wins = self.csv_layer.read_promo_calendar() if promo_adjustment_enabled else []
+                _all_skus_mods = context.skus if context is not None else self.csv_layer.read_skus()
+                _promo_wins = load_promo_index(self.csv_layer) if promo_adjustment_enabled else []
                 _evt_rules = self.csv_layer.read_event_uplift_rules() if event_uplift_enabled else []
                 _holidays_mods: list = []
                 if _holiday_mod_enabled:
@@ -867,9 +876,9 @@ class OrderWorkflow:
                 sku=sku,
                 target_date=target_receipt_date,
                 current_stock=adjusted_stock,
-                transactions=transactions,
+                transactions=context.txns_for(sku) if context is not None else transactions,
                 daily_sales_forecast=daily_sales_avg,
-                sales_records=sales_records,
+                sales_records=context.sales_for(sku) if context is not None else sales_records,
             )
         else:
             # Traditional: on_order unfiltered (legacy behavior)
@@ -893,16 +902,19 @@ class OrderWorkflow:
                 mc_horizon_mode_used = mc_params["horizon_mode"]
                 mc_horizon_days_used = mc_horizon
                 
-                sales_records = self.csv_layer.read_sales()
                 mc_history_lookback_cmp = int(
                     settings.get("monte_carlo", {}).get("history_days", {}).get("value", 90)
                     if settings else 90
                 )
                 mc_cutoff_cmp = date.today() - timedelta(days=mc_history_lookback_cmp)
-                sku_sales_history = [
-                    {"date": rec.date, "qty_sold": rec.qty_sold}
-                    for rec in sales_records if rec.sku == sku and rec.date >= mc_cutoff_cmp
-                ]
+                if context is not None:
+                    sku_sales_history = context.sales_history(sku, mc_cutoff_cmp)
+                else:
+                    sales_records = self.csv_layer.read_sales()
+                    sku_sales_history = [
+                        {"date": rec.date, "qty_sold": rec.qty_sold}
+                        for rec in sales_records if rec.sku == sku and rec.date >= mc_cutoff_cmp
+                    ]
 
                 from ..forecast import monte_carlo_forecast
                 _MC_MIN_HISTORY_CMP = 5
@@ -979,7 +991,12 @@ class OrderWorkflow:
                 )
                 
                 # Prepare sales history for compute_order
-                if sales_records:
+                if context is not None:
+                    history = [
+                        {"date": rec.date, "qty_sold": rec.qty_sold}
+                        for rec in context.sales_for(sku)
+                    ]
+                elif sales_records:
                     history = [
                         {"date": rec.date, "qty_sold": rec.qty_sold}
                         for rec in sales_records if rec.sku == sku
@@ -1100,14 +1117,14 @@ class OrderWorkflow:
             
             # Find upcoming promo for this SKU
             # Load promo calendar
-            all_promo_windows = self.csv_layer.read_promo_calendar()
-            all_skus_list = self.csv_layer.read_skus()
+            all_promo_windows = load_promo_index(self.csv_layer)
+            all_skus_list = context.skus if context is not None else self.csv_layer.read_skus()
             all_sales_records = sales_records if sales_records else self.csv_layer.read_sales()
             
             # Filter promos for this SKU that start AFTER target_receipt_date (order arrives before promo)
             upcoming_promos = [
-                pw for pw in all_promo_windows
-                if pw.sku == sku and pw.start_date > target_receipt_date
+                pw for pw in all_promo_windows.for_sku(sku)
+                if pw.start_date > target_receipt_date
             ]
             
             # Sort by start_date (earliest first)
@@ -1148,9 +1165,9 @@ class OrderWorkflow:
                             sku=sku,
                             target_date=promo_start_candidate,
                             current_stock=current_stock,
-                            transactions=transactions,
+                            transactions=context.txns_for(sku) if context is not None else transactions,
                             daily_sales_forecast=daily_sales_avg,  # Baseline, not promo-adjusted
-                            sales_records=all_sales_records,
+                            sales_records=context.sales_for(sku) if context is not None else all_sales_records,
                         )
                         
                         # Calculate prebuild delta (how much MORE we need by promo start)
@@ -1194,8 +1211,8 @@ class OrderWorkflow:
         
         if post_promo_enabled and target_receipt_date and transactions is not None:
             # Load all promo calendar for post-promo detection
-            all_promo_windows = self.csv_layer.read_promo_calendar()
-            all_skus_list = self.csv_layer.read_skus()
+            all_promo_windows = load_promo_index(self.csv_layer)
+            all_skus_list = context.skus if context is not None else self.csv_layer.read_skus()
             all_sales_records = sales_records if sales_records else self.csv_layer.read_sales()
             
             # Load parameters
@@ -1429,7 +1446,7 @@ class OrderWorkflow:
         projected_stock_at_receipt = 0
         if receipt_date:
             # Project stock as-of receipt_date using ledger
-            transactions = self.csv_layer.read_transactions()
+            transactions = context.txns_for(sku) if context is not None else self.csv_layer.read_transactions()
             projected_stock_obj = StockCalculator.calculate_asof(
                 sku=sku,
                 asof_date=receipt_date + timedelta(days=1),  # Include events on receipt_date
@@ -2013,6 +2030,7 @@ def calculate_daily_sales_average(
     return_details: bool = False,
     sku_txns: list | None = None,
     sku_sales: list | None = None,
+    oos_history: Optional["SkuOosHistory"] = None,
 ) -> tuple:
     """
     Calculate average daily sales for a SKU using calendar-based approach.
@@ -2043,6 +2061,9 @@ def calculate_daily_sales_average(
         asof_date: As-of date for calculation (defaults to today)
         oos_detection_mode: "strict" (on_hand==0) or "relaxed" (on_hand+on_order==0)
         return_details: If True, return detailed breakdown (default: False for backward compatibility)
+        sku_txns / sku_sales: Pre-filtered per-SKU lists (skip the global scans)
+        oos_history: Prebuilt SkuOosHistory of the SKU (e.g. from a cached
+            OosEngine); the list arguments are then ignored
     
     Returns:
         If return_details=False (default):
@@ -2063,213 +2084,32 @@ def calculate_daily_sales_average(
         # avg = sum(sales_10_days) / 27  (excludes 2 real OOS days, 3 overrides excluded)
         # oos_count = 2  (only non-override OOS days)
     """
-    from ..domain.ledger import StockCalculator
-    from ..domain.models import EventType
-    
     if asof_date is None:
         asof_date = date.today()
 
-    # Resolve per-SKU lists: use pre-filtered lists when provided by caller
-    # (avoids O(T_global) scans when called N_sku times from a bulk worker).
-    _txns: list = sku_txns if sku_txns is not None else [t for t in (transactions or []) if t.sku == sku]
-    _srs: list  = sku_sales if sku_sales is not None else [s for s in (sales_records or []) if s.sku == sku]
-
-    # Build sales map: {date: qty_sold}
-    sku_sales_map = {}
-    for s in _srs:
-        sku_sales_map[s.date] = sku_sales_map.get(s.date, 0) + s.qty_sold
-    
-    # Generate calendar days range
-    start_date = asof_date - timedelta(days=days_lookback - 1)
-    calendar_days = [start_date + timedelta(days=i) for i in range(days_lookback)]
-
-    # Find first date with any ledger/sales activity for this SKU.
-    # Days before this anchor are "pre-existence" and should be excluded from
-    # both the OOS count and the valid-day denominator (treated like
-    # out-of-assortment so they don't inflate oos_days_count or deflate avg).
-    _first_activity = None
-    for _d in sku_sales_map:
-        if _first_activity is None or _d < _first_activity:
-            _first_activity = _d
-    for _t in _txns:
-        if _first_activity is None or _t.date < _first_activity:
-            _first_activity = _t.date
-
-    # Build map of out-of-assortment periods from ledger
-    out_of_assortment_days = set()
-
-    # Pre-existence: mark days before the SKU's first known activity as excluded.
-    # This prevents "no data before SKU was created" from being counted as OOS.
-    if _first_activity and _first_activity > start_date:
-        for _d in calendar_days:
-            if _d < _first_activity:
-                out_of_assortment_days.add(_d)
-
-    if _txns:
-        # Find all assortment transitions for this SKU
-        assortment_events = [
-            txn for txn in _txns
-            if txn.event in (EventType.ASSORTMENT_OUT, EventType.ASSORTMENT_IN)
-        ]
-        
-        # Sort by date
-        assortment_events.sort(key=lambda t: t.date)
-        
-        # Build periods: assume SKU starts IN assortment unless first event is ASSORTMENT_IN
-        currently_out = False
-        out_start = None
-        
-        # If first event in history is ASSORTMENT_IN, SKU was initially OUT —
-        # BUT ONLY if the SKU had no prior activity before that event.
-        # An orphan ASSORTMENT_IN on a SKU that was already trading (visible
-        # sales or transactions BEFORE the ASSORTMENT_IN date) is spurious
-        # (e.g. written by SKU_EDIT when toggling in_assortment=True on an
-        # already-active SKU). In that case, do NOT assume was-out-from-start.
-        if (assortment_events
-                and assortment_events[0].event == EventType.ASSORTMENT_IN
-                and (_first_activity is None or _first_activity >= assortment_events[0].date)):
-            currently_out = True
-            out_start = start_date  # Entire lookback period starts as OUT
-        
-        for event in assortment_events:
-            if event.event == EventType.ASSORTMENT_OUT:
-                currently_out = True
-                out_start = event.date
-            elif event.event == EventType.ASSORTMENT_IN:
-                if currently_out and out_start:
-                    # Mark all days from out_start to event.date-1 as out of assortment
-                    current = out_start
-                    while current < event.date:
-                        if current in calendar_days:
-                            out_of_assortment_days.add(current)
-                        current += timedelta(days=1)
-                currently_out = False
-                out_start = None
-        
-        # If still out at end of period
-        if currently_out and out_start:
-            current = out_start
-            while current <= asof_date:
-                if current in calendar_days:
-                    out_of_assortment_days.add(current)
-                current += timedelta(days=1)
-
-    # Sales-immunity: a day with recorded sales cannot be out-of-assortment.
-    # Guards against spurious ASSORTMENT_IN events (e.g. written by a SKU_EDIT
-    # that toggles in_assortment) incorrectly marking active trading days as
-    # excluded and collapsing history_valid_days to 0.
-    if sku_sales_map:
-        out_of_assortment_days -= set(sku_sales_map.keys())
-
-    # Detect OOS days (if transactions provided)
-    oos_days = set()
-    oos_override_days = set()  # Days with OOS_ESTIMATE_OVERRIDE marker
-
-    if _txns:
-        # First, identify days with override markers (dual detection: new OOS_OVERRIDE
-        # event type + legacy WASTE-with-note for backward compatibility)
-        for txn in _txns:
-            if txn.event == EventType.OOS_OVERRIDE:                    # new clean marker
-                oos_override_days.add(txn.date)
-            elif txn.note and "OOS_ESTIMATE_OVERRIDE:" in txn.note:    # legacy backward compat
-                oos_override_days.add(txn.date)
-
-        # ── FAST PATH: single forward pass instead of 30 × calculate_asof ──
-        # One call to get base state at start of lookback window, then replay
-        # only events that fall within [start_date, asof_date].  This reduces
-        # complexity from O(days × T_all) to O(T_sku_total + days).
-        # Boundary is inclusive (<=) so estimates written for today are visible.
-        # Pass per-SKU lists to calculate_asof so it doesn't re-scan global lists.
-        base_stock = StockCalculator.calculate_asof(
-            sku, start_date, _txns, _srs
-        )
-        oh = base_stock.on_hand
-        oo = base_stock.on_order
-
-        # Collect and sort SKU-filtered events in the lookback window
-        _priority = StockCalculator.EVENT_PRIORITY
-        _window_txns: list = [
-            t for t in _txns
-            if start_date <= t.date <= asof_date
-        ]
-        if _srs:
-            # Deduplicate: skip sales_records dates that already have an explicit
-            # SALE transaction in the ledger (same dedup as StockCalculator.calculate_asof).
-            # Without this, EOD-generated records (which write BOTH a SALE transaction AND
-            # a sales.csv entry for the same day) would double-deplete the running stock.
-            _window_dates_with_ledger_sale = {
-                t.date for t in _window_txns if t.event == EventType.SALE
-            }
-            _window_txns.extend(
-                Transaction(date=s.date, sku=s.sku, event=EventType.SALE, qty=s.qty_sold)
-                for s in _srs
-                if start_date <= s.date <= asof_date
-                and s.date not in _window_dates_with_ledger_sale
-            )
-        _window_txns.sort(key=lambda t: (t.date, _priority.get(t.event, 99)))
-
-        # Group by date for efficient day-by-day replay
-        from itertools import groupby
-        _by_day: dict = {
-            day: list(grp)
-            for day, grp in groupby(_window_txns, key=lambda t: t.date)
-        }
-
-        for day in calendar_days:
-            # Check OOS at the START of the day (before applying that day's events)
-            if day not in oos_override_days:
-                if oos_detection_mode == "strict":
-                    if oh == 0:
-                        oos_days.add(day)
-                else:  # "relaxed"
-                    if oh + oo == 0:
-                        oos_days.add(day)
-
-            # Apply events of this day to advance the running state
-            for txn in _by_day.get(day, []):
-                ev = txn.event
-                if ev == EventType.SNAPSHOT:
-                    oh = txn.qty
-                    oo = 0
-                elif ev == EventType.ORDER:
-                    oo += txn.qty
-                elif ev == EventType.RECEIPT:
-                    oo = max(0, oo - txn.qty)
-                    oh += txn.qty
-                elif ev == EventType.SALE:
-                    oh = max(0, oh - txn.qty)
-                elif ev == EventType.WASTE:
-                    oh = max(0, oh - txn.qty)
-                elif ev == EventType.ADJUST:
-                    oh = max(0, txn.qty)
-            oh = max(0, oh)
-            oo = max(0, oo)
-    
-    # Calculate average excluding OOS days AND out-of-assortment days
-    total_sales = 0
-    valid_days = 0
-    
-    for day in calendar_days:
-        if day in oos_days:
-            continue  # Skip OOS days
-        if day in out_of_assortment_days:
-            continue  # Skip out-of-assortment days
-        
-        # Include day with sales qty (or zero if no sales)
-        total_sales += sku_sales_map.get(day, 0)
-        valid_days += 1
-    
-    avg_sales = total_sales / valid_days if valid_days > 0 else 0.0
-    oos_days_count = len(oos_days)
+    if oos_history is None:
+        # Resolve per-SKU lists: use pre-filtered lists when provided by caller
+        # (avoids O(T_global) scans when called N_sku times from a bulk worker).
+        _txns: list = sku_txns if sku_txns is not None else [t for t in (transactions or []) if t.sku == sku]
+        _srs: list  = sku_sales if sku_sales is not None else [s for s in (sales_records or []) if s.sku == sku]
+        oos_history = SkuOosHistory(sku, _txns, _srs)
+
+    # One replay of the SKU's ledger: OOS days (checked at the start of each
+    # day, override markers excluded) and out-of-assortment days (incl.
+    # pre-existence and sales immunity) -- see analytics.oos_engine.
+    summary = oos_history.summary(asof_date, days_lookback, oos_detection_mode)
     
     if return_details:
         # Return detailed breakdown for KPI analysis
-        oos_days_list = sorted(list(oos_days))
-        out_of_assortment_days_list = sorted(list(out_of_assortment_days))
-        return (avg_sales, oos_days_count, oos_days_list, out_of_assortment_days_list)
+        return (
+            summary.avg_daily_sales,
+            summary.oos_days_count,
+            list(summary.oos_days),
+            list(summary.out_of_assortment_days),
+        )
     else:
         # Backward compatible return for existing callers
-        return (avg_sales, oos_days_count)
+        return (summary.avg_daily_sales, summary.oos_days_count)
 
 
 def propose_order_for_sku(
@@ -27,9 +27,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import date, timedelta
-from typing import Dict, List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence
 
-from src.domain.ledger import StockCalculator
+from src.domain.ledger import StockCalculator, get_stock_timeline
 from src.domain.models import SalesRecord, Transaction
 
 
@@ -73,6 +73,7 @@ def build_projection_series(
     sales_records: Optional[Sequence[SalesRecord]] = None,
     past_days: int = 7,
     future_extra_days: int = 5,
+    revision: Any = None,
 ) -> ProjectionSeries:
     """Build the data series for the Stock Projection chart.
 
@@ -87,27 +88,26 @@ def build_projection_series(
             as-of calculation (same semantics as ``StockCalculator``).
         past_days: Number of past days to render (default 7).
         future_extra_days: Days added beyond the receipt window.
+        revision: Storage revision the data corresponds to; reuses the
+            SKU's cached stock timeline across redraws (None = no caching).
     """
     daily_demand, demand_source = _select_demand_driver(proposal)
 
-    # --- Past: real ledger as-of per day -------------------------------------
-    # calculate_asof applies events with date < asof_date, so to capture the
-    # state at end-of-day D we query with asof_date = D + 1.
+    # --- Past: real ledger end-of-day per day -------------------------------
+    # One forward replay of the SKU's events; end-of-day D equals
+    # calculate_asof(D + 1).
     past_x: List[int] = list(range(-past_days, 1))
-    past_stock: List[float] = []
     txns_list = list(transactions)
     sales_list = list(sales_records) if sales_records is not None else None
-    for d in past_x:
-        target = today + timedelta(days=d)
-        try:
-            stock = StockCalculator.calculate_asof(
-                proposal.sku, target + timedelta(days=1), txns_list, sales_list,
-            )
-            past_stock.append(float(stock.on_hand))
-        except Exception:
-            # On any ledger error, fall back to current_on_hand so the
-            # chart still renders something reasonable.
-            past_stock.append(float(proposal.current_on_hand))
+    try:
+        timeline = get_stock_timeline(proposal.sku, txns_list, sales_list, revision)
+        past_stock: List[float] = [
+            float(q) for q in timeline.eod_on_hand(today - timedelta(days=past_days), today)
+        ]
+    except Exception:
+        # On any ledger error, fall back to current_on_hand so the
+        # chart still renders something reasonable.
+        past_stock = [float(proposal.current_on_hand)] * len(past_x)
 
     # --- Pipeline receipts ---------------------------------------------------
     pipeline_by_day: Dict[int, int] = {}
@@ -0,0 +1,177 @@
+"""
+Per-run context for bulk proposal generation ("Genera proposte").
+
+PASS A (OOS analysis) loads the ledger and sales once, slices them per SKU
+and computes the OOS-censored daily average of every SKU.  The resulting
+:class:`ProposalRunContext` is then handed to PASS B
+(``OrderWorkflow.generate_proposal``), the Monte Carlo comparison and the
+projection chart, so none of them re-reads storage or re-derives per-SKU
+histories for data the run already holds.
+"""
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..analytics.oos_engine import SkuOosHistory
+from ..domain.models import SKU, SalesRecord, Stock, Transaction
+
+
+@dataclass
+class SkuDemand:
+    """PASS A result for one SKU (OOS-censored demand over the lookback window)."""
+    sku: str
+    daily_sales: float
+    oos_days_count: int
+    oos_days_list: List[date]
+    out_of_assortment_days: List[date]
+    history_valid_days: int
+    oos_detection_mode: str
+    oos_boost_percent: float = 0.0
+
+    @property
+    def censored_days(self) -> frozenset:
+        """Days excluded from the average (OOS or out of assortment)."""
+        return frozenset(self.oos_days_list) | frozenset(self.out_of_assortment_days)
+
+
+@dataclass
+class ProposalRunContext:
+    """
+    Data shared by every step of one proposal generation run.
+
+    Attributes:
+        settings: Settings dict read once at the start of the run
+        skus: SKU master data (storage order)
+        transactions / sales_records: Full ledger and sales lists as loaded at
+            the start of the run (cross-SKU reads); in-run estimates are
+            mirrored only into the per-SKU slices (``txns_for`` / ``sales_for``)
+        stocks: Stock per SKU at the proposal as-of date
+        asof_date: Reference date of the OOS analysis
+        oos_lookback_days: OOS analysis window (days)
+        demand: PASS A results per SKU (filled by ``compute_demand``)
+        revision: Storage revision the context is consistent with (None = unknown)
+    """
+    settings: Dict[str, Any]
+    skus: List[SKU]
+    transactions: List[Transaction]
+    sales_records: List[SalesRecord]
+    stocks: Dict[str, Stock] = field(default_factory=dict)
+    asof_date: date = field(default_factory=date.today)
+    oos_lookback_days: int = 30
+    demand: Dict[str, SkuDemand] = field(default_factory=dict)
+    revision: Any = None
+
+    def __post_init__(self):
+        self.skus_by_id: Dict[str, SKU] = {s.sku: s for s in self.skus}
+        self._txns_by_sku: Dict[str, List[Transaction]] = defaultdict(list)
+        for t in self.transactions:
+            self._txns_by_sku[t.sku].append(t)
+        self._sales_by_sku: Dict[str, List[SalesRecord]] = defaultdict(list)
+        for s in self.sales_records:
+            self._sales_by_sku[s.sku].append(s)
+        self._history_cache: Dict[Tuple[str, date], List[Dict[str, Any]]] = {}
+        self._oos_histories: Dict[str, SkuOosHistory] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Per-SKU slices
+    # ------------------------------------------------------------------ #
+
+    def txns_for(self, sku: str) -> List[Transaction]:
+        """Ledger events of ``sku`` (run order)."""
+        return self._txns_by_sku.get(sku, [])
+
+    def sales_for(self, sku: str) -> List[SalesRecord]:
+        """Sales records of ``sku`` (run order)."""
+        return self._sales_by_sku.get(sku, [])
+
+    def sales_history(self, sku: str, since: date) -> List[Dict[str, Any]]:
+        """
+        ``{"date", "qty_sold"}`` history of ``sku`` from ``since`` on, as fed to
+        the Monte Carlo forecast (primary method and comparison share it).
+        """
+        key = (sku, since)
+        with self._lock:
+            history = self._history_cache.get(key)
+        if history is None:
+            history = [
+                {"date": rec.date, "qty_sold": rec.qty_sold}
+                for rec in self.sales_for(sku) if rec.date >= since
+            ]
+            with self._lock:
+                self._history_cache[key] = history
+        return history
+
+    def oos_history(self, sku: str) -> SkuOosHistory:
+        """Daily OOS / assortment records of ``sku`` (one ledger replay per run)."""
+        with self._lock:
+            history = self._oos_histories.get(sku)
+        if history is None:
+            history = SkuOosHistory(sku, self.txns_for(sku), self.sales_for(sku))
+            with self._lock:
+                self._oos_histories[sku] = history
+        return history
+
+    # ------------------------------------------------------------------ #
+    # PASS A
+    # ------------------------------------------------------------------ #
+
+    def compute_demand(self, sku: str, oos_detection_mode: str) -> SkuDemand:
+        """(Re)compute and store the OOS-censored daily average of ``sku``."""
+        from .order import calculate_daily_sales_average
+
+        daily_sales, oos_days_count, oos_days_list, out_of_assortment_days = calculate_daily_sales_average(
+            self.sales_for(sku), sku,
+            days_lookback=self.oos_lookback_days,
+            transactions=self.txns_for(sku),
+            asof_date=self.asof_date,
+            oos_detection_mode=oos_detection_mode,
+            return_details=True,
+            oos_history=self.oos_history(sku),
+        )
+        previous = self.demand.get(sku)
+        demand = SkuDemand(
+            sku=sku,
+            daily_sales=daily_sales,
+            oos_days_count=oos_days_count,
+            oos_days_list=oos_days_list,
+            out_of_assortment_days=out_of_assortment_days,
+            history_valid_days=self.oos_lookback_days - len(oos_days_list) - len(out_of_assortment_days),
+            oos_detection_mode=oos_detection_mode,
+            oos_boost_percent=previous.oos_boost_percent if previous else 0.0,
+        )
+        self.demand[sku] = demand
+        return demand
+
+    # ------------------------------------------------------------------ #
+    # In-run updates
+    # ------------------------------------------------------------------ #
+
+    def replace_day_events(
+        self,
+        sku: str,
+        day: date,
+        sale: Optional[SalesRecord] = None,
+        marker: Optional[Transaction] = None,
+    ):
+        """
+        Mirror an OOS estimate written during the run: replace the SKU's sale
+        (and/or marker event of the same type) on ``day`` in its per-SKU slices.
+
+        Only the SKU's buckets are touched; the flat ``transactions`` /
+        ``sales_records`` lists keep the run's initial load.
+        """
+        if sale is not None:
+            self._sales_by_sku[sku] = [s for s in self.sales_for(sku) if s.date != day] + [sale]
+        if marker is not None:
+            self._txns_by_sku[sku] = [
+                t for t in self.txns_for(sku)
+                if not (t.date == day and t.event == marker.event)
+            ] + [marker]
+        with self._lock:
+            self._history_cache = {k: v for k, v in self._history_cache.items() if k[0] != sku}
+            self._oos_histories.pop(sku, None)
@@ -0,0 +1,159 @@
+"""
+Tests for keyset-paginated per-SKU timeline reads.
+
+The per-SKU row index (CSV) and the indexed SQL page query must return the
+same events, in the same order, as the former full-scan + sort of the audit
+timeline, and stay correct across appends and rewrites.
+"""
+
+import random
+import shutil
+import sqlite3
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.db import PRAGMA_CONFIG
+from src.domain.models import EventType, Transaction
+from src.persistence.csv_layer import CSVLayer
+from src.repositories import LedgerRepository, SKURepository
+
+SKUS = ["SKU001", "SKU002", "SKU003"]
+EVENTS = [EventType.SALE, EventType.ORDER, EventType.RECEIPT, EventType.ADJUST, EventType.WASTE]
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = tempfile.mkdtemp()
+    yield Path(temp_dir)
+    shutil.rmtree(temp_dir)
+
+
+def _random_transactions(rng, n=300):
+    base = date(2026, 1, 1)
+    txns = []
+    for i in range(n):
+        txns.append(Transaction(
+            date=base + timedelta(days=rng.randint(0, 40)),
+            sku=rng.choice(SKUS),
+            event=rng.choice(EVENTS),
+            qty=rng.randint(1, 20),
+            # Notes with quotes / commas / embedded newlines span several physical lines
+            note=rng.choice([None, "plain", 'say "hi", ok', "multi\nline note"]),
+        ))
+    return txns
+
+
+def _legacy_timeline(csv_layer, sku):
+    """Former audit timeline: full ledger scan, filtered, sorted by date desc."""
+    return sorted([t for t in csv_layer.read_transactions() if t.sku == sku], key=lambda t: t.date, reverse=True)
+
+
+def _all_pages(read_page, sku, limit):
+    events, cursor, pages = [], None, 0
+    while True:
+        page, cursor = read_page(sku, limit=limit, before=cursor)
+        events.extend(page)
+        pages += 1
+        if cursor is None:
+            return events, pages
+
+
+def test_csv_pages_match_full_scan(temp_data_dir):
+    rng = random.Random(7)
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    csv_layer.overwrite_transactions(_random_transactions(rng))
+
+    for sku in SKUS:
+        expected = _legacy_timeline(csv_layer, sku)
+        first, _ = csv_layer.read_sku_transactions_page(sku, limit=25)
+        assert first == expected[:25]
+
+        events, pages = _all_pages(csv_layer.read_sku_transactions_page, sku, 25)
+        assert events == expected
+        assert pages == max(1, -(-len(expected) // 25))
+
+    assert csv_layer.read_sku_transactions_page("MISSING") == ([], None)
+
+
+def test_csv_index_follows_appends_and_rewrites(temp_data_dir):
+    rng = random.Random(11)
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    csv_layer.overwrite_transactions(_random_transactions(rng, n=50))
+    csv_layer.read_sku_transactions_page("SKU001")  # build the index
+
+    # Appends are folded in incrementally (possibly from another CSVLayer instance)
+    other = CSVLayer(data_dir=temp_data_dir)
+    for txn in _random_transactions(rng, n=20):
+        other.write_transaction(txn)
+        assert csv_layer.read_sku_transactions_page(txn.sku, limit=None)[0] == _legacy_timeline(csv_layer, txn.sku)
+
+    # A rewrite (e.g. an EOD upsert) invalidates the offsets
+    remaining = [t for t in csv_layer.read_transactions() if t.sku != "SKU002"]
+    csv_layer.overwrite_transactions(remaining)
+    assert csv_layer.read_sku_transactions_page("SKU002") == ([], None)
+    assert csv_layer.read_sku_transactions_page("SKU001", limit=None)[0] == _legacy_timeline(csv_layer, "SKU001")
+
+
+def test_audit_log_sku_read_matches_full_scan(temp_data_dir):
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    rng = random.Random(3)
+    for i in range(120):
+        csv_layer.log_audit("SKU_EDIT", f"edit {i}, \"quoted\"", sku=rng.choice(SKUS + [None]))
+
+    rows = csv_layer._read_csv("audit_log.csv")
+    for sku in SKUS:
+        expected = sorted([r for r in rows if r.get("sku") == sku], key=lambda r: r["timestamp"], reverse=True)
+        assert [a.details for a in csv_layer.read_audit_log(sku=sku, limit=10)] == [r["details"] for r in expected[:10]]
+
+        entries, _ = _all_pages(csv_layer.read_sku_audit_page, sku, 7)
+        assert [a.timestamp for a in entries] == [r["timestamp"] for r in expected]
+
+
+@pytest.fixture
+def ledger():
+    db = sqlite3.connect(":memory:")
+    db.row_factory = sqlite3.Row
+    for pragma, value in PRAGMA_CONFIG.items():
+        db.execute(f"PRAGMA {pragma}={value}")
+    for migration_file in sorted((Path(__file__).parent.parent / "migrations").glob("*.sql")):
+        db.executescript(migration_file.read_text())
+    db.commit()
+    for sku in SKUS:
+        SKURepository(db).upsert({"sku": sku, "description": sku})
+    yield LedgerRepository(db)
+    db.close()
+
+
+def test_sqlite_page_query_matches_full_scan(ledger):
+    rng = random.Random(5)
+    txns = _random_transactions(rng, n=200)
+    ledger.append_batch([
+        {"date": t.date.isoformat(), "sku": t.sku, "event": t.event.value, "qty": t.qty,
+         "receipt_date": None, "note": t.note or ""}
+        for t in txns
+    ])
+
+    for sku in SKUS:
+        rows = ledger.list_transactions_for_sku_asof(sku, date(2100, 1, 1))
+        expected = [r["transaction_id"] for r in sorted(rows, key=lambda r: r["date"], reverse=True)]
+
+        got, before = [], None
+        while True:
+            page = ledger.list_transactions_for_sku_page(sku, limit=9, before=before)
+            got.extend(r["transaction_id"] for r in page)
+            if len(page) < 9:
+                break
+            before = (page[-1]["date"], page[-1]["transaction_id"])
+        assert got == expected
+
+
+def test_sqlite_page_query_uses_sku_date_index(ledger):
+    plan = ledger.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM transactions WHERE sku = ? AND date <= ? "
+        "AND (date < ? OR transaction_id > ?) ORDER BY date DESC, transaction_id ASC LIMIT ?",
+        ("SKU001", "2026-01-10", "2026-01-10", 0, 10),
+    ).fetchall()
+    assert any("idx_transactions_sku_date" in row[-1] for row in plan)
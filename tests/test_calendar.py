@@ -694,3 +694,114 @@ class TestHolidaySystem:
         finally:
             import shutil
             shutil.rmtree(test_dir, ignore_errors=True)
+
+
+class TestResolutionCache:
+    """Test memoization of receipt dates / protection windows on CalendarConfig."""
+
+    def test_repeated_calls_hit_cache(self):
+        """Identical (order_date, lane) calls are resolved once per config."""
+        from src.domain.calendar import resolve_receipt_and_protection
+
+        config = CalendarConfig()
+        wednesday = Date(2026, 2, 4)
+
+        first = resolve_receipt_and_protection(wednesday, Lane.STANDARD, config)
+        entries = dict(config._resolution_cache["entries"])
+        second = resolve_receipt_and_protection(wednesday, Lane.STANDARD, config)
+
+        assert first == second
+        assert config._resolution_cache["entries"] == entries
+
+    def test_cached_invalid_lane_still_raises(self):
+        """Invalid lanes are memoized as errors and keep raising ValueError."""
+        config = CalendarConfig()
+        thursday = Date(2026, 2, 5)
+
+        for _ in range(2):
+            with pytest.raises(ValueError, match="SATURDAY lane only valid"):
+                next_receipt_date(thursday, Lane.SATURDAY, config)
+
+    def test_cache_invalidated_when_holidays_change(self):
+        """Mutating the holiday calendar must not serve stale results."""
+        from src.domain.holidays import HolidayCalendar, HolidayRule, HolidayType, HolidayEffect
+
+        cal = HolidayCalendar(rules=[])
+        config = CalendarConfig(holiday_calendar=cal)
+        wednesday = Date(2026, 2, 4)
+
+        assert next_receipt_date(wednesday, Lane.STANDARD, config) == Date(2026, 2, 5)
+
+        cal.rules.append(HolidayRule(
+            name="Chiusura fornitore",
+            scope="supplier",
+            effect=HolidayEffect.NO_RECEIPT,
+            type=HolidayType.SINGLE_DATE,
+            params={"date": "2026-02-05"},
+        ))
+
+        assert next_receipt_date(wednesday, Lane.STANDARD, config) == Date(2026, 2, 6)
+
+    def test_cache_not_part_of_equality(self):
+        """Populated cache does not affect CalendarConfig equality or repr."""
+        from src.domain.calendar import clear_resolution_cache
+
+        a = CalendarConfig()
+        b = CalendarConfig()
+        protection_window(Date(2026, 2, 6), Lane.MONDAY, a)
+
+        assert a == b
+        assert "_resolution_cache" not in repr(a)
+
+        clear_resolution_cache(a)
+        assert a._resolution_cache == {}
+
+    def test_holiday_calendar_version_tracks_rule_changes(self):
+        """Every rule edit renews the version, so the fingerprint never re-reads rules."""
+        from src.domain.holidays import HolidayCalendar, HolidayRule, HolidayType, HolidayEffect
+
+        cal = HolidayCalendar(rules=[])
+        versions = [cal.version]
+
+        rule = HolidayRule(
+            name="Inventario",
+            scope="shop",
+            effect=HolidayEffect.NO_ORDER,
+            type=HolidayType.SINGLE_DATE,
+            params={"date": "2026-02-04"},
+        )
+        cal.rules.append(rule)
+        versions.append(cal.version)
+        cal.rules[0] = rule
+        versions.append(cal.version)
+        cal.disabled_system_holidays.add("Capodanno")
+        versions.append(cal.version)
+        cal.rules = []
+        versions.append(cal.version)
+
+        assert len(set(versions)) == len(versions)
+        assert HolidayCalendar(rules=[]).version != cal.version
+
+    def test_cache_shared_across_threads(self):
+        """Concurrent lookups on one config (GUI worker pools) stay consistent."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        config = CalendarConfig()
+        dates = [Date(2026, 2, 2) + timedelta(days=i) for i in range(60)]
+        expected = {}
+        for d in dates:
+            try:
+                expected[d] = next_receipt_date(d, Lane.STANDARD, CalendarConfig())
+            except ValueError:
+                expected[d] = None
+
+        def lookup(d):
+            try:
+                return d, next_receipt_date(d, Lane.STANDARD, config)
+            except ValueError:
+                return d, None
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lookup, dates * 20))
+
+        assert all(expected[d] == got for d, got in results)
@@ -0,0 +1,119 @@
+"""
+Tests for the indexed lookups behind the daily upsert (POST /exceptions/daily-upsert).
+
+``sum_qty`` (CSV per-SKU row index, SQL ``idx_transactions_sku_date``) must
+match a full-scan sum, and ``sku_exists`` is answered from a catalog cache
+keyed on the file revision.
+"""
+
+import random
+import shutil
+import sqlite3
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.db import PRAGMA_CONFIG
+from src.domain.models import EventType, Transaction
+from src.persistence.csv_layer import CSVLayer
+from src.repositories import LedgerRepository, SKURepository
+
+SKUS = ["SKU001", "SKU002", "SKU003"]
+EVENTS = [EventType.SALE, EventType.ORDER, EventType.RECEIPT, EventType.ADJUST, EventType.WASTE]
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = tempfile.mkdtemp()
+    yield Path(temp_dir)
+    shutil.rmtree(temp_dir)
+
+
+def _random_transactions(rng, n=300):
+    base = date(2026, 1, 1)
+    txns = []
+    for i in range(n):
+        txns.append(Transaction(
+            date=base + timedelta(days=rng.randint(0, 40)),
+            sku=rng.choice(SKUS),
+            event=rng.choice(EVENTS),
+            qty=rng.randint(1, 20),
+            # Notes with quotes / commas / embedded newlines span several physical lines
+            note=rng.choice([None, "plain", 'say "hi", ok', "multi\nline note"]),
+        ))
+    return txns
+
+
+@pytest.fixture
+def ledger():
+    db = sqlite3.connect(":memory:")
+    db.row_factory = sqlite3.Row
+    for pragma, value in PRAGMA_CONFIG.items():
+        db.execute(f"PRAGMA {pragma}={value}")
+    for migration_file in sorted((Path(__file__).parent.parent / "migrations").glob("*.sql")):
+        db.executescript(migration_file.read_text())
+    db.commit()
+    for sku in SKUS:
+        SKURepository(db).upsert({"sku": sku, "description": sku})
+    yield LedgerRepository(db)
+    db.close()
+
+
+def _scan_sum(txns, sku, day, event):
+    return sum(t.qty for t in txns if t.sku == sku and t.date == day and t.event == event)
+
+
+def test_csv_sum_qty_matches_full_scan(temp_data_dir, monkeypatch):
+    rng = random.Random(13)
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    csv_layer.overwrite_transactions(_random_transactions(rng, n=150))
+    csv_layer.write_transactions_batch(_random_transactions(rng, n=30))
+    txns = csv_layer.read_transactions()
+
+    monkeypatch.setattr(csv_layer, "read_transactions", lambda: pytest.fail("full ledger read"))
+    for sku in SKUS + ["MISSING"]:
+        for offset in range(-1, 42):
+            day = date(2026, 1, 1) + timedelta(days=offset)
+            for event in EVENTS:
+                assert csv_layer.sum_qty(sku, day, event) == _scan_sum(txns, sku, day, event)
+
+
+def test_sku_exists_cached_per_catalog_revision(temp_data_dir, monkeypatch):
+    from src.domain.models import SKU
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    csv_layer.write_sku(SKU(sku="SKU001", description="one"))
+    assert csv_layer.sku_exists("SKU001")
+
+    reads = []
+    original = csv_layer.get_all_sku_ids
+    monkeypatch.setattr(csv_layer, "get_all_sku_ids", lambda: reads.append(1) or original())
+    assert csv_layer.sku_exists("SKU001") and not csv_layer.sku_exists("SKU002")
+    assert reads == []
+
+    csv_layer.write_sku(SKU(sku="SKU002", description="two"))
+    assert csv_layer.sku_exists("SKU002")
+    assert reads == [1]
+
+
+def test_sqlite_sum_qty_uses_sku_date_index(ledger):
+    rng = random.Random(17)
+    txns = _random_transactions(rng, n=120)
+    ledger.append_batch([
+        {"date": t.date.isoformat(), "sku": t.sku, "event": t.event.value, "qty": t.qty,
+         "receipt_date": None, "note": t.note or ""}
+        for t in txns
+    ])
+    for sku in SKUS:
+        for offset in range(0, 41, 3):
+            day = date(2026, 1, 1) + timedelta(days=offset)
+            for event in EVENTS:
+                assert ledger.sum_qty(sku, day.isoformat(), event.value) == _scan_sum(txns, sku, day, event)
+
+    plan = ledger.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT COALESCE(SUM(qty), 0) FROM transactions "
+        "WHERE sku = ? AND date = ? AND event = ?",
+        ("SKU001", "2026-01-10", "SALE"),
+    ).fetchall()
+    assert any("idx_transactions_sku_date" in row[-1] for row in plan)
@@ -0,0 +1,169 @@
+"""
+Tests for the incremental dashboard aggregate store.
+"""
+
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.analytics.dashboard_aggregates import DashboardAggregates, moving_average
+from src.domain.models import EventType, SalesRecord, Transaction
+
+TODAY = date(2026, 5, 20)
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def _sales(rng, n):
+    return [
+        SalesRecord(date=TODAY - timedelta(days=rng.randint(-2, 70)), sku=rng.choice(["A", "B", "C"]), qty_sold=rng.randint(0, 20))
+        for _ in range(n)
+    ]
+
+
+def _txns(rng, n):
+    return [
+        Transaction(
+            date=TODAY - timedelta(days=rng.randint(0, 40)),
+            sku=rng.choice(["A", "B"]),
+            event=rng.choice([EventType.WASTE, EventType.ORDER, EventType.SALE]),
+            qty=rng.randint(1, 9),
+        )
+        for _ in range(n)
+    ]
+
+
+def _naive_daily(records, end, days, sku=None):
+    out = []
+    for i in range(days - 1, -1, -1):
+        d = end - timedelta(days=i)
+        out.append(sum(r.qty_sold for r in records if r.date == d and (sku is None or r.sku == sku)))
+    return out
+
+
+def _naive_waste(txns, end, days, sku):
+    out = []
+    for i in range(days - 1, -1, -1):
+        d = end - timedelta(days=i)
+        out.append(sum(t.qty for t in txns if t.event == EventType.WASTE and t.date == d and t.sku == sku))
+    return out
+
+
+def _assert_matches(store, sales, txns):
+    assert store.daily_sales(TODAY, 30) == _naive_daily(sales, TODAY, 30)
+    for sku in ("A", "B", "C", "Z"):
+        assert store.daily_sales(TODAY, 31, sku) == _naive_daily(sales, TODAY, 31, sku)
+        assert store.daily_waste(TODAY, 31, sku) == _naive_waste(txns, TODAY, 31, sku)
+    weekly = [
+        sum(r.qty_sold for r in sales if TODAY - timedelta(days=k * 7 + 6) <= r.date <= TODAY - timedelta(days=k * 7))
+        for k in range(7, -1, -1)
+    ]
+    assert store.weekly_sales(TODAY, 8) == weekly
+
+
+def test_series_match_naive_scan():
+    rng = random.Random(5)
+    sales, txns = _sales(rng, 400), _txns(rng, 300)
+    store = DashboardAggregates()
+    assert store.sync(sales, txns) is True
+    _assert_matches(store, sales, txns)
+
+
+def test_appends_are_folded_incrementally():
+    rng = random.Random(8)
+    sales, txns = _sales(rng, 200), _txns(rng, 100)
+    store = DashboardAggregates()
+    store.sync(sales, txns, revision=1)
+    assert store.sync(sales, txns, revision=1) is False
+
+    sales = sales + _sales(rng, 50)
+    txns = txns + _txns(rng, 30)
+    assert store.sync(sales, txns, revision=2) is True
+    assert store._sales.count == len(sales)
+    _assert_matches(store, sales, txns)
+
+
+def test_in_place_rewrite_triggers_rebuild():
+    rng = random.Random(9)
+    sales, txns = _sales(rng, 200), _txns(rng, 100)
+    store = DashboardAggregates()
+    store.sync(sales, txns, revision=1)
+
+    # Upsert in the middle of the file (same row count)
+    old = sales[57]
+    sales[57] = SalesRecord(date=old.date, sku=old.sku, qty_sold=old.qty_sold + 100)
+    del txns[10]
+    store.sync(sales, txns, revision=2)
+    _assert_matches(store, sales, txns)
+
+
+def test_append_only_epoch_checks_tail_only(monkeypatch):
+    import src.analytics.dashboard_aggregates as agg
+    rng = random.Random(10)
+    sales, txns = _sales(rng, 300), _txns(rng, 100)
+    store = DashboardAggregates()
+    epochs = {"sales": ("p", 1, 0), "transactions": ("p", 2, 0)}
+    store.sync(sales, txns, revision=1, epochs=epochs)
+
+    keyed = []
+    original = agg._sales_key
+    monkeypatch.setattr(agg, "_sales_key", lambda s: keyed.append(s) or original(s))
+    sales = sales + _sales(rng, 10)
+    assert store.sync(sales, txns, revision=2, epochs=epochs) is True
+    assert len(keyed) == 11  # the new rows + the last consumed one
+    _assert_matches(store, sales, txns)
+
+    # Rewritten file (new epoch): the whole prefix is checked and the edit seen
+    sales[5] = SalesRecord(date=sales[5].date, sku=sales[5].sku, qty_sold=sales[5].qty_sold + 7)
+    store.sync(sales, txns, revision=3, epochs={**epochs, "sales": ("p", 1, 1)})
+    _assert_matches(store, sales, txns)
+
+
+def test_csv_rewrite_epoch_ignores_appends(temp_data_dir):
+    from src.persistence.csv_layer import CSVLayer
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    epoch = csv_layer.rewrite_epoch("sales.csv")
+    csv_layer.append_sales_batch([SalesRecord(date=TODAY, sku="A", qty_sold=1)])
+    csv_layer.write_sales_record(SalesRecord(date=TODAY, sku="B", qty_sold=2))
+    assert csv_layer.rewrite_epoch("sales.csv") == epoch
+    csv_layer.write_sales(csv_layer.read_sales()[:1])
+    assert csv_layer.rewrite_epoch("sales.csv") != epoch
+
+
+def test_persisted_and_reloaded(temp_data_dir):
+    rng = random.Random(12)
+    sales, txns = _sales(rng, 150), _txns(rng, 80)
+    store = DashboardAggregates.load(temp_data_dir)
+    store.sync(sales, txns, revision=("a", 1))
+
+    reloaded = DashboardAggregates.load(temp_data_dir)
+    assert reloaded.sync(sales, txns, revision=("a", 1)) is False
+    _assert_matches(reloaded, sales, txns)
+    assert reloaded.sku_totals() == store.sku_totals()
+
+    sales = sales + _sales(rng, 10)
+    assert reloaded.sync(sales, txns, revision=("a", 2)) is True
+    _assert_matches(reloaded, sales, txns)
+
+
+def test_corrupt_file_ignored(temp_data_dir):
+    (temp_data_dir / "dashboard_aggregates.json").write_text("{not json", encoding="utf-8")
+    store = DashboardAggregates.load(temp_data_dir)
+    assert store.daily_sales(TODAY, 3) == [0, 0, 0]
+
+
+def test_moving_average_matches_window_mean():
+    rng = random.Random(1)
+    values = [rng.randint(0, 50) for _ in range(40)]
+    for period in (1, 3, 7, 40, 41):
+        expected = [sum(values[i - period + 1:i + 1]) / period for i in range(period - 1, len(values))]
+        assert moving_average(values, period) == expected
@@ -0,0 +1,174 @@
+"""
+Tests for the smart-exceptions candidate snapshot.
+
+The snapshot + in-memory filter must select exactly the SKUs the old
+per-refresh scan selected, and must be rebuilt only when data changes.
+"""
+
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.analytics.exception_candidates import (
+    build_exception_snapshot,
+    filter_exception_candidates,
+    latest_kpi_by_sku,
+    load_exception_snapshot,
+)
+from src.domain.ledger import StockCalculator
+from src.domain.models import SKU, EventType, SalesRecord, Transaction
+from src.persistence.csv_layer import CSVLayer
+
+ASOF = date(2026, 3, 1)
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def _random_data(rng, n_skus=40):
+    skus = [
+        SKU(sku=f"SKU{i:03d}", description=f"Item {i}", shelf_life_days=rng.choice([0, 0, 2, 3, 5, 10]))
+        for i in range(n_skus)
+    ]
+    events = [EventType.SNAPSHOT, EventType.ORDER, EventType.RECEIPT, EventType.SALE, EventType.WASTE, EventType.ADJUST]
+    transactions = [
+        Transaction(
+            date=ASOF - timedelta(days=rng.randint(-3, 60)),
+            sku=rng.choice(skus).sku,
+            event=rng.choice(events),
+            qty=rng.randint(1, 120),
+        )
+        for _ in range(600)
+    ]
+    kpis = []
+    for s in skus:
+        for _ in range(rng.randint(0, 3)):
+            kpis.append({
+                "sku": s.sku,
+                "date": (ASOF - timedelta(days=rng.randint(0, 10))).isoformat(),
+                "oos_rate": rng.choice(["", "None", "abc", str(rng.uniform(0, 40))]),
+                "otif_rate": rng.choice(["", str(rng.uniform(50, 100))]),
+                "wmape": rng.choice(["", str(rng.uniform(0, 90))]),
+            })
+    return skus, transactions, kpis
+
+
+def _legacy_filter(skus, transactions, kpis, unfulfilled_map, thresholds, filters):
+    """Reference: the scan formerly inlined in the GUI refresh."""
+    oos_t, otif_t, wmape_t, shelf_t = thresholds
+    f_oos, f_otif, f_wmape, f_perish = filters
+    stock_map = {
+        s.sku: StockCalculator.calculate_asof(s.sku, ASOF, transactions, None).on_hand for s in skus
+    }
+    kpi_map = {}
+    for kpi in kpis:
+        k, d = kpi.get("sku", ""), kpi.get("date", "")
+        if k and (k not in kpi_map or d > kpi_map[k].get("date", "")):
+            kpi_map[k] = kpi
+
+    def safe_float(value, default=0.0):
+        if value is None or value == '' or value == 'None':
+            return default
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return default
+
+    rows = []
+    for s in skus:
+        kpi = kpi_map.get(s.sku)
+        oos = safe_float(kpi.get("oos_rate"), 0.0) if kpi else 0.0
+        otif = safe_float(kpi.get("otif_rate"), 100.0) if kpi else 100.0
+        wmape = safe_float(kpi.get("wmape"), 0.0) if kpi else 0.0
+        unf = unfulfilled_map.get(s.sku, 0)
+        shelf = s.shelf_life_days or 0
+        stock = stock_map[s.sku]
+        reasons = []
+        if f_oos and oos > oos_t:
+            reasons.append(f"OOS alto ({oos:.1f}%)")
+        if f_otif and (otif < otif_t or unf > 0):
+            if otif < otif_t and unf > 0:
+                reasons.append(f"OTIF basso ({otif:.1f}%) + Unfulfilled ({unf})")
+            elif unf > 0:
+                reasons.append(f"Unfulfilled ({unf})")
+            else:
+                reasons.append(f"OTIF basso ({otif:.1f}%)")
+        if f_wmape and wmape > wmape_t:
+            reasons.append(f"WMAPE alto ({wmape:.1f}%)")
+        if f_perish and shelf > 0 and shelf < shelf_t and stock > 0 and stock > shelf * 10:
+            reasons.append(f"Shelf life critica ({shelf}d, stock={stock})")
+        if reasons:
+            rows.append({
+                "sku": s.sku, "description": s.description, "oos_rate": oos, "otif": otif,
+                "unfulfilled": unf, "wmape": wmape, "shelf_life": shelf, "stock": stock,
+                "reason": "; ".join(reasons),
+            })
+    rows.sort(key=lambda x: (-len(x["reason"].split(";")), -x["oos_rate"]))
+    return rows
+
+
+def test_filter_matches_legacy_scan():
+    rng = random.Random(3)
+    for _ in range(10):
+        skus, transactions, kpis = _random_data(rng)
+        snapshot = build_exception_snapshot(skus, transactions, kpis, ASOF)
+        unfulfilled = {s.sku: rng.choice([0, 0, 4]) for s in skus}
+        for thresholds in [(15.0, 80.0, 50.0, 7), (5.0, 95.0, 20.0, 4), (30.0, 60.0, 80.0, 11)]:
+            for filters in [(True, True, True, True), (False, True, False, True), (True, False, True, False)]:
+                expected = _legacy_filter(skus, transactions, kpis, unfulfilled, thresholds, filters)
+                got = filter_exception_candidates(
+                    snapshot, *thresholds,
+                    filter_oos=filters[0], filter_otif=filters[1],
+                    filter_wmape=filters[2], filter_perish=filters[3],
+                    unfulfilled_map=unfulfilled,
+                )
+                assert got == expected
+
+
+def test_calculate_all_skus_matches_per_sku_replay():
+    rng = random.Random(11)
+    skus, transactions, _ = _random_data(rng)
+    sales = [
+        SalesRecord(date=ASOF - timedelta(days=rng.randint(0, 30)), sku=rng.choice(skus).sku, qty_sold=rng.randint(0, 9))
+        for _ in range(200)
+    ]
+    ids = [s.sku for s in skus] + ["UNKNOWN"]
+    for sales_records in (None, sales):
+        batch = StockCalculator.calculate_all_skus(ids, ASOF, transactions, sales_records)
+        for sku in ids:
+            assert batch[sku] == StockCalculator.calculate_asof(sku, ASOF, transactions, sales_records)
+
+
+def test_latest_kpi_first_row_wins_ties():
+    rows = [
+        {"sku": "A", "date": "2026-01-02", "wmape": "1"},
+        {"sku": "A", "date": "2026-01-02", "wmape": "2"},
+        {"sku": "A", "date": "2026-01-01", "wmape": "3"},
+        {"sku": "", "date": "2026-01-05"},
+    ]
+    assert latest_kpi_by_sku(rows) == {"A": rows[0]}
+
+
+def test_snapshot_cached_per_revision(temp_data_dir):
+    layer = CSVLayer(data_dir=temp_data_dir)
+    layer.write_sku(SKU(sku="SKU001", description="Latte", shelf_life_days=3))
+    layer.write_transaction(Transaction(date=ASOF - timedelta(days=2), sku="SKU001", event=EventType.SNAPSHOT, qty=50))
+
+    first = load_exception_snapshot(layer, asof_date=ASOF)
+    assert load_exception_snapshot(layer, asof_date=ASOF) is first
+    assert first.candidates[0].stock == 50
+    assert first.candidates[0].perish_risk is True
+
+    layer.write_transaction(Transaction(date=ASOF - timedelta(days=1), sku="SKU001", event=EventType.WASTE, qty=40))
+    second = load_exception_snapshot(layer, asof_date=ASOF)
+    assert second is not first
+    assert second.candidates[0].stock == 10
+    assert second.candidates[0].perish_risk is False
@@ -0,0 +1,179 @@
+"""
+Tests for the background GUI data service (snapshot cache, dedup, cancellation).
+
+Tk is replaced by a fake root whose ``after`` callbacks are pumped manually,
+so the tests run headless.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.gui.data_service import GuiDataService
+
+
+class FakeRoot:
+    """Collects ``after`` callbacks; ``pump`` runs them like the Tk mainloop."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, fn):
+        self.callbacks.append(fn)
+
+    def pump(self, service, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            callbacks, self.callbacks = self.callbacks, []
+            for fn in callbacks:
+                fn()
+            with service._lock:
+                idle = service._pending == 0
+            if idle and service._results.empty():
+                return
+            time.sleep(0.005)
+        raise AssertionError("background work did not complete")
+
+
+class FakeStorage:
+    def __init__(self):
+        self.revision = 1
+        self.loads = 0
+
+    def data_revision(self):
+        return self.revision
+
+    def read_skus(self):
+        self.loads += 1
+        return []
+
+    def get_all_sku_ids(self):
+        return ["SKU001", "SKU002"]
+
+    def read_transactions(self):
+        return []
+
+    def read_sales(self):
+        return []
+
+
+@pytest.fixture
+def service():
+    storage = FakeStorage()
+    root = FakeRoot()
+    svc = GuiDataService(storage, root, max_workers=2)
+    yield svc
+    svc.shutdown()
+
+
+def test_snapshot_loaded_once_per_revision(service):
+    first = service.snapshot()
+    assert service.snapshot() is first
+    assert service.storage.loads == 1
+
+    service.storage.revision = 2
+    second = service.snapshot()
+    assert second is not first
+    assert second.revision == 2
+    assert service.storage.loads == 2
+
+
+def test_result_delivered_on_main_thread(service):
+    main = threading.get_ident()
+    delivered = []
+
+    service.submit(
+        "stock",
+        lambda snap, token: (threading.get_ident(), list(snap.sku_ids)),
+        on_result=lambda r: delivered.append((threading.get_ident(), r)),
+    )
+    service.root.pump(service)
+
+    assert len(delivered) == 1
+    thread_id, (worker_id, sku_ids) = delivered[0]
+    assert thread_id == main
+    assert worker_id != main
+    assert sku_ids == ["SKU001", "SKU002"]
+
+
+def test_newer_request_supersedes_stale_one(service):
+    release = threading.Event()
+    delivered = []
+
+    def slow(snap, token):
+        release.wait(5)
+        return "stale"
+
+    stale = service.submit("stock", slow, on_result=delivered.append)
+    service.submit("stock", lambda snap, token: "fresh", on_result=delivered.append)
+    release.set()
+    service.root.pump(service)
+
+    assert stale.cancelled
+    assert delivered == ["fresh"]
+
+
+def test_keyed_requests_are_deduplicated(service):
+    calls = []
+    release = threading.Event()
+    delivered = []
+
+    def compute(snap, token):
+        calls.append(1)
+        release.wait(5)
+        return 42
+
+    service.submit("a", compute, on_result=delivered.append, key="same")
+    service.submit("b", compute, on_result=delivered.append, key="same")
+    release.set()
+    service.root.pump(service)
+
+    assert len(calls) == 1
+    assert delivered == [42, 42]
+
+
+def test_errors_routed_to_on_error(service):
+    errors = []
+    results = []
+
+    def boom(snap, token):
+        raise ValueError("broken")
+
+    service.submit("dashboard", boom, on_result=results.append, on_error=errors.append)
+    service.root.pump(service)
+
+    assert results == []
+    assert len(errors) == 1 and isinstance(errors[0], ValueError)
+
+
+def test_cancel_channel_skips_callbacks(service):
+    release = threading.Event()
+    delivered = []
+
+    def compute(snap, token):
+        release.wait(5)
+        return "late"
+
+    token = service.submit("audit", compute, on_result=delivered.append)
+    service.cancel("audit")
+    release.set()
+    service.root.pump(service)
+
+    assert token.cancelled
+    assert delivered == []
+
+
+def test_targeted_read_skips_snapshot_load(service):
+    delivered = []
+
+    service.submit(
+        "audit",
+        lambda snap, token: (snap, service.read(service.storage.get_all_sku_ids)),
+        on_result=delivered.append,
+        needs_snapshot=False,
+    )
+    service.root.pump(service)
+
+    assert delivered == [(None, ["SKU001", "SKU002"])]
+    assert service.storage.loads == 0
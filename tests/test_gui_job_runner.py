@@ -0,0 +1,134 @@
+"""
+Tests for the GUI background job runner (single-flight, progress, cancellation, history).
+
+Tk is replaced by a fake root whose ``after`` callbacks are pumped manually,
+so the tests run headless.
+"""
+
+import threading
+import time
+
+from src.gui.job_runner import JOB_CANCELLED, JOB_DONE, JOB_FAILED, JobRunner
+
+
+class FakeRoot:
+    """Collects ``after`` callbacks; ``pump`` runs them like the Tk mainloop."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, fn):
+        self.callbacks.append(fn)
+
+    def pump(self, runner, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            callbacks, self.callbacks = self.callbacks, []
+            for fn in callbacks:
+                fn()
+            with runner._lock:
+                idle = not runner._active and runner._events.empty()
+            if idle and not self.callbacks:
+                return
+            time.sleep(0.005)
+        raise AssertionError("jobs did not complete")
+
+
+def test_result_and_progress_delivered_on_main_thread():
+    root = FakeRoot()
+    runner = JobRunner(root, progress_interval=0)
+    main = threading.get_ident()
+    seen, progress = [], []
+
+    def job(ctx):
+        for i in range(5):
+            ctx.progress(i, 5, f"item {i}")
+        return "ok"
+
+    def on_done(result):
+        seen.append((result, threading.get_ident()))
+
+    def on_progress(record):
+        progress.append((record.done, record.total, threading.get_ident()))
+
+    assert runner.start("kpi", job, on_done=on_done, on_progress=on_progress, label="KPI") is not None
+    root.pump(runner)
+
+    assert seen == [("ok", main)]
+    assert [p[:2] for p in progress][-5:] == [(0, 5), (1, 5), (2, 5), (3, 5), (4, 5)]
+    assert all(p[2] == main for p in progress)
+    [record] = runner.jobs()
+    assert (record.status, record.label) == (JOB_DONE, "KPI")
+    assert record.duration is not None and record.duration >= 0
+
+
+def test_single_flight_per_name():
+    root = FakeRoot()
+    runner = JobRunner(root, max_workers=2)
+    release = threading.Event()
+    runs = []
+
+    def job(ctx):
+        runs.append(1)
+        release.wait(5)
+        return len(runs)
+
+    first = runner.start("scoring", job)
+    assert first is not None
+    assert runner.start("scoring", job) is None  # double click
+    other = runner.start("kpi", lambda ctx: "other")
+    assert other is not None
+    release.set()
+    root.pump(runner)
+
+    assert len(runs) == 1
+    # Once finished, the same name can run again
+    assert runner.start("scoring", job) is not None
+    root.pump(runner)
+    assert len(runs) == 2
+
+
+def test_cooperative_cancellation_stops_the_loop():
+    root = FakeRoot()
+    runner = JobRunner(root)
+    started = threading.Event()
+    processed, outcome = [], []
+
+    def job(ctx):
+        for i in range(1000):
+            ctx.progress(i, 1000)
+            started.set()
+            processed.append(i)
+            time.sleep(0.001)
+        return "finished"
+
+    runner.start("closed_loop", job, on_done=outcome.append, on_cancelled=lambda: outcome.append("cancelled"))
+    assert started.wait(5)
+    assert runner.cancel("closed_loop")
+    root.pump(runner)
+
+    assert outcome == ["cancelled"]
+    assert len(processed) < 1000
+    assert runner.jobs()[0].status == JOB_CANCELLED
+    assert not runner.cancel("closed_loop")
+
+
+def test_errors_and_queued_jobs_recorded_in_history():
+    root = FakeRoot()
+    runner = JobRunner(root, max_workers=1)
+    release = threading.Event()
+    errors = []
+
+    def failing(ctx):
+        release.wait(5)
+        raise ValueError("boom")
+
+    runner.start("a", failing, on_error=errors.append)
+    runner.start("b", lambda ctx: None)
+    runner.cancel("b")  # cancelled while still queued: never runs
+    release.set()
+    root.pump(runner)
+
+    assert [str(e) for e in errors] == ["boom"]
+    statuses = {j.name: (j.status, j.error) for j in runner.jobs()}
+    assert statuses == {"a": (JOB_FAILED, "boom"), "b": (JOB_CANCELLED, None)}
@@ -0,0 +1,75 @@
+"""
+Tests for the RowModel behind the virtualized Treeview (no display needed).
+"""
+
+from src.gui.widgets import RowModel
+
+
+def _model():
+    model = RowModel(
+        sort_keys={"qty": lambda key, rec: rec["qty"]},
+        search_text=lambda key, rec: f"{key} {rec['desc']}",
+    )
+    model.set_rows([
+        ("SKU003", {"qty": 5, "desc": "Latte intero"}),
+        ("SKU001", {"qty": 9, "desc": "Pane"}),
+        ("SKU002", {"qty": 1, "desc": "Latte scremato"}),
+    ])
+    return model
+
+
+def test_insertion_order_and_positions():
+    model = _model()
+    assert model.keys() == ["SKU003", "SKU001", "SKU002"]
+    assert len(model) == 3
+    assert model[1] == "SKU001"
+    assert model.index("SKU002") == 2
+    assert model.index("MISSING") is None
+
+
+def test_sort_and_reverse():
+    model = _model()
+    model.sort_by("qty")
+    assert model.keys() == ["SKU002", "SKU003", "SKU001"]
+    model.sort_by("qty", descending=True)
+    assert model.keys() == ["SKU001", "SKU003", "SKU002"]
+    model.sort_by(None)
+    assert model.keys() == ["SKU003", "SKU001", "SKU002"]
+
+
+def test_update_repositions_sorted_row():
+    model = _model()
+    model.sort_by("qty")
+    record = model.get("SKU002")
+    before = model.version("SKU002")
+    record["qty"] = 7  # mutated in place
+    model.update("SKU002")
+    assert model.keys() == ["SKU003", "SKU002", "SKU001"]
+    assert model.version("SKU002") != before
+
+
+def test_search_narrows_and_widens():
+    model = _model()
+    model.set_search("latte")
+    assert model.keys() == ["SKU003", "SKU002"]
+    model.set_search("latte s")
+    assert model.keys() == ["SKU002"]
+    model.set_search("")
+    assert model.keys() == ["SKU003", "SKU001", "SKU002"]
+
+
+def test_filter_combines_with_search_and_sort():
+    model = _model()
+    model.sort_by("qty")
+    model.set_filter(lambda key, rec: rec["qty"] > 2)
+    model.set_search("sku")
+    assert model.keys() == ["SKU003", "SKU001"]
+
+
+def test_set_rows_keeps_sort_and_bumps_versions():
+    model = _model()
+    model.sort_by("qty")
+    v = model.version("SKU001")
+    model.set_rows([("SKU001", {"qty": 3, "desc": "Pane"}), ("SKU009", {"qty": 2, "desc": "Uova"})])
+    assert model.keys() == ["SKU009", "SKU001"]
+    assert model.version("SKU001") != v
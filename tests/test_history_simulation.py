@@ -471,3 +471,30 @@ class TestDeterminism:
             "Stesso seed deve produrre lo stesso totale di vendite"
         assert res_a.orders_created == res_b.orders_created, \
             "Stesso seed deve produrre lo stesso numero di ordini"
+
+
+# ---------------------------------------------------------------------------
+# 9. Interruzione (progress callback)
+# ---------------------------------------------------------------------------
+
+class TestAbortedRun:
+    """Un run interrotto durante la simulazione non tocca i dati esistenti."""
+
+    END_DATE = date(2025, 1, 31)
+    N_DAYS = 10
+
+    def test_abort_keeps_previous_simulation(self, csv_layer, workflow):
+        workflow.run_for_sku("SKU_TEST", 2, 4, self.N_DAYS, self.END_DATE, random_seed=42)
+        before = _sim_txns(csv_layer, "SKU_TEST")
+        calls = []
+
+        def progress(done, total):
+            calls.append((done, total))
+            if done == 5:
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            workflow.run_for_sku("SKU_TEST", 5, 6, self.N_DAYS, self.END_DATE, random_seed=1, progress=progress)
+
+        assert calls == [(d, self.N_DAYS) for d in range(6)]
+        assert _sim_txns(csv_layer, "SKU_TEST") == before
@@ -312,6 +312,75 @@ class TestIntermittentBacktest:
         assert best_method in ["sba", "tsb"]
 
 
+class TestSinglePassBacktestEngine:
+    """one_step_forecasts / backtest_all_methods must match per-origin refits."""
+
+    @staticmethod
+    def _refit_forecast(series, method, t, alpha, exclude):
+        from src.domain.intermittent_forecast import (
+            fit_croston, fit_sba, fit_tsb, predict_daily,
+        )
+        train_exclude = [i for i in exclude if i < t]
+        fit = {
+            "croston": lambda: fit_croston(series[:t], alpha, train_exclude),
+            "sba": lambda: fit_sba(series[:t], alpha, train_exclude),
+            "tsb": lambda: fit_tsb(series[:t], alpha, alpha, train_exclude),
+        }[method]
+        try:
+            return predict_daily(fit())
+        except ValueError:
+            return None
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    @pytest.mark.parametrize("alpha", [0.1, 0.35, 1.0])
+    def test_forecasts_identical_to_refit(self, seed, alpha):
+        import random
+        from src.domain.intermittent_forecast import one_step_forecasts
+
+        rng = random.Random(seed)
+        series = [rng.choice([0.0, 0.0, 0.0, rng.uniform(1, 30)]) for _ in range(60)]
+        exclude = sorted(rng.sample(range(60), 8)) + [0, 1]
+
+        forecasts = one_step_forecasts(series, alpha, exclude)
+
+        for method in ("croston", "sba", "tsb"):
+            assert len(forecasts[method]) == len(series) + 1
+            for t in range(len(series) + 1):
+                assert forecasts[method][t] == self._refit_forecast(
+                    series, method, t, alpha, exclude
+                ), (method, t)
+
+    def test_backtest_all_methods_matches_backtest_method(self, intermittent_series):
+        from src.domain.intermittent_forecast import backtest_all_methods, backtest_method
+
+        exclude = [3, 85, 88]
+        results = backtest_all_methods(intermittent_series, test_periods=10, alpha=0.2,
+                                       exclude_indices=exclude)
+
+        assert set(results) == {"croston", "sba", "tsb"}
+        for method, result in results.items():
+            assert result == backtest_method(intermittent_series, method, 10, 0.2, exclude)
+            assert result.n_forecasts == 8  # 85 and 88 are censored
+
+    def test_backtest_all_methods_too_short_raises(self):
+        from src.domain.intermittent_forecast import backtest_all_methods
+
+        with pytest.raises(ValueError, match="too short"):
+            backtest_all_methods([1.0] * 8, test_periods=4)
+
+    def test_sigma_with_shared_forecasts(self, intermittent_series):
+        """Passing precomputed forecasts gives the same sigma_P."""
+        from src.domain.intermittent_forecast import (
+            fit_sba, one_step_forecasts, estimate_sigma_P_rolling,
+        )
+
+        model = fit_sba(intermittent_series, alpha=0.1)
+        shared = one_step_forecasts(intermittent_series, 0.1)
+
+        assert estimate_sigma_P_rolling(intermittent_series, model, P=3, forecasts=shared) == \
+            estimate_sigma_P_rolling(intermittent_series, model, P=3)
+
+
 # ---------------------------------------------------------------------------
 # Test Integration (demand_builder)
 # ---------------------------------------------------------------------------
@@ -0,0 +1,161 @@
+"""
+Tests for targeted ledger deletes and day replacements (revert / purge flows).
+
+``delete_transactions`` / ``replace_transactions_day`` (CSV) and
+``delete_matching`` / ``replace_day`` (SQLite) must match a full-scan filter.
+"""
+
+import random
+import shutil
+import sqlite3
+import tempfile
+from dataclasses import replace
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.db import PRAGMA_CONFIG
+from src.domain.models import EventType, Transaction
+from src.persistence.csv_layer import CSVLayer
+from src.repositories import LedgerRepository, SKURepository
+
+SKUS = ["SKU001", "SKU002", "SKU003"]
+EVENTS = [EventType.SALE, EventType.ORDER, EventType.RECEIPT, EventType.ADJUST, EventType.WASTE]
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = tempfile.mkdtemp()
+    yield Path(temp_dir)
+    shutil.rmtree(temp_dir)
+
+
+def _random_transactions(rng, n=300):
+    base = date(2026, 1, 1)
+    txns = []
+    for i in range(n):
+        txns.append(Transaction(
+            date=base + timedelta(days=rng.randint(0, 40)),
+            sku=rng.choice(SKUS),
+            event=rng.choice(EVENTS),
+            qty=rng.randint(1, 20),
+            # Notes with quotes / commas / embedded newlines span several physical lines
+            note=rng.choice([None, "plain", 'say "hi", ok', "multi\nline note"]),
+        ))
+    return txns
+
+
+@pytest.fixture
+def ledger():
+    db = sqlite3.connect(":memory:")
+    db.row_factory = sqlite3.Row
+    for pragma, value in PRAGMA_CONFIG.items():
+        db.execute(f"PRAGMA {pragma}={value}")
+    for migration_file in sorted((Path(__file__).parent.parent / "migrations").glob("*.sql")):
+        db.executescript(migration_file.read_text())
+    db.commit()
+    for sku in SKUS:
+        SKURepository(db).upsert({"sku": sku, "description": sku})
+    yield LedgerRepository(db)
+    db.close()
+
+
+def _sim_note(rng):
+    return rng.choice([None, "plain", "SIM_HIST run 1", 'say "hi", SIM_HIST', "multi\nline note"])
+
+
+def test_csv_delete_transactions_matches_full_scan(temp_data_dir, monkeypatch):
+    rng = random.Random(19)
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    txns = [replace(t, note=_sim_note(rng)) for t in _random_transactions(rng, n=200)]
+    csv_layer.overwrite_transactions(txns)
+    read_all = csv_layer.read_transactions
+    monkeypatch.setattr(csv_layer, "read_transactions", lambda: pytest.fail("full ledger read"))
+
+    d1, d2 = date(2026, 1, 5), date(2026, 1, 20)
+    cases = [
+        ("SKU001", dict(date_from=d1, date_to=d1, events=[EventType.SALE])),
+        ("SKU002", dict(date_from=d1, date_to=d2, note_contains="SIM_HIST")),
+        ("SKU003", dict(events=[EventType.WASTE, EventType.ADJUST])),
+        ("MISSING", dict()),
+    ]
+    for sku, filters in cases:
+        def _hit(t):
+            return (
+                t.sku == sku
+                and ("date_from" not in filters or t.date >= filters["date_from"])
+                and ("date_to" not in filters or t.date <= filters["date_to"])
+                and ("events" not in filters or t.event in filters["events"])
+                and ("note_contains" not in filters or bool(t.note and filters["note_contains"] in t.note))
+            )
+        expected = [t for t in txns if not _hit(t)]
+        assert csv_layer.delete_transactions(sku, **filters) == len(txns) - len(expected)
+        assert read_all() == expected
+        txns = expected
+
+
+def test_csv_replace_day_appends_when_nothing_matches(temp_data_dir, monkeypatch):
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    day = date(2026, 1, 10)
+    csv_layer.overwrite_transactions([
+        Transaction(date=day, sku="SKU001", event=EventType.WASTE, qty=3),
+        Transaction(date=day, sku="SKU002", event=EventType.WASTE, qty=4),
+    ])
+    new = Transaction(date=day, sku="SKU001", event=EventType.ADJUST, qty=9, note="fix")
+
+    backups = []
+    original_backup = csv_layer._backup_file
+    monkeypatch.setattr(csv_layer, "_backup_file", lambda name: backups.append(name) or original_backup(name))
+    assert csv_layer.replace_transactions_day("SKU001", day, [new], events=[EventType.ADJUST]) == 0
+    assert backups == []  # plain append, no rewrite
+
+    newer = Transaction(date=day, sku="SKU001", event=EventType.WASTE, qty=5)
+    assert csv_layer.replace_transactions_day("SKU001", day, [newer], events=[EventType.WASTE]) == 1
+    assert backups == ["transactions.csv"]
+    assert csv_layer.read_transactions() == [
+        Transaction(date=day, sku="SKU002", event=EventType.WASTE, qty=4),
+        new,
+        newer,
+    ]
+
+
+def test_sqlite_delete_and_replace_day(ledger):
+    rng = random.Random(23)
+    txns = [replace(t, note=_sim_note(rng)) for t in _random_transactions(rng, n=150)]
+    ledger.append_batch([
+        {"date": t.date.isoformat(), "sku": t.sku, "event": t.event.value, "qty": t.qty,
+         "receipt_date": None, "note": t.note or ""}
+        for t in txns
+    ])
+
+    def _count(where, values=()):
+        return ledger.conn.execute(f"SELECT COUNT(*) FROM transactions WHERE {where}", values).fetchone()[0]
+
+    sim = _count("sku = 'SKU001' AND date BETWEEN '2026-01-05' AND '2026-01-20' AND note LIKE '%SIM_HIST%'")
+    total = _count("1")
+    assert ledger.delete_matching("SKU001", "2026-01-05", "2026-01-20", note_contains="SIM_HIST") == sim
+    assert _count("1") == total - sim
+    assert _count("sku = 'SKU001' AND date BETWEEN '2026-01-05' AND '2026-01-20' AND note LIKE '%SIM_HIST%'") == 0
+
+    day_rows = _count("sku = 'SKU002' AND date = '2026-01-10' AND event IN ('SALE', 'WASTE')")
+    replaced = ledger.replace_day("SKU002", "2026-01-10", [
+        {"date": "2026-01-10", "sku": "SKU002", "event": "WASTE", "qty": 7, "note": "total"},
+    ], events=["SALE", "WASTE"])
+    assert replaced == day_rows
+    assert ledger.sum_qty("SKU002", "2026-01-10", "WASTE") == 7
+    assert ledger.sum_qty("SKU002", "2026-01-10", "SALE") == 0
+
+    # Constraint violation: the delete is rolled back too
+    before = _count("1")
+    with pytest.raises(RuntimeError):
+        ledger.replace_day("SKU002", "2026-01-10", [
+            {"date": "2026-01-10", "sku": "SKU002", "event": "WASTE", "qty": None},
+        ])
+    assert _count("1") == before
+
+    plan = ledger.conn.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM transactions WHERE sku = ? AND date >= ? AND date <= ?",
+        ("SKU001", "2026-01-05", "2026-01-20"),
+    ).fetchall()
+    assert any("idx_transactions_sku_date" in row[-1] for row in plan)
@@ -297,6 +297,36 @@ class TestFEFOConsumption:
         with pytest.raises(ValueError, match="Insufficient stock in lots"):
             LotConsumptionManager.consume_from_lots("SKU001", 50, lots, temp_csv_layer)
 
+    def test_batch_write_applies_fefo_with_one_lots_rewrite(self, temp_csv_layer, monkeypatch):
+        """A ledger batch consumes lots like sequential writes, rewriting lots.csv once."""
+        today = date.today()
+        temp_csv_layer.write_sku(SKU(sku="SKU002", description="Other"))
+        temp_csv_layer.write_lot(Lot("LOT-A", "SKU001", today + timedelta(days=5), 20, "REC-A", today))
+        temp_csv_layer.write_lot(Lot("LOT-B", "SKU001", today + timedelta(days=10), 30, "REC-B", today))
+        temp_csv_layer.write_lot(Lot("LOT-C", "SKU002", None, 10, "REC-C", today))
+        
+        lot_writes = []
+        original = temp_csv_layer._write_csv_atomic
+        monkeypatch.setattr(
+            temp_csv_layer, "_write_csv_atomic",
+            lambda name, rows: lot_writes.append(name) or original(name, rows),
+        )
+        temp_csv_layer.write_transactions_batch([
+            Transaction(date=today, sku="SKU001", event=EventType.WASTE, qty=15),
+            Transaction(date=today, sku="SKU002", event=EventType.SALE, qty=4),
+            Transaction(date=today, sku="SKU001", event=EventType.SALE, qty=10),
+        ])
+        
+        assert lot_writes == ["lots.csv"]
+        assert {l.lot_id: l.qty_on_hand for l in temp_csv_layer.read_lots()} == {"LOT-B": 25, "LOT-C": 6}
+        notes = [t.note for t in temp_csv_layer.read_transactions()]
+        assert notes == [
+            "FEFO: LOT-A:15pz(exp:%s)" % (today + timedelta(days=5)).isoformat(),
+            "FEFO: LOT-C:4pz(exp:no expiry)",
+            "FEFO: LOT-A:5pz(exp:%s), LOT-B:5pz(exp:%s)" % (
+                (today + timedelta(days=5)).isoformat(), (today + timedelta(days=10)).isoformat()),
+        ]
+
 
 class TestReceivingWithLots:
     """Test receiving workflow with lot creation."""
@@ -0,0 +1,134 @@
+"""
+Tests for the OOS / censoring engine (per-SKU daily records from one replay).
+
+The OOS flag of every day must match the start-of-day state given by
+StockCalculator.calculate_asof, and the engine must be shared by the KPI
+functions within one data revision.
+"""
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.analytics import oos_engine
+from src.analytics.kpi import compute_forecast_accuracy, compute_pi80_coverage_kpi, estimate_lost_sales
+from src.analytics.oos_engine import SkuOosHistory, load_oos_engine
+from src.domain.ledger import StockCalculator
+from src.domain.models import EventType, SalesRecord, Transaction
+from src.persistence.csv_layer import CSVLayer
+from src.workflows.order import calculate_daily_sales_average
+
+BASE = date(2026, 2, 1)
+EVENTS = [
+    EventType.SNAPSHOT, EventType.ORDER, EventType.RECEIPT, EventType.SALE,
+    EventType.WASTE, EventType.ADJUST, EventType.OOS_OVERRIDE,
+    EventType.ASSORTMENT_OUT, EventType.ASSORTMENT_IN,
+]
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = tempfile.mkdtemp()
+    yield Path(temp_dir)
+    shutil.rmtree(temp_dir)
+
+
+def _random_data(rng, sku="SKU001"):
+    txns = [
+        Transaction(date=BASE + timedelta(days=rng.randint(0, 50)), sku=sku,
+                    event=rng.choice(EVENTS), qty=rng.randint(0, 12))
+        for _ in range(rng.randint(1, 30))
+    ]
+    sales = [
+        SalesRecord(date=BASE + timedelta(days=d), sku=sku, qty_sold=rng.randint(0, 4))
+        for d in range(0, 51) if rng.random() < 0.5
+    ]
+    return txns, sales
+
+
+def test_records_match_per_day_asof():
+    rng = random.Random(12)
+    for _ in range(50):
+        txns, sales = _random_data(rng)
+        history = SkuOosHistory("SKU001", txns, sales)
+        overrides = {t.date for t in txns if t.event == EventType.OOS_OVERRIDE}
+        for mode in ("strict", "relaxed"):
+            for rec in history.records(BASE - timedelta(days=3), BASE + timedelta(days=55), mode):
+                stock = StockCalculator.calculate_asof("SKU001", rec.day, txns, sales)
+                empty = stock.on_hand == 0 if mode == "strict" else stock.on_hand + stock.on_order == 0
+                assert (rec.on_hand, rec.on_order) == (stock.on_hand, stock.on_order)
+                assert rec.oos == (empty and rec.day not in overrides)
+                assert rec.override == (rec.day in overrides)
+                assert rec.sold == sum(s.qty_sold for s in sales if s.date == rec.day)
+                if rec.sold:
+                    assert not rec.out_of_assortment
+
+
+def test_summary_matches_calculate_daily_sales_average():
+    rng = random.Random(3)
+    for _ in range(30):
+        txns, sales = _random_data(rng)
+        history = SkuOosHistory("SKU001", txns, sales)
+        asof = BASE + timedelta(days=rng.randint(10, 50))
+        summary = history.summary(asof, 30, "strict")
+        assert summary is history.summary(asof, 30, "strict")
+        assert calculate_daily_sales_average(sales, "SKU001", 30, txns, asof, "strict", return_details=True) == (
+            summary.avg_daily_sales, summary.oos_days_count, summary.oos_days, summary.out_of_assortment_days,
+        )
+        window = history.window(asof, 30, "strict")
+        valid = [r for r in window if not r.censored]
+        expected_avg = sum(r.sold for r in valid) / len(valid) if valid else 0.0
+        assert summary.avg_daily_sales == pytest.approx(expected_avg)
+
+
+def test_no_ledger_means_no_oos_days():
+    sales = [SalesRecord(date=BASE + timedelta(days=d), sku="SKU001", qty_sold=1) for d in range(10)]
+    history = SkuOosHistory("SKU001", [], sales)
+    assert not any(r.oos for r in history.records(BASE, BASE + timedelta(days=9)))
+
+
+def test_assortment_periods():
+    txns = [
+        Transaction(date=BASE, sku="SKU001", event=EventType.SNAPSHOT, qty=10),
+        Transaction(date=BASE + timedelta(days=5), sku="SKU001", event=EventType.ASSORTMENT_OUT, qty=0),
+        Transaction(date=BASE + timedelta(days=8), sku="SKU001", event=EventType.ASSORTMENT_IN, qty=0),
+        Transaction(date=BASE + timedelta(days=12), sku="SKU001", event=EventType.ASSORTMENT_OUT, qty=0),
+    ]
+    sales = [SalesRecord(date=BASE + timedelta(days=6), sku="SKU001", qty_sold=2)]  # sales immunity
+    history = SkuOosHistory("SKU001", txns, sales)
+    out = [r.day for r in history.records(BASE - timedelta(days=2), BASE + timedelta(days=14)) if r.out_of_assortment]
+    assert out == [BASE - timedelta(days=2), BASE - timedelta(days=1),  # before first activity
+                   BASE + timedelta(days=5), BASE + timedelta(days=7),
+                   BASE + timedelta(days=12), BASE + timedelta(days=13), BASE + timedelta(days=14)]
+
+
+def test_engine_shared_by_kpis_within_a_revision(temp_data_dir, monkeypatch):
+    monkeypatch.setattr(oos_engine, "_ENGINE_CACHE", {})
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    rng = random.Random(8)
+    txns, sales = [], []
+    for sku in ("SKU001", "SKU002"):
+        t, s = _random_data(rng, sku)
+        txns += t
+        sales += s
+    csv_layer.overwrite_transactions(txns)
+    csv_layer.write_sales(sales)
+
+    reads = []
+    original = csv_layer.read_transactions
+    monkeypatch.setattr(csv_layer, "read_transactions", lambda *a, **k: reads.append(1) or original(*a, **k))
+
+    asof = BASE + timedelta(days=50)
+    engine = load_oos_engine(csv_layer)
+    for sku in ("SKU001", "SKU002"):
+        estimate_lost_sales(sku, 30, "strict", csv_layer, asof)
+        compute_forecast_accuracy(sku, 30, "strict", csv_layer, asof)
+        compute_pi80_coverage_kpi(sku, 30, "strict", csv_layer, asof)
+    assert load_oos_engine(csv_layer) is engine
+    assert len(reads) == 1
+
+    csv_layer.write_transaction(Transaction(date=asof, sku="SKU001", event=EventType.WASTE, qty=1))
+    assert load_oos_engine(csv_layer) is not engine
@@ -3,13 +3,18 @@ Test suite for CSV persistence layer.
 
 Tests auto-create, read/write, and data integrity.
 """
+import hashlib
+import json
+import subprocess
+import sys
+import threading
 import pytest
 from datetime import date
 from pathlib import Path
 import tempfile
 import shutil
 
-from src.domain.models import SKU, Transaction, EventType, SalesRecord
+from src.domain.models import SKU, Transaction, EventType, SalesRecord, Lot
 from src.persistence.csv_layer import CSVLayer
 
 
@@ -205,6 +210,213 @@ class TestTransactionOperations:
         assert read_txns[0].event == EventType.SNAPSHOT
         assert read_txns[1].event == EventType.ORDER
 
+    def test_write_transactions_batch_appends_without_rewrite(self, csv_layer, temp_data_dir, monkeypatch):
+        """Batch writes append the new rows only: no re-read, no rewrite, no backup."""
+        csv_layer.write_transaction(
+            Transaction(date=date(2026, 1, 1), sku="SKU001", event=EventType.SNAPSHOT, qty=100)
+        )
+        path = temp_data_dir / "transactions.csv"
+        before = path.read_bytes()
+        assert csv_layer.read_sku_transactions_page("SKU001")[0]  # index built
+
+        def no_full_rewrite(*args, **kwargs):
+            raise AssertionError("full read/rewrite of transactions.csv")
+        monkeypatch.setattr(csv_layer, "_read_csv", no_full_rewrite)
+        monkeypatch.setattr(csv_layer, "_write_csv_atomic", no_full_rewrite)
+
+        csv_layer.write_transactions_batch([
+            Transaction(date=date(2026, 1, 5), sku="SKU001", event=EventType.ORDER, qty=50,
+                        receipt_date=date(2026, 1, 8)),
+            Transaction(date=date(2026, 1, 6), sku="SKU002", event=EventType.SNAPSHOT, qty=7),
+        ])
+        monkeypatch.undo()
+
+        assert path.read_bytes().startswith(before)
+        assert not list(temp_data_dir.glob("transactions.csv.backup.*"))
+        assert not list(temp_data_dir.glob("*.journal"))
+        assert [t.qty for t in csv_layer.read_transactions()] == [100, 50, 7]
+        page, _ = csv_layer.read_sku_transactions_page("SKU001")
+        assert [t.event for t in page] == [EventType.ORDER, EventType.SNAPSHOT]
+
+    def test_interrupted_batch_append_recovered_on_open(self, csv_layer, temp_data_dir):
+        """A torn batch is rolled back; a fully written one survives a lost commit marker."""
+        csv_layer.write_transaction(
+            Transaction(date=date(2026, 1, 1), sku="SKU001", event=EventType.SNAPSHOT, qty=100)
+        )
+        path = temp_data_dir / "transactions.csv"
+        journal = temp_data_dir / "transactions.csv.journal"
+        committed = path.read_bytes()
+
+        # Crash after the journal, before the commit marker: keep the complete batch
+        csv_layer.write_transactions_batch([
+            Transaction(date=date(2026, 1, 5), sku="SKU001", event=EventType.ORDER, qty=50),
+        ])
+        full = path.read_bytes()
+        batch = full[len(committed):]
+        journal.write_text(json.dumps({
+            "size": len(committed), "length": len(batch), "sha256": hashlib.sha256(batch).hexdigest(),
+        }))
+        assert len(CSVLayer(data_dir=temp_data_dir).read_transactions()) == 2
+        assert not journal.exists()
+
+        # Crash in the middle of the append: roll back to the previous size
+        path.write_bytes(full[: len(committed) + len(batch) // 2])
+        journal.write_text(json.dumps({
+            "size": len(committed), "length": len(batch), "sha256": hashlib.sha256(batch).hexdigest(),
+        }))
+        layer = CSVLayer(data_dir=temp_data_dir)
+        assert path.read_bytes() == committed
+        assert not journal.exists()
+        assert [t.qty for t in layer.read_transactions()] == [100]
+
+    def test_receipt_batch_commits_all_files_together(self, csv_layer, temp_data_dir):
+        """Ledger, receiving logs and lots of a receipt batch are kept or rolled back as one."""
+        receipt_txn = Transaction(date=date(2026, 1, 5), sku="0000001", event=EventType.RECEIPT, qty=12)
+        log = dict(document_id="DDT-1", date_str="2026-01-05", sku="0000001", qty=12, receipt_date="2026-01-05")
+        lot = Lot(lot_id="L1", sku="0000001", expiry_date=date(2026, 2, 1), qty_on_hand=12,
+                  receipt_id="DDT-1", receipt_date=date(2026, 1, 5))
+        names = ["transactions.csv", "receiving_logs.csv", "lots.csv"]
+        before = {name: (temp_data_dir / name).read_bytes() for name in names}
+
+        csv_layer.write_receipt_batch([receipt_txn], [log], [lot])
+        assert not list(temp_data_dir.glob("*.journal"))
+        assert "DDT-1" in csv_layer.receiving_document_ids()
+        assert [l.lot_id for l in csv_layer.read_lots()] == ["L1"]
+        after = {name: (temp_data_dir / name).read_bytes() for name in names}
+
+        # Crash with lots.csv torn: every file of the batch is rolled back
+        for name in names:
+            added = after[name][len(before[name]):]
+            (temp_data_dir / f"{name}.journal").write_text(json.dumps({
+                "size": len(before[name]), "length": len(added),
+                "sha256": hashlib.sha256(added).hexdigest(), "batch": "b1", "files": 3,
+            }))
+        (temp_data_dir / "lots.csv").write_bytes(after["lots.csv"][:-3])
+        layer = CSVLayer(data_dir=temp_data_dir)
+        assert {name: (temp_data_dir / name).read_bytes() for name in names} == before
+        assert not list(temp_data_dir.glob("*.journal"))
+        assert "DDT-1" not in layer.receiving_document_ids()
+
+    def test_eod_batch_rewrite_rolls_forward_only_after_marker(self, csv_layer, temp_data_dir):
+        """A staged sales.csv rewrite is discarded without the marker, renamed in with it."""
+        csv_layer.write_sales([SalesRecord(date=date(2026, 1, 1), sku="SKU001", qty_sold=3)])
+        sales_path = temp_data_dir / "sales.csv"
+        ledger_path = temp_data_dir / "transactions.csv"
+        old_sales, ledger = sales_path.read_bytes(), ledger_path.read_bytes()
+        staged = b"date,sku,qty_sold,promo_flag\r\n2026-01-01,SKU001,5,0\r\n"
+        added = b"2026-01-01,SKU001,SALE,5,,\r\n"
+
+        def _crash(marker):
+            ledger_path.write_bytes(ledger + added)
+            (temp_data_dir / "sales.csv.replace").write_bytes(staged)
+            (temp_data_dir / "sales.csv.journal").write_text(json.dumps({"replace": True, "batch": "b1", "files": 2}))
+            (temp_data_dir / "transactions.csv.journal").write_text(json.dumps({
+                "size": len(ledger), "length": len(added),
+                "sha256": hashlib.sha256(added).hexdigest(), "batch": "b1", "files": 2,
+            }))
+            if marker:
+                (temp_data_dir / "append-b1.commit").write_text("{}")
+
+        _crash(marker=False)
+        layer = CSVLayer(data_dir=temp_data_dir)
+        assert (sales_path.read_bytes(), ledger_path.read_bytes()) == (old_sales, ledger)
+        assert not list(temp_data_dir.glob("sales.csv.*"))
+
+        _crash(marker=True)
+        layer = CSVLayer(data_dir=temp_data_dir)
+        assert (sales_path.read_bytes(), ledger_path.read_bytes()) == (staged, ledger + added)
+        assert [s.qty_sold for s in layer.read_sales()] == [5]
+        assert not list(temp_data_dir.glob("*.journal")) + list(temp_data_dir.glob("*.replace"))
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="flock-based helper process")
+    def test_journal_of_live_writer_not_recovered(self, csv_layer, temp_data_dir):
+        """Another process mid-append (lock held, journal present) is never rolled back."""
+        path = temp_data_dir / "transactions.csv"
+        committed = path.read_bytes()
+        partial = b"2026-01-05,SKU001,ORDER,5"
+        path.write_bytes(committed + partial)
+        journal = temp_data_dir / "transactions.csv.journal"
+        journal.write_text(json.dumps({"size": len(committed), "length": 64, "sha256": "x"}))
+
+        holder = subprocess.Popen(
+            [sys.executable, "-c",
+             "import fcntl, sys; f = open(sys.argv[1], 'a'); fcntl.flock(f, fcntl.LOCK_EX); "
+             "print('locked', flush=True); sys.stdin.read()",
+             str(temp_data_dir / ".append.lock")],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            assert holder.stdout.readline().strip() == "locked"
+            opened = threading.Thread(target=CSVLayer, kwargs={"data_dir": temp_data_dir})
+            opened.start()
+            opened.join(timeout=0.3)
+            assert opened.is_alive()  # waits for the writer instead of truncating its append
+            assert path.read_bytes() == committed + partial
+        finally:
+            holder.stdin.close()  # writer dies: the OS releases its lock
+            holder.wait(timeout=5)
+        opened.join(timeout=5)
+        assert not opened.is_alive()
+        assert path.read_bytes() == committed
+        assert not journal.exists()
+
+    def test_concurrent_layers_append_and_recover(self, temp_data_dir):
+        """Layers opened and appending from several threads never race on a journal."""
+        errors = []
+
+        def _worker(n):
+            try:
+                for i in range(10):
+                    CSVLayer(data_dir=temp_data_dir).write_transactions_batch([
+                        Transaction(date=date(2026, 1, 1), sku=f"SKU{n}", event=EventType.SNAPSHOT, qty=i),
+                    ])
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+
+        workers = [threading.Thread(target=_worker, args=(n,)) for n in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert errors == []
+        assert len(CSVLayer(data_dir=temp_data_dir).read_transactions()) == 40
+        assert not list(temp_data_dir.glob("*.journal"))
+
+    def test_rewrites_and_single_appends_resolve_pending_journals(self, csv_layer, temp_data_dir):
+        """A crashed batch's journal never truncates a later rewrite or single-row append."""
+        path = temp_data_dir / "transactions.csv"
+        journal = temp_data_dir / "transactions.csv.journal"
+
+        def _crashed_batch():
+            committed = path.read_bytes()
+            path.write_bytes(committed + b"2026-01-09,SKU001,ORDER,5")  # torn row
+            journal.write_text(json.dumps({"size": len(committed), "length": 64, "sha256": "x"}))
+
+        _crashed_batch()
+        csv_layer.overwrite_transactions([
+            Transaction(date=date(2026, 1, day), sku="SKU001", event=EventType.SNAPSHOT, qty=day)
+            for day in range(1, 20)
+        ])
+        assert not journal.exists()
+        csv_layer.write_transactions_batch([
+            Transaction(date=date(2026, 1, 20), sku="SKU001", event=EventType.SNAPSHOT, qty=20),
+        ])
+        assert [t.qty for t in csv_layer.read_transactions()] == list(range(1, 21))
+
+        _crashed_batch()
+        csv_layer.write_transaction(
+            Transaction(date=date(2026, 1, 21), sku="SKU002", event=EventType.SNAPSHOT, qty=21)
+        )
+        assert not journal.exists()
+        CSVLayer(data_dir=temp_data_dir)
+        assert [t.qty for t in csv_layer.read_transactions()][-2:] == [20, 21]
+
+        _crashed_batch()
+        assert csv_layer.delete_transactions("SKU001", date_from=date(2026, 1, 1), date_to=date(2026, 1, 1)) == 1
+        assert not journal.exists()
+        assert [t.qty for t in csv_layer.read_transactions()][:2] == [2, 3]
+        assert len(csv_layer.read_transactions()) == 20
+
 
 class TestSalesOperations:
     """Test sales read/write operations."""
@@ -0,0 +1,110 @@
+"""
+Tests for the preindexed promo-window lookup (PromoIndex / load_promo_index).
+
+The index must answer exactly like the list-scanning query functions it
+replaces, and must be rebuilt when promo_calendar.csv changes.
+"""
+
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.domain.models import PromoWindow
+from src.forecast import _find_promo_window_for_date
+from src.persistence.csv_layer import CSVLayer
+from src.promo_calendar import (
+    PromoIndex,
+    get_active_promos,
+    is_promo,
+    load_promo_index,
+    promo_windows_for_sku,
+)
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def _random_windows(rng, n=60):
+    base = date(2026, 1, 1)
+    windows = []
+    for _ in range(n):
+        start = base + timedelta(days=rng.randint(0, 90))
+        windows.append(PromoWindow(
+            sku=rng.choice(["SKU001", "SKU002", "SKU003"]),
+            start_date=start,
+            end_date=start + timedelta(days=rng.randint(0, 20)),
+            store_id=rng.choice([None, None, "S1", "S2"]),
+        ))
+    return windows
+
+
+class TestPromoIndexEquivalence:
+    """PromoIndex answers match the list-based functions."""
+
+    def test_sequence_behaviour(self):
+        windows = _random_windows(random.Random(1), n=10)
+        index = PromoIndex(windows)
+        assert len(index) == len(windows)
+        assert list(index) == windows
+        assert index[3] == windows[3]
+        assert index[-1] == windows[-1]
+
+    def test_queries_match_list_scan(self):
+        rng = random.Random(42)
+        for _ in range(20):
+            windows = _random_windows(rng)
+            index = PromoIndex(windows)
+            for offset in range(-5, 125, 3):
+                d = date(2026, 1, 1) + timedelta(days=offset)
+                assert get_active_promos(index, d) == get_active_promos(windows, d)
+                for sku in ("SKU001", "SKU002", "SKU003", "MISSING"):
+                    for store in (None, "S1", "S2"):
+                        assert is_promo(d, sku, index, store) == is_promo(d, sku, windows, store)
+                        assert (
+                            _find_promo_window_for_date(d, sku, index, store)
+                            is _find_promo_window_for_date(d, sku, windows, store)
+                        )
+            for sku in ("SKU001", "SKU002", "MISSING"):
+                for store in (None, "S1"):
+                    assert promo_windows_for_sku(sku, index, store) == promo_windows_for_sku(sku, windows, store)
+
+    def test_global_only(self):
+        windows = _random_windows(random.Random(7))
+        index = PromoIndex(windows)
+        assert list(index.global_only()) == [w for w in windows if w.store_id is None]
+        assert index.global_only() is index.global_only()
+
+
+class TestLoadPromoIndex:
+    """load_promo_index is shared per calendar revision."""
+
+    def test_reused_until_calendar_changes(self, temp_data_dir):
+        layer = CSVLayer(data_dir=temp_data_dir)
+        layer.write_promo_window(PromoWindow("SKU001", date(2026, 3, 1), date(2026, 3, 7)))
+
+        first = load_promo_index(layer)
+        assert load_promo_index(layer) is first
+        assert is_promo(date(2026, 3, 10), "SKU001", first) is False
+
+        layer.write_promo_window(PromoWindow("SKU001", date(2026, 3, 8), date(2026, 3, 14)))
+        second = load_promo_index(layer)
+        assert second is not first
+        assert len(second) == 2
+        assert is_promo(date(2026, 3, 10), "SKU001", second) is True
+
+    def test_overwrite_invalidates(self, temp_data_dir):
+        layer = CSVLayer(data_dir=temp_data_dir)
+        window = PromoWindow("SKU001", date(2026, 3, 1), date(2026, 3, 7))
+        layer.write_promo_calendar([window])
+        assert len(load_promo_index(layer)) == 1
+
+        layer.write_promo_calendar([])
+        assert len(load_promo_index(layer)) == 0
@@ -0,0 +1,140 @@
+"""
+Tests for the shared proposal run context (PASS A results reused by PASS B).
+
+A proposal generated from a ProposalRunContext must be identical to the
+legacy path (fresh storage reads + global-list scans), without touching
+storage for any of the data the context already holds.
+"""
+import random
+import shutil
+import tempfile
+from dataclasses import asdict
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.domain.ledger import StockCalculator
+from src.domain.models import SKU, EventType, SalesRecord, Transaction
+from src.persistence.csv_layer import CSVLayer
+from src.workflows.order import OrderWorkflow, calculate_daily_sales_average
+from src.workflows.proposal_context import ProposalRunContext
+
+SKUS = [f"SKU{i:03d}" for i in range(1, 7)]
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = tempfile.mkdtemp()
+    yield Path(temp_dir)
+    shutil.rmtree(temp_dir)
+
+
+def _populate(csv_layer: CSVLayer, rng: random.Random):
+    today = date.today()
+    for sku in SKUS:
+        csv_layer.write_sku(SKU(sku=sku, description=f"Item {sku}", pack_size=rng.choice([1, 6]), moq=1))
+    txns, sales = [], []
+    for sku in SKUS:
+        txns.append(Transaction(date=today - timedelta(days=60), sku=sku, event=EventType.SNAPSHOT, qty=rng.randint(20, 70)))
+        for d in range(59, 0, -1):
+            day = today - timedelta(days=d)
+            if rng.random() < 0.6:
+                sales.append(SalesRecord(date=day, sku=sku, qty_sold=rng.randint(0, 5)))
+            if rng.random() < 0.1:
+                txns.append(Transaction(date=day, sku=sku, event=EventType.ADJUST, qty=-rng.randint(1, 10)))
+        txns.append(Transaction(
+            date=today - timedelta(days=1), sku=sku, event=EventType.ORDER, qty=3,
+            receipt_date=today + timedelta(days=rng.randint(1, 5)),
+        ))
+    csv_layer.overwrite_transactions(txns)
+    csv_layer.write_sales(sales)
+
+
+def _context(csv_layer: CSVLayer) -> ProposalRunContext:
+    transactions = csv_layer.read_transactions()
+    sales = csv_layer.read_sales()
+    stocks = StockCalculator.calculate_all_skus(SKUS, date.today() + timedelta(days=1), transactions, sales)
+    return ProposalRunContext(
+        settings=csv_layer.read_settings(),
+        skus=csv_layer.read_skus(),
+        transactions=transactions,
+        sales_records=sales,
+        stocks=stocks,
+    )
+
+
+def test_compute_demand_matches_global_scan(temp_data_dir):
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    _populate(csv_layer, random.Random(1))
+    context = _context(csv_layer)
+
+    for sku in SKUS:
+        demand = context.compute_demand(sku, "strict")
+        expected = calculate_daily_sales_average(
+            context.sales_records, sku, days_lookback=30,
+            transactions=context.transactions, asof_date=date.today(),
+            oos_detection_mode="strict", return_details=True,
+        )
+        assert (demand.daily_sales, demand.oos_days_count, demand.oos_days_list, demand.out_of_assortment_days) == expected
+        assert demand.history_valid_days == 30 - len(expected[2]) - len(expected[3])
+
+
+@pytest.mark.parametrize("forecast_method", ["simple", "monte_carlo"])
+def test_proposal_from_context_matches_legacy_path(temp_data_dir, monkeypatch, forecast_method):
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    _populate(csv_layer, random.Random(2))
+    settings = csv_layer.read_settings()
+    settings.setdefault("reorder_engine", {})["forecast_method"] = {"value": forecast_method}
+    settings.setdefault("monte_carlo", {})["show_comparison"] = {"value": True}
+    csv_layer.write_settings(settings)
+
+    workflow = OrderWorkflow(csv_layer)
+    context = _context(csv_layer)
+    receipt = date.today() + timedelta(days=3)
+
+    def generate(sku, **kwargs):
+        demand = context.demand.get(sku) or context.compute_demand(sku, "strict")
+        return workflow.generate_proposal(
+            sku=sku, description=f"Item {sku}", current_stock=context.stocks[sku],
+            daily_sales_avg=demand.daily_sales, sku_obj=context.skus_by_id[sku],
+            target_receipt_date=receipt, protection_period_days=3,
+            transactions=context.transactions, sales_records=context.sales_records,
+            **kwargs,
+        )
+
+    legacy = {sku: generate(sku) for sku in SKUS}
+
+    # With the context nothing it holds may be read from storage again
+    for name in ("read_settings", "read_sales", "read_transactions", "read_skus"):
+        monkeypatch.setattr(csv_layer, name, lambda *a, _n=name, **k: pytest.fail(f"{_n} called"))
+    shared = {sku: generate(sku, context=context) for sku in SKUS}
+
+    for sku in SKUS:
+        assert asdict(shared[sku]) == asdict(legacy[sku])
+
+
+def test_replace_day_events_updates_slices(temp_data_dir):
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    _populate(csv_layer, random.Random(3))
+    context = _context(csv_layer)
+    day = date.today() - timedelta(days=2)
+    before = context.sales_history("SKU001", day - timedelta(days=5))
+    flat_sales, flat_txns = context.sales_records, context.transactions
+    flat_sizes = (len(flat_sales), len(flat_txns))
+
+    sale = SalesRecord(date=day, sku="SKU001", qty_sold=99)
+    marker = Transaction(date=day, sku="SKU001", event=EventType.OOS_OVERRIDE, qty=0)
+    context.replace_day_events("SKU001", day, sale=sale, marker=marker)
+
+    assert [s for s in context.sales_for("SKU001") if s.date == day] == [sale]
+    assert marker in context.txns_for("SKU001")
+    # Only the SKU's buckets change; the flat run lists are left alone
+    assert context.sales_records is flat_sales and context.transactions is flat_txns
+    assert (len(flat_sales), len(flat_txns)) == flat_sizes
+    after = context.sales_history("SKU001", day - timedelta(days=5))
+    assert after is not before
+    assert {"date": day, "qty_sold": 99} in after
+
+    demand = context.compute_demand("SKU001", "strict")
+    assert day not in demand.oos_days_list
@@ -0,0 +1,119 @@
+"""
+Tests for batch receipt closing.
+
+Ledger events, receiving logs and lots of a receipt batch are committed
+together: in SQLite mode inside the ledger transaction, in CSV mode as one
+journaled append whose commit marker decides recovery after a crash.
+"""
+
+import hashlib
+import json
+import shutil
+import sqlite3
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from src.db import PRAGMA_CONFIG
+from src.domain.models import EventType, Lot, Transaction
+from src.persistence.csv_layer import CSVLayer
+from src.repositories import LedgerRepository, SKURepository
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = tempfile.mkdtemp()
+    yield Path(temp_dir)
+    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def ledger():
+    db = sqlite3.connect(":memory:")
+    db.row_factory = sqlite3.Row
+    for pragma, value in PRAGMA_CONFIG.items():
+        db.execute(f"PRAGMA {pragma}={value}")
+    for migration_file in sorted((Path(__file__).parent.parent / "migrations").glob("*.sql")):
+        db.executescript(migration_file.read_text())
+    db.commit()
+    SKURepository(db).upsert({"sku": "SKU001", "description": "SKU001"})
+    yield LedgerRepository(db)
+    db.close()
+
+
+def _receipt():
+    txn = Transaction(date=date(2026, 1, 5), sku="0000001", event=EventType.RECEIPT, qty=12)
+    log = dict(document_id="DDT-1", date_str="2026-01-05", sku="0000001", qty=12, receipt_date="2026-01-05")
+    lot = Lot(lot_id="L1", sku="0000001", expiry_date=date(2026, 2, 1), qty_on_hand=12,
+              receipt_id="DDT-1", receipt_date=date(2026, 1, 5))
+    return txn, log, lot
+
+
+def test_append_batch_rolled_back_when_before_commit_fails(ledger):
+    row = {"date": "2026-01-01", "sku": "SKU001", "event": "RECEIPT", "qty": 5, "receipt_date": None, "note": ""}
+
+    def _csv_commit_fails():
+        raise OSError("disk full")
+
+    with pytest.raises(RuntimeError):
+        ledger.append_batch([row, row], before_commit=_csv_commit_fails)
+    assert ledger.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 0
+
+    seen = []
+    ledger.append_batch([row], before_commit=lambda: seen.append(
+        ledger.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+    ))
+    assert seen == [1]  # runs inside the transaction, after the inserts
+
+
+def test_crash_while_deleting_journals_keeps_committed_batch(temp_data_dir):
+    """Marker present, some journals already gone: every file keeps the batch."""
+    csv_layer = CSVLayer(data_dir=temp_data_dir)
+    names = ["transactions.csv", "receiving_logs.csv", "lots.csv"]
+    before = {name: (temp_data_dir / name).read_bytes() for name in names}
+    txn, log, lot = _receipt()
+    csv_layer.write_receipt_batch([txn], [log], [lot])
+    assert not list(temp_data_dir.glob("append-*.commit"))
+    after = {name: (temp_data_dir / name).read_bytes() for name in names}
+
+    # transactions.csv.journal already deleted, the other two still there
+    for name in names[1:]:
+        added = after[name][len(before[name]):]
+        (temp_data_dir / f"{name}.journal").write_text(json.dumps({
+            "size": len(before[name]), "length": len(added),
+            "sha256": hashlib.sha256(added).hexdigest(), "batch": "b1", "files": 3,
+        }))
+    (temp_data_dir / "append-b1.commit").write_text(json.dumps({"batch": "b1", "files": names}))
+
+    layer = CSVLayer(data_dir=temp_data_dir)
+    assert {name: (temp_data_dir / name).read_bytes() for name in names} == after
+    assert not list(temp_data_dir.glob("*.journal"))
+    assert not list(temp_data_dir.glob("append-*.commit"))
+    assert [t.qty for t in layer.read_transactions() if t.event == EventType.RECEIPT] == [12]
+    assert "DDT-1" in layer.receiving_document_ids()
+
+
+def test_sqlite_commit_failure_does_not_duplicate_csv_rows(temp_data_dir, monkeypatch):
+    """COMMIT fails after the CSV half landed: the fallback only adds the ledger rows."""
+    import src.persistence.storage_adapter as sa
+
+    monkeypatch.setattr(sa, "DATABASE_PATH", temp_data_dir / "app.db")
+    monkeypatch.setattr(sa, "automatic_backup_on_startup", lambda **kwargs: None)
+    adapter = sa.StorageAdapter(data_dir=temp_data_dir, force_backend="sqlite")
+    assert adapter.is_sqlite_mode()
+
+    def _commit_fails(transactions, before_commit=None):
+        before_commit()
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(LedgerRepository, "append_batch", lambda self, *a, **k: _commit_fails(*a, **k))
+    txn, log, lot = _receipt()
+    adapter.write_receipt_batch([txn], [log], [lot])
+
+    csv_layer = adapter.csv_layer
+    assert [t.event for t in csv_layer.read_transactions()] == [EventType.RECEIPT]
+    assert [r["document_id"] for r in csv_layer.read_receiving_logs()] == ["DDT-1"]
+    assert [l.lot_id for l in csv_layer.read_lots()] == ["L1"]
+    adapter.close()
@@ -397,3 +397,59 @@ class TestReceivingTraceability:
         
         assert int(order_log["qty_received"]) == 50
         assert order_log["status"] == "RECEIVED"
+
+
+def _receiving_setup(csv_layer):
+    csv_layer.write_sku(SKU(sku="0000001", description="Latte", shelf_life_days=10))
+    csv_layer.write_sku(SKU(sku="0000002", description="Yogurt", has_expiry_label=True))
+    csv_layer.write_sku(SKU(sku="0000003", description="Acqua"))
+    csv_layer.write_order_log("ORD-1", "2026-03-01", "0000001", 30, "PENDING", "2026-03-04")
+    csv_layer.write_order_log("ORD-2", "2026-03-02", "0000001", 20, "PENDING", "2026-03-05")
+    csv_layer.write_order_log("ORD-3", "2026-03-02", "0000002", 10, "PENDING", "2026-03-05")
+
+
+_DOCUMENTS = [
+    {"document_id": "DDT-A", "receipt_date": date(2026, 3, 4), "items": [
+        {"sku": "0000001", "qty_received": 25},
+        {"sku": "0000002", "qty_received": 4, "expiry_date": "2026-04-01"},
+    ]},
+    {"document_id": "DDT-B", "receipt_date": date(2026, 3, 5), "items": [
+        {"sku": "0000001", "qty_received": 15},
+        {"sku": "0000003", "qty_received": 6},
+    ], "notes": "second truck"},
+    {"document_id": "DDT-A", "receipt_date": date(2026, 3, 5), "items": [
+        {"sku": "0000001", "qty_received": 99},
+    ]},
+]
+
+
+def test_close_receipts_batch_matches_sequential_documents(tmp_path, monkeypatch):
+    """A batch writes what closing the documents one by one writes, with one commit."""
+    layers = [CSVLayer(data_dir=tmp_path / name) for name in ("seq", "batch")]
+    for layer in layers:
+        _receiving_setup(layer)
+    sequential, batch = layers
+
+    seq_results = [
+        ReceivingWorkflow(sequential).close_receipt_by_document(
+            doc["document_id"], doc["receipt_date"], doc["items"], doc.get("notes", ""),
+        )
+        for doc in _DOCUMENTS
+    ]
+
+    calls = []
+    for name in ("read_order_logs", "read_skus", "write_receipt_batch", "update_orders_received_qty"):
+        original = getattr(batch, name)
+        monkeypatch.setattr(batch, name, lambda *a, _n=name, _o=original, **k: calls.append(_n) or _o(*a, **k))
+    batch_results = ReceivingWorkflow(batch).close_receipts_batch(_DOCUMENTS)
+
+    assert batch_results == seq_results
+    assert [r[1] for r in batch_results] == [False, False, True]
+    # order_logs: read once for allocation + once by the single rewrite
+    assert {name: calls.count(name) for name in set(calls)} == {
+        "read_order_logs": 2, "read_skus": 1, "write_receipt_batch": 1, "update_orders_received_qty": 1,
+    }
+    assert batch.read_transactions() == sequential.read_transactions()
+    assert batch.read_receiving_logs() == sequential.read_receiving_logs()
+    assert batch.read_lots() == sequential.read_lots()
+    assert batch.read_order_logs() == sequential.read_order_logs()
@@ -553,6 +553,65 @@ class TestBatchComputation:
         assert "SKU001" in results
         assert "SKU_MISSING" not in results  # Skipped
 
+    @pytest.mark.parametrize("alpha", [0.80, 0.95, 0.999])
+    def test_batch_matches_per_sku_path(self, alpha):
+        """The vectorized batch returns exactly what compute_order returns per SKU."""
+        order_date = date(2024, 2, 1)
+        cases = {
+            "PACK": (2, [], OrderConstraints(pack_size=6), _generate_volatile_history()),
+            "MOQ": (0, [], OrderConstraints(pack_size=5, moq=40), _generate_stable_history(daily_qty=4.0)),
+            "CAP": (0, [{"receipt_date": date(2024, 2, 2), "qty": 1}],
+                    OrderConstraints(pack_size=3, max_stock=4), _generate_stable_history()),
+            "OVER": (500, [], OrderConstraints(max_stock=100), _generate_stable_history()),
+            "LATE": (0, [{"receipt_date": date(2024, 6, 1), "qty": 30}], OrderConstraints(),
+                     _generate_stable_history(days=20, daily_qty=2.5)),
+        }
+        batch = compute_order_batch(
+            skus=list(cases),
+            order_date=order_date,
+            lane=Lane.STANDARD,
+            alpha=alpha,
+            inventory_data={sku: {"on_hand": c[0], "pipeline": c[1]} for sku, c in cases.items()},
+            constraints_map={sku: c[2] for sku, c in cases.items()},
+            history_map={sku: c[3] for sku, c in cases.items()},
+        )
+        for sku, (on_hand, pipeline, constraints, history) in cases.items():
+            expected = compute_order(
+                sku=sku, order_date=order_date, lane=Lane.STANDARD, alpha=alpha,
+                on_hand=on_hand, pipeline=pipeline, constraints=constraints, history=history,
+            )
+            assert batch[sku] == expected
+            assert type(batch[sku]["order_final"]) is int
+        notes = [note.split(":")[0] for r in batch.values() for note in r["constraints_applied"]]
+        assert {"pack_size", "moq", "max_stock"} <= set(notes)
+
+    def test_batch_demand_overrides_skip_sigma_refit(self, monkeypatch):
+        """SKUs with (μ_P, σ_P) from the demand engine match the override path, no rolling refit."""
+        import src.uncertainty as uncertainty
+
+        history = _generate_stable_history()
+        expected = compute_order(
+            sku="SKU001", order_date=date(2024, 2, 1), lane=Lane.STANDARD, alpha=0.95,
+            on_hand=5, pipeline=[], constraints=OrderConstraints(pack_size=4), history=history,
+            forecast_demand_override=33.3, sigma_horizon_override=6.1,
+        )
+
+        def _no_refit(*args, **kwargs):
+            raise AssertionError("rolling sigma refit not expected")
+
+        monkeypatch.setattr(uncertainty, "estimate_demand_uncertainty", _no_refit)
+        batch = compute_order_batch(
+            skus=["SKU001"],
+            order_date=date(2024, 2, 1),
+            lane=Lane.STANDARD,
+            alpha=0.95,
+            inventory_data={"SKU001": {"on_hand": 5, "pipeline": []}},
+            constraints_map={"SKU001": OrderConstraints(pack_size=4)},
+            history_map={"SKU001": history},
+            demand_overrides={"SKU001": (33.3, 6.1)},
+        )
+        assert batch["SKU001"] == expected
+
 
 class TestEdgeCases:
     """Test edge cases and boundary conditions."""
@@ -10,6 +10,7 @@ Covers:
   - Days-of-supply bell-curve scoring
   - Batch population scoring (cross-SKU percentile rank)
   - Confidence / data-quality flags
+  - Columnar pipeline parity with the per-SKU reference helpers
 """
 
 import math
@@ -26,7 +27,9 @@ from src.analytics.scoring import (
     build_feature_row,
     compute_importance_scores,
     compute_health_score,
+    compute_health_scores,
     compute_priority_scores,
+    index_sales_by_sku,
     score_all_skus,
     _availability_subscore,
     _waste_subscore,
@@ -34,6 +37,7 @@ from src.analytics.scoring import (
     _supplier_subscore,
     _forecast_subscore,
     _clamp,
+    _percentile_rank,
     _robust_scale_list,
 )
 
@@ -527,3 +531,51 @@ def test_single_sku_population_no_crash():
     assert len(results) == 1
     r = results[0]
     assert 0.0 <= r.priority_score <= 100.0
+
+
+# ---------------------------------------------------------------------------
+# 8. Columnar pipeline parity
+# ---------------------------------------------------------------------------
+
+class TestColumnarParity:
+
+    def test_robust_scale_matches_percentile_rank(self):
+        vals = [3.0, 1.0, 3.0, 0.0, 7.5, 1.0, 3.0, -2.0]
+        expected = [_percentile_rank(v, vals) * 100.0 for v in vals]
+        assert _robust_scale_list(vals) == expected
+        assert _robust_scale_list([4.0, 4.0, 4.0]) == [50.0, 50.0, 50.0]
+        assert _robust_scale_list([]) == []
+
+    def test_health_scores_match_scalar(self):
+        rows = [
+            _make_row("A"),
+            _make_row("B", shelf_life_days=None, waste_rate=None),
+            _make_row("C", oos_rate=None, days_of_supply=None, fill_rate=None,
+                      otif_rate=None, avg_delay_days=None, wmape=None, bias=None),
+            _make_row("D", days_of_supply=-3.0, avg_daily_sales=0.0),
+            _make_row("E", days_of_supply=DOS_TARGET_HIGH * 3, oos_rate=1.4),
+            _make_row("F", days_of_supply=DOS_TARGET_LOW / 2, avg_delay_days=60.0),
+        ]
+        rows[0].pi80_coverage_error = -0.12
+        rows[1].wmape_promo, rows[1].n_promo_points = 35.0, 4
+        rows[2].wmape_event, rows[2].n_event_points = 80.0, 3
+        rows[3].wmape_promo, rows[3].n_promo_points = 35.0, 1   # below min points
+        for weights in (None, {"availability": 0.0, "waste": 1.0, "inventory_eff": 0.0,
+                               "supplier": 0.0, "forecast": 0.0}):
+            assert compute_health_scores(rows, weights) == [
+                compute_health_score(r, weights) for r in rows
+            ]
+
+    def test_index_sales_by_sku_gives_same_feature_row(self):
+        from src.domain.models import SalesRecord
+
+        ref = date(2025, 1, 15)
+        sales = [
+            SalesRecord(date=date(2025, 1, d), sku=sku, qty_sold=q)
+            for d, sku, q in [(2, "A", 3), (3, "B", 1), (5, "A", 0), (14, "A", 4), (15, "A", 9)]
+        ]
+        by_sku = index_sales_by_sku(sales)
+        assert [s.qty_sold for s in by_sku["A"]] == [3, 0, 4, 9]
+        full = build_feature_row("A", ref, 30, sales, [], None, None, stock_on_hand=5.0)
+        grouped = build_feature_row("A", ref, 30, by_sku["A"], [], None, None, stock_on_hand=5.0)
+        assert full == grouped
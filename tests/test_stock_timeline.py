@@ -0,0 +1,77 @@
+"""
+Tests for the per-SKU stock timeline (single forward replay).
+
+Every as-of / end-of-day value must equal StockCalculator.calculate_asof on
+the full lists, including implicit sales, ledger-SALE dedup and same-day
+event priority.
+"""
+import random
+from datetime import date, timedelta
+
+from src.domain import ledger
+from src.domain.ledger import StockCalculator, StockTimeline, get_stock_timeline
+from src.domain.models import EventType, SalesRecord, Transaction
+
+SKUS = ["SKU001", "SKU002"]
+EVENTS = [
+    EventType.SNAPSHOT, EventType.ORDER, EventType.RECEIPT, EventType.SALE,
+    EventType.WASTE, EventType.ADJUST, EventType.UNFULFILLED, EventType.OOS_OVERRIDE,
+]
+BASE = date(2026, 3, 1)
+
+
+def _random_data(rng, n=250):
+    txns = [
+        Transaction(date=BASE + timedelta(days=rng.randint(0, 40)), sku=rng.choice(SKUS),
+                    event=rng.choice(EVENTS), qty=rng.randint(0, 30))
+        for _ in range(n)
+    ]
+    sales = [
+        SalesRecord(date=BASE + timedelta(days=d), sku=sku, qty_sold=rng.randint(0, 6))
+        for sku in SKUS for d in range(0, 41) if rng.random() < 0.7
+    ]
+    return txns, sales
+
+
+def test_asof_matches_calculate_asof():
+    rng = random.Random(4)
+    for _ in range(5):
+        txns, sales = _random_data(rng)
+        for sku in SKUS + ["MISSING"]:
+            for sales_arg in (sales, None):
+                timeline = StockTimeline(sku, txns, sales_arg)
+                for d in range(-2, 45):
+                    asof = BASE + timedelta(days=d)
+                    assert timeline.asof(asof) == StockCalculator.calculate_asof(sku, asof, txns, sales_arg)
+
+
+def test_eod_on_hand_matches_per_day_replay():
+    rng = random.Random(9)
+    txns, sales = _random_data(rng)
+    for sku in SKUS:
+        timeline = StockTimeline(sku, txns, sales)
+        start, end = BASE - timedelta(days=3), BASE + timedelta(days=44)
+        expected = [
+            StockCalculator.calculate_asof(sku, start + timedelta(days=i + 1), txns, sales).on_hand
+            for i in range((end - start).days + 1)
+        ]
+        assert timeline.eod_on_hand(start, end) == expected
+        assert timeline.eod_on_hand(BASE + timedelta(days=10), BASE + timedelta(days=12)) == expected[13:16]
+    assert timeline.eod_on_hand(BASE, BASE - timedelta(days=1)) == []
+
+
+def test_cache_keyed_on_sku_and_revision(monkeypatch):
+    monkeypatch.setattr(ledger, "_TIMELINE_CACHE", ledger.OrderedDict())
+    monkeypatch.setattr(ledger, "_TIMELINE_CACHE_SIZE", 2)
+    txns, sales = _random_data(random.Random(1))
+
+    first = get_stock_timeline("SKU001", txns, sales, revision=(1, 2))
+    assert get_stock_timeline("SKU001", txns, sales, revision=(1, 2)) is first
+    assert get_stock_timeline("SKU001", txns, sales, revision=(1, 3)) is not first
+    assert get_stock_timeline("SKU001", txns, sales, revision=None) is not first
+
+    # LRU: touching SKU001@(1,3) keeps it, the oldest entry is evicted
+    get_stock_timeline("SKU001", txns, sales, revision=(1, 3))
+    get_stock_timeline("SKU002", txns, sales, revision=(1, 3))
+    assert ("SKU001", (1, 2), True) not in ledger._TIMELINE_CACHE
+    assert list(ledger._TIMELINE_CACHE) == [("SKU001", (1, 3), True), ("SKU002", (1, 3), True)]
@@ -442,6 +442,109 @@ class TestDailyCloseWorkflow:
         # Verify sales
         sales = csv_layer.read_sales()
         assert len(sales) == 3
+    
+    def test_process_bulk_eod_stock_single_batch_write(self, csv_layer, monkeypatch):
+        """Bulk EOD loads data once and persists all events in one ledger batch."""
+        from src.domain.models import SKU
+        for i in range(3):
+            csv_layer.write_sku(SKU(sku=f"SKU00{i+1}", description=f"Product {i+1}"))
+            csv_layer.write_transaction(Transaction(
+                date=date(2026, 1, 1), sku=f"SKU00{i+1}", event=EventType.SNAPSHOT, qty=100,
+            ))
+        
+        batches, single_writes = [], []
+        original_batch = csv_layer.write_eod_batch
+        monkeypatch.setattr(csv_layer, "write_eod_batch",
+                            lambda txns, *a: batches.append(list(txns)) or original_batch(txns, *a))
+        monkeypatch.setattr(csv_layer, "write_transaction", single_writes.append)
+        monkeypatch.setattr(csv_layer, "write_sales", lambda sales: pytest.fail("separate sales write"))
+        
+        workflow = DailyCloseWorkflow(csv_layer)
+        results = workflow.process_bulk_eod_stock(
+            eod_entries={"SKU001": 90, "GHOST": 5, "SKU003": -1, "SKU002": 100},
+            eod_date=date(2026, 1, 2),
+        )
+        
+        assert results[0] == "✓ SKU001 | Venduto: 10"
+        assert results[1].startswith("✗ GHOST")
+        assert results[2].startswith("✗ SKU003")
+        assert results[3] == "✓ SKU002 | Nessun cambiamento (stock teorico = EOD)"
+        assert single_writes == []
+        assert len(batches) == 1
+        assert [(t.sku, t.event, t.qty) for t in batches[0]] == [("SKU001", EventType.SALE, 10)]
+        assert [(s.sku, s.qty_sold) for s in csv_layer.read_sales()] == [("SKU001", 10)]
+        
+        # Re-run replaces the day's sale instead of appending a second one
+        workflow.process_bulk_eod_stock({"SKU001": 85}, date(2026, 1, 2))
+        assert [(s.sku, s.qty_sold) for s in csv_layer.read_sales()] == [("SKU001", 15)]
+    
+    def test_eod_close_consumes_lots_once_in_sqlite_mode(self, temp_data_dir, monkeypatch):
+        """SQLite mode: the EOD SALE consumes lots (FEFO) exactly once, sales and lots in CSV."""
+        import src.persistence.storage_adapter as sa
+        from src.domain.models import SKU, Lot
+        
+        monkeypatch.setattr(sa, "DATABASE_PATH", temp_data_dir / "app.db")
+        monkeypatch.setattr(sa, "automatic_backup_on_startup", lambda **kwargs: None)
+        storage = sa.StorageAdapter(data_dir=temp_data_dir, force_backend="sqlite")
+        assert storage.is_sqlite_mode()
+        storage.write_sku(SKU(sku="0000001", description="Milk"))
+        storage.write_transaction(Transaction(
+            date=date(2026, 1, 1), sku="0000001", event=EventType.SNAPSHOT, qty=10,
+        ))
+        storage.write_lot(Lot("LOT-A", "0000001", date(2026, 2, 1), 10, "REC-A", date(2026, 1, 1)))
+        
+        workflow = DailyCloseWorkflow(storage)
+        workflow.process_bulk_eod_stock({"0000001": 6}, date(2026, 1, 2))
+        assert [(l.lot_id, l.qty_on_hand) for l in storage.read_lots()] == [("LOT-A", 6)]
+        assert [(s.sku, s.qty_sold) for s in storage.read_sales()] == [("0000001", 4)]
+        sales = [t for t in storage.read_transactions() if t.event == EventType.SALE]
+        assert [(t.qty, t.note) for t in sales] == [(4, "EOD chiusura giornaliera; FEFO: LOT-A:4pz(exp:2026-02-01)")]
+        storage.close()
+    
+    def test_process_bulk_eod_stock_matches_per_entry_processing(self, temp_data_dir, monkeypatch):
+        """Per-SKU slices give the same sales and ledger as one process_eod_stock per SKU."""
+        import random
+        from src.domain.models import SKU
+        rng = random.Random(5)
+        eod_date = date(2026, 1, 20)
+        skus = [f"SKU{i:03d}" for i in range(12)]
+        txns, sales = [], []
+        for sku in skus:
+            txns.append(Transaction(date=date(2026, 1, 1), sku=sku, event=EventType.SNAPSHOT, qty=rng.randint(20, 80)))
+            for _ in range(rng.randint(0, 6)):
+                event = rng.choice([EventType.RECEIPT, EventType.WASTE, EventType.SALE, EventType.ORDER])
+                txns.append(Transaction(date=date(2026, 1, rng.randint(2, 20)), sku=sku, event=event,
+                                        qty=rng.randint(1, 10)))
+            sales += [SalesRecord(date=date(2026, 1, d), sku=sku, qty_sold=rng.randint(0, 3))
+                      for d in range(2, 21) if rng.random() < 0.4]
+        entries = {sku: rng.randint(0, 60) for sku in skus}
+        
+        layers = []
+        for name in ("bulk", "single"):
+            layer = CSVLayer(data_dir=temp_data_dir / name)
+            for sku in skus:
+                layer.write_sku(SKU(sku=sku, description=sku))
+            layer.overwrite_transactions(txns)
+            layer.write_sales(sales)
+            layers.append(layer)
+        bulk_layer, single_layer = layers
+        
+        reads = []
+        for method in ("read_skus", "read_transactions", "read_sales"):
+            original = getattr(bulk_layer, method)
+            monkeypatch.setattr(bulk_layer, method,
+                                lambda _o=original, _m=method: reads.append(_m) or _o())
+        bulk = DailyCloseWorkflow(bulk_layer).process_bulk_eod_stock(entries, eod_date)
+        single = [f"✓ {DailyCloseWorkflow(single_layer).process_eod_stock(sku, eod_date, qty)[2]}"
+                  for sku, qty in entries.items()]
+        monkeypatch.undo()
+        
+        assert sorted(reads) == ["read_sales", "read_skus", "read_transactions"]
+        assert bulk == single
+        key = lambda r: (r.sku, r.date)
+        assert sorted(bulk_layer.read_sales(), key=key) == sorted(single_layer.read_sales(), key=key)
+        ledger = lambda layer: sorted(layer.read_transactions(), key=lambda t: (t.sku, t.date, t.event.value, t.qty))
+        assert ledger(bulk_layer) == ledger(single_layer)
         
     def test_process_eod_invalid_sku(self, csv_layer):
         """Process EOD for non-existent SKU should raise error."""